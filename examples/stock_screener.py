@@ -32,6 +32,8 @@ except ImportError:
     print("警告: 无法导入 StockUniverse，部分功能可能受限")
     StockUniverse = None
 
+from analyzers.technical_screen import TechnicalScreenEngine
+
 # 导入分析模块
 try:
     from analyzers.fundamental_analyzer import FundamentalAnalyzer
@@ -96,6 +98,9 @@ class StockScreener:
         # 初始化股票池管理器
         self.stock_universe = StockUniverse()
         
+        # 向量化技术评分引擎
+        self.technical_engine = TechnicalScreenEngine()
+        
         # 初始化分析器
         self.enable_fundamental = enable_fundamental and ENABLE_FUNDAMENTAL
         self.enable_market_env = enable_market_env and ENABLE_MARKET_ENV
@@ -346,104 +351,18 @@ class StockScreener:
 
     def calculate_technical_scores(self, df):
         """计算技术分析各项得分"""
-        latest = df.iloc[-1]
-        scores = {}
-        
-        # 1. 趋势得分 (25%)
-        trend_score = 0
-        if latest['Close'] > latest['sma_20']:
-            trend_score += 25
-        if latest['sma_20'] > latest['sma_50']:
-            trend_score += 25
-        if latest['Close'] > latest['sma_5']:
-            trend_score += 25
-        if latest['ema_12'] > latest['ema_26']:
-            trend_score += 25
-        
-        scores['trend_score'] = min(trend_score, 100)
-        
-        # 2. 动量得分 (25%)
-        momentum_score = 0
-        if latest['rsi'] > 30 and latest['rsi'] < 70:
-            momentum_score += 50
-        if latest['macd'] > latest['macd_signal']:
-            momentum_score += 50
-        
-        scores['momentum_score'] = min(momentum_score, 100)
-        
-        # 3. 波动得分 (20%) - 低波动率更好
-        volatility_score = 100
-        if latest['volatility'] > 0.4:  # 高波动
-            volatility_score = 20
-        elif latest['volatility'] > 0.3:
-            volatility_score = 60
-        elif latest['volatility'] > 0.2:
-            volatility_score = 100
-        
-        scores['volatility_score'] = volatility_score
-        
-        # 4. 成交量得分 (15%)
-        volume_score = 0
-        if latest['volume_ratio'] > 1.5:  # 成交量放大
-            volume_score = 100
-        elif latest['volume_ratio'] > 1.2:
-            volume_score = 80
-        elif latest['volume_ratio'] > 1.0:
-            volume_score = 60
-        elif latest['volume_ratio'] > 0.8:
-            volume_score = 40
-        else:
-            volume_score = 20
-        
-        # 计算标准化成交量得分
-        volume_score = min(latest['volume_ratio'] * 30, 100)
-        scores['volume_score'] = volume_score
-        
-        # 5. 技术指标得分 (15%)
-        tech_score = 0
-        # 布林带位置
-        if 0.2 <= latest['bb_position'] <= 0.8:
-            tech_score += 30
-        # RSI范围
-        if 40 <= latest['rsi'] <= 70:
-            tech_score += 40
-        # MACD信号
-        if latest['macd_histogram'] > 0:
-            tech_score += 30
-        
-        scores['technical_score'] = min(tech_score, 100)
-        
-        # 综合技术得分
-        weights = {
-            'trend_score': 0.25,
-            'momentum_score': 0.25,
-            'volatility_score': 0.20,
-            'volume_score': 0.15,
-            'technical_score': 0.15
+        scores = self.technical_engine.score_snapshot(df.iloc[[-1]]).iloc[0]
+        return {
+            'trend_score': float(scores['trend_score']),
+            'momentum_score': float(scores['momentum_score']),
+            'volatility_score': float(scores['volatility_score']),
+            'volume_score': float(scores['volume_score']),
+            'technical_score': float(scores['technical_score'])
         }
-        
-        technical_total = sum(scores[key] * weights[key] for key in weights)
-        scores['technical_score'] = technical_total
-        
-        return scores
 
     def calculate_bonus_points(self, latest):
         """计算额外加分项"""
-        bonus_points = 0
-        
-        # 近期表现
-        if latest['momentum_20'] > 0.1:  # 20日涨幅>10%
-            bonus_points += 20
-        elif latest['momentum_20'] > 0.05:  # 20日涨幅>5%
-            bonus_points += 15
-        elif latest['momentum_20'] > 0.02:  # 20日涨幅>2%
-            bonus_points += 10
-        
-        # RSI适中
-        if 50 <= latest['rsi'] <= 70:
-            bonus_points += 5
-        
-        return min(bonus_points, 25)
+        return int(self.technical_engine.score_snapshot(latest.to_frame().T)['bonus_points'].iloc[0])
 
     def screen_stocks(self, symbols=None, max_workers=3):
         """
@@ -519,6 +438,75 @@ class StockScreener:
         
         return self.results
 
+    def screen_universe(self, symbols=None, data_dir=None, data_by_symbol=None, top_n=None):
+        """
+        全市场技术面筛选 - 向量化版本
+        将股票池对齐为OHLCV面板，一次性计算全部指标和得分（仅技术面）
+        数据来源优先级: data_by_symbol > data_dir 本地CSV > yfinance 批量下载
+        """
+        start_time = time.time()
+        self.results = []
+        self.failed_stocks = []
+        
+        if data_by_symbol is not None:
+            panel = self.technical_engine.build_panel(data_by_symbol)
+        elif data_dir is not None:
+            panel = self.technical_engine.load_panel_from_directory(data_dir, symbols)
+        else:
+            if symbols is None:
+                symbols = self.get_stock_list()
+            print(f"📥 批量下载 {len(symbols)} 只股票数据...")
+            raw = yf.download(symbols, period="6mo", interval="1d", group_by='ticker',
+                              auto_adjust=False, progress=False, threads=True)
+            data_by_symbol = self.technical_engine.split_download(raw, symbols)
+            panel = self.technical_engine.build_panel(data_by_symbol)
+        
+        universe = list(panel['Close'].columns)
+        print(f"\n🔍 向量化筛选 {len(universe)} 只股票...")
+        table = self.technical_engine.score_panel(panel)
+        
+        for symbol in universe:
+            if symbol not in table.index:
+                self.failed_stocks.append(f"{symbol}: 数据不足")
+        if symbols is not None:
+            for symbol in symbols:
+                if symbol not in panel['Close'].columns:
+                    self.failed_stocks.append(f"{symbol}: 数据获取失败")
+        
+        if top_n is not None:
+            table = table.head(top_n)
+        
+        for symbol, row in table.iterrows():
+            self.results.append({
+                'symbol': symbol,
+                'total_score': round(float(row['screen_score']), 2),
+                'score_breakdown': {'technical_score': round(float(row['technical_score']), 1)},
+                'technical_details': {
+                    'trend_score': round(float(row['trend_score']), 1),
+                    'momentum_score': round(float(row['momentum_score']), 1),
+                    'volatility_score': round(float(row['volatility_score']), 1),
+                    'volume_score': round(float(row['volume_score']), 1),
+                    'technical_score': round(float(row['technical_score']), 1)
+                },
+                'fundamental_details': {},
+                'market_details': {},
+                'sentiment_fund_details': {},
+                'current_price': round(float(row['current_price']), 2),
+                'volume_ratio': round(float(row['volume_ratio']), 2) if not pd.isna(row['volume_ratio']) else 0,
+                'rsi': round(float(row['rsi']), 1) if not pd.isna(row['rsi']) else 0,
+                'momentum_20': round(float(row['momentum_20']) * 100, 2) if not pd.isna(row['momentum_20']) else 0,
+                'volatility': round(float(row['volatility']) * 100, 2) if not pd.isna(row['volatility']) else 0,
+                'bonus_points': int(row['bonus_points'])
+            })
+        
+        elapsed_time = time.time() - start_time
+        print("\n📊 筛选完成!")
+        print(f"⏱️  用时: {elapsed_time:.1f}秒")
+        print(f"✅ 成功: {len(self.results)}只股票")
+        print(f"❌ 失败: {len(self.failed_stocks)}只股票")
+        
+        return self.results
+
     def get_stock_list(self, source='sp500'):
         """获取股票列表"""
         if source == 'sp500':
@@ -905,6 +893,19 @@ def main():
                     print(f"  {i}. {stock['symbol']}: {stock['total_score']:.1f}分")
             return
         
+        elif command == 'local':
+            # 本地数据全市场向量化筛选
+            if len(sys.argv) < 3:
+                print("❌ 请指定本地数据目录")
+                return
+            top_n = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 20
+            screener = StockScreener(enable_fundamental=False, enable_market_env=False,
+                                     enable_sentiment_fund=False)
+            results = screener.screen_universe(data_dir=sys.argv[2], top_n=top_n)
+            for i, stock in enumerate(results, 1):
+                print(f"  {i}. {stock['symbol']}: {stock['total_score']:.1f}分")
+            return
+        
         else:
             print(f"❌ 未知命令: {command}")
             print_usage()
@@ -928,6 +929,7 @@ def print_usage():
     print("  python screener.py crypto [数量]    - 分析加密货币相关")
     print("  python screener.py etfs [数量]      - 分析热门ETF")
     print("  python screener.py comprehensive [数量] - 综合分析")
+    print("  python screener.py local <目录> [TOP N] - 本地CSV全市场向量化技术筛选")
     print("")
     print("📝 自选股管理:")
     print("  python screener.py watchlist        - 显示自选股池")
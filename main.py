@@ -21,9 +21,11 @@
 import os
 import sys
 import argparse
-import asyncio
 from datetime import datetime
 
+# 各子命令的依赖（pandas、yfinance、asyncio 等）在对应处理函数中按需导入，
+# 保证 --help、自选股列表等轻量命令快速启动
+
 def print_banner():
     """打印系统横幅"""
     print("===============================================================================")
@@ -78,6 +80,7 @@ def print_help():
     print("   python3 main.py performance start            # 启动监控")
     print("   python3 main.py performance stop             # 停止监控")
     print("   python3 main.py performance status           # 监控状态")
+    print("   python3 main.py performance latency          # 管道延迟分位数")
     
     print("\n�🔬 6. 高级技术库 (专业级功能):")
     print("   python3 main.py advanced anomaly AAPL        # 异常检测系统")
@@ -98,24 +101,31 @@ def print_help():
     print("   python3 main.py trade monitor                # 启动交易监控")
     print("=" * 80)
 
+def run_simple_cli(cli_args):
+    """在当前进程中运行统一CLI（不再为每个命令启动新的Python解释器）"""
+    core_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'core')
+    if core_dir not in sys.path:
+        sys.path.insert(0, core_dir)
+    
+    import simple_cli
+    return simple_cli.main(cli_args)
+
 def handle_select_command(args):
     """处理选股命令"""
     print("🔍 启动智能选股系统...")
     
     # 使用统一CLI处理选股
-    cli_script = os.path.join(os.path.dirname(__file__), 'src', 'core', 'simple_cli.py')
-    
     if args.action == 'single':
         if not args.symbol:
             print("❌ 请指定股票代码")
             return
-        cmd = f"python3 {cli_script} screen single {args.symbol}"
+        cli_args = ['screen', 'single', args.symbol]
     elif args.action == 'pool':
         pool = args.pool or 'sp500'
         limit = getattr(args, 'limit', 10)
-        cmd = f"python3 {cli_script} screen pool {pool} --limit {limit}"
+        cli_args = ['screen', 'pool', pool, '--limit', str(limit)]
     elif args.action == 'batch':
-        cmd = f"python3 {cli_script} screen batch"
+        cli_args = ['screen', 'batch']
     elif args.action == 'anomaly':
         print("🔬 启动异常检测分析...")
         handle_advanced_command(['anomaly', args.symbol])
@@ -124,39 +134,33 @@ def handle_select_command(args):
         print("❌ 未知选股操作")
         return
     
-    os.system(cmd)
+    run_simple_cli(cli_args)
 
 def handle_watchlist_command(args):
     """处理自选股池命令"""
     print("📋 启动自选股池管理...")
     
     # 使用统一CLI处理自选股
-    cli_script = os.path.join(os.path.dirname(__file__), 'src', 'core', 'simple_cli.py')
-    
-    if args.action == 'add' and args.symbol:
-        cmd = f"python3 {cli_script} watchlist add {args.symbol}"
-    elif args.action == 'remove' and args.symbol:
-        cmd = f"python3 {cli_script} watchlist remove {args.symbol}"
+    if args.action in ('add', 'remove') and args.symbol:
+        cli_args = ['watchlist', args.action, args.symbol]
     else:
-        cmd = f"python3 {cli_script} watchlist {args.action}"
+        cli_args = ['watchlist', args.action]
     
-    os.system(cmd)
+    run_simple_cli(cli_args)
 
 def handle_strategy_command(args):
     """处理策略分析命令"""
     print("📊 启动策略分析系统...")
     
     # 使用统一CLI处理策略
-    cli_script = os.path.join(os.path.dirname(__file__), 'src', 'core', 'simple_cli.py')
-    
     if args.action == 'list':
-        cmd = f"python3 {cli_script} strategy list"
+        cli_args = ['strategy', 'list']
     elif args.action == 'test' and args.strategy and args.symbol:
-        cmd = f"python3 {cli_script} strategy test {args.strategy} {args.symbol}"
+        cli_args = ['strategy', 'test', args.strategy, args.symbol]
     elif args.action == 'multi' and args.strategies and args.symbol:
-        cmd = f"python3 {cli_script} strategy multi '{args.strategies}' {args.symbol}"
+        cli_args = ['strategy', 'multi', args.strategies, args.symbol]
     elif args.action == 'config' and args.config and args.symbol:
-        cmd = f"python3 {cli_script} config use {args.config} {args.symbol}"
+        cli_args = ['config', 'use', args.config, args.symbol]
     elif args.action == 'backtest':
         print("🔄 启动回测验证...")
         # 集成回测功能
@@ -175,7 +179,7 @@ def handle_strategy_command(args):
         print("❌ 策略命令参数不足")
         return
     
-    os.system(cmd)
+    run_simple_cli(cli_args)
 
 def handle_trade_command(args):
     """处理自动交易命令 - 实时响应式流程"""
@@ -462,7 +466,7 @@ def handle_performance_command(args):
         import sys
         import os
         sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'core'))
-        from performance_monitor import get_performance_monitor, start_performance_monitoring, stop_performance_monitoring, print_performance_dashboard
+        from performance_monitor import get_performance_monitor, start_performance_monitoring, stop_performance_monitoring, print_performance_dashboard, print_latency_summary
         
         if args.action == 'dashboard':
             print("📊 显示性能仪表板...")
@@ -505,6 +509,10 @@ def handle_performance_command(args):
                 print("\n💡 启动方法:")
                 print("   python3 main.py performance start    # 启动监控")
                 print("   python3 main.py trade monitor        # 启动交易监控(包含性能监控)")
+        elif args.action == 'latency':
+            print("⏱️ 管道延迟分位数 (p50/p99/p999)...")
+            print_latency_summary()
+            
         else:
             print("❌ 未知性能监控操作")
             
@@ -669,7 +677,7 @@ def create_parser():
     
     # 5. 性能监控命令
     perf_parser = subparsers.add_parser('performance', help='性能监控')
-    perf_parser.add_argument('action', choices=['dashboard', 'start', 'stop', 'status'], help='监控操作')
+    perf_parser.add_argument('action', choices=['dashboard', 'start', 'stop', 'status', 'latency'], help='监控操作')
     
     # 6. 高级技术库命令
     advanced_parser = subparsers.add_parser('advanced', help='高级技术库')
@@ -0,0 +1,161 @@
+"""
+技术指标结果缓存
+
+以"指标名 + 参数 + 输入数据指纹"为键缓存指标结果，
+按字节预算做LRU淘汰，并记录每条序列最近一次的计算结果，
+当新序列只是在旧序列末尾追加了K线时，只需计算尾部即可续接。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _array_bytes(values: np.ndarray) -> bytes:
+    """数组的原始字节（对象类型先逐元素哈希）"""
+    if values.dtype == object:
+        values = pd.util.hash_array(values)
+    return np.ascontiguousarray(values).tobytes()
+
+
+def fingerprint(series: Sequence[pd.Series], length: Optional[int] = None) -> str:
+    """
+    计算输入序列（前 length 行）的指纹
+
+    对索引和各序列的原始字节做一次 blake2b 哈希，
+    内容、长度或索引任一不同都会得到不同的指纹。
+    """
+    length = len(series[0]) if length is None else length
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(length.to_bytes(8, 'little'))
+    digest.update(_array_bytes(series[0].index[:length].to_numpy()))
+    for s in series:
+        digest.update(_array_bytes(s.to_numpy()[:length]))
+    return digest.hexdigest()
+
+
+def estimate_nbytes(values: Any) -> int:
+    """估算指标结果占用的字节数"""
+    if isinstance(values, pd.Series):
+        return int(values.memory_usage(index=True, deep=False))
+    if isinstance(values, np.ndarray):
+        return int(values.nbytes)
+    if isinstance(values, dict):
+        return sum(estimate_nbytes(v) for v in values.values())
+    return 64
+
+
+class IndicatorCache:
+    """
+    指标结果LRU缓存（字节预算）
+
+    - 精确命中：键为 (指标名, 参数键, 输入指纹)
+    - 续接：同一指标/参数/起始索引的序列记录最近一次的长度和前缀指纹，
+      供调用方判断新序列是否为旧序列追加K线后的结果
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (result, nbytes)
+        self._lineage = {}             # (指标名, 参数键, 起始索引) -> (长度, 指纹, key)
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'extends': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def params_key(params: Dict[str, Any]) -> str:
+        """参数键（与参数顺序无关）"""
+        return repr(sorted(params.items()))
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """精确查找，命中时移到LRU末尾"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def find_prefix(self, lineage_key: Tuple, series: Sequence[pd.Series]) -> Optional[Tuple[int, Any]]:
+        """
+        查找可续接的旧结果
+
+        Returns:
+            (旧序列长度, 旧结果)；新序列不是旧序列的追加时返回 None
+        """
+        with self._lock:
+            lineage = self._lineage.get(lineage_key)
+            if lineage is None:
+                return None
+            length, prefix_fp, key = lineage
+            entry = self._entries.get(key)
+
+        if entry is None or length >= len(series[0]):
+            return None
+        if fingerprint(series, length) != prefix_fp:
+            return None
+        return length, entry[0]
+
+    def put(self, key: Tuple, result: Any, nbytes: int,
+            lineage_key: Tuple = None, length: int = 0, extended: bool = False):
+        """写入结果并按字节预算淘汰最久未使用的条目"""
+        with self._lock:
+            if extended:
+                self.stats['extends'] += 1
+            else:
+                self.stats['misses'] += 1
+
+            if nbytes > self.max_bytes:
+                return
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (result, nbytes)
+            self.current_bytes += nbytes
+            if lineage_key is not None:
+                self._lineage[lineage_key] = (length, key[-1], key)
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.stats['evictions'] += 1
+
+            if len(self._lineage) > 2 * len(self._entries):
+                self._lineage = {
+                    k: v for k, v in self._lineage.items() if v[2] in self._entries
+                }
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._lineage.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中率等缓存统计"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses'] + self.stats['extends']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'extend_rate': self.stats['extends'] / lookups if lookups else 0.0
+            }
@@ -81,60 +81,87 @@ class StatisticalAnalyzer:
         self.scaler = StandardScaler() if SKLEARN_AVAILABLE else None
     
     def correlation_analysis(self, data: pd.DataFrame, method: str = 'pearson',
-                           significance_level: float = 0.05) -> CorrelationResult:
+                           significance_level: float = 0.05,
+                           min_abs_correlation: float = 0.5,
+                           dtype: Any = np.float64,
+                           block_size: int = 1024) -> CorrelationResult:
         """相关性分析
         
         Args:
             data: 数据框
             method: 相关性方法 ('pearson', 'spearman', 'kendall')
             significance_level: 显著性水平
+            min_abs_correlation: 强相关性的最小绝对相关系数
+            dtype: 相关性/显著性矩阵的数据类型，资产数量很大时可用 np.float32 减半内存
+            block_size: 分块计算的行数，控制中间结果的内存占用
         """
-        # 计算相关性矩阵
-        if method == 'pearson':
-            corr_matrix = data.corr(method='pearson')
-        elif method == 'spearman':
-            corr_matrix = data.corr(method='spearman')
-        elif method == 'kendall':
-            corr_matrix = data.corr(method='kendall')
-        else:
+        if method not in ('pearson', 'spearman', 'kendall'):
             raise ValueError(f"Unknown correlation method: {method}")
         
-        # 计算显著性
         n = len(data)
-        significance_matrix = pd.DataFrame(
-            index=corr_matrix.index,
-            columns=corr_matrix.columns
-        )
-        
-        if SCIPY_AVAILABLE:
-            for i in range(len(corr_matrix)):
-                for j in range(len(corr_matrix)):
-                    if i != j:
-                        r = corr_matrix.iloc[i, j]
-                        # 计算t统计量
-                        t_stat = r * np.sqrt((n - 2) / (1 - r**2))
-                        p_value = 2 * (1 - stats.t.cdf(abs(t_stat), n - 2))
-                        significance_matrix.iloc[i, j] = p_value
-                    else:
-                        significance_matrix.iloc[i, j] = 0.0
+        columns = data.columns
+        k = len(columns)
+        
+        # 无缺失值的数值数据走矩阵乘法快速路径（Spearman 只排名一次）；
+        # 有缺失值时需要按列对剔除，Kendall 无矩阵形式，交给 pandas
+        values = None
+        if method != 'kendall' and all(pd.api.types.is_numeric_dtype(t) for t in data.dtypes):
+            source = data.rank() if method == 'spearman' else data
+            values = source.to_numpy(dtype=np.float64)
+            if np.isnan(values).any():
+                values = None
+        
+        if values is None:
+            corr_values = data.corr(method=method).to_numpy(dtype=dtype)
+            standardized = None
         else:
-            # 简化的显著性计算
-            significance_matrix = significance_matrix.fillna(0.5)
+            corr_values = np.empty((k, k), dtype=dtype)
+            standardized = self._standardize_columns(values).astype(dtype, copy=False)
+        
+        p_values = np.full((k, k), 0.5, dtype=dtype)
+        strong_rows, strong_cols = [], []
+        
+        # 按行分块：计算相关系数、t统计量和p值，并只在上三角中筛选强相关
+        for lo in range(0, k, block_size):
+            hi = min(lo + block_size, k)
+            if standardized is not None:
+                block = standardized[:, lo:hi].T @ standardized
+                np.clip(block, -1.0, 1.0, out=block)
+                rows = np.arange(hi - lo)
+                diagonal = block[rows, lo + rows]
+                block[rows, lo + rows] = np.where(np.isnan(diagonal), np.nan, 1.0)
+                corr_values[lo:hi] = block
+            block = corr_values[lo:hi]
+            
+            if SCIPY_AVAILABLE:
+                p_block = self._correlation_p_values(block, n)
+                p_block[np.arange(hi - lo), np.arange(lo, hi)] = 0.0
+                p_values[lo:hi] = p_block
+            p_block = p_values[lo:hi]
+            
+            upper = np.arange(k)[None, :] > np.arange(lo, hi)[:, None]
+            mask = upper & (np.abs(block) > min_abs_correlation) & (p_block < significance_level)
+            i, j = np.nonzero(mask)
+            strong_rows.append(i + lo)
+            strong_cols.append(j)
+        
+        corr_matrix = pd.DataFrame(corr_values, index=columns, columns=columns, copy=False)
+        significance_matrix = pd.DataFrame(p_values, index=columns, columns=columns, copy=False)
         
-        # 找出强相关性
+        # 找出强相关性（上三角，按行优先顺序）
         strong_correlations = []
-        for i in range(len(corr_matrix)):
-            for j in range(i + 1, len(corr_matrix)):
-                corr_val = corr_matrix.iloc[i, j]
-                p_val = significance_matrix.iloc[i, j]
-                
-                if abs(corr_val) > 0.5 and p_val < significance_level:
-                    strong_correlations.append({
-                        'pair': (corr_matrix.index[i], corr_matrix.columns[j]),
-                        'correlation': corr_val,
-                        'p_value': p_val,
-                        'strength': 'strong' if abs(corr_val) > 0.7 else 'moderate'
-                    })
+        if strong_rows:
+            rows = np.concatenate(strong_rows)
+            cols = np.concatenate(strong_cols)
+            for i, j, corr_val, p_val in zip(rows.tolist(), cols.tolist(),
+                                             corr_values[rows, cols].tolist(),
+                                             p_values[rows, cols].tolist()):
+                strong_correlations.append({
+                    'pair': (columns[i], columns[j]),
+                    'correlation': corr_val,
+                    'p_value': p_val,
+                    'strength': 'strong' if abs(corr_val) > 0.7 else 'moderate'
+                })
         
         return CorrelationResult(
             correlation_matrix=corr_matrix,
@@ -142,6 +169,22 @@ class StatisticalAnalyzer:
             strong_correlations=strong_correlations
         )
     
+    @staticmethod
+    def _standardize_columns(values: np.ndarray) -> np.ndarray:
+        """按列中心化并缩放到单位范数，使 Z.T @ Z 即为相关系数矩阵（常数列为 NaN）"""
+        centered = values - values.mean(axis=0)
+        norms = np.sqrt(np.einsum('ij,ij->j', centered, centered))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return centered / np.where(norms > 0, norms, np.nan)
+    
+    @staticmethod
+    def _correlation_p_values(r: np.ndarray, n: int) -> np.ndarray:
+        """相关系数的双侧 t 检验 p 值（整块向量化计算）"""
+        r = r.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_stat = r * np.sqrt((n - 2) / (1 - r**2))
+        return 2 * stats.t.sf(np.abs(t_stat), n - 2)
+    
     def regression_analysis(self, X: pd.DataFrame, y: pd.Series,
                           model_type: str = 'linear',
                           alpha: float = 1.0) -> RegressionResult:
@@ -14,6 +14,7 @@ import talib
 import warnings
 
 from . import IndicatorResult, IndicatorType
+from .indicator_cache import IndicatorCache, estimate_nbytes, fingerprint
 
 
 class AdvancedIndicators:
@@ -151,14 +152,12 @@ class AdvancedIndicators:
         max_price = close.max()
         price_bins = np.linspace(min_price, max_price, bins + 1)
         
-        # 计算每个价格区间的成交量
-        volume_profile = []
-        for i in range(len(price_bins) - 1):
-            mask = (close >= price_bins[i]) & (close < price_bins[i + 1])
-            vol_in_bin = volume[mask].sum()
-            volume_profile.append(vol_in_bin)
-        
-        volume_profile = np.array(volume_profile)
+        # 计算每个价格区间的成交量（区间左闭右开，最高价不计入，与逐区间统计一致）
+        prices = close.to_numpy(dtype=float)
+        volumes = np.nan_to_num(volume.to_numpy(dtype=float), nan=0.0)
+        bin_index = np.searchsorted(price_bins, prices, side='right') - 1
+        in_range = (bin_index >= 0) & (bin_index < bins)
+        volume_profile = np.bincount(bin_index[in_range], weights=volumes[in_range], minlength=bins)
         price_centers = (price_bins[:-1] + price_bins[1:]) / 2
         
         # 找到成交量最大的价格区间（POC - Point of Control）
@@ -273,6 +272,9 @@ class AdvancedIndicators:
 class TechnicalPatterns:
     """技术形态识别"""
     
+    # 双顶/双底默认最大间隔（window 的倍数）
+    PATTERN_SPAN_WINDOWS = 10
+    
     @staticmethod
     def detect_support_resistance(close: pd.Series, window: int = 20, 
                                  min_touches: int = 2) -> Dict[str, List[float]]:
@@ -283,15 +285,15 @@ class TechnicalPatterns:
             window: 检测窗口
             min_touches: 最小触及次数
         """
-        # 找到局部最高点和最低点
-        highs = []
-        lows = []
+        # 找到局部最高点和最低点（居中滚动窗口的最大/最小值）
+        values = close.to_numpy(dtype=float)
+        span = 2 * window + 1
+        rolling = pd.Series(values).rolling(span, center=True, min_periods=1)
+        inner = np.zeros(len(values), dtype=bool)
+        inner[window:len(values) - window] = True
         
-        for i in range(window, len(close) - window):
-            if close.iloc[i] == close.iloc[i-window:i+window+1].max():
-                highs.append(close.iloc[i])
-            if close.iloc[i] == close.iloc[i-window:i+window+1].min():
-                lows.append(close.iloc[i])
+        highs = values[inner & (values == rolling.max().to_numpy())].tolist()
+        lows = values[inner & (values == rolling.min().to_numpy())].tolist()
         
         # 聚类相近的价格水平
         resistance_levels = []
@@ -314,32 +316,188 @@ class TechnicalPatterns:
         if not levels:
             return []
         
-        levels = sorted(levels)
-        clusters = []
-        current_cluster = [levels[0]]
+        levels = np.sort(np.asarray(levels, dtype=float))
         
-        for level in levels[1:]:
-            if abs(level - current_cluster[-1]) / current_cluster[-1] <= tolerance:
-                current_cluster.append(level)
-            else:
-                if len(current_cluster) >= min_touches:
-                    clusters.append(sum(current_cluster) / len(current_cluster))
-                current_cluster = [level]
+        # 相邻价格相差超过容差处断开
+        with np.errstate(divide='ignore', invalid='ignore'):
+            joined = np.abs(np.diff(levels)) / levels[:-1] <= tolerance
+        groups = np.split(levels, np.flatnonzero(~joined) + 1)
+        
+        return [sum(group.tolist()) / len(group) for group in groups if len(group) >= min_touches]
+    
+    @staticmethod
+    def _find_double_patterns(points: np.ndarray, prices: np.ndarray, between: np.ndarray,
+                              window: int, max_span: Optional[int] = None, tolerance: float = 0.05,
+                              max_pairs_per_batch: int = 2_000_000,
+                              max_patterns: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """寻找价格接近且间隔超过 window 的极值点对
         
-        if len(current_cluster) >= min_touches:
-            clusters.append(sum(current_cluster) / len(current_cluster))
+        极值点按价格排序后二分查找 ±tolerance 价格带内的候选点；指定 max_span 时
+        也可按时间窗口查找，取候选对更少的一种。只检查候选对，
+        再用区间最小值查询找出两点之间 between 最小的位置。
         
-        return clusters
+        Args:
+            points: 极值点位置（升序）
+            prices: 价格数组（取 prices[points] 比较）
+            between: 两点之间寻找最小值的数组
+            window: 两点最小间隔
+            max_span: 两点最大间隔（None 表示不限）
+            tolerance: 相对价差上限
+            max_patterns: 最多返回的点对数，超出时保留最近的（None 表示不限）
+            
+        Returns:
+            (第一个点序号, 第二个点序号, 中间最小值位置)，按 (第一个点, 第二个点) 排序
+        """
+        empty = np.empty(0, dtype=np.intp)
+        if len(points) < 2:
+            return empty, empty, empty
+        
+        point_prices = prices[points]
+        
+        # 价格带候选：按价格排序后的 [lower, upper)
+        order = np.argsort(point_prices, kind='stable')
+        sorted_prices = point_prices[order]
+        margin = np.abs(point_prices) * tolerance * (1 + 1e-9)
+        lower = np.searchsorted(sorted_prices, point_prices - margin, side='left')
+        upper = np.searchsorted(sorted_prices, point_prices + margin, side='right')
+        # 价格为负时相对价差恒为负，任何点都满足条件
+        negative = point_prices < 0
+        lower[negative] = 0
+        upper[negative] = len(points)
+        
+        # 时间窗口候选：间隔在 (window, max_span] 内的后续点，天然按时间排序
+        by_time = False
+        if max_span is not None:
+            time_lower = np.searchsorted(points, points + window, side='right')
+            time_upper = np.searchsorted(points, points + max_span, side='right')
+            if (time_upper - time_lower).sum() < (upper - lower).sum():
+                order = np.arange(len(points))
+                lower, upper = time_lower, np.maximum(time_upper, time_lower)
+                by_time = True
+        counts = upper - lower
+        
+        # 分批展开候选对，避免价格平坦时占用过多内存
+        firsts, seconds = [], []
+        cumulative = np.cumsum(counts)
+        batch_start = 0
+        while batch_start < len(points):
+            limit = (cumulative[batch_start - 1] if batch_start else 0) + max_pairs_per_batch
+            batch_end = max(batch_start + 1, int(np.searchsorted(cumulative, limit, side='right')))
+            batch = np.arange(batch_start, batch_end)
+            batch_start = batch_end
+            
+            batch_counts = counts[batch]
+            first = np.repeat(batch, batch_counts)
+            offsets = np.arange(batch_counts.sum()) - np.repeat(np.cumsum(batch_counts) - batch_counts, batch_counts)
+            second = order[np.repeat(lower[batch], batch_counts) + offsets]
+            
+            gap = points[second] - points[first]
+            keep = (second > first) & (gap > window)
+            if max_span is not None:
+                keep &= gap <= max_span
+            first, second = first[keep], second[keep]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                keep = np.abs(point_prices[first] - point_prices[second]) / point_prices[first] < tolerance
+            firsts.append(first[keep])
+            seconds.append(second[keep])
+        
+        first = np.concatenate(firsts) if firsts else empty
+        second = np.concatenate(seconds) if seconds else empty
+        if not by_time:
+            ordering = np.lexsort((second, first))
+            first, second = first[ordering], second[ordering]
+        if max_patterns is not None and len(first) > max_patterns:
+            first, second = first[len(first) - max_patterns:], second[len(second) - max_patterns:]
+        
+        return first, second, TechnicalPatterns._range_argmin(between, points, first, second)
+    
+    @staticmethod
+    def _build_double_patterns(starts: np.ndarray, ends: np.ndarray, middles: np.ndarray,
+                               prices: np.ndarray, middle_prices: np.ndarray,
+                               keys: Tuple[str, str, str, str]) -> List[Dict[str, Any]]:
+        """组装双顶/双底结果字典"""
+        middle_key, price1_key, price2_key, middle_price_key = keys
+        price1, price2 = prices[starts], prices[ends]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(np.abs(price1 - price2) / price1 < 0.02, 0.8, 0.6).tolist()
+        
+        return [
+            {
+                'start_idx': start_idx,
+                'end_idx': end_idx,
+                middle_key: middle_idx,
+                price1_key: p1,
+                price2_key: p2,
+                middle_price_key: middle_price,
+                'confidence': conf
+            }
+            for start_idx, end_idx, middle_idx, p1, p2, middle_price, conf in zip(
+                starts, ends, middles.tolist(), price1, price2, middle_prices[middles], confidence)
+        ]
+    
+    @staticmethod
+    def _range_argmin(values: np.ndarray, points: np.ndarray,
+                      first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """values[points[first] : points[second] + 1] 中最小值的位置（相同取最左，忽略NaN）
+        
+        相邻极值点之间的区段最小值建稀疏表，每个查询 O(1)。
+        """
+        if len(first) == 0:
+            return np.empty(0, dtype=np.intp)
+        
+        filled = np.where(np.isnan(values), np.inf, values)
+        
+        # 区段 k = [points[k], points[k+1])
+        starts = points[:-1]
+        seg_min = np.minimum.reduceat(filled[:points[-1]], starts)
+        seg_lengths = np.diff(points)
+        is_min = filled[points[0]:points[-1]] == np.repeat(seg_min, seg_lengths)
+        min_positions = np.flatnonzero(is_min) + points[0]
+        seg_pos = min_positions[np.searchsorted(min_positions, starts)]
+        
+        # 稀疏表：table[k][s] 为区段 [s, s + 2^k) 的最小值及其位置
+        table_values, table_pos = [seg_min], [seg_pos]
+        width = 1
+        while 2 * width <= len(seg_min):
+            prev_values, prev_pos = table_values[-1], table_pos[-1]
+            left_values, right_values = prev_values[:-width], prev_values[width:]
+            take_right = right_values < left_values
+            table_values.append(np.where(take_right, right_values, left_values))
+            table_pos.append(np.where(take_right, prev_pos[width:], prev_pos[:-width]))
+            width *= 2
+        
+        # 查询区段 [first, second)，再并入右端点 points[second]
+        length = second - first
+        level = np.floor(np.log2(length)).astype(np.intp)
+        result_values = np.empty(len(first))
+        result_pos = np.empty(len(first), dtype=np.intp)
+        for k in np.unique(level):
+            rows = np.flatnonzero(level == k)
+            left = first[rows]
+            right = second[rows] - (1 << k)
+            left_values, right_values = table_values[k][left], table_values[k][right]
+            take_right = right_values < left_values
+            result_values[rows] = np.where(take_right, right_values, left_values)
+            result_pos[rows] = np.where(take_right, table_pos[k][right], table_pos[k][left])
+        
+        end_values = filled[points[second]]
+        return np.where(end_values < result_values, points[second], result_pos)
     
     @staticmethod
     def detect_chart_patterns(high: pd.Series, low: pd.Series, close: pd.Series,
-                            window: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+                            window: int = 20, max_span: Optional[int] = None,
+                            max_patterns: Optional[int] = 1000) -> Dict[str, List[Dict[str, Any]]]:
         """检测图表形态
         
         Args:
             high, low, close: 价格数据
             window: 检测窗口
+            max_span: 双顶/双底两个极值点的最大间隔（K线数），默认 PATTERN_SPAN_WINDOWS * window。
+                不限间隔时价格长期在窄幅区间内的点对数随极值点数平方增长，长序列无法在合理时间内完成
+            max_patterns: 每种形态最多返回的数量，超出时保留最近的（None 表示不限）
         """
+        if max_span is None:
+            max_span = TechnicalPatterns.PATTERN_SPAN_WINDOWS * window
         patterns = {
             'double_top': [],
             'double_bottom': [],
@@ -351,63 +509,62 @@ class TechnicalPatterns:
         peaks, _ = find_peaks(high, distance=window//2)
         troughs, _ = find_peaks(-low, distance=window//2)
         
-        # 检测双顶
-        for i in range(len(peaks) - 1):
-            for j in range(i + 1, len(peaks)):
-                peak1_idx, peak2_idx = peaks[i], peaks[j]
-                peak1_price, peak2_price = high.iloc[peak1_idx], high.iloc[peak2_idx]
-                
-                # 双顶条件：两个峰值接近，中间有谷底
-                if (abs(peak1_price - peak2_price) / peak1_price < 0.05 and
-                    peak2_idx - peak1_idx > window):
-                    
-                    # 找中间的谷底
-                    valley_range = range(peak1_idx, peak2_idx + 1)
-                    valley_idx = valley_range[np.argmin(low.iloc[valley_range])]
-                    
-                    patterns['double_top'].append({
-                        'start_idx': peak1_idx,
-                        'end_idx': peak2_idx,
-                        'valley_idx': valley_idx,
-                        'peak1_price': peak1_price,
-                        'peak2_price': peak2_price,
-                        'valley_price': low.iloc[valley_idx],
-                        'confidence': 0.8 if abs(peak1_price - peak2_price) / peak1_price < 0.02 else 0.6
-                    })
-        
-        # 检测双底（类似逻辑）
-        for i in range(len(troughs) - 1):
-            for j in range(i + 1, len(troughs)):
-                trough1_idx, trough2_idx = troughs[i], troughs[j]
-                trough1_price, trough2_price = low.iloc[trough1_idx], low.iloc[trough2_idx]
-                
-                if (abs(trough1_price - trough2_price) / trough1_price < 0.05 and
-                    trough2_idx - trough1_idx > window):
-                    
-                    # 找中间的峰顶
-                    peak_range = range(trough1_idx, trough2_idx + 1)
-                    peak_idx = peak_range[np.argmax(high.iloc[peak_range])]
-                    
-                    patterns['double_bottom'].append({
-                        'start_idx': trough1_idx,
-                        'end_idx': trough2_idx,
-                        'peak_idx': peak_idx,
-                        'trough1_price': trough1_price,
-                        'trough2_price': trough2_price,
-                        'peak_price': high.iloc[peak_idx],
-                        'confidence': 0.8 if abs(trough1_price - trough2_price) / trough1_price < 0.02 else 0.6
-                    })
+        high_values = high.to_numpy(dtype=float)
+        low_values = low.to_numpy(dtype=float)
+        
+        # 检测双顶：两个峰值接近，中间有谷底
+        first, second, valleys = TechnicalPatterns._find_double_patterns(
+            peaks, high_values, low_values, window, max_span, max_patterns=max_patterns)
+        patterns['double_top'] = TechnicalPatterns._build_double_patterns(
+            peaks[first], peaks[second], valleys, high_values, low_values,
+            ('valley_idx', 'peak1_price', 'peak2_price', 'valley_price'))
+        
+        # 检测双底（类似逻辑，中间找峰顶）
+        first, second, tops = TechnicalPatterns._find_double_patterns(
+            troughs, low_values, -high_values, window, max_span, max_patterns=max_patterns)
+        patterns['double_bottom'] = TechnicalPatterns._build_double_patterns(
+            troughs[first], troughs[second], tops, low_values, high_values,
+            ('peak_idx', 'trough1_price', 'trough2_price', 'peak_price'))
         
         return patterns
 
 
 class IndicatorEngine:
-    """技术指标引擎"""
+    """技术指标引擎
+    
+    计算结果按"指标名 + 参数 + 输入数据指纹"缓存（LRU，字节预算），
+    同一序列追加新K线后再次计算时，滚动窗口类指标只计算尾部并与旧结果拼接。
+    """
+    
+    # 各指标使用的输入列
+    INDICATOR_INPUTS = {
+        'adaptive_ma': ('close',),
+        'price_channel': ('high', 'low'),
+        'vwap_bands': ('high', 'low', 'close', 'volume'),
+        'mfi': ('high', 'low', 'close', 'volume'),
+        'chaikin_osc': ('high', 'low', 'close', 'volume'),
+        'volume_profile': ('close', 'volume'),
+        'tsi': ('close',),
+        'ichimoku': ('high', 'low', 'close'),
+    }
     
-    def __init__(self):
+    # 可增量续接的指标: 参数 -> (需要的历史K线数, 旧结果末尾需要重算的行数)
+    # EWM/累积/递推类指标依赖全部历史，volume_profile 是整体统计，均不续接
+    INCREMENTAL_WINDOWS = {
+        'price_channel': lambda p: (p.get('period', 20), 0),
+        'vwap_bands': lambda p: (2 * p.get('period', 20), 0),
+        'mfi': lambda p: (p.get('period', 14) + 1, 0),
+        'ichimoku': lambda p: (
+            max(p.get('conversion_period', 9), p.get('base_period', 26),
+                p.get('leading_span_b_period', 52)) + p.get('displacement', 26),
+            p.get('displacement', 26)
+        ),
+    }
+    
+    def __init__(self, cache_bytes: int = 64 * 1024 * 1024):
         self.advanced_indicators = AdvancedIndicators()
         self.pattern_detector = TechnicalPatterns()
-        self.cache = {}
+        self.cache = IndicatorCache(max_bytes=cache_bytes)
     
     def calculate_indicator(self, indicator_name: str, data: Dict[str, pd.Series],
                           **params) -> IndicatorResult:
@@ -418,12 +575,66 @@ class IndicatorEngine:
             data: 价格数据字典 (包含open, high, low, close, volume)
             **params: 指标参数
         """
-        # 生成缓存键
-        cache_key = f"{indicator_name}_{hash(str(params))}"
-        
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        columns = self.INDICATOR_INPUTS.get(indicator_name)
+        if columns is None:
+            raise ValueError(f"Error calculating {indicator_name}: Unknown indicator: {indicator_name}")
         
+        try:
+            series = [data[column] for column in columns]
+        except KeyError as e:
+            raise ValueError(f"Error calculating {indicator_name}: missing input {e}")
+        
+        params_key = self.cache.params_key(params)
+        cache_key = (indicator_name, params_key, fingerprint(series))
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        length = len(series[0])
+        lineage_key = (indicator_name, params_key, series[0].index[0] if length else None)
+        
+        # 追加K线：只计算尾部
+        window = self.INCREMENTAL_WINDOWS.get(indicator_name)
+        if window is not None and length:
+            prefix = self.cache.find_prefix(lineage_key, series)
+            if prefix is not None:
+                result = self._extend(indicator_name, data, params, columns,
+                                      prefix[0], prefix[1], *window(params))
+                self.cache.put(cache_key, result, estimate_nbytes(result.values),
+                               lineage_key, length, extended=True)
+                return result
+        
+        result = self._compute(indicator_name, data, params)
+        self.cache.put(cache_key, result, estimate_nbytes(result.values), lineage_key, length)
+        return result
+    
+    def _extend(self, indicator_name: str, data: Dict[str, pd.Series], params: Dict[str, Any],
+                columns: Tuple[str, ...], old_length: int, old_result: IndicatorResult,
+                lookback: int, lookahead: int) -> IndicatorResult:
+        """在旧结果后续接新K线：从 old_length 前 lookback + lookahead 行开始重算尾部"""
+        keep = max(0, old_length - lookahead)
+        start = max(0, keep - lookback)
+        tail = self._compute(indicator_name, {column: data[column].iloc[start:] for column in columns}, params)
+        
+        def merge(old, new):
+            return pd.concat([old.iloc[:keep], new.iloc[keep - start:]])
+        
+        if isinstance(old_result.values, dict):
+            values = {key: merge(old_result.values[key], tail.values[key]) for key in tail.values}
+        else:
+            values = merge(old_result.values, tail.values)
+        
+        return IndicatorResult(
+            name=tail.name,
+            type=tail.type,
+            values=values,
+            parameters=params
+        )
+    
+    def _compute(self, indicator_name: str, data: Dict[str, pd.Series],
+                 params: Dict[str, Any]) -> IndicatorResult:
+        """计算指标（不经过缓存）"""
         try:
             if indicator_name == 'adaptive_ma':
                 values = self.advanced_indicators.adaptive_moving_average(
@@ -516,8 +727,6 @@ class IndicatorEngine:
             else:
                 raise ValueError(f"Unknown indicator: {indicator_name}")
             
-            # 缓存结果
-            self.cache[cache_key] = result
             return result
             
         except Exception as e:
@@ -538,6 +747,10 @@ class IndicatorEngine:
             'chart_patterns': chart_patterns
         }
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """指标缓存统计（命中率、续接率、占用字节等）"""
+        return self.cache.get_stats()
+    
     def get_available_indicators(self) -> Dict[str, Dict[str, Any]]:
         """获取可用指标列表"""
         return {
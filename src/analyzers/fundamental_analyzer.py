@@ -9,340 +9,227 @@ Fundamental Analysis Module
 - 盈利能力分析
 - 成长性分析
 - 股息收益率分析
+
+基本面数据来自持久化快照表 (FundamentalSnapshotStore)，
+各维度评分按列对整张快照表一次性计算。
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from analyzers.fundamental_store import FundamentalSnapshotStore, NUMERIC_FIELDS, TEXT_FIELDS
+except ImportError:
+    from fundamental_store import FundamentalSnapshotStore, NUMERIC_FIELDS, TEXT_FIELDS
+
+
+# 综合基本面评分权重
+FUNDAMENTAL_WEIGHTS = {
+    'valuation': 0.25,      # 估值 25%
+    'health': 0.25,         # 财务健康 25%
+    'profitability': 0.20,  # 盈利能力 20%
+    'growth': 0.20,         # 成长性 20%
+    'dividend': 0.10        # 股息 10%
+}
+
+# 常用分档：高于阈值依次得 100/80/60/40 分，否则 20 分
+_TIER_SCORES = [100, 80, 60, 40]
+
 
 class FundamentalAnalyzer:
     """基本面分析器"""
     
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, store: FundamentalSnapshotStore = None):
+        self.store = store or FundamentalSnapshotStore()
         print("📊 基本面分析器初始化完成")
     
     def get_fundamental_data(self, symbol: str) -> dict:
-        """获取基本面数据"""
-        
-        if symbol in self.cache:
-            return self.cache[symbol]
+        """获取基本面数据（快照过期时刷新）"""
         
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
-            # 提取关键基本面指标
-            fundamental_data = {
-                # 估值指标
-                'pe_ratio': info.get('trailingPE', None),
-                'forward_pe': info.get('forwardPE', None),
-                'pb_ratio': info.get('priceToBook', None),
-                'ps_ratio': info.get('priceToSalesTrailing12Months', None),
-                'peg_ratio': info.get('pegRatio', None),
-                'enterprise_value': info.get('enterpriseValue', None),
-                'ev_revenue': info.get('enterpriseToRevenue', None),
-                'ev_ebitda': info.get('enterpriseToEbitda', None),
-                
-                # 财务健康度
-                'debt_to_equity': info.get('debtToEquity', None),
-                'current_ratio': info.get('currentRatio', None),
-                'quick_ratio': info.get('quickRatio', None),
-                'cash_per_share': info.get('totalCashPerShare', None),
-                'book_value': info.get('bookValue', None),
-                
-                # 盈利能力
-                'profit_margin': info.get('profitMargins', None),
-                'operating_margin': info.get('operatingMargins', None),
-                'gross_margin': info.get('grossMargins', None),
-                'roe': info.get('returnOnEquity', None),
-                'roa': info.get('returnOnAssets', None),
-                'roic': info.get('returnOnInvestmentCapital', None),
-                
-                # 成长性
-                'revenue_growth': info.get('revenueGrowth', None),
-                'earnings_growth': info.get('earningsGrowth', None),
-                'earnings_quarterly_growth': info.get('earningsQuarterlyGrowth', None),
-                
-                # 股息
-                'dividend_yield': info.get('dividendYield', None),
-                'payout_ratio': info.get('payoutRatio', None),
-                'dividend_rate': info.get('dividendRate', None),
-                
-                # 市场数据
-                'market_cap': info.get('marketCap', None),
-                'float_shares': info.get('floatShares', None),
-                'shares_outstanding': info.get('sharesOutstanding', None),
-                'beta': info.get('beta', None),
-                
-                # 业务指标
-                'sector': info.get('sector', 'Unknown'),
-                'industry': info.get('industry', 'Unknown'),
-                'business_summary': info.get('longBusinessSummary', ''),
-                'full_time_employees': info.get('fullTimeEmployees', None),
-                
-                # 分析师评级
-                'recommendation': info.get('recommendationKey', None),
-                'target_price': info.get('targetMeanPrice', None),
-                'analyst_count': info.get('numberOfAnalystOpinions', None)
-            }
+            refresh = self.store.refresh([symbol])
+            if symbol in refresh['failed']:
+                print(f"❌ 获取 {symbol} 基本面数据失败: {refresh['failed'][symbol]}")
             
-            self.cache[symbol] = fundamental_data
-            return fundamental_data
+            table = self.store.latest([symbol])
+            if table.empty:
+                return {}
+            return self._row_to_dict(table.iloc[0])
             
         except Exception as e:
             print(f"❌ 获取 {symbol} 基本面数据失败: {e}")
             return {}
     
-    def score_valuation(self, data: dict) -> float:
-        """估值评分 (0-100)"""
-        
-        score = 0
-        factors = 0
-        
-        # P/E ratio评分
-        pe = data.get('pe_ratio')
-        if pe and pe > 0:
-            factors += 1
-            if pe < 15:
-                score += 100  # 估值便宜
-            elif pe < 20:
-                score += 80   # 合理估值
-            elif pe < 25:
-                score += 60   # 稍贵
-            elif pe < 35:
-                score += 40   # 较贵
-            else:
-                score += 20   # 很贵
-        
-        # P/B ratio评分
-        pb = data.get('pb_ratio')
-        if pb and pb > 0:
-            factors += 1
-            if pb < 1:
-                score += 100  # 破净，可能低估
-            elif pb < 2:
-                score += 80   # 合理
-            elif pb < 3:
-                score += 60   # 一般
-            elif pb < 5:
-                score += 40   # 偏高
-            else:
-                score += 20   # 很高
-        
-        # PEG ratio评分
-        peg = data.get('peg_ratio')
-        if peg and peg > 0:
-            factors += 1
-            if peg < 1:
-                score += 100  # 成长性好于估值
-            elif peg < 1.5:
-                score += 80   # 合理
-            elif peg < 2:
-                score += 60   # 一般
-            else:
-                score += 40   # 高估
+    def refresh_snapshots(self, symbols: list, force: bool = False) -> dict:
+        """批量刷新快照表（只拉取过期股票），适合每日收盘后的批处理任务"""
+        
+        print(f"📥 刷新基本面快照 {len(symbols)} 只股票...")
+        stats = self.store.refresh(symbols, force=force)
+        print(f"✅ 刷新 {stats['refreshed']} 只, 跳过 {stats['skipped']} 只, "
+              f"失败 {len(stats['failed'])} 只, 用时 {stats['elapsed']:.1f}秒")
+        return stats
+    
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        """快照行转为字段字典，缺失的数值为None"""
+        data = {}
+        for field in NUMERIC_FIELDS:
+            value = row.get(field)
+            data[field] = None if value is None or pd.isna(value) else float(value)
+        for field, (_, default) in TEXT_FIELDS.items():
+            value = row.get(field)
+            data[field] = default if value is None or (isinstance(value, float) and pd.isna(value)) else value
+        return data
+    
+    # ================================= 按列评分 =================================
+    
+    @staticmethod
+    def _column(table: pd.DataFrame, field: str) -> pd.Series:
+        """取数值列，缺失列视为全部缺失"""
+        if field not in table.columns:
+            return pd.Series(np.nan, index=table.index)
+        return pd.to_numeric(table[field], errors='coerce')
+    
+    @staticmethod
+    def _tiers(conditions: list, scores: list = None, default: float = 20) -> np.ndarray:
+        """按条件分档打分"""
+        return np.select(conditions, scores or _TIER_SCORES[:len(conditions)], default=default)
+    
+    @staticmethod
+    def _average(parts: list) -> pd.Series:
+        """有效因子得分取平均，没有有效因子时为50分"""
+        total = sum(np.where(mask, score, 0) for mask, score in parts)
+        factors = sum(mask.astype(int) for mask, _ in parts)
+        return pd.Series(np.where(factors > 0, total / np.maximum(factors, 1), 50),
+                         index=parts[0][0].index, dtype=float)
+    
+    def _score(self, data, scorer):
+        """data 为快照表时返回逐行得分，为单只股票字典时返回单个得分"""
+        if isinstance(data, pd.DataFrame):
+            return scorer(data)
+        return float(scorer(pd.DataFrame([data])).iloc[0])
+    
+    def _valuation_columns(self, table: pd.DataFrame) -> pd.Series:
+        pe = self._column(table, 'pe_ratio')
+        pb = self._column(table, 'pb_ratio')
+        peg = self._column(table, 'peg_ratio')
+        
+        return self._average([
+            # P/E ratio评分：15以下便宜，35以上很贵
+            (pe > 0, self._tiers([pe < 15, pe < 20, pe < 25, pe < 35])),
+            # P/B ratio评分：破净可能低估
+            (pb > 0, self._tiers([pb < 1, pb < 2, pb < 3, pb < 5])),
+            # PEG ratio评分：小于1说明成长性好于估值
+            (peg > 0, self._tiers([peg < 1, peg < 1.5, peg < 2], default=40))
+        ])
+    
+    def _financial_health_columns(self, table: pd.DataFrame) -> pd.Series:
+        debt_equity = self._column(table, 'debt_to_equity')
+        current_ratio = self._column(table, 'current_ratio')
+        roe = self._column(table, 'roe')
+        
+        return self._average([
+            # 债务权益比：越低越好
+            (debt_equity.notna(),
+             self._tiers([debt_equity < 0.3, debt_equity < 0.6, debt_equity < 1.0, debt_equity < 2.0])),
+            # 流动比率：越高流动性越好
+            (current_ratio.notna() & (current_ratio != 0),
+             self._tiers([current_ratio > 2, current_ratio > 1.5, current_ratio > 1.2, current_ratio > 1])),
+            # ROE (净资产收益率)
+            (roe.notna() & (roe != 0),
+             self._tiers([roe > 0.2, roe > 0.15, roe > 0.1, roe > 0.05]))
+        ])
+    
+    def _profitability_columns(self, table: pd.DataFrame) -> pd.Series:
+        profit_margin = self._column(table, 'profit_margin')
+        gross_margin = self._column(table, 'gross_margin')
+        roa = self._column(table, 'roa')
+        
+        return self._average([
+            # 净利润率
+            (profit_margin.notna() & (profit_margin != 0),
+             self._tiers([profit_margin > 0.2, profit_margin > 0.1, profit_margin > 0.05, profit_margin > 0])),
+            # 毛利率
+            (gross_margin.notna() & (gross_margin != 0),
+             self._tiers([gross_margin > 0.5, gross_margin > 0.3, gross_margin > 0.2, gross_margin > 0.1])),
+            # ROA (总资产收益率)
+            (roa.notna() & (roa != 0),
+             self._tiers([roa > 0.1, roa > 0.05, roa > 0.02, roa > 0]))
+        ])
+    
+    def _growth_columns(self, table: pd.DataFrame) -> pd.Series:
+        parts = []
+        # 营收增长率、盈利增长率、季度盈利增长：30%以上高增长，负增长20分
+        for field in ['revenue_growth', 'earnings_growth', 'earnings_quarterly_growth']:
+            growth = self._column(table, field)
+            parts.append((growth.notna(),
+                          self._tiers([growth > 0.3, growth > 0.2, growth > 0.1, growth > 0])))
+        return self._average(parts)
+    
+    def _dividend_columns(self, table: pd.DataFrame) -> pd.Series:
+        dividend_yield = self._column(table, 'dividend_yield')
+        payout_ratio = self._column(table, 'payout_ratio')
         
-        return score / factors if factors > 0 else 50
+        # 股息收益率评分
+        yield_score = self._tiers([
+            dividend_yield > 0.06, dividend_yield > 0.04, dividend_yield > 0.02, dividend_yield > 0.01])
+        
+        # 派息率评分：30%-60%为健康派息率，80%以上不可持续
+        payout_score = np.select([
+            (payout_ratio >= 0.3) & (payout_ratio <= 0.6),
+            (payout_ratio > 0.6) & (payout_ratio <= 0.8),
+            payout_ratio > 0.8
+        ], [50, 30, 10], default=40)
+        payout_score = np.where(payout_ratio.notna() & (payout_ratio != 0), payout_score, 0)
+        
+        # 无股息得0分
+        has_dividend = dividend_yield.notna() & (dividend_yield != 0)
+        return pd.Series(np.where(has_dividend, np.minimum(yield_score + payout_score, 100), 0),
+                         index=table.index, dtype=float)
+    
+    def score_valuation(self, data) -> float:
+        """估值评分 (0-100)"""
+        return self._score(data, self._valuation_columns)
     
-    def score_financial_health(self, data: dict) -> float:
+    def score_financial_health(self, data) -> float:
         """财务健康度评分 (0-100)"""
-        
-        score = 0
-        factors = 0
-        
-        # 债务权益比
-        debt_equity = data.get('debt_to_equity')
-        if debt_equity is not None:
-            factors += 1
-            if debt_equity < 0.3:
-                score += 100  # 低负债
-            elif debt_equity < 0.6:
-                score += 80   # 适度负债
-            elif debt_equity < 1.0:
-                score += 60   # 中等负债
-            elif debt_equity < 2.0:
-                score += 40   # 高负债
-            else:
-                score += 20   # 很高负债
-        
-        # 流动比率
-        current_ratio = data.get('current_ratio')
-        if current_ratio:
-            factors += 1
-            if current_ratio > 2:
-                score += 100  # 流动性很好
-            elif current_ratio > 1.5:
-                score += 80   # 流动性好
-            elif current_ratio > 1.2:
-                score += 60   # 流动性一般
-            elif current_ratio > 1:
-                score += 40   # 流动性紧张
-            else:
-                score += 20   # 流动性很差
-        
-        # ROE (净资产收益率)
-        roe = data.get('roe')
-        if roe:
-            factors += 1
-            if roe > 0.2:
-                score += 100  # 盈利能力很强
-            elif roe > 0.15:
-                score += 80   # 盈利能力强
-            elif roe > 0.1:
-                score += 60   # 盈利能力一般
-            elif roe > 0.05:
-                score += 40   # 盈利能力弱
-            else:
-                score += 20   # 盈利能力很弱
-        
-        return score / factors if factors > 0 else 50
+        return self._score(data, self._financial_health_columns)
     
-    def score_profitability(self, data: dict) -> float:
+    def score_profitability(self, data) -> float:
         """盈利能力评分 (0-100)"""
-        
-        score = 0
-        factors = 0
-        
-        # 净利润率
-        profit_margin = data.get('profit_margin')
-        if profit_margin:
-            factors += 1
-            if profit_margin > 0.2:
-                score += 100
-            elif profit_margin > 0.1:
-                score += 80
-            elif profit_margin > 0.05:
-                score += 60
-            elif profit_margin > 0:
-                score += 40
-            else:
-                score += 20
-        
-        # 毛利率
-        gross_margin = data.get('gross_margin')
-        if gross_margin:
-            factors += 1
-            if gross_margin > 0.5:
-                score += 100
-            elif gross_margin > 0.3:
-                score += 80
-            elif gross_margin > 0.2:
-                score += 60
-            elif gross_margin > 0.1:
-                score += 40
-            else:
-                score += 20
-        
-        # ROA (总资产收益率)
-        roa = data.get('roa')
-        if roa:
-            factors += 1
-            if roa > 0.1:
-                score += 100
-            elif roa > 0.05:
-                score += 80
-            elif roa > 0.02:
-                score += 60
-            elif roa > 0:
-                score += 40
-            else:
-                score += 20
-        
-        return score / factors if factors > 0 else 50
+        return self._score(data, self._profitability_columns)
     
-    def score_growth(self, data: dict) -> float:
+    def score_growth(self, data) -> float:
         """成长性评分 (0-100)"""
-        
-        score = 0
-        factors = 0
-        
-        # 营收增长率
-        revenue_growth = data.get('revenue_growth')
-        if revenue_growth is not None:
-            factors += 1
-            if revenue_growth > 0.3:
-                score += 100  # 高增长
-            elif revenue_growth > 0.2:
-                score += 80   # 良好增长
-            elif revenue_growth > 0.1:
-                score += 60   # 适度增长
-            elif revenue_growth > 0:
-                score += 40   # 微增长
-            else:
-                score += 20   # 负增长
-        
-        # 盈利增长率
-        earnings_growth = data.get('earnings_growth')
-        if earnings_growth is not None:
-            factors += 1
-            if earnings_growth > 0.3:
-                score += 100
-            elif earnings_growth > 0.2:
-                score += 80
-            elif earnings_growth > 0.1:
-                score += 60
-            elif earnings_growth > 0:
-                score += 40
-            else:
-                score += 20
-        
-        # 季度盈利增长
-        quarterly_growth = data.get('earnings_quarterly_growth')
-        if quarterly_growth is not None:
-            factors += 1
-            if quarterly_growth > 0.3:
-                score += 100
-            elif quarterly_growth > 0.2:
-                score += 80
-            elif quarterly_growth > 0.1:
-                score += 60
-            elif quarterly_growth > 0:
-                score += 40
-            else:
-                score += 20
-        
-        return score / factors if factors > 0 else 50
+        return self._score(data, self._growth_columns)
     
-    def score_dividend(self, data: dict) -> float:
+    def score_dividend(self, data) -> float:
         """股息评分 (0-100)"""
+        return self._score(data, self._dividend_columns)
+    
+    def score_table(self, table: pd.DataFrame) -> pd.DataFrame:
+        """对整张快照表按列计算各维度得分和综合基本面得分"""
         
-        dividend_yield = data.get('dividend_yield')
-        payout_ratio = data.get('payout_ratio')
-        
-        if not dividend_yield:
-            return 0  # 无股息
-        
-        score = 0
-        
-        # 股息收益率评分
-        if dividend_yield > 0.06:
-            score += 100  # 高股息
-        elif dividend_yield > 0.04:
-            score += 80   # 良好股息
-        elif dividend_yield > 0.02:
-            score += 60   # 适度股息
-        elif dividend_yield > 0.01:
-            score += 40   # 低股息
-        else:
-            score += 20   # 很低股息
-        
-        # 派息率评分
-        if payout_ratio:
-            if 0.3 <= payout_ratio <= 0.6:
-                score += 50  # 健康派息率
-            elif 0.6 < payout_ratio <= 0.8:
-                score += 30  # 较高派息率
-            elif payout_ratio > 0.8:
-                score += 10  # 不可持续
-            else:
-                score += 40  # 保守派息
+        scores = pd.DataFrame({
+            'valuation_score': self.score_valuation(table),
+            'health_score': self.score_financial_health(table),
+            'profitability_score': self.score_profitability(table),
+            'growth_score': self.score_growth(table),
+            'dividend_score': self.score_dividend(table)
+        }, index=table.index)
         
-        return min(score, 100)
+        # 综合基本面评分 (加权平均)
+        scores['fundamental_score'] = (
+            scores['valuation_score'] * FUNDAMENTAL_WEIGHTS['valuation'] +
+            scores['health_score'] * FUNDAMENTAL_WEIGHTS['health'] +
+            scores['profitability_score'] * FUNDAMENTAL_WEIGHTS['profitability'] +
+            scores['growth_score'] * FUNDAMENTAL_WEIGHTS['growth'] +
+            scores['dividend_score'] * FUNDAMENTAL_WEIGHTS['dividend']
+        )
+        return scores
     
     def get_sector_industry_info(self, data: dict) -> dict:
         """获取行业板块信息"""
@@ -353,56 +240,20 @@ class FundamentalAnalyzer:
             'beta': data.get('beta', None)
         }
     
-    def analyze_fundamentals(self, symbol: str) -> dict:
-        """综合基本面分析"""
-        
-        print(f"📊 开始分析 {symbol} 的基本面...")
-        
-        # 获取基本面数据
-        data = self.get_fundamental_data(symbol)
-        
-        if not data:
-            return {
-                'symbol': symbol,
-                'error': '无法获取基本面数据',
-                'fundamental_score': 0
-            }
-        
-        # 各维度评分
-        valuation_score = self.score_valuation(data)
-        health_score = self.score_financial_health(data)
-        profitability_score = self.score_profitability(data)
-        growth_score = self.score_growth(data)
-        dividend_score = self.score_dividend(data)
-        
-        # 综合基本面评分 (加权平均)
-        weights = {
-            'valuation': 0.25,      # 估值 25%
-            'health': 0.25,         # 财务健康 25%
-            'profitability': 0.20,  # 盈利能力 20%
-            'growth': 0.20,         # 成长性 20%
-            'dividend': 0.10        # 股息 10%
-        }
-        
-        fundamental_score = (
-            valuation_score * weights['valuation'] +
-            health_score * weights['health'] +
-            profitability_score * weights['profitability'] +
-            growth_score * weights['growth'] +
-            dividend_score * weights['dividend']
-        )
+    def _build_result(self, symbol: str, data: dict, scores) -> dict:
+        """组装单只股票的分析结果"""
         
         # 获取行业信息
         sector_info = self.get_sector_industry_info(data)
         
-        result = {
+        return {
             'symbol': symbol,
-            'fundamental_score': round(fundamental_score, 1),
-            'valuation_score': round(valuation_score, 1),
-            'health_score': round(health_score, 1),
-            'profitability_score': round(profitability_score, 1),
-            'growth_score': round(growth_score, 1),
-            'dividend_score': round(dividend_score, 1),
+            'fundamental_score': round(float(scores['fundamental_score']), 1),
+            'valuation_score': round(float(scores['valuation_score']), 1),
+            'health_score': round(float(scores['health_score']), 1),
+            'profitability_score': round(float(scores['profitability_score']), 1),
+            'growth_score': round(float(scores['growth_score']), 1),
+            'dividend_score': round(float(scores['dividend_score']), 1),
             'sector': sector_info['sector'],
             'industry': sector_info['industry'],
             'beta': sector_info['beta'],
@@ -419,29 +270,63 @@ class FundamentalAnalyzer:
             'recommendation': data.get('recommendation'),
             'target_price': data.get('target_price')
         }
+    
+    def analyze_fundamentals(self, symbol: str) -> dict:
+        """综合基本面分析"""
+        
+        print(f"📊 开始分析 {symbol} 的基本面...")
+        
+        # 获取基本面数据
+        data = self.get_fundamental_data(symbol)
         
-        return result
+        if not data:
+            return {
+                'symbol': symbol,
+                'error': '无法获取基本面数据',
+                'fundamental_score': 0
+            }
+        
+        scores = self.score_table(pd.DataFrame([data], index=[symbol])).iloc[0]
+        return self._build_result(symbol, data, scores)
     
-    def batch_analyze(self, symbols: list) -> list:
-        """批量基本面分析"""
+    def batch_analyze(self, symbols: list, refresh: bool = True) -> list:
+        """批量基本面分析：一次并发刷新过期快照，再对整张表按列评分"""
         
         print(f"📊 开始批量基本面分析 {len(symbols)} 只股票...")
         
+        failed = {}
+        if refresh:
+            failed = self.refresh_snapshots(symbols)['failed']
+        
+        table = self.store.latest(symbols)
+        scores = self.score_table(table)
+        
+        rows = table.to_dict('index')
+        score_rows = scores.to_dict('index')
+        
         results = []
-        for i, symbol in enumerate(symbols, 1):
-            try:
-                result = self.analyze_fundamentals(symbol)
-                results.append(result)
-                print(f"✅ {symbol}: 基本面得分 {result.get('fundamental_score', 0):.1f} ({i}/{len(symbols)})")
-            except Exception as e:
-                print(f"❌ {symbol}: 分析失败 - {e} ({i}/{len(symbols)})")
-                results.append({
+        for symbol in symbols:
+            if symbol in rows:
+                result = self._build_result(symbol, self._row_to_dict(rows[symbol]), score_rows[symbol])
+            else:
+                result = {
                     'symbol': symbol,
-                    'error': str(e),
+                    'error': failed.get(symbol, '无法获取基本面数据'),
                     'fundamental_score': 0
-                })
+                }
+            results.append(result)
         
         return results
+    
+    def analyze_universe(self, symbols: list = None) -> pd.DataFrame:
+        """对快照表中的全部（或指定）股票评分，按综合得分排序"""
+        
+        table = self.store.latest(symbols)
+        scores = self.score_table(table)
+        scores['sector'] = table['sector']
+        scores['industry'] = table['industry']
+        scores['as_of'] = table['as_of']
+        return scores.sort_values('fundamental_score', ascending=False)
 
 
 def test_fundamental_analysis():
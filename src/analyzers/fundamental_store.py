@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+基本面快照存储
+Fundamental Snapshot Store
+
+将基本面指标持久化到 SQLite 快照表，主键为 (股票代码, 快照日期)：
+- 重启后无需重新下载，历史快照可回溯
+- 批量刷新时只并发拉取过期的股票
+- 以 DataFrame 形式读出整张最新快照表，供按列评分
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+
+# 字段名 -> yfinance info 键
+NUMERIC_FIELDS = {
+    # 估值指标
+    'pe_ratio': 'trailingPE',
+    'forward_pe': 'forwardPE',
+    'pb_ratio': 'priceToBook',
+    'ps_ratio': 'priceToSalesTrailing12Months',
+    'peg_ratio': 'pegRatio',
+    'enterprise_value': 'enterpriseValue',
+    'ev_revenue': 'enterpriseToRevenue',
+    'ev_ebitda': 'enterpriseToEbitda',
+
+    # 财务健康度
+    'debt_to_equity': 'debtToEquity',
+    'current_ratio': 'currentRatio',
+    'quick_ratio': 'quickRatio',
+    'cash_per_share': 'totalCashPerShare',
+    'book_value': 'bookValue',
+
+    # 盈利能力
+    'profit_margin': 'profitMargins',
+    'operating_margin': 'operatingMargins',
+    'gross_margin': 'grossMargins',
+    'roe': 'returnOnEquity',
+    'roa': 'returnOnAssets',
+    'roic': 'returnOnInvestmentCapital',
+
+    # 成长性
+    'revenue_growth': 'revenueGrowth',
+    'earnings_growth': 'earningsGrowth',
+    'earnings_quarterly_growth': 'earningsQuarterlyGrowth',
+
+    # 股息
+    'dividend_yield': 'dividendYield',
+    'payout_ratio': 'payoutRatio',
+    'dividend_rate': 'dividendRate',
+
+    # 市场数据
+    'market_cap': 'marketCap',
+    'float_shares': 'floatShares',
+    'shares_outstanding': 'sharesOutstanding',
+    'beta': 'beta',
+
+    # 业务指标
+    'full_time_employees': 'fullTimeEmployees',
+
+    # 分析师评级
+    'target_price': 'targetMeanPrice',
+    'analyst_count': 'numberOfAnalystOpinions'
+}
+
+# 字段名 -> (yfinance info 键, 默认值)
+TEXT_FIELDS = {
+    'sector': ('sector', 'Unknown'),
+    'industry': ('industry', 'Unknown'),
+    'business_summary': ('longBusinessSummary', ''),
+    'recommendation': ('recommendationKey', None)
+}
+
+FUNDAMENTAL_FIELDS = list(NUMERIC_FIELDS) + list(TEXT_FIELDS)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'fundamentals.db')
+
+# 单条 SQL 的 IN (...) 参数上限（SQLite 旧版本默认最多 999 个绑定参数）
+SQL_IN_CHUNK = 500
+
+
+def _to_number(value) -> Optional[float]:
+    """转换为浮点数，无法转换（如 'Infinity' 字符串）时返回None"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if np.isfinite(number) else None
+
+
+def extract_fundamentals(info: dict) -> dict:
+    """从 yfinance info 中提取关键基本面指标"""
+    data = {field: _to_number(info.get(key)) for field, key in NUMERIC_FIELDS.items()}
+    for field, (key, default) in TEXT_FIELDS.items():
+        data[field] = info.get(key, default)
+    return data
+
+
+def yfinance_info_fetcher(symbol: str) -> dict:
+    """默认数据源：yfinance 个股信息"""
+    if yf is None:
+        raise ImportError("yfinance 未安装")
+    return yf.Ticker(symbol).info or {}
+
+
+class FundamentalSnapshotStore:
+    """基本面快照表
+
+    每次刷新写入当日快照 (symbol, as_of)；同一天重复刷新覆盖当日行。
+    fetched_at 距今超过 max_age 秒的股票视为过期，refresh() 只拉取过期股票。
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, max_age: float = 86400,
+                 max_workers: int = 8, info_fetcher: Callable[[str], dict] = None):
+        self.db_path = db_path
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.info_fetcher = info_fetcher or yfinance_info_fetcher
+        self._lock = threading.Lock()
+
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # 内存数据库只在同一连接内可见，因此保持一个共享连接
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建快照表"""
+        columns = [f"{field} REAL" for field in NUMERIC_FIELDS]
+        columns += [f"{field} TEXT" for field in TEXT_FIELDS]
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    symbol TEXT NOT NULL,
+                    as_of TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    {', '.join(columns)},
+                    PRIMARY KEY (symbol, as_of)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_fundamentals_fetched ON fundamentals (symbol, fetched_at)")
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+
+    # ================================= 写入 =================================
+
+    def upsert(self, snapshots: Dict[str, dict], as_of: str = None, fetched_at: float = None):
+        """批量写入快照（单个事务）"""
+        if not snapshots:
+            return
+
+        as_of = as_of or datetime.now().strftime('%Y-%m-%d')
+        fetched_at = fetched_at or time.time()
+        columns = ['symbol', 'as_of', 'fetched_at'] + FUNDAMENTAL_FIELDS
+        rows = [
+            (symbol, as_of, fetched_at) + tuple(data.get(field) for field in FUNDAMENTAL_FIELDS)
+            for symbol, data in snapshots.items()
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO fundamentals ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+
+    # ================================= 查询 =================================
+
+    @staticmethod
+    def _chunks(symbols: List[str]):
+        """按 SQL_IN_CHUNK 分块，返回 (股票列表, 占位符) 序列"""
+        for start in range(0, len(symbols), SQL_IN_CHUNK):
+            chunk = symbols[start:start + SQL_IN_CHUNK]
+            yield chunk, ', '.join('?' * len(chunk))
+
+    def _last_fetched(self, symbols: List[str]) -> Dict[str, float]:
+        """各股票最近一次刷新时间（走 (symbol, fetched_at) 索引，只查询请求的股票）"""
+        symbols = list(dict.fromkeys(symbols))
+        last_fetched = {}
+        with self._lock:
+            for chunk, placeholders in self._chunks(symbols):
+                rows = self._conn.execute(
+                    f"SELECT symbol, MAX(fetched_at) FROM fundamentals "
+                    f"WHERE symbol IN ({placeholders}) GROUP BY symbol", chunk).fetchall()
+                last_fetched.update(rows)
+        return last_fetched
+
+    def stale_symbols(self, symbols: List[str], max_age: float = None) -> List[str]:
+        """返回没有快照或快照已过期的股票"""
+        max_age = self.max_age if max_age is None else max_age
+        cutoff = time.time() - max_age
+        last_fetched = self._last_fetched(symbols)
+        return [symbol for symbol in dict.fromkeys(symbols)
+                if last_fetched.get(symbol, 0) < cutoff]
+
+    def latest(self, symbols: List[str] = None) -> pd.DataFrame:
+        """每只股票的最新快照，以 symbol 为索引
+
+        指定 symbols 时只在主键 (symbol, as_of) 上查询这些股票，按输入顺序返回。
+        """
+        query = """
+            SELECT f.* FROM fundamentals f
+            JOIN (SELECT symbol, MAX(as_of) AS as_of FROM fundamentals {where} GROUP BY symbol) last
+              ON f.symbol = last.symbol AND f.as_of = last.as_of
+        """
+        with self._lock:
+            if symbols is None:
+                table = pd.read_sql_query(query.format(where=''), self._conn)
+            else:
+                symbols = list(dict.fromkeys(symbols))
+                frames = [
+                    pd.read_sql_query(query.format(where=f"WHERE symbol IN ({placeholders})"),
+                                      self._conn, params=chunk)
+                    for chunk, placeholders in self._chunks(symbols)
+                ]
+                table = pd.concat(frames, ignore_index=True) if frames else pd.read_sql_query(
+                    query.format(where='WHERE 0'), self._conn)
+
+        table = table.set_index('symbol')
+        if symbols is not None:
+            table = table.reindex([symbol for symbol in symbols if symbol in table.index])
+        numeric = list(NUMERIC_FIELDS)
+        table[numeric] = table[numeric].astype(float)
+        return table
+
+    def history(self, symbol: str) -> pd.DataFrame:
+        """单只股票的全部历史快照"""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT * FROM fundamentals WHERE symbol = ? ORDER BY as_of",
+                self._conn, params=(symbol,), index_col='as_of')
+
+    # ================================= 批量刷新 =================================
+
+    def refresh(self, symbols: List[str], force: bool = False) -> dict:
+        """并发拉取过期股票的基本面并批量写入
+
+        Returns:
+            {'requested', 'refreshed', 'skipped', 'failed': {symbol: 错误}, 'elapsed'}
+        """
+        start_time = time.time()
+        symbols = list(dict.fromkeys(symbols))
+        pending = symbols if force else self.stale_symbols(symbols)
+
+        snapshots = {}
+        failed = {}
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                future_to_symbol = {
+                    executor.submit(self.info_fetcher, symbol): symbol for symbol in pending
+                }
+                for future in as_completed(future_to_symbol):
+                    symbol = future_to_symbol[future]
+                    try:
+                        info = future.result()
+                        if not info:
+                            raise ValueError("返回空数据")
+                        snapshots[symbol] = extract_fundamentals(info)
+                    except Exception as e:
+                        failed[symbol] = str(e)
+
+            self.upsert(snapshots)
+
+        return {
+            'requested': len(symbols),
+            'refreshed': len(snapshots),
+            'skipped': len(symbols) - len(pending),
+            'failed': failed,
+            'elapsed': time.time() - start_time
+        }
+
+    def get_stats(self) -> dict:
+        """快照表统计"""
+        with self._lock:
+            symbols, snapshots, last = self._conn.execute(
+                "SELECT COUNT(DISTINCT symbol), COUNT(*), MAX(fetched_at) FROM fundamentals").fetchone()
+        return {
+            'db_path': self.db_path,
+            'symbols': symbols,
+            'snapshots': snapshots,
+            'last_refresh': datetime.fromtimestamp(last).strftime('%Y-%m-%d %H:%M:%S') if last else None
+        }
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+共享市场上下文服务
+Shared Market Context Service
+
+进程内统一加载并缓存各分析器共用的市场数据：
+- 主要指数 / 基准ETF / VIX / 行业ETF：每个刷新周期批量下载一次
+- 预先计算均线、波动率、动量、趋势强度、板块动量等衍生数据
+- 个股历史和基本信息按 (代码, 周期) 缓存，多个分析器共享同一份数据
+
+每次刷新生成一个新的只读 MarketContext 快照，分析器之间共享而不互相修改。
+测试时可通过 inject() 注入离线数据，完全不访问网络。
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+
+# 主要市场指数
+MARKET_INDICES = {
+    'SPX': '^GSPC',    # S&P 500
+    'NDX': '^IXIC',    # NASDAQ
+    'DJI': '^DJI',     # 道琼斯
+    'RUT': '^RUT',     # Russell 2000 (小盘股)
+    'VIX': '^VIX',     # 恐慌指数
+    'TNX': '^TNX',     # 10年期国债收益率
+    'DXY': 'DX-Y.NYB'  # 美元指数
+}
+
+# 基准ETF
+BENCHMARK_ETFS = ['SPY', 'QQQ', 'IWM']  # 大盘、科技、小盘
+
+# 行业板块ETF
+SECTOR_ETFS = {
+    'XLK': '科技',
+    'XLF': '金融',
+    'XLV': '医疗',
+    'XLE': '能源',
+    'XLI': '工业',
+    'XLP': '消费必需品',
+    'XLY': '消费可选',
+    'XLU': '公用事业',
+    'XLRE': '房地产',
+    'XLB': '材料',
+    'XLC': '通讯'
+}
+
+MARKET_PERIOD = "3mo"
+
+
+def calculate_trend_strength(data: pd.DataFrame) -> float:
+    """计算趋势强度"""
+
+    if len(data) < 20:
+        return 0
+
+    # 计算价格相对于移动平均线的位置
+    current_price = data['Close'].iloc[-1]
+    sma_20 = data['Close'].rolling(20).mean().iloc[-1]
+
+    # 计算趋势一致性
+    above_sma_count = sum(data['Close'].tail(20) > data['Close'].rolling(20).mean().tail(20))
+    trend_consistency = above_sma_count / 20
+
+    # 计算价格动量
+    price_momentum = (current_price / sma_20 - 1) * 100
+
+    # 综合趋势强度
+    trend_strength = (trend_consistency * 50) + min(abs(price_momentum) * 2, 50)
+
+    return min(trend_strength, 100)
+
+
+def _momentum(close: pd.Series, days: int) -> float:
+    """N日动量 (%)，数据不足时为NaN"""
+    if len(close) <= days:
+        return np.nan
+    return (close.iloc[-1] / close.iloc[-(days + 1)] - 1) * 100
+
+
+def yfinance_fetcher(tickers: List[str], period: str) -> Dict[str, pd.DataFrame]:
+    """默认数据源：一次批量下载全部代码的日线数据"""
+    if yf is None:
+        raise ImportError("yfinance 未安装")
+
+    raw = yf.download(tickers, period=period, interval="1d", group_by='ticker',
+                      auto_adjust=True, progress=False, threads=True)
+    if raw is None or raw.empty:
+        return {}
+
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {tickers[0]: raw.dropna(how='all')}
+
+    available = set(raw.columns.get_level_values(0))
+    return {ticker: raw[ticker].dropna(how='all') for ticker in tickers if ticker in available}
+
+
+class MarketContext:
+    """某一时刻的市场上下文快照（只读）"""
+
+    def __init__(self, market_data: Dict[str, pd.DataFrame], created_at: float = None):
+        self.created_at = created_at or time.time()
+        self.version = int(self.created_at * 1000)
+
+        histories = {}
+        for ticker, hist in market_data.items():
+            if hist is not None and not hist.empty:
+                histories[ticker] = hist
+        self.histories = MappingProxyType(histories)
+
+        self.index_stats = MappingProxyType(self._build_index_stats())
+        self.sector_performance = MappingProxyType(self._build_sector_performance())
+        self.benchmark_returns = MappingProxyType(self._build_benchmark_returns())
+
+    # ================================= 衍生数据 =================================
+
+    def _build_index_stats(self) -> dict:
+        """指数均线、波动率、动量和趋势强度"""
+        stats = {}
+        for name, ticker in MARKET_INDICES.items():
+            hist = self.histories.get(ticker)
+            if hist is None:
+                continue
+            try:
+                hist = hist.copy()
+                hist['SMA_20'] = hist['Close'].rolling(20).mean()
+                hist['SMA_50'] = hist['Close'].rolling(50).mean()
+                hist['volatility'] = hist['Close'].pct_change().rolling(20).std() * np.sqrt(252)
+
+                stats[name] = {
+                    'current_price': hist['Close'].iloc[-1],
+                    'sma_20': hist['SMA_20'].iloc[-1],
+                    'sma_50': hist['SMA_50'].iloc[-1],
+                    'volatility': hist['volatility'].iloc[-1],
+                    'momentum_5d': _momentum(hist['Close'], 5),
+                    'momentum_20d': _momentum(hist['Close'], 20),
+                    'momentum_60d': _momentum(hist['Close'], 60),
+                    'trend_strength': calculate_trend_strength(hist),
+                    'data': hist
+                }
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"❌ 计算 {name} 指标失败: {e}")
+        return stats
+
+    def _build_sector_performance(self) -> dict:
+        """行业ETF 20日/60日动量"""
+        performance = {}
+        for etf, sector_name in SECTOR_ETFS.items():
+            hist = self.histories.get(etf)
+            if hist is None or len(hist) <= 20:
+                continue
+            performance[sector_name] = {
+                'etf': etf,
+                'momentum_20d': _momentum(hist['Close'], 20),
+                'momentum_60d': _momentum(hist['Close'], 60)
+            }
+        return performance
+
+    def _build_benchmark_returns(self) -> dict:
+        """基准ETF近20个交易日累计收益率"""
+        returns = {}
+        for ticker in BENCHMARK_ETFS:
+            hist = self.histories.get(ticker)
+            if hist is None:
+                continue
+            daily_returns = hist['Close'].pct_change().tail(20)
+            returns[ticker] = (1 + daily_returns).prod() - 1
+        return returns
+
+    # ================================= 查询接口 =================================
+
+    def get_history(self, ticker: str) -> Optional[pd.DataFrame]:
+        """获取指数/ETF历史数据"""
+        return self.histories.get(ticker)
+
+    @property
+    def vix_level(self) -> Optional[float]:
+        """最新VIX读数"""
+        hist = self.histories.get(MARKET_INDICES['VIX'])
+        if hist is None:
+            return None
+        return float(hist['Close'].iloc[-1])
+
+    def get_summary(self) -> dict:
+        """上下文摘要"""
+        return {
+            'created_at': datetime.fromtimestamp(self.created_at).strftime('%Y-%m-%d %H:%M:%S'),
+            'tickers': len(self.histories),
+            'indices': list(self.index_stats.keys()),
+            'sectors': len(self.sector_performance),
+            'vix_level': self.vix_level
+        }
+
+
+class MarketContextService:
+    """共享市场上下文服务
+
+    指数、基准和行业ETF每 refresh_interval 秒批量刷新一次；
+    个股历史/信息按相同有效期缓存（LRU，最多 max_symbols 条）。
+    fetcher 签名为 fetcher(tickers, period) -> {ticker: DataFrame}，
+    info_fetcher 签名为 info_fetcher(symbol) -> dict，可替换为离线实现。
+    """
+
+    def __init__(self, refresh_interval: float = 900, max_symbols: int = 2048,
+                 fetcher: Callable[[List[str], str], Dict[str, pd.DataFrame]] = None,
+                 info_fetcher: Callable[[str], dict] = None):
+        self.refresh_interval = refresh_interval
+        self.max_symbols = max_symbols
+        self.fetcher = fetcher or yfinance_fetcher
+        self.info_fetcher = info_fetcher or self._yfinance_info
+
+        self._context: Optional[MarketContext] = None
+        self._offline = False
+        self._lock = threading.RLock()
+
+        # (symbol, period) -> (加载时间, DataFrame)
+        self._symbol_histories: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        # symbol -> (加载时间, dict)
+        self._symbol_info: 'OrderedDict[str, tuple]' = OrderedDict()
+        # 键级锁只在有线程持有时存活，用完即从字典中消失
+        self._key_locks: 'weakref.WeakValueDictionary[object, threading.Lock]' = weakref.WeakValueDictionary()
+
+        self.stats = {
+            'context_refreshes': 0,
+            'context_hits': 0,
+            'symbol_fetches': 0,
+            'symbol_hits': 0,
+            'info_fetches': 0,
+            'info_hits': 0
+        }
+
+    @staticmethod
+    def _yfinance_info(symbol: str) -> dict:
+        """默认个股信息源"""
+        if yf is None:
+            raise ImportError("yfinance 未安装")
+        return yf.Ticker(symbol).info or {}
+
+    def _is_fresh(self, loaded_at: float) -> bool:
+        return self._offline or time.time() - loaded_at < self.refresh_interval
+
+    # ================================= 市场上下文 =================================
+
+    def get_context(self) -> MarketContext:
+        """获取市场上下文，过期时刷新"""
+        with self._lock:
+            if self._context is not None and self._is_fresh(self._context.created_at):
+                self.stats['context_hits'] += 1
+                return self._context
+            return self.refresh()
+
+    def refresh(self) -> MarketContext:
+        """立即批量重新加载指数、基准和行业ETF"""
+        tickers = list(MARKET_INDICES.values()) + BENCHMARK_ETFS + list(SECTOR_ETFS.keys())
+
+        with self._lock:
+            if self._offline and self._context is not None:
+                return self._context
+
+            try:
+                market_data = self.fetcher(tickers, MARKET_PERIOD)
+            except Exception as e:
+                print(f"❌ 市场数据加载失败: {e}")
+                if self._context is not None:
+                    return self._context
+                market_data = {}
+
+            self._context = MarketContext(market_data)
+            self.stats['context_refreshes'] += 1
+            return self._context
+
+    # ================================= 个股数据 =================================
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get_symbol_history(self, symbol: str, period: str = MARKET_PERIOD) -> pd.DataFrame:
+        """获取个股历史（同一刷新周期内各分析器共享）"""
+        key = (symbol, period)
+
+        with self._key_lock(key):
+            with self._lock:
+                cached = self._symbol_histories.get(key)
+                if cached and self._is_fresh(cached[0]):
+                    self._symbol_histories.move_to_end(key)
+                    self.stats['symbol_hits'] += 1
+                    return cached[1]
+                if self._offline:
+                    return pd.DataFrame()
+
+            hist = self.fetcher([symbol], period).get(symbol, pd.DataFrame())
+
+            with self._lock:
+                self._symbol_histories[key] = (time.time(), hist)
+                self._symbol_histories.move_to_end(key)
+                while len(self._symbol_histories) > self.max_symbols:
+                    self._symbol_histories.popitem(last=False)
+                self.stats['symbol_fetches'] += 1
+            return hist
+
+    def get_symbol_info(self, symbol: str) -> dict:
+        """获取个股基本信息（beta、行业等）"""
+        with self._key_lock(('info', symbol)):
+            with self._lock:
+                cached = self._symbol_info.get(symbol)
+                if cached and self._is_fresh(cached[0]):
+                    self._symbol_info.move_to_end(symbol)
+                    self.stats['info_hits'] += 1
+                    return cached[1]
+                if self._offline:
+                    return {}
+
+            info = MappingProxyType(dict(self.info_fetcher(symbol) or {}))
+
+            with self._lock:
+                self._symbol_info[symbol] = (time.time(), info)
+                self._symbol_info.move_to_end(symbol)
+                while len(self._symbol_info) > self.max_symbols:
+                    self._symbol_info.popitem(last=False)
+                self.stats['info_fetches'] += 1
+            return info
+
+    # ================================= 离线注入 =================================
+
+    def inject(self, market_data: Dict[str, pd.DataFrame],
+               symbol_histories: Dict[str, pd.DataFrame] = None,
+               symbol_info: Dict[str, dict] = None, period: str = MARKET_PERIOD):
+        """注入离线数据并停止网络刷新
+
+        market_data 以行情代码为键（如 '^GSPC'、'SPY'、'XLK'），
+        symbol_histories / symbol_info 以个股代码为键。
+        """
+        now = time.time()
+        with self._lock:
+            self._offline = True
+            self._context = MarketContext(market_data, created_at=now)
+            self._symbol_histories.clear()
+            self._symbol_info.clear()
+            for symbol, hist in (symbol_histories or {}).items():
+                self._symbol_histories[(symbol, period)] = (now, hist)
+            for symbol, info in (symbol_info or {}).items():
+                self._symbol_info[symbol] = (now, MappingProxyType(dict(info)))
+
+    def clear(self):
+        """清空全部缓存并恢复在线刷新"""
+        with self._lock:
+            self._offline = False
+            self._context = None
+            self._symbol_histories.clear()
+            self._symbol_info.clear()
+
+    def get_stats(self) -> dict:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                **self.stats,
+                'offline': self._offline,
+                'cached_symbols': len(self._symbol_histories),
+                'context': self._context.get_summary() if self._context else None
+            }
+
+
+# ================================= 全局实例 =================================
+
+_global_market_context: Optional[MarketContextService] = None
+_global_lock = threading.Lock()
+
+
+def get_market_context_service() -> MarketContextService:
+    """获取全局市场上下文服务"""
+    global _global_market_context
+    with _global_lock:
+        if _global_market_context is None:
+            _global_market_context = MarketContextService()
+        return _global_market_context
+
+
+def set_market_context_service(service: MarketContextService):
+    """替换全局市场上下文服务（测试或离线运行时使用）"""
+    global _global_market_context
+    with _global_lock:
+        _global_market_context = service
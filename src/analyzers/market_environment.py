@@ -11,103 +11,42 @@ Market Environment Analysis Module
 - 流动性环境
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from analyzers.market_context import calculate_trend_strength, get_market_context_service
+except ImportError:
+    from market_context import calculate_trend_strength, get_market_context_service
+
 
 class MarketEnvironmentAnalyzer:
     """市场环境分析器"""
     
-    def __init__(self):
+    def __init__(self, context_service=None):
         self.market_data = {}
+        self.context_service = context_service or get_market_context_service()
         print("🌍 市场环境分析器初始化完成")
     
     def get_market_indices(self) -> dict:
-        """获取主要市场指数数据"""
-        
-        indices = {
-            'SPX': '^GSPC',    # S&P 500
-            'NDX': '^IXIC',    # NASDAQ
-            'DJI': '^DJI',     # 道琼斯
-            'RUT': '^RUT',     # Russell 2000 (小盘股)
-            'VIX': '^VIX',     # 恐慌指数
-            'TNX': '^TNX',     # 10年期国债收益率
-            'DXY': 'DX-Y.NYB'  # 美元指数
-        }
-        
-        market_data = {}
+        """获取主要市场指数数据（来自共享市场上下文）"""
         
-        for name, symbol in indices.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="3mo", interval="1d")
-                
-                if not hist.empty:
-                    # 计算技术指标
-                    hist['SMA_20'] = hist['Close'].rolling(20).mean()
-                    hist['SMA_50'] = hist['Close'].rolling(50).mean()
-                    hist['volatility'] = hist['Close'].pct_change().rolling(20).std() * np.sqrt(252)
-                    
-                    current_price = hist['Close'].iloc[-1]
-                    sma_20 = hist['SMA_20'].iloc[-1]
-                    sma_50 = hist['SMA_50'].iloc[-1]
-                    volatility = hist['volatility'].iloc[-1]
-                    
-                    # 计算动量
-                    momentum_5d = (current_price / hist['Close'].iloc[-6] - 1) * 100
-                    momentum_20d = (current_price / hist['Close'].iloc[-21] - 1) * 100
-                    momentum_60d = (current_price / hist['Close'].iloc[-61] - 1) * 100
-                    
-                    market_data[name] = {
-                        'current_price': current_price,
-                        'sma_20': sma_20,
-                        'sma_50': sma_50,
-                        'volatility': volatility,
-                        'momentum_5d': momentum_5d,
-                        'momentum_20d': momentum_20d,
-                        'momentum_60d': momentum_60d,
-                        'trend_strength': self._calculate_trend_strength(hist),
-                        'data': hist
-                    }
-                    
-            except Exception as e:
-                print(f"❌ 获取 {name} 数据失败: {e}")
-                continue
-        
-        self.market_data = market_data
-        return market_data
+        context = self.context_service.get_context()
+        self.market_data = dict(context.index_stats)
+        return self.market_data
     
     def _calculate_trend_strength(self, data: pd.DataFrame) -> float:
         """计算趋势强度"""
-        
-        if len(data) < 20:
-            return 0
-        
-        # 计算价格相对于移动平均线的位置
-        current_price = data['Close'].iloc[-1]
-        sma_20 = data['Close'].rolling(20).mean().iloc[-1]
-        
-        # 计算趋势一致性
-        above_sma_count = sum(data['Close'].tail(20) > data['Close'].rolling(20).mean().tail(20))
-        trend_consistency = above_sma_count / 20
-        
-        # 计算价格动量
-        price_momentum = (current_price / sma_20 - 1) * 100
-        
-        # 综合趋势强度
-        trend_strength = (trend_consistency * 50) + min(abs(price_momentum) * 2, 50)
-        
-        return min(trend_strength, 100)
+        return calculate_trend_strength(data)
     
     def analyze_market_trend(self) -> dict:
         """分析市场趋势"""
         
-        if not self.market_data:
-            self.get_market_indices()
+        # 共享上下文在刷新周期内直接返回缓存快照
+        self.get_market_indices()
         
         trend_analysis = {}
         
@@ -192,40 +131,7 @@ class MarketEnvironmentAnalyzer:
     def analyze_sector_rotation(self) -> dict:
         """分析行业板块轮动"""
         
-        sectors = {
-            'XLK': '科技',
-            'XLF': '金融', 
-            'XLV': '医疗',
-            'XLE': '能源',
-            'XLI': '工业',
-            'XLP': '消费必需品',
-            'XLY': '消费可选',
-            'XLU': '公用事业',
-            'XLRE': '房地产',
-            'XLB': '材料',
-            'XLC': '通讯'
-        }
-        
-        sector_performance = {}
-        
-        for etf, sector_name in sectors.items():
-            try:
-                ticker = yf.Ticker(etf)
-                hist = ticker.history(period="3mo", interval="1d")
-                
-                if not hist.empty:
-                    # 计算相对表现
-                    momentum_20d = (hist['Close'].iloc[-1] / hist['Close'].iloc[-21] - 1) * 100
-                    momentum_60d = (hist['Close'].iloc[-1] / hist['Close'].iloc[-61] - 1) * 100
-                    
-                    sector_performance[sector_name] = {
-                        'etf': etf,
-                        'momentum_20d': momentum_20d,
-                        'momentum_60d': momentum_60d
-                    }
-                    
-            except Exception as e:
-                continue
+        sector_performance = dict(self.context_service.get_context().sector_performance)
         
         # 排序找出表现最好的板块
         if sector_performance:
@@ -307,9 +213,8 @@ class MarketEnvironmentAnalyzer:
         
         # 获取个股数据
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="3mo", interval="1d")
-            info = ticker.info
+            hist = self.context_service.get_symbol_history(symbol, period="3mo")
+            info = self.context_service.get_symbol_info(symbol)
             
             if hist.empty:
                 return {'error': f'无法获取{symbol}数据'}
@@ -7,7 +7,6 @@ Sentiment & Fund Flow Analyzer
 """
 
 try:
-    import yfinance as yf
     import pandas as pd
     from datetime import datetime
     from typing import Dict
@@ -15,15 +14,19 @@ try:
     warnings.filterwarnings('ignore')
 except ImportError as e:
     print(f"警告: 缺少依赖包 {e}, 情绪分析功能可能受限")
-    yf = None
     pd = None
 
+try:
+    from analyzers.market_context import get_market_context_service
+except ImportError:
+    from market_context import get_market_context_service
+
 
 class SentimentFundAnalyzer:
     """情绪/资金面分析器"""
     
-    def __init__(self):
-        self.vix_data = None
+    def __init__(self, context_service=None):
+        self.context_service = context_service or get_market_context_service()
         self.market_indices = ['SPY', 'QQQ', 'IWM']  # 大盘、科技、小盘
         
         print("🎭 情绪/资金面分析器初始化完成")
@@ -40,8 +43,7 @@ class SentimentFundAnalyzer:
         """
         try:
             # 获取股票数据
-            stock = yf.Ticker(symbol)
-            hist = stock.history(period="3mo", interval="1d")
+            hist = self.context_service.get_symbol_history(symbol, period="3mo")
             
             if hist.empty or len(hist) < 30:
                 return self._get_default_sentiment_fund()
@@ -84,13 +86,9 @@ class SentimentFundAnalyzer:
     def _analyze_vix_sentiment(self) -> Dict:
         """分析VIX恐慌指数"""
         try:
-            if self.vix_data is None:
-                vix = yf.Ticker("^VIX")
-                self.vix_data = vix.history(period="5d")
+            current_vix = self.context_service.get_context().vix_level
             
-            if not self.vix_data.empty:
-                current_vix = self.vix_data['Close'].iloc[-1]
-                
+            if current_vix is not None:
                 if current_vix < 15:
                     sentiment = "极度乐观"
                     score = 90
@@ -219,10 +217,9 @@ class SentimentFundAnalyzer:
             stock_performance = (1 + stock_returns).prod() - 1
             
             # 获取SPY作为基准
-            spy = yf.Ticker("SPY")
-            spy_hist = spy.history(period="1mo")
-            spy_returns = spy_hist['Close'].pct_change().tail(20)
-            spy_performance = (1 + spy_returns).prod() - 1
+            spy_performance = self.context_service.get_context().benchmark_returns.get('SPY')
+            if spy_performance is None:
+                raise ValueError("SPY基准数据不可用")
             
             # 计算相对表现
             relative_perf = stock_performance - spy_performance
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+向量化技术评分引擎
+Vectorized Technical Screening Engine
+
+将整个股票池对齐为 (日期 × 股票) 的OHLCV面板，按列一次性计算：
+- 均线 / EMA / MACD / RSI / 布林带 / 成交量比 / 波动率 / 动量
+- StockScreener 的技术评分规则（趋势、动量、波动、成交量、指标 + 加分项）
+- simple_cli 的简化技术评分规则
+并返回按得分排序的结果表，全程没有逐股票的Python循环。
+"""
+
+import os
+import pandas as pd
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 综合技术得分权重（与 StockScreener.calculate_technical_scores 一致）
+TECHNICAL_WEIGHTS = {
+    'trend_score': 0.25,
+    'momentum_score': 0.25,
+    'volatility_score': 0.20,
+    'volume_score': 0.15,
+    'indicator_score': 0.15
+}
+
+
+def _ffill_inside(frame: pd.DataFrame) -> pd.DataFrame:
+    """只填充两端有效值之间的缺口，首尾缺失保持NaN
+
+    等价于 ffill(limit_area='inside')，但兼容 pandas 2.2 之前的版本。
+    """
+    return frame.ffill().where(frame.bfill().notna())
+
+
+def _rolling(frame: pd.DataFrame, window: int, reducer: str) -> pd.DataFrame:
+    """按列滚动统计（窗口内任一值缺失则结果为NaN，与 rolling(window) 默认行为一致）
+
+    pandas 对宽表的 rolling 逐列执行，股票数很多时较慢；
+    这里用滑动窗口视图在整个二维数组上一次完成。
+    """
+    values = frame.to_numpy(dtype=float)
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        if reducer == 'mean':
+            result[window - 1:] = windows.mean(axis=-1)
+        else:
+            result[window - 1:] = windows.std(axis=-1, ddof=1)
+    return pd.DataFrame(result, index=frame.index, columns=frame.columns)
+
+
+class TechnicalScreenEngine:
+    """向量化技术评分引擎"""
+
+    def __init__(self, min_history: int = 50):
+        self.min_history = min_history
+
+    # ================================= 面板构建 =================================
+
+    def build_panel(self, data_by_symbol: dict) -> dict:
+        """将 {symbol: OHLCV DataFrame} 对齐为 {字段: (日期 × 股票) DataFrame}"""
+        columns = {field: {} for field in OHLCV_FIELDS}
+
+        for symbol, df in data_by_symbol.items():
+            if df is None or len(df) == 0:
+                continue
+            for field in OHLCV_FIELDS:
+                if field in df.columns:
+                    columns[field][symbol] = df[field]
+                elif field.lower() in df.columns:
+                    columns[field][symbol] = df[field.lower()]
+
+        # 各股票索引通常相同，先合并出统一日历再按列拼接二维数组，避免逐列对齐
+        dates = None
+        for series in columns['Close'].values():
+            if dates is None:
+                dates = series.index
+            elif not series.index.equals(dates):
+                dates = dates.union(series.index)
+        if dates is None:
+            dates = pd.DatetimeIndex([])
+        dates = dates.sort_values()
+        symbols = list(columns['Close'].keys())
+
+        def to_column(series):
+            if series is None:
+                return np.full(len(dates), np.nan)
+            if not series.index.equals(dates):
+                series = series.reindex(dates)
+            return series.to_numpy(dtype=float)
+
+        def to_frame(field):
+            blocks = [to_column(columns[field].get(symbol)) for symbol in symbols]
+            values = np.column_stack(blocks) if blocks else np.empty((len(dates), 0))
+            return pd.DataFrame(values, index=dates, columns=symbols)
+
+        close = to_frame('Close')
+        panel = {'Close': _ffill_inside(close)}
+        for field in ['Open', 'High', 'Low', 'Volume']:
+            frame = to_frame(field)
+            # 交易日历不一致造成的中间缺口按停牌处理：价格沿用前值，成交量为0
+            if field == 'Volume':
+                panel[field] = frame.where(frame.notna() | panel['Close'].isna(), 0.0)
+            else:
+                panel[field] = _ffill_inside(frame)
+        return panel
+
+    @staticmethod
+    def split_download(raw: pd.DataFrame, symbols: list) -> dict:
+        """将 yfinance.download 的结果拆分为 {symbol: OHLCV DataFrame}
+
+        兼容三种列结构：(股票, 字段) 两层列 (group_by='ticker')、
+        (字段, 股票) 两层列 (默认 group_by='column') 以及单只股票的单层字段列。
+        """
+        if raw is None or raw.empty:
+            return {}
+
+        if not isinstance(raw.columns, pd.MultiIndex):
+            return {symbols[0]: raw} if len(symbols) == 1 else {}
+
+        data_by_symbol = {}
+        ticker_level = 0 if set(symbols) & set(raw.columns.get_level_values(0)) else 1
+        available = set(raw.columns.get_level_values(ticker_level))
+        for symbol in symbols:
+            if symbol in available:
+                frame = raw.xs(symbol, axis=1, level=ticker_level)
+                if not frame.dropna(how='all').empty:
+                    data_by_symbol[symbol] = frame
+        return data_by_symbol
+
+    def load_panel_from_directory(self, directory: str, symbols: list = None) -> dict:
+        """从本地CSV目录 ({symbol}.csv，首列为日期) 加载面板"""
+        if symbols is None:
+            symbols = sorted(os.path.splitext(name)[0] for name in os.listdir(directory)
+                             if name.endswith('.csv'))
+
+        data_by_symbol = {}
+        for symbol in symbols:
+            path = os.path.join(directory, f"{symbol}.csv")
+            if os.path.exists(path):
+                data_by_symbol[symbol] = pd.read_csv(path, index_col=0, parse_dates=True)
+
+        return self.build_panel(data_by_symbol)
+
+    # ================================= 指标计算 =================================
+
+    def compute_indicators(self, panel: dict) -> dict:
+        """按列计算全部技术指标，返回 {指标名: (日期 × 股票) DataFrame}"""
+        close = panel['Close']
+        volume = panel['Volume']
+        ind = {'Close': close, 'Volume': volume}
+
+        # 移动平均线
+        ind['sma_5'] = _rolling(close, 5, 'mean')
+        ind['sma_10'] = _rolling(close, 10, 'mean')
+        ind['sma_20'] = _rolling(close, 20, 'mean')
+        ind['sma_50'] = _rolling(close, 50, 'mean')
+
+        # 指数移动平均线
+        ind['ema_12'] = close.ewm(span=12).mean()
+        ind['ema_26'] = close.ewm(span=26).mean()
+
+        # MACD
+        ind['macd'] = ind['ema_12'] - ind['ema_26']
+        ind['macd_signal'] = ind['macd'].ewm(span=9).mean()
+        ind['macd_histogram'] = ind['macd'] - ind['macd_signal']
+
+        # RSI
+        delta = close.diff()
+        listed = close.notna()
+        gain = delta.where(delta > 0, 0).where(listed)
+        loss = (-delta.where(delta < 0, 0)).where(listed)
+        rs = _rolling(gain, 14, 'mean') / _rolling(loss, 14, 'mean')
+        ind['rsi'] = 100 - (100 / (1 + rs))
+
+        # 布林带
+        ind['bb_middle'] = ind['sma_20']
+        bb_std = _rolling(close, 20, 'std')
+        ind['bb_upper'] = ind['bb_middle'] + (bb_std * 2)
+        ind['bb_lower'] = ind['bb_middle'] - (bb_std * 2)
+        ind['bb_width'] = (ind['bb_upper'] - ind['bb_lower']) / ind['bb_middle']
+        ind['bb_position'] = (close - ind['bb_lower']) / (ind['bb_upper'] - ind['bb_lower'])
+
+        # 成交量指标
+        ind['volume_sma'] = _rolling(volume, 20, 'mean')
+        ind['volume_ratio'] = volume / ind['volume_sma']
+
+        # 波动率
+        ind['volatility'] = _rolling(close.pct_change(fill_method=None), 20, 'std') * np.sqrt(252)
+
+        # 动量指标
+        ind['momentum_5'] = close.pct_change(5, fill_method=None)
+        ind['momentum_10'] = close.pct_change(10, fill_method=None)
+        ind['momentum_20'] = close.pct_change(20, fill_method=None)
+
+        return ind
+
+    def latest_snapshot(self, indicators: dict) -> pd.DataFrame:
+        """取每只股票最后一个有效交易日的指标值，返回 (股票 × 指标) DataFrame"""
+        close = indicators['Close']
+        valid = close.notna().to_numpy()
+        n_rows = valid.shape[0]
+
+        has_data = valid.any(axis=0)
+        last_row = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+        history = valid.sum(axis=0)
+        columns = np.arange(close.shape[1])
+
+        snapshot = {name: frame.to_numpy()[last_row, columns] if n_rows else np.array([])
+                    for name, frame in indicators.items()}
+        snapshot = pd.DataFrame(snapshot, index=close.columns)
+        snapshot['history'] = history
+        snapshot['as_of'] = close.index[last_row] if n_rows else pd.NaT
+        return snapshot[has_data] if n_rows else snapshot
+
+    # ================================= 评分规则 =================================
+
+    @staticmethod
+    def score_snapshot(latest: pd.DataFrame) -> pd.DataFrame:
+        """对指标快照按 StockScreener 规则评分（按列向量化）"""
+        close = latest['Close']
+        rsi = latest['rsi']
+        volume_ratio = latest['volume_ratio']
+        volatility = latest['volatility']
+        momentum_20 = latest['momentum_20']
+        scores = pd.DataFrame(index=latest.index)
+
+        # 1. 趋势得分
+        scores['trend_score'] = (
+            (close > latest['sma_20']).astype(int) * 25 +
+            (latest['sma_20'] > latest['sma_50']).astype(int) * 25 +
+            (close > latest['sma_5']).astype(int) * 25 +
+            (latest['ema_12'] > latest['ema_26']).astype(int) * 25
+        ).clip(upper=100)
+
+        # 2. 动量得分
+        scores['momentum_score'] = (
+            ((rsi > 30) & (rsi < 70)).astype(int) * 50 +
+            (latest['macd'] > latest['macd_signal']).astype(int) * 50
+        ).clip(upper=100)
+
+        # 3. 波动得分 - 低波动率更好
+        scores['volatility_score'] = np.select(
+            [volatility > 0.4, volatility > 0.3], [20, 60], default=100)
+
+        # 4. 成交量得分
+        scores['volume_score'] = np.minimum(volume_ratio * 30, 100)
+
+        # 5. 技术指标得分
+        scores['indicator_score'] = (
+            ((latest['bb_position'] >= 0.2) & (latest['bb_position'] <= 0.8)).astype(int) * 30 +
+            ((rsi >= 40) & (rsi <= 70)).astype(int) * 40 +
+            (latest['macd_histogram'] > 0).astype(int) * 30
+        ).clip(upper=100)
+
+        # 综合技术得分
+        scores['technical_score'] = sum(scores[key] * weight for key, weight in TECHNICAL_WEIGHTS.items())
+
+        # 额外加分项
+        bonus = np.select([momentum_20 > 0.1, momentum_20 > 0.05, momentum_20 > 0.02],
+                          [20, 15, 10], default=0)
+        bonus = bonus + ((rsi >= 50) & (rsi <= 70)).astype(int).to_numpy() * 5
+        scores['bonus_points'] = np.minimum(bonus, 25)
+
+        return scores
+
+    @staticmethod
+    def simple_score_snapshot(latest: pd.DataFrame) -> pd.Series:
+        """对指标快照按 simple_cli 简化规则评分（趋势60% + RSI动量40%）"""
+        close = latest['Close']
+        trend_score = (
+            (close > latest['sma_5']).astype(int) * 25 +
+            (close > latest['sma_20']).astype(int) * 35 +
+            (close > latest['sma_50']).astype(int) * 40
+        )
+        rsi = latest['rsi']
+        momentum_score = np.select(
+            [(rsi >= 40) & (rsi <= 70), (rsi >= 30) & (rsi <= 80)], [100, 80], default=60)
+
+        return (trend_score * 0.6 + momentum_score * 0.4).clip(0, 100)
+
+    # ================================= 筛选 =================================
+
+    def score_panel(self, panel: dict) -> pd.DataFrame:
+        """对整个面板评分，返回按得分排序的结果表"""
+        indicators = self.compute_indicators(panel)
+        latest = self.latest_snapshot(indicators)
+
+        table = self.score_snapshot(latest)
+        table['simple_score'] = self.simple_score_snapshot(latest)
+        table['screen_score'] = np.minimum(table['technical_score'] + table['bonus_points'], 100)
+
+        table['current_price'] = latest['Close']
+        table['rsi'] = latest['rsi']
+        table['volume_ratio'] = latest['volume_ratio']
+        table['momentum_20'] = latest['momentum_20']
+        table['volatility'] = latest['volatility']
+        table['history'] = latest['history']
+        table['as_of'] = latest['as_of']
+
+        # 历史数据不足的股票不参与排名
+        table = table[table['history'] >= self.min_history]
+        table = table.sort_values('screen_score', ascending=False, kind='mergesort')
+        table['rank'] = np.arange(1, len(table) + 1)
+        table.index.name = 'symbol'
+        return table
+
+    def screen(self, data_by_symbol: dict, top_n: int = None, min_score: float = None) -> pd.DataFrame:
+        """筛选股票池：构建面板 → 计算指标 → 评分排名"""
+        table = self.score_panel(self.build_panel(data_by_symbol))
+        if min_score is not None:
+            table = table[table['screen_score'] >= min_score]
+        if top_n is not None:
+            table = table.head(top_n)
+        return table
@@ -13,6 +13,7 @@
 """
 
 import os
+import math
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any, Union, Callable
@@ -23,6 +24,10 @@ import json
 from .data_manager import HistoricalDataManager, MarketData
 from .parameter_optimizer import OptimizationManager, ParameterRange, OptimizationResult
 from .performance_analyzer import PerformanceAnalyzer, PerformanceMetrics
+from .result_store import OptimizationResultStore, code_fingerprint, data_fingerprint
+
+# 回测引擎版本：引擎逻辑变化导致结果不可比时递增，使已存储的优化结果失效
+ENGINE_VERSION = "1"
 
 # 导入核心回测引擎（简化版本）
 class SimpleBacktestEngine:
@@ -112,13 +117,15 @@ class SimpleBacktestEngine:
         
         except Exception as e:
             self.logger.error(f"回测失败: {e}")
-            return SimpleBacktestResults()
+            return SimpleBacktestResults(error=str(e))
 
 
 class SimpleBacktestResults:
     """简化的回测结果"""
     
-    def __init__(self, trades=None, equity_curve=None, daily_returns=None, final_equity=100000):
+    def __init__(self, trades=None, equity_curve=None, daily_returns=None, final_equity=100000,
+                 error: str = None):
+        self.error = error  # 回测失败时的错误信息
         self.trades = trades or []
         self.equity_curve = self._create_series(equity_curve or [100000])
         self.daily_returns = self._create_series(daily_returns or [])
@@ -248,6 +255,9 @@ class StrategyBacktestManager:
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
         
+        # 优化结果和任务状态的持久化存储
+        self.result_store = OptimizationResultStore(os.path.join(cache_dir, "results.db"))
+        
         # 初始化各模块
         self.data_manager = HistoricalDataManager()
         self.optimization_manager = OptimizationManager()
@@ -308,16 +318,27 @@ class StrategyBacktestManager:
     def optimize_strategy(self, config: BacktestConfig, strategy_func: Callable,
                          parameter_ranges: List[ParameterRange],
                          optimizer_type: str = "grid",
-                         max_iterations: int = 50) -> List[OptimizationResult]:
+                         max_iterations: int = 50,
+                         resume: bool = True,
+                         successive_halving: bool = False,
+                         eta: int = 3,
+                         min_budget: float = 1 / 27) -> List[OptimizationResult]:
         """
         策略参数优化
         
+        每个参数组合评估后立即写入结果存储；已评估过的组合（相同策略、参数、
+        数据和引擎版本）直接复用，中断后重新调用即从断点继续。
+        
         Args:
             config: 回测配置
             strategy_func: 策略函数
             parameter_ranges: 参数范围列表
             optimizer_type: 优化算法类型
             max_iterations: 最大迭代次数
+            resume: 继续同一配置下未完成的优化运行
+            successive_halving: 逐级减半模式：候选先在数据前缀上回测，只有前 1/eta 晋级到更长的数据
+            eta: 每级淘汰比例
+            min_budget: 第一级使用的数据比例
         
         Returns:
             优化结果列表
@@ -336,21 +357,49 @@ class StrategyBacktestManager:
             raise ValueError(f"无法获取数据: {config.symbol}")
         
         # 定义回测函数
-        def backtest_function(params: Dict[str, Any]):
-            """用于优化的回测函数"""
+        def backtest_function(params: Dict[str, Any], budget: float = 1.0):
+            """用于优化的回测函数（budget < 1 时只回测数据前缀）"""
             self.backtest_engine.initial_capital = config.initial_capital
-            return self.backtest_engine.run_backtest(strategy_func, data, **params)
+            bars = data if budget >= 1.0 else data[:max(2, math.ceil(len(data) * budget))]
+            return self.backtest_engine.run_backtest(strategy_func, bars, **params)
+        
+        run = self.result_store.open_run(
+            strategy=self._strategy_key(config, strategy_func),
+            fingerprint=data_fingerprint(data),
+            engine_version=self._engine_version(config),
+            optimizer=optimizer_type,
+            config={
+                'symbol': config.symbol,
+                'start_date': config.start_date,
+                'end_date': config.end_date,
+                'objective': "sharpe_ratio",
+                'max_iterations': max_iterations,
+                'parameter_ranges': [vars(pr) for pr in parameter_ranges],
+                'successive_halving': [eta, min_budget] if successive_halving else None
+            },
+            resume=resume
+        )
         
         # 执行优化
-        results = self.optimization_manager.optimize_strategy(
-            parameter_ranges=parameter_ranges,
-            backtest_function=backtest_function,
-            objective_metric="sharpe_ratio",
-            optimizer_type=optimizer_type,
-            max_iterations=max_iterations
-        )
+        try:
+            results = self.optimization_manager.optimize_strategy(
+                parameter_ranges=parameter_ranges,
+                backtest_function=backtest_function,
+                objective_metric="sharpe_ratio",
+                optimizer_type=optimizer_type,
+                max_iterations=max_iterations,
+                run=run,
+                successive_halving=successive_halving,
+                eta=eta,
+                min_budget=min_budget
+            )
+        except BaseException:
+            run.finish("interrupted")
+            raise
+        run.finish("completed")
         
-        self.logger.info(f"参数优化完成: {len(results)}个结果")
+        self.logger.info(f"参数优化完成: {len(results)}个结果 "
+                         f"(复用{run.hits}个, 新评估{run.evaluated}个, 运行{run.run_id})")
         
         # 缓存优化结果
         self._cache_optimization_results(config, results)
@@ -443,6 +492,7 @@ class StrategyBacktestManager:
         )
         
         self.tasks[task_id] = task
+        self._save_task(task)
         self.logger.info(f"创建回测任务: {task_id}")
         
         return task_id
@@ -464,6 +514,9 @@ class StrategyBacktestManager:
         task = self.tasks[task_id]
         task.status = "running"
         task.start_time = datetime.now()
+        task.end_time = None
+        task.error = None
+        self._save_task(task)
         
         try:
             # 执行回测
@@ -482,6 +535,7 @@ class StrategyBacktestManager:
             }
             task.status = "completed"
             task.end_time = datetime.now()
+            self._save_task(task)
             
             self.logger.info(f"任务执行成功: {task_id}")
             return True
@@ -490,14 +544,18 @@ class StrategyBacktestManager:
             task.error = str(e)
             task.status = "failed"
             task.end_time = datetime.now()
+            self._save_task(task)
             
             self.logger.error(f"任务执行失败: {task_id}, {e}")
             return False
     
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
-        """获取任务状态"""
+        """获取任务状态（不在内存中的任务从结果存储读取，例如重启前创建的任务）"""
         if task_id not in self.tasks:
-            return {"error": "任务不存在"}
+            record = self.result_store.load_task(task_id)
+            if record is None:
+                return {"error": "任务不存在"}
+            return self._task_record_status(record)
         
         task = self.tasks[task_id]
         
@@ -523,6 +581,117 @@ class StrategyBacktestManager:
         
         return status_info
     
+    def resume_tasks(self, strategy_funcs: Dict[str, Callable]) -> Dict[str, bool]:
+        """
+        恢复并执行未完成的任务（进程中断前处于 pending/running 状态的任务）
+        
+        Args:
+            strategy_funcs: 策略函数字典 {策略名: 函数}，策略函数无法持久化，需重新提供
+        
+        Returns:
+            {任务ID: 是否执行成功}
+        """
+        outcomes = {}
+        for record in self.result_store.load_tasks(status=["pending", "running"]):
+            task_id = record['task_id']
+            if task_id in self.tasks:
+                continue
+            
+            strategy_func = strategy_funcs.get(record['strategy_name'])
+            if strategy_func is None:
+                self.logger.error(f"未找到策略函数: {record['strategy_name']}, 跳过任务 {task_id}")
+                continue
+            
+            self.tasks[task_id] = BacktestTask(
+                task_id=task_id,
+                config=BacktestConfig(**record['config']),
+                strategy_func=strategy_func,
+                strategy_params=record['strategy_params']
+            )
+            self.logger.info(f"恢复回测任务: {task_id}")
+            outcomes[task_id] = self.run_task(task_id)
+        
+        return outcomes
+    
+    def get_optimization_report(self, strategy_name: str = None, run_id: str = None,
+                                top_n: int = 10) -> Dict[str, Any]:
+        """
+        查询历史优化结果并生成报告（跨运行，统计在数据库中完成）
+        
+        Args:
+            strategy_name: 策略名称，None 表示全部策略
+            run_id: 只统计某次优化运行
+            top_n: 报告中的最优结果数
+        """
+        report = {}
+        if strategy_name is not None:
+            strategies = [run['strategy'] for run in self.result_store.list_runs()
+                          if run['strategy'].split(':', 1)[0] == strategy_name]
+            for strategy in dict.fromkeys(strategies):
+                report[strategy] = self.optimization_manager.get_optimization_report(
+                    top_n=top_n, result_store=self.result_store, strategy=strategy, run_id=run_id)
+            return report
+        
+        return self.optimization_manager.get_optimization_report(
+            top_n=top_n, result_store=self.result_store, run_id=run_id)
+    
+    @staticmethod
+    def _strategy_key(config: BacktestConfig, strategy_func: Callable) -> str:
+        """结果存储中的策略标识：策略名 + 策略函数 + 代码指纹（修改策略代码后不复用旧结果）"""
+        func_name = f"{getattr(strategy_func, '__module__', '')}.{getattr(strategy_func, '__qualname__', repr(strategy_func))}"
+        return f"{config.strategy_name}:{func_name}@{code_fingerprint(strategy_func)}"
+    
+    def _engine_version(self, config: BacktestConfig) -> str:
+        """引擎版本及影响结果的引擎设置"""
+        return f"{type(self.backtest_engine).__name__}/{ENGINE_VERSION}/capital={config.initial_capital!r}"
+    
+    def _save_task(self, task: BacktestTask):
+        """持久化任务状态"""
+        summary = None
+        if task.status == "completed" and task.results:
+            metrics = task.results['performance_metrics']
+            summary = {
+                'total_return': metrics.total_return,
+                'sharpe_ratio': metrics.sharpe_ratio,
+                'max_drawdown': metrics.max_drawdown,
+                'total_trades': metrics.total_trades
+            }
+        
+        try:
+            self.result_store.save_task(
+                task.task_id,
+                strategy_name=task.config.strategy_name,
+                config=task.config.to_dict(),
+                strategy_params=task.strategy_params,
+                status=task.status,
+                start_time=task.start_time.isoformat() if task.start_time else None,
+                end_time=task.end_time.isoformat() if task.end_time else None,
+                error=task.error,
+                results_summary=summary
+            )
+        except Exception as e:
+            self.logger.error(f"保存任务状态失败: {task.task_id}, {e}")
+    
+    @staticmethod
+    def _task_record_status(record: Dict[str, Any]) -> Dict[str, Any]:
+        """由持久化的任务记录生成状态信息"""
+        start_time = datetime.fromisoformat(record['start_time']) if record['start_time'] else None
+        end_time = datetime.fromisoformat(record['end_time']) if record['end_time'] else None
+        
+        status_info = {
+            'task_id': record['task_id'],
+            'status': record['status'],
+            'config': record['config'],
+            'start_time': record['start_time'],
+            'end_time': record['end_time'],
+            'duration': (end_time - start_time).total_seconds() if start_time and end_time else None
+        }
+        if record['results_summary']:
+            status_info['results_summary'] = record['results_summary']
+        if record['error']:
+            status_info['error'] = record['error']
+        return status_info
+    
     def _cache_optimization_results(self, config: BacktestConfig, results: List[OptimizationResult]):
         """缓存优化结果"""
         cache_file = os.path.join(
@@ -18,6 +18,14 @@ import pickle
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any, Union
 import logging
+from collections import OrderedDict
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
 
 # 基础数据结构
 class MarketData:
@@ -91,37 +99,229 @@ class DataProvider:
 
 
 class CSVDataProvider(DataProvider):
-    """CSV文件数据提供者"""
+    """CSV文件数据提供者
+
+    有 numpy/pandas 时按列批量解析（支持 .csv.gz / .csv.zst 压缩文件，大文件分块读取），
+    首次加载后写入二进制缓存（.npz），之后只要CSV未修改就直接读取缓存，跳过解析。
+    日期过滤在已排序的时间戳数组上二分查找，只为区间内的行创建 MarketData。
+    """
+    
+    # 按顺序查找的文件扩展名
+    FILE_EXTENSIONS = ('.csv', '.csv.gz', '.csv.zst')
+    
+    # 分块读取的行数
+    CHUNK_ROWS = 500_000
+    
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+    
+    # 解析规则版本，写入二进制缓存签名；规则变化时旧缓存自动失效
+    PARSER_VERSION = 2
     
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, cache_dir: str = None, max_cached_symbols: int = 64):
         super().__init__("CSV")
         self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, '.cache')
+        
+        # 进程内LRU缓存: symbol -> (文件签名, 列数组)，最多保留 max_cached_symbols 只股票
+        self.max_cached_symbols = max_cached_symbols
+        self._arrays = OrderedDict()
         
         # 确保数据目录存在
         os.makedirs(data_dir, exist_ok=True)
     
+    def _find_file(self, symbol: str) -> Optional[str]:
+        """查找股票对应的数据文件（含压缩格式）"""
+        for ext in self.FILE_EXTENSIONS:
+            file_path = os.path.join(self.data_dir, f"{symbol}{ext}")
+            if os.path.exists(file_path):
+                return file_path
+        return None
+    
     def get_historical_data(self, symbol: str, start_date: str, end_date: str, 
                            interval: str = "1d") -> List[MarketData]:
         """从CSV文件读取历史数据"""
-        file_path = os.path.join(self.data_dir, f"{symbol}.csv")
+        file_path = self._find_file(symbol)
         
-        if not os.path.exists(file_path):
-            self.logger.warning(f"数据文件不存在: {file_path}")
+        if file_path is None:
+            self.logger.warning(f"数据文件不存在: {os.path.join(self.data_dir, f'{symbol}.csv')}")
             return []
         
-        data_list = []
         start_dt = datetime.strptime(start_date, "%Y-%m-%d")
         end_dt = datetime.strptime(end_date, "%Y-%m-%d")
         
+        if np is None or pd is None:
+            return self._read_csv_rows(symbol, file_path, start_dt, end_dt)
+        
+        try:
+            arrays = self.load_arrays(symbol)
+        except Exception as e:
+            self.logger.error(f"读取CSV文件失败: {e}")
+            return []
+        
+        # 二分查找日期区间
+        dates = arrays['date']
+        lo = np.searchsorted(dates, np.datetime64(start_dt, 'ns'), side='left')
+        hi = np.searchsorted(dates, np.datetime64(end_dt, 'ns'), side='right')
+        
+        columns = [arrays[name][lo:hi].tolist() for name in self.COLUMNS]
+        return [
+            MarketData(symbol=symbol, date=date, open_price=open_price, high=high,
+                       low=low, close=close, volume=volume)
+            for date, open_price, high, low, close, volume in zip(
+                dates[lo:hi].astype('datetime64[us]').tolist(), *columns)
+        ]
+    
+    def load_arrays(self, symbol: str) -> Dict[str, Any]:
+        """
+        加载股票的全部数据为列数组（按日期排序，已剔除无效行）
+        
+        Returns:
+            {'date': datetime64[ns] 数组, 'open'/'high'/'low'/'close': float64 数组,
+             'volume': int64 数组}
+        """
+        file_path = self._find_file(symbol)
+        if file_path is None:
+            raise FileNotFoundError(f"数据文件不存在: {symbol}")
+        
+        stat = os.stat(file_path)
+        signature = np.array([stat.st_mtime_ns, stat.st_size, self.PARSER_VERSION], dtype=np.int64)
+        
+        cached = self._arrays.get(symbol)
+        if cached is not None and np.array_equal(cached[0], signature):
+            self._arrays.move_to_end(symbol)
+            return cached[1]
+        
+        arrays = self._load_binary_cache(symbol, signature)
+        if arrays is None:
+            arrays = self._parse_csv(file_path)
+            self._save_binary_cache(symbol, signature, arrays)
+            self.logger.info(f"CSV解析完成: {symbol}, {len(arrays['date'])}条记录")
+        
+        self._arrays[symbol] = (signature, arrays)
+        self._arrays.move_to_end(symbol)
+        while len(self._arrays) > self.max_cached_symbols:
+            self._arrays.popitem(last=False)
+        return arrays
+    
+    def _parse_csv(self, file_path: str) -> Dict[str, Any]:
+        """按列批量解析CSV（自动识别压缩格式，分块读取）"""
+        first = pd.read_csv(file_path, header=None, nrows=1, usecols=[0], dtype=str)
+        has_header = not first.empty and str(first.iloc[0, 0]).startswith('date')
+        
+        reader = pd.read_csv(
+            file_path,
+            header=None,
+            skiprows=1 if has_header else 0,
+            usecols=range(6),
+            names=['date', *self.COLUMNS],
+            dtype={'date': str},
+            # 只有空字段视为缺失（与逐行解析一致：空成交量记为0，'nan' 等文本按无效处理）
+            keep_default_na=False,
+            na_values=[''],
+            skipinitialspace=True,
+            float_precision='round_trip',
+            on_bad_lines='skip',
+            chunksize=self.CHUNK_ROWS
+        )
+        
+        chunks = {name: [] for name in ('date', *self.COLUMNS)}
+        invalid = 0
+        for chunk in reader:
+            dates = pd.to_datetime(chunk['date'], format='ISO8601', errors='coerce').to_numpy('datetime64[ns]')
+            prices = {name: self._to_float64(chunk[name]) for name in self.COLUMNS}
+            # 空成交量记为0；非数字成交量保持NaN，整行按无效处理
+            volume = np.where(chunk['volume'].isna().to_numpy(), 0.0, prices['volume'])
+            
+            # 与 MarketData.validate 相同的校验规则
+            valid = (
+                ~np.isnat(dates)
+                & ~np.isnan(prices['open']) & ~np.isnan(prices['high'])
+                & ~np.isnan(prices['low']) & ~np.isnan(prices['close'])
+                & (prices['high'] >= np.maximum(prices['open'], prices['close']))
+                & (prices['low'] <= np.minimum(prices['open'], prices['close']))
+                & (prices['low'] >= 0) & (prices['open'] >= 0) & (prices['close'] >= 0)
+                & ~np.isnan(volume) & (volume >= 0)
+            )
+            invalid += int(len(valid) - valid.sum())
+            
+            chunks['date'].append(dates[valid])
+            for name in ('open', 'high', 'low', 'close'):
+                chunks[name].append(prices[name][valid])
+            chunks['volume'].append(volume[valid].astype(np.int64))
+        
+        if invalid:
+            self.logger.warning(f"跳过无效数据行: {file_path}, {invalid}行")
+        
+        arrays = {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+            for name, parts in chunks.items()
+        }
+        if not chunks['date']:
+            arrays['date'] = np.empty(0, dtype='datetime64[ns]')
+            arrays['volume'] = np.empty(0, dtype=np.int64)
+        
+        # 乱序文件按日期稳定排序
+        if len(arrays['date']) > 1 and (np.diff(arrays['date'].view(np.int64)) < 0).any():
+            order = np.argsort(arrays['date'], kind='stable')
+            arrays = {name: values[order] for name, values in arrays.items()}
+        
+        return arrays
+    
+    @staticmethod
+    def _to_float64(column) -> Any:
+        """列转 float64；含非数字内容的列逐个转换（无法解析的记为NaN），结果与 float() 一致"""
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            return column.to_numpy(np.float64)
+        
+        def to_float(value):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+        
+        return np.fromiter((to_float(value) for value in column), dtype=np.float64, count=len(column))
+    
+    def _binary_cache_file(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}.npz")
+    
+    def _load_binary_cache(self, symbol: str, signature) -> Optional[Dict[str, Any]]:
+        """读取二进制缓存（CSV文件签名不一致时视为失效）"""
+        cache_file = self._binary_cache_file(symbol)
+        if not os.path.exists(cache_file):
+            return None
+        
+        try:
+            with np.load(cache_file) as cached:
+                if not np.array_equal(cached['signature'], signature):
+                    return None
+                return {name: cached[name] for name in ('date', *self.COLUMNS)}
+        except Exception as e:
+            self.logger.warning(f"读取二进制缓存失败: {cache_file}, {e}")
+            return None
+    
+    def _save_binary_cache(self, symbol: str, signature, arrays: Dict[str, Any]):
+        """写入二进制缓存"""
+        cache_file = self._binary_cache_file(symbol)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.tmp.npz"
+            np.savez(tmp_file, signature=signature, **arrays)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            self.logger.warning(f"写入二进制缓存失败: {cache_file}, {e}")
+    
+    def _read_csv_rows(self, symbol: str, file_path: str,
+                       start_dt: datetime, end_dt: datetime) -> List[MarketData]:
+        """逐行解析（无 numpy/pandas 时使用，仅支持未压缩文件）"""
+        data_list = []
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-                # 跳过表头
-                if lines and lines[0].startswith('date'):
-                    lines = lines[1:]
-                
-                for line in lines:
+                for line in f:
+                    # 跳过表头
+                    if line.startswith('date'):
+                        continue
+                    
                     parts = line.strip().split(',')
                     if len(parts) >= 6:
                         try:
@@ -157,17 +357,29 @@ class CSVDataProvider(DataProvider):
         file_path = os.path.join(self.data_dir, f"{symbol}.csv")
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # 写入表头
-                f.write("date,open,high,low,close,volume\\n")
-                
-                # 写入数据
-                for market_data in sorted(data, key=lambda x: x.date):
-                    f.write(f"{market_data.date.strftime('%Y-%m-%d')},"
-                           f"{market_data.open},{market_data.high},"
-                           f"{market_data.low},{market_data.close},"
-                           f"{market_data.volume}\\n")
+            data = sorted(data, key=lambda x: x.date)
+            if pd is not None:
+                frame = pd.DataFrame({
+                    'date': [d.date for d in data],
+                    'open': [d.open for d in data],
+                    'high': [d.high for d in data],
+                    'low': [d.low for d in data],
+                    'close': [d.close for d in data],
+                    'volume': [d.volume for d in data]
+                })
+                has_time = any(d.date.hour or d.date.minute or d.date.second for d in data)
+                frame.to_csv(file_path, index=False,
+                             date_format='%Y-%m-%d %H:%M:%S' if has_time else '%Y-%m-%d')
+            else:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    # 写入表头
+                    f.write("date,open,high,low,close,volume\n")
+                    f.writelines(
+                        f"{d.date.strftime('%Y-%m-%d')},{d.open},{d.high},{d.low},{d.close},{d.volume}\n"
+                        for d in data
+                    )
             
+            self._arrays.pop(symbol, None)
             self.logger.info(f"数据保存成功: {symbol}, {len(data)}条记录")
         
         except Exception as e:
@@ -8,17 +8,23 @@
 1. 网格搜索优化
 2. 随机搜索优化
 3. 遗传算法优化
-4. 参数空间定义
-5. 优化结果分析
+4. 贝叶斯优化（代理模型 + 批量候选）
+5. 逐级减半（successive halving）提前淘汰
+6. 参数空间定义
+7. 优化结果分析
 """
 
 import itertools
 import logging
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 @dataclass
 class ParameterRange:
@@ -104,6 +110,26 @@ class ParameterOptimizer(ABC):
                 max_iterations: int = 100) -> List[OptimizationResult]:
         """执行参数优化"""
         pass
+    
+    def _evaluate_params(self, objective_function: Callable, params: Dict[str, Any],
+                         *args) -> OptimizationResult:
+        """评估一组参数，失败时返回适应度为 -inf 的结果"""
+        try:
+            start_time = datetime.now()
+            result = objective_function(params, *args)
+            
+            if isinstance(result, OptimizationResult):
+                result.optimization_time = (datetime.now() - start_time).total_seconds()
+                return result
+            return OptimizationResult(
+                parameters=params,
+                fitness=float(result),
+                optimization_time=(datetime.now() - start_time).total_seconds()
+            )
+        
+        except Exception as e:
+            self.logger.error(f"参数评估失败: {params}, {e}")
+            return OptimizationResult(parameters=params, fitness=-float('inf'))
 
 
 class GridSearchOptimizer(ParameterOptimizer):
@@ -297,18 +323,31 @@ class RandomSearchOptimizer(ParameterOptimizer):
 
 
 class GeneticOptimizer(ParameterOptimizer):
-    """遗传算法优化器"""
+    """
+    遗传算法优化器
+    
+    种群以 numpy 参数矩阵表示（每行一个个体，choice 参数存选项下标），
+    选择、交叉、变异均为整代向量化操作；适应度按参数元组缓存，重复出现的个体不再评估。
+    
+    每代未评估的个体作为一批交给执行器：
+    - "serial"：逐个评估（默认）
+    - "thread" / "process" 或 concurrent.futures.Executor 实例：并行评估
+      （进程池要求目标函数可被 pickle）
+    - vectorized=True：目标函数一次接收整批参数 {参数名: 数组}，返回适应度数组
+    """
     
     def __init__(self, population_size: int = 50, mutation_rate: float = 0.1, 
-                 crossover_rate: float = 0.8, seed: int = 42):
+                 crossover_rate: float = 0.8, seed: int = 42,
+                 executor: Union[str, Executor] = "serial", max_workers: int = None,
+                 vectorized: bool = False):
         super().__init__("Genetic")
         self.population_size = population_size
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
-        
-        import random
-        self.random = random
-        self.random.seed(seed)
+        self.seed = seed
+        self.executor = executor
+        self.max_workers = max_workers
+        self.vectorized = vectorized
     
     def optimize(self, parameter_ranges: List[ParameterRange],
                 objective_function: Callable,
@@ -317,6 +356,9 @@ class GeneticOptimizer(ParameterOptimizer):
         遗传算法优化
         
         使用选择、交叉、变异操作进化参数组合。
+        
+        Returns:
+            每个不同个体的评估结果，按适应度排序
         """
         self.logger.info(f"开始遗传算法优化: 种群大小={self.population_size}, 代数={max_iterations}")
         
@@ -326,58 +368,35 @@ class GeneticOptimizer(ParameterOptimizer):
                 raise ValueError(f"无效的参数范围: {param_range.name}")
         
         self.parameter_ranges = parameter_ranges
+        self.rng = np.random.default_rng(self.seed)
+        self.fitness_cache = {}  # 参数元组 -> OptimizationResult
         
         # 初始化种群
         population = self._initialize_population()
-        all_results = []
         
-        for generation in range(max_iterations):
-            self.logger.info(f"第{generation+1}代进化")
-            
-            # 评估种群
-            generation_results = []
-            for individual in population:
-                try:
-                    start_time = datetime.now()
-                    result = objective_function(individual)
-                    
-                    if isinstance(result, OptimizationResult):
-                        result.optimization_time = (datetime.now() - start_time).total_seconds()
-                        generation_results.append(result)
-                    else:
-                        opt_result = OptimizationResult(
-                            parameters=individual,
-                            fitness=float(result),
-                            optimization_time=(datetime.now() - start_time).total_seconds()
-                        )
-                        generation_results.append(opt_result)
+        executor, owned = self._open_executor()
+        try:
+            for generation in range(max_iterations):
+                self.logger.info(f"第{generation+1}代进化")
                 
-                except Exception as e:
-                    self.logger.error(f"个体评估失败: {individual}, {e}")
-                    # 给失败的个体一个很低的适应度
-                    opt_result = OptimizationResult(
-                        parameters=individual,
-                        fitness=-float('inf')
-                    )
-                    generation_results.append(opt_result)
-            
-            all_results.extend(generation_results)
-            
-            # 排序（按适应度降序）
-            generation_results.sort(key=lambda x: x.fitness, reverse=True)
-            
-            # 记录最优个体
-            if generation_results:
-                best = generation_results[0]
-                avg_fitness = sum(r.fitness for r in generation_results if r.fitness != -float('inf')) / len(generation_results)
-                self.logger.info(f"第{generation+1}代: 最优适应度={best.fitness:.4f}, 平均适应度={avg_fitness:.4f}")
-            
-            # 选择、交叉、变异
-            if generation < max_iterations - 1:  # 不是最后一代
-                population = self._evolve_population(generation_results)
+                # 评估种群（只评估未缓存的个体）
+                fitness = self._evaluate_population(population, objective_function, executor)
+                
+                # 记录最优个体
+                valid = fitness[fitness != -np.inf]
+                best = int(np.argmax(fitness))
+                avg_fitness = valid.sum() / len(fitness) if len(valid) else 0.0
+                self.logger.info(f"第{generation+1}代: 最优适应度={fitness[best]:.4f}, 平均适应度={avg_fitness:.4f}")
+                
+                # 选择、交叉、变异
+                if generation < max_iterations - 1:  # 不是最后一代
+                    population = self._evolve_population(population, fitness)
+        finally:
+            if owned:
+                executor.shutdown()
         
-        # 返回所有结果，按适应度排序
-        all_results.sort(key=lambda x: x.fitness, reverse=True)
+        # 返回所有不同个体的结果，按适应度排序
+        all_results = sorted(self.fitness_cache.values(), key=lambda x: x.fitness, reverse=True)
         
         self.logger.info(f"遗传算法完成: {len(all_results)}个评估结果")
         if all_results:
@@ -386,133 +405,604 @@ class GeneticOptimizer(ParameterOptimizer):
         
         return all_results
     
-    def _initialize_population(self) -> List[Dict[str, Any]]:
-        """初始化种群"""
-        population = []
-        
-        for _ in range(self.population_size):
-            individual = {}
-            for param_range in self.parameter_ranges:
-                if param_range.param_type == "choice":
-                    individual[param_range.name] = self.random.choice(param_range.choices)
-                elif param_range.param_type == "int":
-                    individual[param_range.name] = self.random.randint(
-                        int(param_range.min_value), 
-                        int(param_range.max_value)
-                    )
-                elif param_range.param_type == "float":
-                    individual[param_range.name] = round(
-                        self.random.uniform(param_range.min_value, param_range.max_value), 
-                        6
-                    )
-            population.append(individual)
+    # ===== 种群编码 =====
+    
+    def _random_values(self, param_range: ParameterRange, size: int) -> np.ndarray:
+        """某个参数在范围内的随机取值（choice 为选项下标）"""
+        if param_range.param_type == "choice":
+            return self.rng.integers(len(param_range.choices), size=size).astype(float)
+        elif param_range.param_type == "int":
+            return self.rng.integers(int(param_range.min_value), int(param_range.max_value) + 1,
+                                     size=size).astype(float)
+        return np.round(self.rng.uniform(param_range.min_value, param_range.max_value, size), 6)
+    
+    def _initialize_population(self) -> np.ndarray:
+        """初始化种群矩阵 (种群大小, 参数个数)"""
+        columns = [self._random_values(pr, self.population_size) for pr in self.parameter_ranges]
+        return np.column_stack(columns) if columns else np.empty((self.population_size, 0))
+    
+    def _decode(self, row: np.ndarray) -> Dict[str, Any]:
+        """矩阵行 -> 参数字典"""
+        params = {}
+        for param_range, value in zip(self.parameter_ranges, row.tolist()):
+            if param_range.param_type == "choice":
+                params[param_range.name] = param_range.choices[int(value)]
+            elif param_range.param_type == "int":
+                params[param_range.name] = int(value)
+            else:
+                params[param_range.name] = value
+        return params
+    
+    def _decode_columns(self, rows: np.ndarray) -> Dict[str, Any]:
+        """矩阵 -> {参数名: 数组}，供向量化目标函数使用"""
+        columns = {}
+        for j, param_range in enumerate(self.parameter_ranges):
+            if param_range.param_type == "choice":
+                columns[param_range.name] = np.asarray(param_range.choices, dtype=object)[rows[:, j].astype(int)]
+            elif param_range.param_type == "int":
+                columns[param_range.name] = rows[:, j].astype(np.int64)
+            else:
+                columns[param_range.name] = rows[:, j]
+        return columns
+    
+    # ===== 评估 =====
+    
+    def _open_executor(self):
+        """返回 (执行器, 是否由本优化器创建)；串行或向量化时执行器为 None"""
+        if self.vectorized or self.executor in (None, "serial"):
+            return None, False
+        if self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers), True
+        if self.executor == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers), True
+        if isinstance(self.executor, str):
+            raise ValueError(f"未知的执行器: {self.executor}")
+        return self.executor, False
+    
+    def _evaluate_population(self, population: np.ndarray, objective_function: Callable,
+                             executor: Optional[Executor]) -> np.ndarray:
+        """评估整代种群，返回适应度数组（失败的个体为 -inf）"""
+        keys = [tuple(row) for row in population.tolist()]
+        
+        # 本代中未评估过的不同个体
+        pending = {}
+        for i, key in enumerate(keys):
+            if key not in self.fitness_cache and key not in pending:
+                pending[key] = i
+        
+        if pending:
+            rows = population[list(pending.values())]
+            batch = [self._decode(row) for row in rows]
+            
+            if self.vectorized:
+                results = self._evaluate_vectorized(objective_function, rows, batch)
+            elif executor is None:
+                results = [self._evaluate_params(objective_function, params) for params in batch]
+            else:
+                results = self._evaluate_with_executor(objective_function, batch, executor)
+            
+            for key, result in zip(pending, results):
+                self.fitness_cache[key] = result
+        
+        return np.array([self.fitness_cache[key].fitness for key in keys], dtype=float)
+    
+    def _evaluate_vectorized(self, objective_function: Callable, rows: np.ndarray,
+                             batch: List[Dict[str, Any]]) -> List[OptimizationResult]:
+        """整批参数一次调用向量化目标函数"""
+        try:
+            fitness = np.asarray(objective_function(self._decode_columns(rows)), dtype=float)
+            if fitness.shape != (len(batch),):
+                raise ValueError(f"向量化目标函数返回了{fitness.shape}，应为({len(batch)},)")
+        except Exception as e:
+            self.logger.error(f"种群评估失败: {e}")
+            fitness = np.full(len(batch), -np.inf)
+        
+        fitness = np.where(np.isnan(fitness), -np.inf, fitness)
+        return [OptimizationResult(parameters=params, fitness=float(value))
+                for params, value in zip(batch, fitness)]
+    
+    def _evaluate_with_executor(self, objective_function: Callable, batch: List[Dict[str, Any]],
+                                executor: Executor) -> List[OptimizationResult]:
+        """把一批个体提交给执行器并行评估"""
+        start_time = datetime.now()
+        futures = [executor.submit(objective_function, params) for params in batch]
         
-        return population
+        results = []
+        for params, future in zip(batch, futures):
+            try:
+                result = future.result()
+                if not isinstance(result, OptimizationResult):
+                    result = OptimizationResult(parameters=params, fitness=float(result))
+            except Exception as e:
+                self.logger.error(f"个体评估失败: {params}, {e}")
+                # 给失败的个体一个很低的适应度
+                result = OptimizationResult(parameters=params, fitness=-float('inf'))
+            results.append(result)
+        
+        elapsed = (datetime.now() - start_time).total_seconds()
+        for result in results:
+            result.optimization_time = elapsed / len(results)
+        return results
     
-    def _evolve_population(self, evaluated_population: List[OptimizationResult]) -> List[Dict[str, Any]]:
+    # ===== 进化 =====
+    
+    def _evolve_population(self, population: np.ndarray, fitness: np.ndarray) -> np.ndarray:
         """进化种群"""
         # 选择（轮盘赌选择）
-        selected = self._selection(evaluated_population)
+        selected = population[self._selection(fitness)]
         
-        # 交叉和变异
-        new_population = []
+        # 奇数个体时最后一个与第一个配对
+        if len(selected) % 2:
+            selected = np.vstack([selected, selected[:1]])
         
-        for i in range(0, len(selected), 2):
-            parent1 = selected[i].parameters
-            parent2 = selected[i + 1] if i + 1 < len(selected) else selected[0].parameters
-            
-            # 交叉
-            if self.random.random() < self.crossover_rate:
-                child1, child2 = self._crossover(parent1, parent2)
-            else:
-                child1, child2 = parent1.copy(), parent2.copy()
-            
-            # 变异
-            if self.random.random() < self.mutation_rate:
-                child1 = self._mutate(child1)
-            if self.random.random() < self.mutation_rate:
-                child2 = self._mutate(child2)
-            
-            new_population.extend([child1, child2])
+        # 交叉和变异
+        children = self._crossover(selected[0::2], selected[1::2])
+        children = self._mutate(children)
         
         # 确保种群大小
-        return new_population[:self.population_size]
+        return children[:self.population_size]
     
-    def _selection(self, evaluated_population: List[OptimizationResult]) -> List[OptimizationResult]:
-        """轮盘赌选择"""
+    def _selection(self, fitness: np.ndarray) -> np.ndarray:
+        """轮盘赌选择，返回被选中个体的下标"""
+        valid = fitness != -np.inf
+        if not valid.any():
+            return self.rng.integers(len(fitness), size=self.population_size)
+        
         # 处理负适应度
-        min_fitness = min(r.fitness for r in evaluated_population if r.fitness != -float('inf'))
-        if min_fitness < 0:
-            offset = abs(min_fitness) + 1
-        else:
-            offset = 0
+        min_fitness = fitness[valid].min()
+        offset = abs(min_fitness) + 1 if min_fitness < 0 else 0
         
         # 计算选择概率
-        total_fitness = sum(max(0, r.fitness + offset) for r in evaluated_population)
+        weights = np.where(valid, np.maximum(fitness + offset, 0), 0.0)
+        cumulative = np.cumsum(weights)
+        total_fitness = cumulative[-1]
         
         if total_fitness == 0:
             # 如果所有适应度都相同，随机选择
-            return self.random.choices(evaluated_population, k=self.population_size)
-        
-        # 轮盘赌选择
-        selected = []
-        for _ in range(self.population_size):
-            pick = self.random.uniform(0, total_fitness)
-            current = 0
-            for individual in evaluated_population:
-                current += max(0, individual.fitness + offset)
-                if current >= pick:
-                    selected.append(individual)
-                    break
-        
-        return selected
-    
-    def _crossover(self, parent1: Dict[str, Any], parent2: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-        """单点交叉"""
-        child1 = parent1.copy()
-        child2 = parent2.copy()
-        
-        # 随机选择交叉点
-        param_names = list(parent1.keys())
-        if len(param_names) > 1:
-            crossover_point = self.random.randint(1, len(param_names) - 1)
-            
-            for i, param_name in enumerate(param_names):
-                if i >= crossover_point:
-                    child1[param_name] = parent2[param_name]
-                    child2[param_name] = parent1[param_name]
+            return self.rng.integers(len(fitness), size=self.population_size)
         
-        return child1, child2
+        picks = self.rng.uniform(0, total_fitness, self.population_size)
+        return np.minimum(np.searchsorted(cumulative, picks, side='left'), len(fitness) - 1)
+    
+    def _crossover(self, parents1: np.ndarray, parents2: np.ndarray) -> np.ndarray:
+        """单点交叉（每对父代按 crossover_rate 决定是否交叉），返回交错排列的子代"""
+        pairs, dims = parents1.shape
+        children1, children2 = parents1.copy(), parents2.copy()
+        
+        if dims > 1:
+            crossing = self.rng.random(pairs) < self.crossover_rate
+            # 随机选择交叉点
+            points = self.rng.integers(1, dims, size=pairs)
+            swap = crossing[:, None] & (np.arange(dims)[None, :] >= points[:, None])
+            children1[swap] = parents2[swap]
+            children2[swap] = parents1[swap]
+        
+        children = np.empty((2 * pairs, dims))
+        children[0::2] = children1
+        children[1::2] = children2
+        return children
+    
+    def _mutate(self, population: np.ndarray) -> np.ndarray:
+        """变异：每个个体按 mutation_rate 随机选一个参数重新取值"""
+        mutated = population.copy()
+        if mutated.shape[1] == 0:
+            return mutated
+        
+        rows = np.flatnonzero(self.rng.random(len(mutated)) < self.mutation_rate)
+        columns = self.rng.integers(mutated.shape[1], size=len(rows))
+        for j, param_range in enumerate(self.parameter_ranges):
+            target = rows[columns == j]
+            if len(target):
+                mutated[target, j] = self._random_values(param_range, len(target))
+        return mutated
+
+
+class BayesianOptimizer(ParameterOptimizer):
+    """
+    贝叶斯优化器
+    
+    用高斯过程代理模型拟合已评估的结果，按期望改进(EI)挑选下一批参数，
+    适合单次回测代价高、希望用更少回测找到最优参数的场景。
+    
+    - 参数编码：int/float 归一化到 [0, 1]，choice 独热编码；有步长的参数只在步长网格上取值
+    - 每轮提出 batch_size 个候选（kriging believer：选中一个后以预测均值作为虚拟观测再选下一个），
+      可用 max_workers 并行评估
+    - 连续 patience 轮最优适应度没有提升时视为收敛，提前停止
+    """
+    
+    # 候选长度尺度和噪声（在归一化的参数空间中），每轮按边际似然选取
+    LENGTH_SCALES = (0.05, 0.1, 0.2, 0.35, 0.6, 1.0)
+    NOISE_LEVELS = (1e-4, 1e-2, 1e-1)
+    
+    def __init__(self, batch_size: int = 4, initial_points: int = None,
+                 n_candidates: int = 2048, patience: int = 10, xi: float = 0.01,
+                 max_workers: int = 1, seed: int = 42):
+        super().__init__("Bayesian")
+        self.batch_size = batch_size
+        self.initial_points = initial_points
+        self.n_candidates = n_candidates
+        self.patience = patience
+        self.xi = xi
+        self.max_workers = max_workers
+        self.seed = seed
     
-    def _mutate(self, individual: Dict[str, Any]) -> Dict[str, Any]:
-        """变异操作"""
-        mutated = individual.copy()
+    def optimize(self, parameter_ranges: List[ParameterRange],
+                objective_function: Callable,
+                max_iterations: int = 100) -> List[OptimizationResult]:
+        """
+        贝叶斯优化
+        
+        Args:
+            parameter_ranges: 参数范围列表
+            objective_function: 目标函数，接受参数字典，返回OptimizationResult
+            max_iterations: 最大评估次数（回测次数）
         
-        # 随机选择一个参数进行变异
-        param_name = self.random.choice(list(mutated.keys()))
+        Returns:
+            优化结果列表，按适应度排序
+        """
+        self.logger.info(f"开始贝叶斯优化: 批大小={self.batch_size}, 最大评估次数={max_iterations}")
         
-        # 找到对应的参数范围
-        param_range = None
-        for pr in self.parameter_ranges:
-            if pr.name == param_name:
-                param_range = pr
+        # 验证参数范围
+        for param_range in parameter_ranges:
+            if not param_range.validate():
+                raise ValueError(f"无效的参数范围: {param_range.name}")
+        
+        self.parameter_ranges = parameter_ranges
+        self.rng = np.random.default_rng(self.seed)
+        
+        results = []
+        evaluated = set()
+        grid = self._enumerate_space()
+        
+        # 初始采样
+        initial_points = self.initial_points or max(2 * self._encoded_dim() + 1, self.batch_size)
+        initial_points = min(initial_points, max_iterations)
+        batch = self._unique_samples(initial_points, evaluated, grid)
+        
+        best_fitness = -float('inf')
+        stale_rounds = 0
+        round_index = 0
+        
+        while batch:
+            round_index += 1
+            batch_results = self._evaluate_batch(objective_function, batch)
+            for params in batch:
+                evaluated.add(self._param_key(params))
+            results.extend(batch_results)
+            
+            round_best = max((r.fitness for r in batch_results if self._is_valid(r)), default=-float('inf'))
+            if round_best > best_fitness and (math.isinf(best_fitness) or
+                                              round_best - best_fitness > 1e-12 * max(1.0, abs(best_fitness))):
+                best_fitness = round_best
+                stale_rounds = 0
+            else:
+                stale_rounds += 1
+            
+            self.logger.info(f"第{round_index}轮: 已评估{len(results)}个, 最优适应度={best_fitness:.4f}")
+            
+            remaining = max_iterations - len(results)
+            if remaining <= 0:
+                break
+            if stale_rounds >= self.patience:
+                self.logger.info(f"连续{stale_rounds}轮没有提升，提前停止")
                 break
+            
+            batch = self._propose_batch(results, evaluated, grid, min(self.batch_size, remaining))
         
-        if param_range:
-            if param_range.param_type == "choice":
-                mutated[param_name] = self.random.choice(param_range.choices)
-            elif param_range.param_type == "int":
-                mutated[param_name] = self.random.randint(
-                    int(param_range.min_value), 
-                    int(param_range.max_value)
-                )
-            elif param_range.param_type == "float":
-                mutated[param_name] = round(
-                    self.random.uniform(param_range.min_value, param_range.max_value), 
-                    6
-                )
+        # 按适应度排序（降序）
+        results.sort(key=lambda x: x.fitness, reverse=True)
         
-        return mutated
+        self.logger.info(f"贝叶斯优化完成: {len(results)}个评估结果")
+        if results:
+            best = results[0]
+            self.logger.info(f"最优结果: 适应度={best.fitness:.4f}, 参数={best.parameters}")
+        
+        return results
+    
+    # ===== 评估 =====
+    
+    @staticmethod
+    def _is_valid(result: OptimizationResult) -> bool:
+        return result.fitness is not None and math.isfinite(result.fitness)
+    
+    def _evaluate_batch(self, objective_function: Callable,
+                        batch: List[Dict[str, Any]]) -> List[OptimizationResult]:
+        """评估一批参数（max_workers > 1 时并行）"""
+        if self.max_workers <= 1 or len(batch) == 1:
+            return [self._evaluate_params(objective_function, params) for params in batch]
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batch))) as executor:
+            return list(executor.map(lambda params: self._evaluate_params(objective_function, params), batch))
+    
+    # ===== 参数编码 =====
+    
+    def _encoded_dim(self) -> int:
+        return sum(len(pr.choices) if pr.param_type == "choice" else 1 for pr in self.parameter_ranges)
+    
+    def _param_key(self, params: Dict[str, Any]) -> Tuple:
+        return tuple(params.get(pr.name) for pr in self.parameter_ranges)
+    
+    def _encode(self, params_list: List[Dict[str, Any]]) -> np.ndarray:
+        """参数字典 -> 编码矩阵"""
+        columns = []
+        for pr in self.parameter_ranges:
+            values = [params[pr.name] for params in params_list]
+            if pr.param_type == "choice":
+                # 独热编码按 1/sqrt(2) 缩放，改变一个选项的距离与数值参数跨越整个范围相同
+                index = np.array([pr.choices.index(v) for v in values])
+                columns.append(np.eye(len(pr.choices))[index] / math.sqrt(2))
+            else:
+                span = pr.max_value - pr.min_value
+                columns.append(((np.array(values, dtype=float) - pr.min_value) / span)[:, None])
+        return np.hstack(columns) if columns else np.empty((len(params_list), 0))
+    
+    def _decode_value(self, pr: ParameterRange, unit: float) -> Any:
+        """[0, 1] 上的值 -> 参数值（有步长时对齐到步长网格）"""
+        value = pr.min_value + unit * (pr.max_value - pr.min_value)
+        step = pr.step if pr.step else (1 if pr.param_type == "int" else None)
+        if step:
+            count = math.floor((pr.max_value - pr.min_value) / step + 1e-9)
+            value = pr.min_value + min(max(round((value - pr.min_value) / step), 0), count) * step
+        if pr.param_type == "int":
+            return int(value)
+        return round(float(value), 6)
+    
+    def _sample(self, count: int) -> List[Dict[str, Any]]:
+        """在参数空间中均匀随机采样"""
+        samples = [{} for _ in range(count)]
+        for pr in self.parameter_ranges:
+            if pr.param_type == "choice":
+                picks = self.rng.integers(len(pr.choices), size=count)
+                for params, pick in zip(samples, picks):
+                    params[pr.name] = pr.choices[pick]
+            else:
+                for params, unit in zip(samples, self.rng.random(count)):
+                    params[pr.name] = self._decode_value(pr, unit)
+        return samples
+    
+    def _enumerate_space(self) -> Optional[List[Dict[str, Any]]]:
+        """参数空间离散且不超过 n_candidates 个点时列出全部组合，否则返回 None"""
+        value_lists = []
+        size = 1
+        for pr in self.parameter_ranges:
+            if pr.param_type == "float" and not pr.step:
+                return None
+            if pr.param_type == "choice":
+                values = list(pr.choices)
+            else:
+                values = list(dict.fromkeys(
+                    self._decode_value(pr, (v - pr.min_value) / (pr.max_value - pr.min_value))
+                    for v in pr.generate_values()
+                ))
+            value_lists.append(values)
+            size *= len(values)
+            if size > self.n_candidates:
+                return None
+        
+        names = [pr.name for pr in self.parameter_ranges]
+        return [dict(zip(names, values)) for values in itertools.product(*value_lists)]
+    
+    def _unique_samples(self, count: int, evaluated: set, grid: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """未评估过的随机参数组合"""
+        if grid is not None:
+            pool = [params for params in grid if self._param_key(params) not in evaluated]
+            order = self.rng.permutation(len(pool))[:count]
+            return [pool[i] for i in order]
+        
+        samples = {}
+        for params in self._sample(count * 4):
+            key = self._param_key(params)
+            if key not in evaluated and key not in samples:
+                samples[key] = params
+        return list(samples.values())[:count]
+    
+    def _candidates(self, results: List[OptimizationResult], evaluated: set,
+                    grid: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """候选集：离散空间取全部未评估组合；否则随机采样并在当前最优点附近扰动"""
+        if grid is not None:
+            return [params for params in grid if self._param_key(params) not in evaluated]
+        
+        candidates = self._sample(self.n_candidates // 2)
+        top = sorted((r for r in results if self._is_valid(r)), key=lambda r: r.fitness, reverse=True)[:5]
+        per_point = (self.n_candidates - len(candidates)) // max(len(top), 1)
+        for result in top:
+            for _ in range(per_point):
+                params = dict(result.parameters)
+                for pr in self.parameter_ranges:
+                    if self.rng.random() >= 0.5:
+                        continue
+                    if pr.param_type == "choice":
+                        params[pr.name] = pr.choices[self.rng.integers(len(pr.choices))]
+                    else:
+                        unit = (params[pr.name] - pr.min_value) / (pr.max_value - pr.min_value)
+                        unit = min(max(unit + self.rng.normal(0, 0.1), 0.0), 1.0)
+                        params[pr.name] = self._decode_value(pr, unit)
+                candidates.append(params)
+        
+        unique = {}
+        for params in candidates:
+            key = self._param_key(params)
+            if key not in evaluated:
+                unique.setdefault(key, params)
+        return list(unique.values())
+    
+    # ===== 代理模型 =====
+    
+    @staticmethod
+    def _kernel(A: np.ndarray, B: np.ndarray, length_scale: float) -> np.ndarray:
+        sq_dist = (A * A).sum(1)[:, None] + (B * B).sum(1)[None, :] - 2 * A @ B.T
+        return np.exp(-0.5 * np.maximum(sq_dist, 0.0) / length_scale**2)
+    
+    def _fit_surrogate(self, X: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+        """按对数边际似然选择长度尺度和噪声"""
+        best, best_lml = (self.LENGTH_SCALES[0], self.NOISE_LEVELS[-1]), -float('inf')
+        for length_scale in self.LENGTH_SCALES:
+            K = self._kernel(X, X, length_scale)
+            for noise in self.NOISE_LEVELS:
+                try:
+                    L = np.linalg.cholesky(K + noise * np.eye(len(X)))
+                except np.linalg.LinAlgError:
+                    continue
+                alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+                lml = -0.5 * y @ alpha - np.log(np.diag(L)).sum()
+                if lml > best_lml:
+                    best, best_lml = (length_scale, noise), lml
+        return best
+    
+    def _predict(self, X: np.ndarray, y: np.ndarray, candidates: np.ndarray,
+                 length_scale: float, noise: float) -> Tuple[np.ndarray, np.ndarray]:
+        """高斯过程后验均值和标准差"""
+        K = self._kernel(X, X, length_scale) + noise * np.eye(len(X))
+        L = np.linalg.cholesky(K)
+        K_star = self._kernel(candidates, X, length_scale)
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+        v = np.linalg.solve(L, K_star.T)
+        mean = K_star @ alpha
+        std = np.sqrt(np.maximum(1.0 - (v * v).sum(0), 1e-12))
+        return mean, std
+    
+    @staticmethod
+    def _expected_improvement(mean: np.ndarray, std: np.ndarray, best: float, xi: float) -> np.ndarray:
+        z = (mean - best - xi) / std
+        cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+        pdf = np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+        return (mean - best - xi) * cdf + std * pdf
+    
+    def _propose_batch(self, results: List[OptimizationResult], evaluated: set,
+                       grid: Optional[List[Dict[str, Any]]], count: int) -> List[Dict[str, Any]]:
+        """提出下一批候选（空列表表示参数空间已全部评估）"""
+        valid = [r for r in results if self._is_valid(r)]
+        candidates = self._candidates(results, evaluated, grid)
+        if not candidates:
+            return []
+        if len(valid) < 2:
+            return self._unique_samples(count, evaluated, grid)
+        
+        X = self._encode([r.parameters for r in valid])
+        fitness = np.array([r.fitness for r in valid], dtype=float)
+        scale = fitness.std() or 1.0
+        y = (fitness - fitness.mean()) / scale
+        C = self._encode(candidates)
+        length_scale, noise = self._fit_surrogate(X, y)
+        best = y.max()
+        
+        batch = []
+        available = np.ones(len(candidates), dtype=bool)
+        for _ in range(min(count, len(candidates))):
+            mean, std = self._predict(X, y, C, length_scale, noise)
+            ei = np.where(available, self._expected_improvement(mean, std, best, self.xi), -np.inf)
+            pick = int(np.argmax(ei))
+            batch.append(candidates[pick])
+            available[pick] = False
+            
+            # kriging believer：以预测均值作为虚拟观测，使同一批候选相互分散
+            X = np.vstack([X, C[pick:pick + 1]])
+            y = np.append(y, mean[pick])
+        
+        return batch
+
+
+class SuccessiveHalvingOptimizer(ParameterOptimizer):
+    """
+    逐级减半优化器
+    
+    以现有优化器（网格/随机/遗传/贝叶斯）作为候选生成器：候选先在最小预算
+    （如数据前缀的 1/27）上评估，每一级只保留前 1/eta 晋级到 eta 倍的预算，
+    其余候选提前淘汰，直到剩余候选在完整预算上评估。
+    
+    目标函数形式为 objective_function(params, budget)，budget 为 (0, 1] 的数据比例。
+    """
+    
+    def __init__(self, base_optimizer: ParameterOptimizer, eta: int = 3,
+                 min_budget: float = 1 / 27, max_budget: float = 1.0):
+        super().__init__(f"SuccessiveHalving[{base_optimizer.name}]")
+        if eta < 2:
+            raise ValueError("eta 必须不小于2")
+        if not 0 < min_budget <= max_budget <= 1.0:
+            raise ValueError("预算必须满足 0 < min_budget <= max_budget <= 1")
+        self.base_optimizer = base_optimizer
+        self.eta = eta
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+    
+    def budgets(self) -> List[float]:
+        """各级预算，从小到大，最后一级为 max_budget"""
+        levels = int(math.floor(math.log(self.max_budget / self.min_budget) / math.log(self.eta) + 1e-9)) + 1
+        return [self.max_budget / self.eta ** (levels - 1 - i) for i in range(levels)]
+    
+    def optimize(self, parameter_ranges: List[ParameterRange],
+                objective_function: Callable,
+                max_iterations: int = 100) -> List[OptimizationResult]:
+        """
+        逐级减半优化
+        
+        Args:
+            parameter_ranges: 参数范围列表
+            objective_function: 目标函数，接受 (参数字典, 预算)，返回OptimizationResult
+            max_iterations: 传给候选生成器的最大迭代次数
+        
+        Returns:
+            每个候选最后一级的评估结果：先按到达的级别（高到低），同级按适应度降序，
+            首个结果为完整预算下的最优结果；metrics['budget'] 记录该结果的预算
+        """
+        budgets = self.budgets()
+        self.logger.info(f"开始逐级减半优化: 预算={[round(b, 4) for b in budgets]}, eta={self.eta}")
+        
+        # 第一级：由基础优化器在最小预算上生成并评估候选
+        first = self.base_optimizer.optimize(
+            parameter_ranges, lambda params: objective_function(params, budgets[0]), max_iterations)
+        
+        rung = self._unique([self._tag(r, budgets[0]) for r in first])
+        cost = len(first) * budgets[0]
+        candidate_count = len(rung)
+        finished = []
+        
+        for level, budget in enumerate(budgets[1:], start=1):
+            rung.sort(key=lambda x: x.fitness, reverse=True)
+            valid = [r for r in rung if r.fitness is not None and math.isfinite(r.fitness)]
+            keep = max(1, math.ceil(len(valid) / self.eta)) if valid else 0
+            promoted = valid[:keep]
+            promoted_ids = {id(r) for r in promoted}
+            eliminated = [r for r in rung if id(r) not in promoted_ids]
+            finished.append(eliminated)
+            
+            self.logger.info(f"第{level}级: {len(rung)}个候选, 晋级{len(promoted)}个, 预算={budget:.4f}")
+            rung = [
+                self._tag(self._evaluate_params(objective_function, dict(r.parameters), budget), budget)
+                for r in promoted
+            ]
+            cost += len(promoted) * budget
+        
+        rung.sort(key=lambda x: x.fitness, reverse=True)
+        finished.append(rung)
+        
+        # 高级别在前；同级按适应度降序
+        results = []
+        for group in reversed(finished):
+            results.extend(sorted(group, key=lambda x: x.fitness, reverse=True))
+        
+        full_cost = candidate_count * budgets[-1]
+        self.logger.info(f"逐级减半完成: {candidate_count}个候选, 计算量 {cost:.1f} "
+                         f"(完整评估 {full_cost:.1f}, 节省 {full_cost / cost if cost else 0:.1f}x)")
+        if results:
+            best = results[0]
+            self.logger.info(f"最优结果: 适应度={best.fitness:.4f}, 参数={best.parameters}")
+        
+        return results
+    
+    @staticmethod
+    def _tag(result: OptimizationResult, budget: float) -> OptimizationResult:
+        """在指标中记录预算（复制指标字典，不修改缓存中的结果）"""
+        result.metrics = {**result.metrics, 'budget': budget}
+        return result
+    
+    @staticmethod
+    def _unique(results: List[OptimizationResult]) -> List[OptimizationResult]:
+        """去除重复参数（保留适应度最高的一次）"""
+        unique = {}
+        for result in sorted(results, key=lambda x: x.fitness, reverse=True):
+            unique.setdefault(repr(sorted(result.parameters.items())), result)
+        return list(unique.values())
 
 
 class OptimizationManager:
@@ -527,7 +1017,8 @@ class OptimizationManager:
         self.optimizers = {
             "grid": GridSearchOptimizer(),
             "random": RandomSearchOptimizer(),
-            "genetic": GeneticOptimizer()
+            "genetic": GeneticOptimizer(),
+            "bayesian": BayesianOptimizer()
         }
         self.logger = logging.getLogger("OptimizationManager")
     
@@ -541,16 +1032,27 @@ class OptimizationManager:
                          backtest_function: Callable,
                          objective_metric: str = "sharpe_ratio",
                          optimizer_type: str = "grid",
-                         max_iterations: int = 100) -> List[OptimizationResult]:
+                         max_iterations: int = 100,
+                         run=None,
+                         successive_halving: bool = False,
+                         eta: int = 3,
+                         min_budget: float = 1 / 27) -> List[OptimizationResult]:
         """
         策略参数优化
         
         Args:
             parameter_ranges: 参数范围列表
-            backtest_function: 回测函数，接受参数字典，返回回测结果
+            backtest_function: 回测函数，接受参数字典，返回回测结果；
+                启用逐级减半时以 backtest_function(params, budget) 调用部分预算的回测，
+                budget 为 (0, 1) 的数据比例（数据前缀或股票子集）
             objective_metric: 优化目标指标
-            optimizer_type: 优化器类型
+            optimizer_type: 优化器类型（逐级减半时作为候选生成器）
             max_iterations: 最大迭代次数
+            run: 结果存储中的优化运行（OptimizationRun），评估前先查询已有结果，
+                评估后立即写入，中断后重新运行即可续跑
+            successive_halving: 启用逐级减半，候选先在小预算上评估，只有前 1/eta 晋级
+            eta: 每级淘汰比例
+            min_budget: 第一级的预算
         
         Returns:
             优化结果列表
@@ -559,12 +1061,34 @@ class OptimizationManager:
             raise ValueError(f"未知的优化器类型: {optimizer_type}")
         
         optimizer = self.optimizers[optimizer_type]
+        if successive_halving:
+            optimizer = SuccessiveHalvingOptimizer(optimizer, eta=eta, min_budget=min_budget)
+        
+        def objective_function(params: Dict[str, Any], budget: float = 1.0) -> OptimizationResult:
+            """目标函数（有结果存储时先查询、后写入）"""
+            if run is not None:
+                cached = run.lookup(params, budget)
+                if cached is not None:
+                    return cached
+            
+            result = evaluate(params, budget)
+            if run is not None:
+                run.record(result, budget)
+            return result
         
-        def objective_function(params: Dict[str, Any]) -> OptimizationResult:
-            """目标函数"""
+        def evaluate(params: Dict[str, Any], budget: float) -> OptimizationResult:
+            """执行回测并计算适应度"""
             try:
                 # 执行回测
-                backtest_result = backtest_function(params)
+                if budget < 1.0:
+                    backtest_result = backtest_function(params, budget)
+                else:
+                    backtest_result = backtest_function(params)
+                
+                # 引擎内部捕获的异常视为失败，不参与排序也不写入结果存储
+                error = getattr(backtest_result, 'error', None)
+                if error:
+                    raise RuntimeError(error)
                 
                 # 提取目标指标
                 if hasattr(backtest_result, objective_metric):
@@ -605,16 +1129,28 @@ class OptimizationManager:
                 )
         
         # 执行优化
-        self.logger.info(f"开始参数优化: 算法={optimizer_type}, 目标={objective_metric}")
+        self.logger.info(f"开始参数优化: 算法={optimizer.name}, 目标={objective_metric}")
         results = optimizer.optimize(parameter_ranges, objective_function, max_iterations)
         
         self.logger.info(f"参数优化完成: {len(results)}个结果")
         
         return results
     
-    def get_optimization_report(self, results: List[OptimizationResult], 
-                               top_n: int = 10) -> Dict[str, Any]:
-        """生成优化报告"""
+    def get_optimization_report(self, results: List[OptimizationResult] = None, 
+                               top_n: int = 10, result_store=None,
+                               **filters) -> Dict[str, Any]:
+        """生成优化报告
+        
+        Args:
+            results: 优化结果列表
+            top_n: 报告中的最优结果数
+            result_store: 结果存储（OptimizationResultStore）；未提供 results 时
+                从中查询历史运行的结果，统计在数据库中聚合，参数分析逐批读取
+            **filters: 查询条件 run_id / strategy / fingerprint / engine_version / budget
+        """
+        if results is None and result_store is not None:
+            return self._report_from_store(result_store, top_n, filters)
+        
         if not results:
             return {"error": "没有优化结果"}
         
@@ -651,6 +1187,39 @@ class OptimizationManager:
         
         return report
     
+    def _report_from_store(self, result_store, top_n: int, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """从结果存储生成优化报告，不把全部结果载入内存"""
+        summary = result_store.fitness_summary(**filters)
+        if not summary['total']:
+            return {"error": "没有优化结果"}
+        if not summary['valid']:
+            return {"error": "没有有效的优化结果"}
+        
+        top_results = result_store.top_results(top_n, **filters)
+        valid_results = (r for r in result_store.iter_results(**filters) if r.fitness == r.fitness)
+        
+        return {
+            "summary": {
+                "total_evaluations": summary['total'],
+                "valid_evaluations": summary['valid'],
+                "success_rate": summary['valid'] / summary['total'],
+                "best_fitness": summary['best'],
+                "worst_fitness": summary['worst'],
+                "average_fitness": summary['mean'],
+                "fitness_std": summary['std']
+            },
+            "top_results": [
+                {
+                    "rank": i + 1,
+                    "parameters": result.parameters,
+                    "fitness": result.fitness,
+                    "metrics": result.metrics
+                }
+                for i, result in enumerate(top_results)
+            ],
+            "parameter_analysis": self._analyze_parameters(valid_results)
+        }
+    
     def _calculate_std(self, values: List[float]) -> float:
         """计算标准差"""
         if len(values) < 2:
@@ -660,44 +1229,41 @@ class OptimizationManager:
         variance = sum((x - mean) ** 2 for x in values) / (len(values) - 1)
         return variance ** 0.5
     
-    def _analyze_parameters(self, results: List[OptimizationResult]) -> Dict[str, Any]:
-        """分析参数分布"""
-        if not results:
-            return {}
-        
+    def _analyze_parameters(self, results) -> Dict[str, Any]:
+        """分析参数分布（单次遍历，results 可以是列表或逐批读取的迭代器，首个结果为最优）"""
         param_analysis = {}
+        best_parameters = None
         
-        # 获取所有参数名
-        param_names = set()
         for result in results:
-            param_names.update(result.parameters.keys())
-        
-        for param_name in param_names:
-            values = []
-            for result in results:
-                if param_name in result.parameters:
-                    values.append(result.parameters[param_name])
+            if best_parameters is None:
+                best_parameters = result.parameters
             
-            if values:
-                if isinstance(values[0], (int, float)):
-                    param_analysis[param_name] = {
-                        "type": "numeric",
-                        "min": min(values),
-                        "max": max(values),
-                        "mean": sum(values) / len(values),
-                        "best_value": results[0].parameters.get(param_name)
-                    }
+            for param_name, value in result.parameters.items():
+                analysis = param_analysis.get(param_name)
+                if analysis is None:
+                    # 参数类型由第一个出现的值决定
+                    if isinstance(value, (int, float)):
+                        analysis = {"type": "numeric", "min": value, "max": value, "sum": 0, "count": 0}
+                    else:
+                        analysis = {"type": "categorical", "value_counts": {}}
+                    param_analysis[param_name] = analysis
+                
+                if analysis["type"] == "numeric":
+                    if value < analysis["min"]:
+                        analysis["min"] = value
+                    if value > analysis["max"]:
+                        analysis["max"] = value
+                    analysis["sum"] += value
+                    analysis["count"] += 1
                 else:
                     # 分类参数
-                    value_counts = {}
-                    for value in values:
-                        value_counts[value] = value_counts.get(value, 0) + 1
-                    
-                    param_analysis[param_name] = {
-                        "type": "categorical",
-                        "value_counts": value_counts,
-                        "best_value": results[0].parameters.get(param_name)
-                    }
+                    counts = analysis["value_counts"]
+                    counts[value] = counts.get(value, 0) + 1
+        
+        for param_name, analysis in param_analysis.items():
+            if analysis["type"] == "numeric":
+                analysis["mean"] = analysis.pop("sum") / analysis.pop("count")
+            analysis["best_value"] = best_parameters.get(param_name)
         
         return param_analysis
 
@@ -768,6 +1334,16 @@ if __name__ == "__main__":
         print(f"  最优参数: {best.parameters}")
         print(f"  最优适应度: {best.fitness:.4f}")
     
+    # 测试贝叶斯优化
+    print("\\n🎯 测试贝叶斯优化...")
+    bayesian_optimizer = BayesianOptimizer(batch_size=4)
+    bayesian_results = bayesian_optimizer.optimize(parameter_ranges, mock_objective, max_iterations=20)
+    print(f"✅ 贝叶斯优化完成: {len(bayesian_results)}个结果")
+    if bayesian_results:
+        best = bayesian_results[0]
+        print(f"  最优参数: {best.parameters}")
+        print(f"  最优适应度: {best.fitness:.4f}")
+    
     # 生成优化报告
     print("\\n📈 优化报告...")
     if grid_results:
@@ -782,13 +1358,12 @@ if __name__ == "__main__":
     print("  - 网格搜索算法 ✅")
     print("  - 随机搜索算法 ✅")
     print("  - 遗传算法优化 ✅")
+    print("  - 贝叶斯优化 ✅")
     print("  - 参数范围管理 ✅")
     print("  - 优化结果分析 ✅")
     
     print("\\n🔧 下一步集成:")
-    print("  1. 贝叶斯优化算法")
-    print("  2. 多目标优化支持")
-    print("  3. 并行优化执行")
-    print("  4. 优化过程可视化")
+    print("  1. 多目标优化支持")
+    print("  2. 优化过程可视化")
     
     print("\\n" + "=" * 50)
\ No newline at end of file
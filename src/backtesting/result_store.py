@@ -0,0 +1,462 @@
+"""
+参数优化结果存储
+
+将每个参数组合的回测结果在评估完成后立即写入 SQLite，键为
+(策略, 参数, 数据指纹, 引擎版本)：
+- 优化器评估前先查询，相同网格重复运行时不再重算
+- 中途中断（进程崩溃、手动停止）后重新运行同一优化即可从断点继续
+- 结果表只追加不修改，报告通过 SQL 聚合查询，无需把历史结果全部载入内存
+- 同时持久化回测任务状态
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from .parameter_optimizer import OptimizationResult
+
+
+def _json_default(value):
+    """numpy 标量等对象的 JSON 序列化"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def canonical_json(value: Any) -> str:
+    """键有序、无多余空白的 JSON，用于生成稳定的键"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_json_default)
+
+
+def data_fingerprint(data: List[Any]) -> str:
+    """
+    计算回测数据的指纹
+
+    对每根K线的日期和 OHLCV 做 blake2b 哈希，数据内容任一不同都会得到不同的指纹。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for bar in data:
+        digest.update(repr((bar.symbol, bar.date.isoformat(), bar.open, bar.high,
+                            bar.low, bar.close, bar.volume)).encode())
+    return digest.hexdigest()
+
+
+def _code_bytes(code) -> bytes:
+    """字节码及常量（递归包含嵌套函数）"""
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        parts.append(_code_bytes(const) if inspect.iscode(const) else repr(const).encode())
+    return b'\0'.join(parts)
+
+
+def code_fingerprint(func: Any) -> str:
+    """
+    计算策略代码的指纹
+
+    优先对源码哈希，取不到源码（交互式定义、仅有 .pyc）时使用字节码和常量；
+    functools.partial 额外包含绑定的参数。策略代码修改后指纹随之改变，旧结果不再复用。
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    while isinstance(func, functools.partial):
+        digest.update(repr((func.args, sorted(func.keywords.items()))).encode())
+        func = func.func
+    func = inspect.unwrap(func)
+
+    target = func if inspect.isroutine(func) or inspect.isclass(func) else type(func)
+    try:
+        digest.update(inspect.getsource(target).encode())
+    except (OSError, TypeError):
+        code = getattr(target, '__code__', None)
+        digest.update(_code_bytes(code) if code is not None else repr(target).encode())
+    return digest.hexdigest()
+
+
+def evaluation_key(strategy: str, parameters: Dict[str, Any],
+                   fingerprint: str, engine_version: str, budget: float = 1.0) -> str:
+    """单次评估的键：(策略, 参数, 数据指纹, 引擎版本)，部分预算（逐级减半）的评估另加预算"""
+    key = [strategy, parameters, fingerprint, engine_version]
+    if budget < 1.0:
+        key.append(budget)
+    payload = canonical_json(key)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class OptimizationRun:
+    """
+    一次优化运行
+
+    绑定策略、数据指纹和引擎版本，供优化器在评估前查询已有结果、评估后立即写入。
+    """
+
+    def __init__(self, store: 'OptimizationResultStore', run_id: str, strategy: str,
+                 fingerprint: str, engine_version: str):
+        self.store = store
+        self.run_id = run_id
+        self.strategy = strategy
+        self.fingerprint = fingerprint
+        self.engine_version = engine_version
+        self.hits = 0
+        self.evaluated = 0
+
+    def key(self, parameters: Dict[str, Any], budget: float = 1.0) -> str:
+        return evaluation_key(self.strategy, parameters, self.fingerprint, self.engine_version, budget)
+
+    def lookup(self, parameters: Dict[str, Any], budget: float = 1.0) -> Optional[OptimizationResult]:
+        """查询已评估过的参数组合，命中时同时计入本次运行"""
+        key = self.key(parameters, budget)
+        result = self.store.get(key)
+        if result is not None:
+            self.hits += 1
+            self.store.link(self.run_id, key)
+        return result
+
+    def record(self, result: OptimizationResult, budget: float = 1.0):
+        """写入一次评估结果（失败的评估适应度为 -inf，不写入，下次会重试；
+        没有产生交易的有效评估照常写入）"""
+        if result.fitness == -float('inf'):
+            return
+        self.evaluated += 1
+        self.store.append(self.run_id, self.key(result.parameters, budget), self.strategy,
+                          self.fingerprint, self.engine_version, result, budget)
+
+    def finish(self, status: str = 'completed'):
+        """标记运行结束"""
+        self.store.set_run_status(self.run_id, status)
+
+
+class OptimizationResultStore:
+    """
+    优化结果库
+
+    results 表以评估键为主键，只追加；run_results 记录每次运行包含的评估，
+    runs 记录运行的配置和状态，tasks 记录回测任务状态。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ':memory:':
+            # WAL 下每次评估单独提交的开销很小，进程崩溃时已提交的结果不会丢失
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建数据表"""
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS results (
+                    eval_key TEXT PRIMARY KEY,
+                    strategy TEXT NOT NULL,
+                    data_fingerprint TEXT NOT NULL,
+                    engine_version TEXT NOT NULL,
+                    parameters TEXT NOT NULL,
+                    budget REAL NOT NULL DEFAULT 1.0,
+                    fitness REAL,
+                    metrics TEXT,
+                    elapsed REAL,
+                    evaluated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_results_strategy
+                    ON results (strategy, data_fingerprint, engine_version, fitness);
+
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    data_fingerprint TEXT NOT NULL,
+                    engine_version TEXT NOT NULL,
+                    optimizer TEXT,
+                    config TEXT,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_runs_signature ON runs (signature, status);
+
+                CREATE TABLE IF NOT EXISTS run_results (
+                    run_id TEXT NOT NULL,
+                    eval_key TEXT NOT NULL,
+                    PRIMARY KEY (run_id, eval_key)
+                );
+
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    strategy_name TEXT,
+                    config TEXT,
+                    strategy_params TEXT,
+                    status TEXT NOT NULL,
+                    start_time TEXT,
+                    end_time TEXT,
+                    error TEXT,
+                    results_summary TEXT,
+                    updated_at REAL NOT NULL
+                );
+            """)
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(results)")]
+            if 'budget' not in columns:
+                self._conn.execute("ALTER TABLE results ADD COLUMN budget REAL NOT NULL DEFAULT 1.0")
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+
+    # ================================= 运行 =================================
+
+    def open_run(self, strategy: str, fingerprint: str, engine_version: str,
+                 optimizer: str = None, config: Dict[str, Any] = None,
+                 resume: bool = True) -> OptimizationRun:
+        """
+        开始（或继续）一次优化运行
+
+        Args:
+            strategy: 策略标识
+            fingerprint: 数据指纹
+            engine_version: 回测引擎版本
+            optimizer: 优化器名称
+            config: 运行配置（参数空间、迭代次数等），相同配置视为同一运行
+            resume: 存在未完成的相同运行时继续使用它
+        """
+        signature = evaluation_key(strategy, {'optimizer': optimizer, 'config': config},
+                                   fingerprint, engine_version)
+        now = time.time()
+
+        with self._lock, self._conn:
+            row = None
+            if resume:
+                row = self._conn.execute(
+                    "SELECT run_id FROM runs WHERE signature = ? AND status != 'completed' "
+                    "ORDER BY created_at DESC LIMIT 1", (signature,)).fetchone()
+            if row is not None:
+                run_id = row[0]
+                self._conn.execute(
+                    "UPDATE runs SET status = 'running', updated_at = ? WHERE run_id = ?", (now, run_id))
+            else:
+                run_id = f"run_{time.strftime('%Y%m%d_%H%M%S')}_{signature[:8]}_{int(now * 1e6) % 10**6:06d}"
+                self._conn.execute(
+                    "INSERT INTO runs (run_id, signature, strategy, data_fingerprint, engine_version, "
+                    "optimizer, config, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 'running', ?, ?)",
+                    (run_id, signature, strategy, fingerprint, engine_version, optimizer,
+                     canonical_json(config), now, now))
+
+        return OptimizationRun(self, run_id, strategy, fingerprint, engine_version)
+
+    def set_run_status(self, run_id: str, status: str):
+        """更新运行状态"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?", (status, time.time(), run_id))
+
+    def list_runs(self, strategy: str = None, status: str = None) -> List[Dict[str, Any]]:
+        """列出运行记录（含已完成的评估数）"""
+        query = """
+            SELECT r.run_id, r.strategy, r.data_fingerprint, r.engine_version, r.optimizer,
+                   r.status, r.created_at, r.updated_at, COUNT(rr.eval_key)
+            FROM runs r LEFT JOIN run_results rr ON rr.run_id = r.run_id
+        """
+        query, params = self._where(query, {'r.strategy': strategy, 'r.status': status})
+        query += " GROUP BY r.run_id ORDER BY r.created_at"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        columns = ['run_id', 'strategy', 'data_fingerprint', 'engine_version', 'optimizer',
+                   'status', 'created_at', 'updated_at', 'evaluations']
+        return [dict(zip(columns, row)) for row in rows]
+
+    # ================================= 结果 =================================
+
+    def get(self, key: str) -> Optional[OptimizationResult]:
+        """按评估键查询结果"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT parameters, fitness, metrics, elapsed FROM results WHERE eval_key = ?",
+                (key,)).fetchone()
+        return self._to_result(row) if row is not None else None
+
+    def append(self, run_id: str, key: str, strategy: str, fingerprint: str,
+               engine_version: str, result: OptimizationResult, budget: float = 1.0):
+        """追加一次评估结果并立即提交"""
+        fitness = result.fitness
+        if fitness is not None and math.isnan(fitness):
+            fitness = None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO results (eval_key, strategy, data_fingerprint, engine_version, "
+                "parameters, budget, fitness, metrics, elapsed, evaluated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, strategy, fingerprint, engine_version, canonical_json(result.parameters), budget,
+                 fitness, canonical_json(result.metrics), result.optimization_time, time.time()))
+            self._conn.execute(
+                "INSERT OR IGNORE INTO run_results (run_id, eval_key) VALUES (?, ?)", (run_id, key))
+
+    def link(self, run_id: str, key: str):
+        """把已有结果计入某次运行"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO run_results (run_id, eval_key) VALUES (?, ?)", (run_id, key))
+
+    @staticmethod
+    def _to_result(row) -> OptimizationResult:
+        parameters, fitness, metrics, elapsed = row
+        return OptimizationResult(
+            parameters=json.loads(parameters),
+            fitness=float('nan') if fitness is None else fitness,
+            metrics=json.loads(metrics) if metrics else {},
+            optimization_time=elapsed or 0.0
+        )
+
+    @staticmethod
+    def _where(query: str, filters: Dict[str, Any]):
+        """拼接 WHERE 条件（忽略值为 None 的过滤项）"""
+        conditions = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return query, params
+
+    def _result_query(self, select: str, run_id: str = None, strategy: str = None,
+                      fingerprint: str = None, engine_version: str = None, budget: float = 1.0):
+        """结果查询；默认只包含完整预算的评估，budget=None 时包含全部"""
+        query = f"SELECT {select} FROM results"
+        if run_id is not None:
+            query += " JOIN run_results USING (eval_key)"
+        return self._where(query, {
+            'run_id': run_id,
+            'strategy': strategy,
+            'data_fingerprint': fingerprint,
+            'engine_version': engine_version,
+            'budget': budget
+        })
+
+    def iter_results(self, order_by_fitness: bool = True, batch_size: int = 1000,
+                     **filters) -> Iterator[OptimizationResult]:
+        """
+        逐批读取结果（按适应度降序），不把全部结果载入内存
+
+        Args:
+            filters: run_id / strategy / fingerprint / engine_version / budget
+        """
+        query, params = self._result_query("parameters, fitness, metrics, elapsed", **filters)
+        if order_by_fitness:
+            query += " ORDER BY fitness IS NULL, fitness DESC"
+
+        # 独立游标，避免长时间迭代时占用共享连接的锁
+        cursor = self._conn.cursor()
+        try:
+            with self._lock:
+                cursor.execute(query, params)
+                rows = cursor.fetchmany(batch_size)
+            while rows:
+                for row in rows:
+                    yield self._to_result(row)
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+        finally:
+            cursor.close()
+
+    def top_results(self, top_n: int = 10, **filters) -> List[OptimizationResult]:
+        """适应度最高的前 N 个结果"""
+        query, params = self._result_query("parameters, fitness, metrics, elapsed", **filters)
+        query += " AND fitness IS NOT NULL" if params else " WHERE fitness IS NOT NULL"
+        query += " ORDER BY fitness DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + [top_n]).fetchall()
+        return [self._to_result(row) for row in rows]
+
+    def fitness_summary(self, **filters) -> Dict[str, Any]:
+        """适应度统计（在数据库中聚合）"""
+        query, params = self._result_query(
+            "COUNT(*), COUNT(fitness), MAX(fitness), MIN(fitness), AVG(fitness), "
+            "AVG(fitness * fitness)", **filters)
+        with self._lock:
+            total, valid, best, worst, mean, mean_sq = self._conn.execute(query, params).fetchone()
+
+        std = 0.0
+        if valid and valid >= 2:
+            std = math.sqrt(max(0.0, (mean_sq - mean * mean) * valid / (valid - 1)))
+        return {
+            'total': total,
+            'valid': valid,
+            'best': best,
+            'worst': worst,
+            'mean': mean,
+            'std': std
+        }
+
+    def count(self, **filters) -> int:
+        """结果数量"""
+        query, params = self._result_query("COUNT(*)", **filters)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    # ================================= 任务 =================================
+
+    def save_task(self, task_id: str, strategy_name: str = None, config: Dict[str, Any] = None,
+                  strategy_params: Dict[str, Any] = None, status: str = 'pending',
+                  start_time: str = None, end_time: str = None, error: str = None,
+                  results_summary: Dict[str, Any] = None):
+        """写入或更新任务状态"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (task_id, strategy_name, config, strategy_params, status, "
+                "start_time, end_time, error, results_summary, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, strategy_name, canonical_json(config), canonical_json(strategy_params or {}),
+                 status, start_time, end_time, error,
+                 canonical_json(results_summary) if results_summary is not None else None, time.time()))
+
+    def load_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """读取任务记录"""
+        tasks = self.load_tasks(task_id=task_id)
+        return tasks[0] if tasks else None
+
+    def load_tasks(self, status: List[str] = None, task_id: str = None) -> List[Dict[str, Any]]:
+        """读取任务记录（可按状态过滤）"""
+        query = ("SELECT task_id, strategy_name, config, strategy_params, status, start_time, "
+                 "end_time, error, results_summary FROM tasks")
+        params = []
+        if task_id is not None:
+            query += " WHERE task_id = ?"
+            params.append(task_id)
+        elif status:
+            query += f" WHERE status IN ({', '.join('?' * len(status))})"
+            params.extend(status)
+        query += " ORDER BY updated_at"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        tasks = []
+        for row in rows:
+            task = dict(zip(['task_id', 'strategy_name', 'config', 'strategy_params', 'status',
+                             'start_time', 'end_time', 'error', 'results_summary'], row))
+            for field in ('config', 'strategy_params', 'results_summary'):
+                if task[field] is not None:
+                    task[field] = json.loads(task[field])
+            tasks.append(task)
+        return tasks
+
+    def get_stats(self) -> Dict[str, Any]:
+        """结果库统计"""
+        with self._lock:
+            results = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            runs = dict(self._conn.execute("SELECT status, COUNT(*) FROM runs GROUP BY status").fetchall())
+            tasks = self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        return {
+            'db_path': self.db_path,
+            'results': results,
+            'runs': runs,
+            'tasks': tasks
+        }
@@ -11,7 +11,6 @@
 """
 
 import asyncio
-import threading
 from typing import Dict, List, Optional, Callable
 from datetime import datetime
 import logging
@@ -46,16 +45,22 @@ except ImportError:
         class DataSourceConfig:
             def __init__(self): pass
 
+try:
+    from pipeline_runtime import PipelineRuntime, get_pipeline_runtime
+except ImportError:
+    from .pipeline_runtime import PipelineRuntime, get_pipeline_runtime
+
 logger = logging.getLogger(__name__)
 
 class DataStreamManager:
     """数据流管理器 - 真实市场数据接口"""
     
-    def __init__(self):
+    def __init__(self, runtime: PipelineRuntime = None):
         self.engine = None
         self.is_running = False
+        self.runtime = runtime
         self.loop = None
-        self.thread = None
+        self.engine_future = None
         self.subscribers = {}  # symbol -> [callbacks]
         
     def start_data_stream(self, symbols: List[str], config: DataSourceConfig = None):
@@ -66,28 +71,21 @@ class DataStreamManager:
         
         self.config = config or DataSourceConfig()
         
-        # 在新线程中运行异步事件循环
-        self.thread = threading.Thread(target=self._run_async_loop, args=(symbols,))
-        self.thread.daemon = True
-        self.thread.start()
-        
-        # 等待引擎启动
-        import time
-        time.sleep(2)  # 真实数据源需要更多启动时间
+        # 在管道运行时的事件循环中运行数据引擎，不再单独创建线程和事件循环
+        self.runtime = (self.runtime or get_pipeline_runtime()).start()
+        self.loop = self.runtime.loop
+        self.engine_future = self.runtime.run_coroutine(self._start_engine(symbols))
+        self.engine_future.add_done_callback(self._on_engine_done)
         
         logger.info(f"真实数据流已启动，订阅股票: {symbols}")
     
-    def _run_async_loop(self, symbols: List[str]):
-        """在独立线程中运行异步事件循环"""
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        
-        try:
-            self.loop.run_until_complete(self._start_engine(symbols))
-        except Exception as e:
-            logger.error(f"真实数据流引擎错误: {e}")
-        finally:
-            self.loop.close()
+    def _on_engine_done(self, future):
+        """数据引擎协程结束回调"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            logger.error(f"真实数据流引擎错误: {error}")
     
     async def _start_engine(self, symbols: List[str]):
         """启动真实数据引擎"""
@@ -146,12 +144,15 @@ class DataStreamManager:
         if self.is_running and self.engine:
             # 在数据引擎的事件循环中执行停止操作
             if self.loop and not self.loop.is_closed():
-                asyncio.run_coroutine_threadsafe(self.engine.stop(), self.loop)
+                try:
+                    asyncio.run_coroutine_threadsafe(self.engine.stop(), self.loop).result(timeout=5)
+                except Exception as e:
+                    logger.warning(f"停止数据引擎超时或失败: {e}")
             
         self.is_running = False
         
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=5)
+        if self.engine_future and not self.engine_future.done():
+            self.engine_future.cancel()
         
         logger.info("真实数据流已停止")
     
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+低开销延迟埋点系统
+为实时交易管道的各阶段提供命名埋点和HDR风格的延迟直方图
+
+功能特点:
+- 纳秒级整数计时 (time.perf_counter_ns)
+- 对数-线性分桶直方图，相对误差 < 1%，内存固定
+- 记录操作 O(1)，无锁无分配，单次埋点开销 < 1µs
+- 按阶段输出 p50/p99/p999 分位数
+- 运行中的进程定期导出快照文件，供 CLI 等其他进程读取
+
+用法:
+    fusion_latency = get_latency_tracker().get_histogram(STAGE_FUSION)
+    t0 = perf_counter_ns()
+    ...  # 被测代码
+    fusion_latency.record(perf_counter_ns() - t0)
+
+    with tracker.span(STAGE_RISK_CHECK):
+        ...  # 被测代码
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ================================= 管道阶段名称 =================================
+
+STAGE_QUOTE_POLL = "quote_poll"              # 行情批量轮询
+STAGE_FEED_RECEIVE = "feed_receive"          # 数据源接收
+STAGE_QUEUE_WAIT = "queue_wait"              # 行情在管道队列中的等待
+STAGE_SIGNAL_GENERATION = "signal_generation"  # 策略信号生成
+STAGE_FUSION = "fusion"                      # 信号融合
+STAGE_RISK_CHECK = "risk_check"              # 交易前风险检查
+STAGE_ORDER_SUBMIT = "order_submit"          # 订单提交
+STAGE_ORDER_FILL = "order_fill"              # 订单成交
+
+PIPELINE_STAGES = [
+    STAGE_QUOTE_POLL,
+    STAGE_FEED_RECEIVE,
+    STAGE_QUEUE_WAIT,
+    STAGE_SIGNAL_GENERATION,
+    STAGE_FUSION,
+    STAGE_RISK_CHECK,
+    STAGE_ORDER_SUBMIT,
+    STAGE_ORDER_FILL,
+]
+
+# 延迟快照文件（运行中的管道定期写入，CLI 读取）
+LATENCY_SNAPSHOT_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'performance', 'latency_snapshot.json')
+
+# ================================= 延迟直方图 =================================
+
+class LatencyHistogram:
+    """HDR风格延迟直方图
+
+    数值单位为纳秒。小于 2^sub_bucket_bits 的值精确计数，
+    更大的值按2的幂分段，每段再线性划分为 2^(sub_bucket_bits-1) 个子桶，
+    因此任意记录值的相对误差不超过 2^-(sub_bucket_bits-1)。
+    记录路径只更新桶计数和最大值，样本数、最小值和均值在查询时从桶中汇总。
+    """
+
+    __slots__ = ('name', 'sub_bucket_bits', 'max_value_bits', 'counts', 'max_ns', 'enabled',
+                 '_sub_count', '_half_count', '_base_index', '_max_value')
+
+    def __init__(self, name: str, sub_bucket_bits: int = 8, max_value_bits: int = 40):
+        self.name = name
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_value_bits = max_value_bits          # 2^40 ns ≈ 18分钟
+        self._sub_count = 1 << sub_bucket_bits
+        self._half_count = self._sub_count >> 1
+        self._base_index = self._sub_count - 2 * self._half_count
+        self._max_value = (1 << max_value_bits) - 1
+        bucket_count = self._sub_count + (max_value_bits - sub_bucket_bits) * self._half_count
+        self.counts: List[int] = [0] * bucket_count
+        self.max_ns = 0
+        self.enabled = True
+
+    def record(self, value_ns: int):
+        """记录一个延迟样本 (纳秒)，停用时直接返回"""
+        if not self.enabled:
+            return
+        if value_ns < self._sub_count:
+            if value_ns < 0:
+                value_ns = 0
+            self.counts[value_ns] += 1
+            return
+
+        if value_ns > self.max_ns:
+            if value_ns > self._max_value:
+                value_ns = self._max_value
+            self.max_ns = value_ns
+        shift = value_ns.bit_length() - self.sub_bucket_bits
+        self.counts[self._base_index + shift * self._half_count + (value_ns >> shift)] += 1
+
+    def record_since(self, start_ns: int):
+        """记录从 start_ns (perf_counter_ns) 到现在的延迟"""
+        self.record(perf_counter_ns() - start_ns)
+
+    def _bucket_value(self, index: int) -> int:
+        """桶的代表值 (桶内中点)"""
+        if index < self._sub_count:
+            return index
+        offset = index - self._sub_count
+        shift = offset // self._half_count + 1
+        mantissa = offset % self._half_count + self._half_count
+        return (mantissa << shift) + ((1 << shift) >> 1)
+
+    @property
+    def total_count(self) -> int:
+        """样本总数"""
+        return sum(self.counts)
+
+    def min_value(self) -> int:
+        """最小延迟 (纳秒，桶精度)"""
+        for index, count in enumerate(self.counts):
+            if count:
+                return self._bucket_value(index)
+        return 0
+
+    def max_value(self) -> int:
+        """最大延迟 (纳秒)"""
+        if self.max_ns:
+            return self.max_ns
+        for index in range(self._sub_count - 1, -1, -1):
+            if self.counts[index]:
+                return index
+        return 0
+
+    def percentile(self, percent: float) -> int:
+        """计算分位数 (纳秒)"""
+        total = self.total_count
+        if total == 0:
+            return 0
+
+        target = min(total, max(1, math.ceil(total * percent / 100.0)))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                cumulative += count
+                if cumulative >= target:
+                    return min(self._bucket_value(index), self.max_value())
+        return self.max_value()
+
+    def mean(self) -> float:
+        """平均延迟 (纳秒，桶精度)"""
+        total = 0
+        weighted = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                total += count
+                weighted += count * self._bucket_value(index)
+        return weighted / total if total else 0.0
+
+    def merge(self, other: 'LatencyHistogram'):
+        """合并另一个相同配置的直方图"""
+        if other.sub_bucket_bits != self.sub_bucket_bits or other.max_value_bits != self.max_value_bits:
+            raise ValueError("直方图配置不一致，无法合并")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def reset(self):
+        """清空直方图"""
+        self.counts = [0] * len(self.counts)
+        self.max_ns = 0
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """导出为可JSON序列化的快照（只保存非零桶）"""
+        return {
+            'max_ns': self.max_ns,
+            'counts': {str(index): count for index, count in enumerate(self.counts) if count}
+        }
+
+    def load_snapshot(self, snapshot: Dict[str, Any]):
+        """从快照恢复桶计数"""
+        self.reset()
+        for index, count in snapshot.get('counts', {}).items():
+            self.counts[int(index)] = count
+        self.max_ns = snapshot.get('max_ns', 0)
+
+    def get_summary(self) -> Dict[str, float]:
+        """获取延迟摘要 (单位: 微秒)"""
+        return {
+            'count': self.total_count,
+            'mean_us': self.mean() / 1000.0,
+            'min_us': self.min_value() / 1000.0,
+            'p50_us': self.percentile(50) / 1000.0,
+            'p99_us': self.percentile(99) / 1000.0,
+            'p999_us': self.percentile(99.9) / 1000.0,
+            'max_us': self.max_value() / 1000.0,
+        }
+
+# ================================= 埋点 =================================
+
+class LatencySpan:
+    """命名埋点上下文管理器"""
+
+    __slots__ = ('_histogram', '_start_ns')
+
+    def __init__(self, histogram: LatencyHistogram):
+        self._histogram = histogram
+        self._start_ns = 0
+
+    def __enter__(self) -> 'LatencySpan':
+        self._start_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._histogram.record(perf_counter_ns() - self._start_ns)
+        return False
+
+class LatencyTracker:
+    """管道延迟埋点注册表
+
+    每个阶段对应一个 LatencyHistogram。记录路径只做整数运算和列表自增，
+    不加锁以保持埋点开销在1µs以内；热路径应缓存 get_histogram() 的返回值，
+    直接调用 histogram.record(perf_counter_ns() - t0)。
+    enabled 开关同步到每个直方图，已缓存的直方图同样受控。
+    """
+
+    def __init__(self, sub_bucket_bits: int = 8, enabled: bool = True):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._enabled = enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        for stage in PIPELINE_STAGES:
+            self.get_histogram(stage)
+
+        self._export_thread: Optional[threading.Thread] = None
+        self._export_stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = bool(value)
+        for histogram in self.histograms.values():
+            histogram.enabled = self._enabled
+
+    def get_histogram(self, name: str) -> LatencyHistogram:
+        """获取 (必要时创建) 阶段直方图"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram(name, self.sub_bucket_bits)
+            histogram.enabled = self._enabled
+            self.histograms[name] = histogram
+        return histogram
+
+    def record(self, name: str, latency_ns: int):
+        """记录阶段延迟 (纳秒)"""
+        self.get_histogram(name).record(latency_ns)
+
+    def record_since(self, name: str, start_ns: int):
+        """记录从 start_ns (perf_counter_ns) 到现在的阶段延迟"""
+        self.get_histogram(name).record(perf_counter_ns() - start_ns)
+
+    def span(self, name: str) -> LatencySpan:
+        """创建命名埋点，用于 with 语句"""
+        return LatencySpan(self.get_histogram(name))
+
+    def reset(self, name: Optional[str] = None):
+        """清空指定阶段或全部阶段"""
+        if name is not None:
+            if name in self.histograms:
+                self.histograms[name].reset()
+            return
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def get_summary(self, include_empty: bool = False) -> Dict[str, Dict[str, float]]:
+        """获取各阶段延迟分位数 (单位: 微秒)"""
+        summary = {}
+        for name, histogram in self.histograms.items():
+            if include_empty or histogram.total_count:
+                summary[name] = histogram.get_summary()
+        return summary
+
+    # ================================= 快照导出 =================================
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """导出全部阶段的快照"""
+        return {
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+            'sub_bucket_bits': self.sub_bucket_bits,
+            'stages': {name: histogram.to_snapshot() for name, histogram in self.histograms.items()}
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> 'LatencyTracker':
+        """从快照重建埋点注册表（只读查询用）"""
+        tracker = cls(sub_bucket_bits=snapshot.get('sub_bucket_bits', 8))
+        for name, stage in snapshot.get('stages', {}).items():
+            tracker.get_histogram(name).load_snapshot(stage)
+        return tracker
+
+    def export_snapshot(self, path: str = LATENCY_SNAPSHOT_FILE):
+        """把快照原子写入文件（先写临时文件再替换）"""
+        path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def start_export(self, path: str = LATENCY_SNAPSHOT_FILE, interval: float = 5.0):
+        """启动后台线程，每 interval 秒导出一次快照（已启动时不重复启动）"""
+        if self._export_thread is not None and self._export_thread.is_alive():
+            return
+
+        def export_loop():
+            while not self._export_stop.wait(interval):
+                try:
+                    self.export_snapshot(path)
+                except OSError as e:
+                    logger.warning(f"延迟快照导出失败: {e}")
+
+        self._export_stop.clear()
+        self._export_thread = threading.Thread(target=export_loop, name='latency-export', daemon=True)
+        self._export_thread.start()
+
+    def stop_export(self, path: str = LATENCY_SNAPSHOT_FILE):
+        """停止后台导出，并写出最后一次快照"""
+        if self._export_thread is None:
+            return
+        self._export_stop.set()
+        self._export_thread.join(timeout=2)
+        self._export_thread = None
+        try:
+            self.export_snapshot(path)
+        except OSError as e:
+            logger.warning(f"延迟快照导出失败: {e}")
+
+    def print_summary(self):
+        """打印各阶段延迟表"""
+        summary = self.get_summary()
+        if not summary:
+            print("   暂无埋点数据")
+            return
+
+        print(f"   {'阶段':<18}{'次数':>10}{'p50(µs)':>12}{'p99(µs)':>12}{'p999(µs)':>12}{'max(µs)':>12}")
+        for name, stats in summary.items():
+            print(f"   {name:<18}{stats['count']:>10}{stats['p50_us']:>12.1f}"
+                  f"{stats['p99_us']:>12.1f}{stats['p999_us']:>12.1f}{stats['max_us']:>12.1f}")
+
+# ================================= 全局实例 =================================
+
+_global_latency_tracker: Optional[LatencyTracker] = None
+
+def get_latency_tracker() -> LatencyTracker:
+    """获取全局延迟埋点实例"""
+    global _global_latency_tracker
+    if _global_latency_tracker is None:
+        _global_latency_tracker = LatencyTracker()
+    return _global_latency_tracker
+
+def load_latency_snapshot(path: str = LATENCY_SNAPSHOT_FILE) -> Optional[Dict[str, Any]]:
+    """读取其他进程导出的延迟快照，文件不存在或损坏时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# ================================= 测试代码 =================================
+
+def measure_span_overhead(iterations: int = 200000) -> float:
+    """测量单次埋点开销 (纳秒)"""
+    histogram = LatencyTracker().get_histogram(STAGE_FUSION)
+
+    start = perf_counter_ns()
+    for _ in range(iterations):
+        t0 = perf_counter_ns()
+        histogram.record(perf_counter_ns() - t0)
+    elapsed = perf_counter_ns() - start
+
+    return elapsed / iterations
+
+if __name__ == "__main__":
+    import random
+
+    print("🧪 测试延迟埋点系统...")
+    tracker = LatencyTracker()
+    for _ in range(100000):
+        tracker.record(STAGE_FEED_RECEIVE, int(random.lognormvariate(9, 0.8)))
+    tracker.print_summary()
+    print(f"⏱️ 单次埋点开销: {measure_span_overhead():.0f}ns")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+延迟导入工具 - Lazy Imports
+
+命令行入口只加载子命令真正用到的模块：pandas、yfinance、backtrader 等重量级依赖
+在首次访问属性时才导入，`--help`、自选股列表等轻量命令不再为它们付出启动时间。
+
+用法：
+```python
+data_manager = lazy_module('data_manager')        # 此时不导入
+data_manager.get_data('AAPL')                     # 首次访问时导入
+
+# 模块级 __getattr__ (PEP 562)：from quick_trade import get_data 时才加载 data_manager
+__getattr__ = lazy_exports(globals(), {'get_data': 'data_manager', 'save_backtest_result': 'backtest_manager:save_result'})
+```
+"""
+
+import importlib
+import importlib.util
+from typing import Dict, List
+
+
+class LazyModule:
+    """模块代理：首次访问属性时导入目标模块
+
+    导入失败时抛出 ImportError，且不缓存失败结果，依赖补装后可重试。
+    """
+
+    def __init__(self, name: str):
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_lazy_name'])
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_lazy_name']}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """返回延迟导入的模块代理"""
+    return LazyModule(name)
+
+
+def lazy_exports(module_globals: dict, exports: Dict[str, str]):
+    """生成模块级 __getattr__，按需从其他模块取出导出名
+
+    Args:
+        module_globals: 调用方模块的 globals()，取到的属性会缓存进去
+        exports: 导出名 -> 'module' 或 'module:attribute'
+    """
+    module_name = module_globals.get('__name__')
+
+    def __getattr__(name):
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        source, _, attribute = target.partition(':')
+        value = getattr(importlib.import_module(source), attribute or name)
+        module_globals[name] = value
+        return value
+
+    return __getattr__
+
+
+def missing_modules(names: List[str]) -> List[str]:
+    """返回未安装的模块（只查找模块，不执行导入）"""
+    missing = []
+    for name in names:
+        try:
+            if importlib.util.find_spec(name) is None:
+                missing.append(name)
+        except (ImportError, ValueError):
+            missing.append(name)
+    return missing
@@ -17,6 +17,12 @@ from collections import deque
 import json
 import pickle
 import os
+import sys
+
+# 添加项目根目录到路径以支持模型制品仓库导入
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 # 机器学习库
 try:
@@ -29,6 +35,14 @@ except ImportError:
     ML_AVAILABLE = False
     logging.warning("⚠️ Scikit-learn不可用，ML功能将受限")
 
+# 模型制品仓库（按需加载、内存映射、LRU）
+try:
+    from src.ml_integration.model_store import ModelArtifactStore
+    MODEL_STORE_AVAILABLE = True
+except ImportError:
+    MODEL_STORE_AVAILABLE = False
+    logging.warning("⚠️ 模型制品仓库不可用，模型将不会持久化")
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -99,67 +113,56 @@ class FeatureSet:
 class MLModelManager:
     """机器学习模型管理器"""
     
-    def __init__(self, model_dir: str = "models"):
+    SCALER_ARTIFACT = "feature_scaler"
+    
+    def __init__(self, model_dir: str = "models", max_resident_models: int = 16):
         """初始化模型管理器"""
         self.model_dir = model_dir
-        self.models: Dict[str, Dict] = {}  # 模型缓存
+        self.models: Dict[str, Dict] = {}  # 模型注册表（模型对象按需创建/加载）
         self.scalers: Dict[str, StandardScaler] = {}  # 特征缩放器
+        self._scaler_dirty = False  # 缩放器重新拟合后尚未保存
         self.feature_columns = []
         
         # 确保模型目录存在
         os.makedirs(model_dir, exist_ok=True)
         
+        # 模型制品仓库
+        self.model_store = (ModelArtifactStore(model_dir, max_resident=max_resident_models)
+                            if MODEL_STORE_AVAILABLE else None)
+        
         # 模型性能指标
         self.model_metrics: Dict[str, Dict] = {}
         
         if ML_AVAILABLE:
             self._initialize_models()
+            self._restore_model_state()
         else:
             logger.warning("⚠️ ML库不可用，使用简化预测模型")
         
         logger.info("✅ ML模型管理器初始化完成")
     
     def _initialize_models(self):
-        """初始化ML模型"""
-        # 价格预测模型
-        self.models['price_1m'] = {
-            'model': RandomForestRegressor(n_estimators=100, random_state=42),
-            'trained': False,
-            'last_train_time': 0.0
-        }
-        
-        self.models['price_5m'] = {
-            'model': GradientBoostingRegressor(n_estimators=100, random_state=42),
-            'trained': False,
-            'last_train_time': 0.0
-        }
-        
-        self.models['price_15m'] = {
-            'model': RandomForestRegressor(n_estimators=150, random_state=42),
-            'trained': False,
-            'last_train_time': 0.0
-        }
-        
-        # 信号强度预测模型
-        self.models['signal_strength'] = {
-            'model': GradientBoostingRegressor(n_estimators=80, random_state=42),
-            'trained': False,
-            'last_train_time': 0.0
-        }
-        
-        # 趋势预测模型
-        self.models['trend_prediction'] = {
-            'model': RandomForestRegressor(n_estimators=120, random_state=42),
-            'trained': False,
-            'last_train_time': 0.0
+        """注册ML模型（只登记构造方法，模型对象在首次使用时创建或加载）"""
+        model_factories = {
+            # 价格预测模型
+            'price_1m': lambda: RandomForestRegressor(n_estimators=100, random_state=42),
+            'price_5m': lambda: GradientBoostingRegressor(n_estimators=100, random_state=42),
+            'price_15m': lambda: RandomForestRegressor(n_estimators=150, random_state=42),
+            # 信号强度预测模型
+            'signal_strength': lambda: GradientBoostingRegressor(n_estimators=80, random_state=42),
+            # 趋势预测模型
+            'trend_prediction': lambda: RandomForestRegressor(n_estimators=120, random_state=42),
+            # 波动率预测模型
+            'volatility': lambda: LinearRegression(),
         }
         
-        # 波动率预测模型
-        self.models['volatility'] = {
-            'model': LinearRegression(),
-            'trained': False,
-            'last_train_time': 0.0
-        }
+        for model_name, factory in model_factories.items():
+            self.models[model_name] = {
+                'factory': factory,
+                'model': None,
+                'trained': False,
+                'last_train_time': 0.0
+            }
         
         # 定义特征列
         self.feature_columns = [
@@ -168,7 +171,79 @@ class MLModelManager:
             'volume_ratio', 'market_volatility', 'market_trend'
         ]
         
-        logger.info(f"✅ 初始化 {len(self.models)} 个ML模型")
+        logger.info(f"✅ 注册 {len(self.models)} 个ML模型")
+    
+    def _restore_model_state(self):
+        """从制品清单恢复训练状态（只读取清单，不加载权重）"""
+        if not self.model_store:
+            return
+        
+        restored = 0
+        for model_name, entry in self.models.items():
+            try:
+                manifest = self.model_store.get_manifest(model_name)
+            except Exception as e:
+                logger.warning(f"模型清单读取失败 {model_name}: {e}")
+                continue
+            
+            if manifest is None:
+                continue
+            
+            metadata = manifest.get('metadata', {})
+            entry['trained'] = metadata.get('trained', True)
+            entry['last_train_time'] = metadata.get('last_train_time', 0.0)
+            if metadata.get('metrics'):
+                self.model_metrics[model_name] = metadata['metrics']
+            restored += 1
+        
+        if restored:
+            logger.info(f"✅ 发现 {restored} 个已保存模型，将在首次预测时加载")
+    
+    def _get_model(self, model_name: str):
+        """获取模型对象：内存中的 → 制品仓库（按需加载） → 新建"""
+        entry = self.models[model_name]
+        if entry['model'] is not None:
+            return entry['model']
+        
+        if self.model_store and entry['trained'] and self.model_store.has(model_name):
+            return self.model_store.load(model_name)
+        
+        entry['model'] = entry['factory']()
+        return entry['model']
+    
+    def _get_scaler(self) -> Optional[StandardScaler]:
+        """获取特征缩放器，首次使用时从制品仓库加载"""
+        scaler = self.scalers.get('features')
+        if scaler is None and self.model_store and self.model_store.has(self.SCALER_ARTIFACT):
+            scaler = self.model_store.load(self.SCALER_ARTIFACT)
+            self.scalers['features'] = scaler
+        return scaler
+    
+    def save_models(self) -> Dict[str, str]:
+        """将已训练模型保存为制品，返回各模型内容哈希（未变化的模型不会重写）"""
+        if not self.model_store:
+            return {}
+        
+        saved = {}
+        for model_name, entry in self.models.items():
+            if not entry['trained'] or entry['model'] is None:
+                continue
+            
+            saved[model_name] = self.model_store.save(model_name, entry['model'], metadata={
+                'trained': True,
+                'last_train_time': entry['last_train_time'],
+                'metrics': self.model_metrics.get(model_name, {})
+            })
+            # 交由制品仓库的LRU管理常驻内存
+            entry['model'] = None
+        
+        if self._scaler_dirty and 'features' in self.scalers:
+            saved[self.SCALER_ARTIFACT] = self.model_store.save(
+                self.SCALER_ARTIFACT, self.scalers['features'])
+            self._scaler_dirty = False
+        
+        logger.info(f"💾 已保存 {len(saved)} 个模型制品")
+        return saved
     
     def extract_features(self, price_history: List[float], 
                         volume_history: List[float], 
@@ -230,7 +305,8 @@ class MLModelManager:
             return None
     
     def train_models(self, training_data: List[FeatureSet], 
-                    target_data: Dict[str, List[float]]) -> Dict[str, float]:
+                    target_data: Dict[str, List[float]],
+                    persist: bool = True) -> Dict[str, float]:
         """训练ML模型"""
         if not ML_AVAILABLE or not training_data:
             return {}
@@ -252,6 +328,7 @@ class MLModelManager:
             scaler = StandardScaler()
             X_scaled = scaler.fit_transform(X)
             self.scalers['features'] = scaler
+            self._scaler_dirty = True
             
             training_results = {}
             
@@ -260,7 +337,7 @@ class MLModelManager:
                 if model_name in self.models and len(target_values) == len(X):
                     try:
                         y = np.array(target_values)
-                        model = self.models[model_name]['model']
+                        model = self.models[model_name]['factory']()
                         
                         # 训练模型
                         model.fit(X_scaled, y)
@@ -271,6 +348,7 @@ class MLModelManager:
                         mae = mean_absolute_error(y, y_pred)
                         
                         # 更新模型状态
+                        self.models[model_name]['model'] = model
                         self.models[model_name]['trained'] = True
                         self.models[model_name]['last_train_time'] = time.time()
                         
@@ -290,6 +368,10 @@ class MLModelManager:
                         logger.error(f"模型 {model_name} 训练失败: {e}")
             
             logger.info(f"✅ 完成 {len(training_results)} 个模型训练")
+            
+            if persist and training_results:
+                self.save_models()
+            
             return training_results
             
         except Exception as e:
@@ -312,8 +394,9 @@ class MLModelManager:
             ]])
             
             # 特征缩放
-            if 'features' in self.scalers:
-                feature_vector = self.scalers['features'].transform(feature_vector)
+            scaler = self._get_scaler()
+            if scaler is not None:
+                feature_vector = scaler.transform(feature_vector)
             
             predictions = {}
             
@@ -322,7 +405,7 @@ class MLModelManager:
                 model_name = f'price_{time_horizon}'
                 if model_name in self.models and self.models[model_name]['trained']:
                     try:
-                        pred = self.models[model_name]['model'].predict(feature_vector)[0]
+                        pred = self._get_model(model_name).predict(feature_vector)[0]
                         predictions[f'predicted_price_{time_horizon}'] = max(0.1, pred)  # 确保价格为正
                     except:
                         predictions[f'predicted_price_{time_horizon}'] = features.price
@@ -330,7 +413,7 @@ class MLModelManager:
             # 信号强度预测
             if 'signal_strength' in self.models and self.models['signal_strength']['trained']:
                 try:
-                    signal_strength = self.models['signal_strength']['model'].predict(feature_vector)[0]
+                    signal_strength = self._get_model('signal_strength').predict(feature_vector)[0]
                     predictions['signal_strength'] = np.clip(signal_strength, 0.0, 1.0)
                 except:
                     predictions['signal_strength'] = 0.5
@@ -340,7 +423,7 @@ class MLModelManager:
             # 趋势预测
             if 'trend_prediction' in self.models and self.models['trend_prediction']['trained']:
                 try:
-                    trend_score = self.models['trend_prediction']['model'].predict(feature_vector)[0]
+                    trend_score = self._get_model('trend_prediction').predict(feature_vector)[0]
                     predictions['trend_strength'] = np.clip(abs(trend_score), 0.0, 1.0)
                     predictions['trend_short'] = 'UP' if trend_score > 0.1 else 'DOWN' if trend_score < -0.1 else 'SIDEWAYS'
                 except:
@@ -353,7 +436,7 @@ class MLModelManager:
             # 波动率预测
             if 'volatility' in self.models and self.models['volatility']['trained']:
                 try:
-                    volatility = self.models['volatility']['model'].predict(feature_vector)[0]
+                    volatility = self._get_model('volatility').predict(feature_vector)[0]
                     predictions['volatility_prediction'] = max(0.001, volatility)
                 except:
                     predictions['volatility_prediction'] = features.market_volatility
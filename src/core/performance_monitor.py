@@ -19,6 +19,11 @@ import json
 import numpy as np
 import os
 
+try:
+    from latency_tracker import get_latency_tracker, load_latency_snapshot, LatencyTracker, LATENCY_SNAPSHOT_FILE
+except ImportError:
+    from .latency_tracker import get_latency_tracker, load_latency_snapshot, LatencyTracker, LATENCY_SNAPSHOT_FILE
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -129,6 +134,9 @@ class PerformanceMonitor:
         self.error_counter = 0
         self.last_request_time = time.time()
         
+        # 管道分阶段延迟埋点
+        self.latency_tracker = get_latency_tracker()
+        
         # 回调函数
         self.alert_callbacks: List[Callable] = []
         
@@ -543,6 +551,9 @@ class PerformanceMonitor:
                     'alerts_generated': len(self.alerts)
                 },
                 
+                # 分阶段延迟分位数 (µs)
+                'stage_latency': self.latency_tracker.get_summary(),
+                
                 # 最近警报
                 'recent_alerts': recent_alerts,
                 
@@ -634,6 +645,14 @@ class PerformanceMonitor:
             print(f"   错误率: {app_status.get('error_rate', 0):.1%}")
             print(f"   成功率: {app_status.get('success_rate', 1):.1%}")
         
+        # 分阶段延迟
+        stage_latency = summary.get('stage_latency', {})
+        if stage_latency:
+            print(f"\n⏱️ 管道延迟 (µs):")
+            for stage, stats in stage_latency.items():
+                print(f"   {stage:<18} p50={stats['p50_us']:.1f} p99={stats['p99_us']:.1f} "
+                      f"p999={stats['p999_us']:.1f} (n={stats['count']})")
+        
         # 统计信息
         stats = summary.get('statistics', {})
         print(f"\n📊 统计信息:")
@@ -680,6 +699,28 @@ def print_performance_dashboard():
     monitor = get_performance_monitor()
     monitor.print_performance_dashboard()
 
+def print_latency_summary(snapshot_file: str = LATENCY_SNAPSHOT_FILE):
+    """打印管道分阶段延迟
+
+    本进程有埋点数据时直接打印；否则读取运行中的实时管道定期导出的快照文件。
+    """
+    tracker = get_performance_monitor().latency_tracker
+    if tracker.get_summary():
+        print("\n⏱️ 管道分阶段延迟:")
+        tracker.print_summary()
+        return
+
+    snapshot = load_latency_snapshot(snapshot_file)
+    if snapshot is None:
+        print("\n⏱️ 管道分阶段延迟:")
+        print("   暂无埋点数据 (实时管道未运行或尚未导出快照)")
+        print(f"   快照文件: {os.path.abspath(snapshot_file)}")
+        return
+
+    age = time.time() - snapshot.get('timestamp', 0)
+    print(f"\n⏱️ 管道分阶段延迟 (进程 {snapshot.get('pid')} 的快照，{age:.0f}秒前):")
+    LatencyTracker.from_snapshot(snapshot).print_summary()
+
 # ================================= 测试代码 =================================
 
 async def test_performance_monitor():
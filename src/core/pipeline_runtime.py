@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时管道运行时
+为实时交易管道提供唯一的事件循环线程和数据回调到信号融合的交接队列
+
+功能特点:
+- 一个运行时只拥有一个事件循环线程，数据引擎和信号融合共用
+- 有界 MPSC 合并队列：任意数据线程投递，事件循环线程单一消费
+- 背压时同一股票只保留最新行情（后到覆盖先到），队列满时丢弃新股票并计数
+- 信号融合按微批次执行，每批并发处理不同股票
+- 提供队列深度、合并数、丢弃数、批次大小等统计
+- 记录行情在队列中的等待延迟，运行期间定期导出延迟快照
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from latency_tracker import get_latency_tracker, LatencyHistogram, STAGE_QUEUE_WAIT
+except ImportError:
+    from .latency_tracker import get_latency_tracker, LatencyHistogram, STAGE_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+# ================================= 合并队列 =================================
+
+class CoalescingTickQueue:
+    """有界多生产者单消费者合并队列
+
+    队列按股票保存待处理行情：同一股票尚未被消费时，新行情直接覆盖旧行情，
+    不占用新的队列位置；待处理股票数达到 maxsize 时丢弃新股票的行情。
+    生产者临界区只有几次字典操作，消费者一次取走整批，锁持有时间在微秒级。
+    传入 wait_histogram 时，取出行情时记录其从 (最近一次) 投递到被取出的等待时间。
+    """
+
+    def __init__(self, maxsize: int = 1024, wait_histogram: Optional[LatencyHistogram] = None):
+        self.maxsize = maxsize
+        self.wait_histogram = wait_histogram
+        self._pending: Dict[str, Tuple[Any, int]] = {}  # symbol -> (tick, 投递时间ns)，保持到达顺序
+        self._lock = threading.Lock()
+
+        self.enqueued = 0    # 新进入队列的行情
+        self.coalesced = 0   # 覆盖同股票旧行情的次数
+        self.dropped = 0     # 队列满被丢弃的行情
+        self.drained = 0     # 已被消费的行情
+        self.max_depth = 0
+
+    def put(self, symbol: str, tick: Any) -> Tuple[bool, bool]:
+        """投递行情，返回 (是否被接收, 队列是否由空变为非空需要唤醒消费者)"""
+        now_ns = perf_counter_ns()
+        with self._lock:
+            depth = len(self._pending)
+            if symbol in self._pending:
+                self._pending[symbol] = (tick, now_ns)
+                self.coalesced += 1
+                return True, False
+
+            if depth >= self.maxsize:
+                self.dropped += 1
+                return False, False
+
+            self._pending[symbol] = (tick, now_ns)
+            self.enqueued += 1
+            if depth + 1 > self.max_depth:
+                self.max_depth = depth + 1
+            return True, depth == 0
+
+    def drain(self, max_items: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """取出最多 max_items 条待处理行情（按到达顺序）"""
+        with self._lock:
+            if max_items is None or len(self._pending) <= max_items:
+                batch = self._pending
+                self._pending = {}
+                entries = list(batch.items())
+            else:
+                entries = []
+                for symbol in list(self._pending)[:max_items]:
+                    entries.append((symbol, self._pending.pop(symbol)))
+            self.drained += len(entries)
+
+        if self.wait_histogram is not None:
+            now_ns = perf_counter_ns()
+            for _, (_, queued_ns) in entries:
+                self.wait_histogram.record(now_ns - queued_ns)
+        return [(symbol, tick) for symbol, (tick, _) in entries]
+
+    def depth(self) -> int:
+        """当前待处理股票数"""
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, int]:
+        """队列统计"""
+        with self._lock:
+            return {
+                'depth': len(self._pending),
+                'max_depth': self.max_depth,
+                'capacity': self.maxsize,
+                'enqueued': self.enqueued,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped,
+                'drained': self.drained
+            }
+
+# ================================= 管道运行时 =================================
+
+TickHandler = Callable[[str, Any], Awaitable[None]]
+
+class PipelineRuntime:
+    """实时管道运行时
+
+    start() 后在独立线程中运行唯一的事件循环。数据线程通过 submit() 投递行情，
+    消费协程把队列按微批次交给 handler(symbol, tick) 处理；其他组件通过
+    run_coroutine() 把协程调度到同一事件循环。
+    运行期间延迟埋点快照定期写入文件，供 `main.py performance latency` 在其他进程中读取。
+    """
+
+    def __init__(self, queue_size: int = 1024, batch_size: int = 64, name: str = "pipeline-runtime"):
+        self.name = name
+        self.batch_size = batch_size
+        self.latency_tracker = get_latency_tracker()
+        self.queue = CoalescingTickQueue(queue_size, self.latency_tracker.get_histogram(STAGE_QUEUE_WAIT))
+        self.handler: Optional[TickHandler] = None
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self.is_running = False
+
+        self.stats = {
+            'batches': 0,
+            'processed': 0,
+            'handler_errors': 0,
+            'max_batch_size': 0,
+            'last_batch_ms': 0.0
+        }
+
+    def set_handler(self, handler: Optional[TickHandler]):
+        """设置行情处理协程 handler(symbol, tick)"""
+        self.handler = handler
+
+    # ================================= 生命周期 =================================
+
+    def start(self, timeout: float = 5.0) -> 'PipelineRuntime':
+        """启动事件循环线程（已启动时直接返回）
+
+        事件循环在 timeout 秒内未就绪时停止该线程并抛出 RuntimeError，is_running 保持 False。
+        """
+        if self.is_running:
+            return self
+
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            logger.error(f"管道运行时启动超时 ({timeout}秒): {self.name}")
+            loop = self.loop
+            if loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(loop.stop)
+            raise RuntimeError(f"管道运行时启动超时: {self.name}")
+        self.is_running = True
+        self.latency_tracker.start_export()
+        logger.info(f"管道运行时已启动: {self.name}")
+        return self
+
+    def _run_loop(self):
+        """事件循环线程入口"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._wakeup = asyncio.Event()
+        self._consumer_task = self.loop.create_task(self._consume())
+        self.loop.call_soon(self._ready.set)
+
+        try:
+            self.loop.run_forever()
+        finally:
+            # 取消剩余任务后关闭事件循环
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self, timeout: float = 5.0):
+        """停止事件循环线程"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self.latency_tracker.stop_export()
+        logger.info(f"管道运行时已停止: {self.name}")
+
+    def run_coroutine(self, coro) -> 'asyncio.Future':
+        """从任意线程把协程调度到运行时事件循环，返回 concurrent.futures.Future"""
+        if not self.is_running or self.loop is None:
+            raise RuntimeError("管道运行时未启动")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # ================================= 行情交接 =================================
+
+    def submit(self, symbol: str, tick: Any) -> bool:
+        """投递行情（任意线程可调用），队列满被丢弃时返回False"""
+        accepted, wake = self.queue.put(symbol, tick)
+        if wake and self.loop is not None and not self.loop.is_closed():
+            # 仅在队列由空变为非空时唤醒消费者，避免每笔行情跨线程调度
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+        return accepted
+
+    async def _consume(self):
+        """消费协程：按微批次处理队列中的行情"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while True:
+                batch = self.queue.drain(self.batch_size)
+                if not batch:
+                    break
+                await self._process_batch(batch)
+
+    async def _process_batch(self, batch: List[Tuple[str, Any]]):
+        """并发处理一个微批次（批内股票互不相同）"""
+        start = time.perf_counter()
+
+        if self.handler is not None:
+            results = await asyncio.gather(
+                *(self.handler(symbol, tick) for symbol, tick in batch),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    self.stats['handler_errors'] += 1
+                    logger.error(f"行情处理失败: {result}")
+
+        self.stats['batches'] += 1
+        self.stats['processed'] += len(batch)
+        self.stats['max_batch_size'] = max(self.stats['max_batch_size'], len(batch))
+        self.stats['last_batch_ms'] = (time.perf_counter() - start) * 1000
+
+    # ================================= 统计 =================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """运行时统计：队列深度、丢弃/合并计数、批次信息"""
+        batches = self.stats['batches']
+        return {
+            'is_running': self.is_running,
+            'queue': self.queue.get_stats(),
+            'batches': batches,
+            'processed': self.stats['processed'],
+            'handler_errors': self.stats['handler_errors'],
+            'avg_batch_size': self.stats['processed'] / batches if batches else 0,
+            'max_batch_size': self.stats['max_batch_size'],
+            'last_batch_ms': self.stats['last_batch_ms']
+        }
+
+# ================================= 全局实例 =================================
+
+_global_pipeline_runtime: Optional[PipelineRuntime] = None
+
+def get_pipeline_runtime() -> PipelineRuntime:
+    """获取全局管道运行时"""
+    global _global_pipeline_runtime
+    if _global_pipeline_runtime is None:
+        _global_pipeline_runtime = PipelineRuntime()
+    return _global_pipeline_runtime
@@ -22,6 +22,8 @@ trader = start_trading('RSI', ['AAPL', 'MSFT'])
 ```
 """
 
+from __future__ import annotations
+
 import os
 import sys
 from datetime import datetime, timedelta
@@ -39,30 +41,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# 导入核心模块
+# 核心模块延迟导入：pandas、yfinance 等依赖在首次调用相应功能时才加载，
+# 轻量命令（帮助、自选股列表）不再为它们付出启动时间
 try:
-    from data_manager import DataManager, get_data, get_realtime_price, get_stock_info
-    from strategy_manager import (Strategy, create_strategy, get_available_strategies, 
-                                SignalType, StrategyResult)
-    from backtest_manager import (SimpleBacktester, BacktestResult, quick_backtest, 
-                                save_result as save_backtest_result)
-    from paper_trader import (PaperTrader, PaperPosition, PaperTrade, TradingAccount,
-                             start_paper_trading)
-    
-    logger.info("✅ 核心模块导入成功")
-    CLI_AVAILABLE = True
-    
-except ImportError as e:
-    logger.error(f"❌ 核心模块导入失败：{e}")
+    from lazy_imports import lazy_module, lazy_exports, missing_modules
+except ImportError:
+    from .lazy_imports import lazy_module, lazy_exports, missing_modules
+
+_data_manager = lazy_module('data_manager')
+_strategy_manager = lazy_module('strategy_manager')
+_backtest_manager = lazy_module('backtest_manager')
+_paper_trader = lazy_module('paper_trader')
+
+# 保持原有的导出名：from quick_trade import get_data 时才加载对应模块
+__getattr__ = lazy_exports(globals(), {
+    'DataManager': 'data_manager',
+    'get_data': 'data_manager',
+    'get_realtime_price': 'data_manager',
+    'get_stock_info': 'data_manager',
+    'Strategy': 'strategy_manager',
+    'create_strategy': 'strategy_manager',
+    'get_available_strategies': 'strategy_manager',
+    'SignalType': 'strategy_manager',
+    'StrategyResult': 'strategy_manager',
+    'SimpleBacktester': 'backtest_manager',
+    'BacktestResult': 'backtest_manager',
+    'quick_backtest': 'backtest_manager',
+    'save_backtest_result': 'backtest_manager:save_result',
+    'PaperTrader': 'paper_trader',
+    'PaperPosition': 'paper_trader',
+    'PaperTrade': 'paper_trader',
+    'TradingAccount': 'paper_trader',
+    'start_paper_trading': 'paper_trader',
+})
+
+# 只检查依赖是否已安装，不执行导入
+_missing_dependencies = missing_modules(['pandas', 'numpy'])
+CLI_AVAILABLE = not _missing_dependencies
+if _missing_dependencies:
+    logger.error(f"❌ 缺少依赖包：{', '.join(_missing_dependencies)}")
     logger.info("请确保所有依赖包已安装：pip install pandas numpy")
-    CLI_AVAILABLE = False
-    
-    # 定义空的类型来避免NameError
-    class Strategy: pass
-    class StrategyResult: pass  
-    class SignalType: pass
-    class BacktestResult: pass
-    class PaperTrader: pass
 
 # ==================== 数据相关 ====================
 
@@ -92,7 +110,7 @@ def get_stock_data(symbol: str,
         if end_date is None:
             end_date = datetime.now().strftime('%Y-%m-%d')
         
-        return get_data(symbol, start_date, end_date, period)
+        return _data_manager.get_data(symbol, start_date, end_date, period)
     except Exception as e:
         logger.error(f"获取股票数据失败：{e}")
         raise
@@ -112,7 +130,7 @@ def get_price(symbol: str) -> float:
         >>> print(f"AAPL当前价格：${price:.2f}")
     """
     try:
-        return get_realtime_price(symbol)
+        return _data_manager.get_realtime_price(symbol)
     except Exception as e:
         logger.error(f"获取实时价格失败：{e}")
         return 0.0
@@ -132,7 +150,7 @@ def get_info(symbol: str) -> Dict:
         >>> print(f"公司名称：{info.get('name', 'N/A')}")
     """
     try:
-        return get_stock_info(symbol)
+        return _data_manager.get_stock_info(symbol)
     except Exception as e:
         logger.error(f"获取股票信息失败：{e}")
         return {}
@@ -155,7 +173,7 @@ def create_simple_strategy(name: str, params: Dict = None) -> Strategy:
         >>> print(f"策略：{strategy.name}")
     """
     try:
-        return create_strategy(name, params)
+        return _strategy_manager.create_strategy(name, params)
     except Exception as e:
         logger.error(f"创建策略失败：{e}")
         raise
@@ -172,7 +190,7 @@ def list_strategies() -> List[str]:
         >>> print("可用策略：", strategies)
     """
     try:
-        return get_available_strategies()
+        return _strategy_manager.get_available_strategies()
     except Exception as e:
         logger.error(f"获取策略列表失败：{e}")
         return []
@@ -200,8 +218,8 @@ def test_strategy(strategy_name: str, symbol: str, params: Dict = None) -> Strat
         return strategy.generate_signal(data)
     except Exception as e:
         logger.error(f"测试策略失败：{e}")
-        return StrategyResult(
-            signal=SignalType.HOLD,
+        return _strategy_manager.StrategyResult(
+            signal=_strategy_manager.SignalType.HOLD,
             confidence=0.0,
             price=0.0,
             reason=f"测试失败：{e}",
@@ -236,7 +254,7 @@ def backtest(strategy_name: str,
         >>> print(f"总收益：{result.total_return_percent:.2f}%")
     """
     try:
-        return quick_backtest(
+        return _backtest_manager.quick_backtest(
             strategy_name=strategy_name,
             symbol=symbol,
             start_date=start_date,
@@ -298,7 +316,7 @@ def save_backtest(result: BacktestResult, filename: str = None) -> str:
         >>> print(f"结果保存到：{path}")
     """
     try:
-        return save_backtest_result(result, filename)
+        return _backtest_manager.save_result(result, filename)
     except Exception as e:
         logger.error(f"保存回测结果失败：{e}")
         raise
@@ -335,7 +353,7 @@ def start_trading(strategy_name: str,
         if isinstance(symbols, str):
             symbols = [symbols]
         
-        return start_paper_trading(
+        return _paper_trader.start_paper_trading(
             strategy_name=strategy_name,
             symbols=symbols,
             strategy_params=strategy_params,
@@ -472,7 +490,7 @@ def system_status() -> str:
     
     try:
         # 检查数据模块
-        data_manager = DataManager()
+        data_manager = _data_manager.DataManager()
         status_items.append("✅ 数据模块：正常")
     except Exception as e:
         status_items.append(f"❌ 数据模块：{e}")
@@ -27,6 +27,11 @@ from collections import deque
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    from latency_tracker import get_latency_tracker, STAGE_QUOTE_POLL
+except ImportError:
+    from .latency_tracker import get_latency_tracker, STAGE_QUOTE_POLL
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,19 +69,75 @@ class DataSourceConfig:
         # 数据源优先级
         self.source_priority = ['yfinance']
 
+def fetch_batch_quotes(symbols: List[str]) -> Dict[str, Dict[str, float]]:
+    """一次批量请求获取全部股票当日分钟线，按列汇总为最新报价
+
+    Returns:
+        {symbol: {'price', 'volume', 'open', 'high', 'low'}}，无数据的股票不返回
+    """
+    raw = yf.download(symbols, period="1d", interval="1m", group_by='ticker',
+                      auto_adjust=False, progress=False, threads=True)
+    if raw is None or raw.empty:
+        return {}
+
+    if isinstance(raw.columns, pd.MultiIndex):
+        def field(name):
+            return raw.xs(name, axis=1, level=1).reindex(columns=symbols)
+    else:
+        def field(name):
+            return raw[[name]].set_axis(symbols[:1], axis=1)
+
+    close = field('Close')
+    has_price = close.notna().any().to_numpy()
+
+    # 按列汇总：最新价、当日累计成交量、开盘价、最高价、最低价
+    quotes = pd.DataFrame({
+        'price': close.ffill().iloc[-1],
+        'volume': field('Volume').sum(),
+        'open': field('Open').bfill().iloc[0],
+        'high': field('High').max(),
+        'low': field('Low').min()
+    }).loc[has_price].fillna(0)
+
+    return quotes.to_dict('index')
+
 class YahooFinanceDataSource:
-    """Yahoo Finance数据源 - 免费但有延迟"""
+    """Yahoo Finance数据源 - 免费但有延迟
+    
+    batch_quotes=True 时每个周期用一次批量请求获取全部股票报价，
+    请求在线程池中执行不阻塞事件循环，且只推送价格发生变化的股票。
+    """
     
-    def __init__(self, symbols: List[str]):
+    def __init__(self, symbols: List[str], poll_interval: float = 5.0, batch_quotes: bool = True,
+                 quote_fetcher: Callable[[List[str]], Dict[str, Dict[str, float]]] = None):
         self.symbols = symbols
         self.is_running = False
         self.callbacks = []
         self.last_prices = {}
         self.data_task = None  # 保存数据获取任务引用
         
+        # 批量轮询
+        self.poll_interval = poll_interval  # Yahoo Finance建议5秒间隔
+        self.batch_quotes = batch_quotes
+        self.quote_fetcher = quote_fetcher or fetch_batch_quotes
+        self._executor = None  # 在 start() 中创建，stop() 时关闭
+        self._poll_latency = get_latency_tracker().get_histogram(STAGE_QUOTE_POLL)
+        self.poll_stats = {
+            'cycles': 0,
+            'last_fetch_ms': 0.0,
+            'last_cycle_ms': 0.0,
+            'last_quotes': 0,
+            'last_changed': 0,
+            'total_changed': 0
+        }
+        
     async def start(self):
         """启动Yahoo Finance数据获取"""
         self.is_running = True
+        
+        # 每次启动创建新的线程池（stop() 会关闭旧的）
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yahoo-quotes")
         logger.info("Yahoo Finance数据源已启动")
         
         # 启动数据获取循环并保存任务引用
@@ -96,8 +157,15 @@ class YahooFinanceDataSource:
                     logger.warning("无法获取事件循环，停止数据获取循环")
                     break
                 
-                await self._fetch_realtime_data()
-                await asyncio.sleep(5)  # Yahoo Finance建议5秒间隔
+                cycle_start = time.perf_counter()
+                if self.batch_quotes:
+                    await self._poll_batch_quotes()
+                else:
+                    await self._fetch_realtime_data()
+                
+                # 扣除本周期耗时，保持固定轮询节奏
+                elapsed = time.perf_counter() - cycle_start
+                await asyncio.sleep(max(self.poll_interval - elapsed, 0.5))
             except asyncio.CancelledError:
                 logger.info("数据获取循环被取消")
                 break
@@ -105,8 +173,87 @@ class YahooFinanceDataSource:
                 logger.error(f"Yahoo Finance数据获取错误: {e}")
                 await asyncio.sleep(10)  # 错误时等待更长时间
     
+    async def _poll_batch_quotes(self) -> int:
+        """批量轮询一个周期，返回推送的股票数"""
+        cycle_start_ns = time.perf_counter_ns()
+        loop = asyncio.get_running_loop()
+        
+        # 网络请求在线程池中执行，不阻塞事件循环
+        quotes = await loop.run_in_executor(self._executor, self.quote_fetcher, list(self.symbols))
+        fetch_ns = time.perf_counter_ns() - cycle_start_ns
+        self._poll_latency.record(fetch_ns)
+        
+        changed = self._emit_changed_quotes(quotes)
+        
+        self.poll_stats['cycles'] += 1
+        self.poll_stats['last_fetch_ms'] = fetch_ns / 1e6
+        self.poll_stats['last_cycle_ms'] = (time.perf_counter_ns() - cycle_start_ns) / 1e6
+        self.poll_stats['last_quotes'] = len(quotes)
+        self.poll_stats['last_changed'] = changed
+        self.poll_stats['total_changed'] += changed
+        logger.debug(f"行情轮询: {len(quotes)}/{len(self.symbols)} 只, 变化 {changed} 只, "
+                     f"请求耗时 {fetch_ns / 1e6:.1f}ms")
+        return changed
+    
+    def _emit_changed_quotes(self, quotes: Dict[str, Dict[str, float]]) -> int:
+        """与 last_prices 比较，只推送价格变化（或首次出现）的股票"""
+        changed = 0
+        timestamp = datetime.now()
+        
+        for symbol, quote in quotes.items():
+            current_price = float(quote.get('price', 0) or 0)
+            if current_price <= 0:
+                continue
+            
+            previous_close = self.last_prices.get(symbol)
+            if previous_close == current_price:
+                continue
+            
+            if previous_close is not None:
+                change = current_price - previous_close
+                change_percent = (change / previous_close * 100) if previous_close != 0 else 0
+            else:
+                previous_close = current_price
+                change = 0
+                change_percent = 0
+            
+            self.last_prices[symbol] = current_price
+            changed += 1
+            
+            market_data = RealMarketData(
+                symbol=symbol,
+                price=current_price,
+                volume=int(quote.get('volume', 0) or 0),
+                timestamp=timestamp,
+                open_price=float(quote.get('open', 0) or 0),
+                high_price=float(quote.get('high', 0) or 0),
+                low_price=float(quote.get('low', 0) or 0),
+                previous_close=previous_close,
+                change=change,
+                change_percent=change_percent,
+                source="yahoo_finance",
+                metadata={'poll_cycle': self.poll_stats['cycles']}
+            )
+            
+            # 通知回调
+            for callback in self.callbacks:
+                try:
+                    callback(market_data)
+                except Exception as e:
+                    logger.error(f"Yahoo Finance回调错误: {e}")
+        
+        return changed
+    
+    def get_poll_stats(self) -> Dict[str, Any]:
+        """获取轮询统计（含请求延迟分位数）"""
+        return {
+            **self.poll_stats,
+            'symbols': len(self.symbols),
+            'fetch_latency': self._poll_latency.get_summary()
+        }
+    
     async def _fetch_realtime_data(self):
-        """获取实时数据 - 使用同步方式避免事件循环问题"""
+        """获取实时数据 - 逐只获取（batch_quotes=False 时使用）"""
         try:
             # 直接使用同步方式，避免复杂的事件循环管理
             tickers = yf.Tickers(' '.join(self.symbols))
@@ -215,6 +362,9 @@ class YahooFinanceDataSource:
         # 取消数据获取任务
         if self.data_task and not self.data_task.done():
             self.data_task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
             
         logger.info("Yahoo Finance数据源已停止")
 
@@ -316,7 +466,11 @@ class RealMarketDataEngine:
             'runtime_seconds': runtime,
             'messages_per_second': self.performance_stats['messages_processed'] / runtime if runtime > 0 else 0,
             'last_update_ago': time.time() - self.performance_stats['last_update'] if self.performance_stats['last_update'] > 0 else 0,
-            'cached_symbols': len(self.data_cache)
+            'cached_symbols': len(self.data_cache),
+            'sources': {
+                name: source.get_poll_stats()
+                for name, source in self.data_sources.items() if hasattr(source, 'get_poll_stats')
+            }
         }
     
     async def stop(self):
@@ -371,6 +525,9 @@ async def test_real_data_engine():
         print(f"  消息速率: {stats['messages_per_second']:.1f} MPS")
         print(f"  缓存股票: {stats['cached_symbols']}")
         print(f"  最后更新: {stats['last_update_ago']:.1f}s前")
+        for name, poll in stats['sources'].items():
+            print(f"  {name} 轮询: {poll['cycles']} 周期, 最近请求 {poll['last_fetch_ms']:.0f}ms, "
+                  f"p99 {poll['fetch_latency']['p99_us'] / 1000:.0f}ms")
         
     finally:
         await engine.stop()
@@ -30,6 +30,11 @@ from collections import deque
 import concurrent.futures
 import weakref
 
+try:
+    from latency_tracker import get_latency_tracker, STAGE_FEED_RECEIVE
+except ImportError:
+    from .latency_tracker import get_latency_tracker, STAGE_FEED_RECEIVE
+
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -377,6 +382,7 @@ class RealtimeDataEngine:
             'avg_latency': 0,
             'start_time': None
         }
+        self._receive_latency = get_latency_tracker().get_histogram(STAGE_FEED_RECEIVE)
         
     async def add_data_feed(self, name: str, feed):
         """添加数据源"""
@@ -387,11 +393,13 @@ class RealtimeDataEngine:
     def _on_data_received(self, data: MarketData):
         """数据接收回调"""
         start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
         
         # 添加到缓冲区
         self.data_buffer.append(data)
         
         # 更新性能统计
+        self._receive_latency.record(time.perf_counter_ns() - start_ns)
         self._update_performance_stats(start_time)
         
         logger.debug(f"数据已处理: {data.symbol} @ {data.price}")
@@ -16,6 +16,11 @@ from collections import deque
 import numpy as np
 import pandas as pd
 
+try:
+    from latency_tracker import get_latency_tracker, STAGE_RISK_CHECK
+except ImportError:
+    from .latency_tracker import get_latency_tracker, STAGE_RISK_CHECK
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -112,6 +117,9 @@ class RealtimeRiskEngine:
         self.alert_callbacks: List[Callable] = []
         self.emergency_callbacks: List[Callable] = []
         
+        # 风险检查延迟直方图
+        self._risk_check_latency = get_latency_tracker().get_histogram(STAGE_RISK_CHECK)
+        
         logger.info("✅ 实时风险引擎初始化完成")
     
     async def start(self):
@@ -168,6 +176,7 @@ class RealtimeRiskEngine:
     async def check_pre_trade_risk(self, symbol: str, order_size: float, order_price: float) -> Tuple[bool, str]:
         """交易前风险检查 - 目标延迟 < 20ms"""
         start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
         
         try:
             # 1. 紧急停止检查
@@ -223,6 +232,86 @@ class RealtimeRiskEngine:
         except Exception as e:
             logger.error(f"风险检查失败: {e}")
             return False, f"风险检查错误: {str(e)}"
+        finally:
+            self._risk_check_latency.record(time.perf_counter_ns() - start_ns)
+    
+    async def check_pre_trade_risk_batch(self, orders: List[Tuple[str, float, float]]) -> List[Tuple[bool, str]]:
+        """
+        批量交易前风险检查 - 一次调用检查一组订单
+        
+        紧急停止、交易间隔、损失限制只检查一次；每分钟交易次数和仓位按批内
+        累计计算：已通过的订单占用交易次数，同一标的的多笔订单叠加到仓位上。
+        
+        Args:
+            orders: [(股票代码, 订单数量, 订单价格)]
+            
+        Returns:
+            与 orders 顺序一致的 [(是否通过, 原因说明)]
+        """
+        start_ns = time.perf_counter_ns()
+        limits = self.risk_limits
+        
+        try:
+            # 1. 整批共用的检查
+            if self.emergency_stop:
+                return [(False, "系统处于紧急停止状态")] * len(orders)
+            
+            current_time = time.time()
+            if current_time - self.last_trade_time < limits.min_order_interval:
+                return [(False, f"交易间隔过短 ({current_time - self.last_trade_time:.2f}s)")] * len(orders)
+            
+            if self.daily_pnl < -limits.max_daily_loss:
+                loss_reason = f"日损失超限: ${self.daily_pnl:.2f}"
+            elif self.total_pnl < -limits.max_total_loss:
+                loss_reason = f"总损失超限: ${self.total_pnl:.2f}"
+            else:
+                loss_reason = None
+            
+            # 2. 快照
+            minute_ago = current_time - 60
+            recent_trades = sum(1 for t in self.trades_in_minute if t > minute_ago)
+            pending_positions: Dict[str, float] = {}
+            
+            results = []
+            for symbol, order_size, order_price in orders:
+                if recent_trades >= limits.max_trades_per_minute:
+                    results.append((False, f"1分钟内交易次数超限 ({recent_trades})"))
+                    continue
+                
+                position = pending_positions.get(symbol, self.current_positions.get(symbol, 0.0)) + order_size
+                new_position_value = abs(position * order_price)
+                if new_position_value > limits.max_position_size:
+                    results.append((False, f"仓位价值超限: ${new_position_value:.2f} > ${limits.max_position_size}"))
+                    continue
+                
+                position_ratio = new_position_value / self.portfolio_value
+                if position_ratio > limits.max_position_ratio:
+                    results.append((False, f"仓位比例超限: {position_ratio:.2%} > {limits.max_position_ratio:.2%}"))
+                    continue
+                
+                if loss_reason is not None:
+                    results.append((False, loss_reason))
+                    continue
+                
+                history = self.price_history.get(symbol)
+                if history is not None and len(history) >= 2:
+                    last_price = history[-1]
+                    price_change = abs(order_price - last_price) / last_price
+                    if price_change > 0.1:  # 10%价格变化警告
+                        logger.warning(f"⚠️ 价格异常变化: {symbol} {price_change:.2%}")
+                
+                # 通过：计入批内累计
+                recent_trades += 1
+                pending_positions[symbol] = position
+                results.append((True, "风险检查通过"))
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"批量风险检查失败: {e}")
+            return [(False, f"风险检查错误: {str(e)}")] * len(orders)
+        finally:
+            self._risk_check_latency.record(time.perf_counter_ns() - start_ns)
     
     async def update_market_data(self, symbol: str, price: float, volume: float = 0.0):
         """更新市场数据并进行实时风险评估"""
@@ -45,6 +45,8 @@ try:
     FusedSignal = strategy_signal_fusion.FusedSignal
     SignalType = strategy_signal_fusion.SignalType
     
+    from pipeline_runtime import get_pipeline_runtime
+    
     SIGNAL_INTEGRATION_AVAILABLE = True
     logger.info("✅ 信号集成模块导入成功")
 except ImportError as e:
@@ -59,6 +61,7 @@ except ImportError as e:
     stop_realtime_data = None
     create_default_fusion_system = None
     get_data_stream_manager = None
+    get_pipeline_runtime = None
     SIGNAL_INTEGRATION_AVAILABLE = False
 
 @dataclass
@@ -82,6 +85,7 @@ class RealTimeSignalIntegration:
         self.is_running = False
         self.trading_callbacks = []
         self.signal_history = []
+        self.runtime = None  # 管道运行时（数据引擎和信号融合共用的事件循环）
         self.event_loop = None  # 保存事件循环引用
         self.performance_stats = {
             'signals_generated': 0,
@@ -108,15 +112,9 @@ class RealTimeSignalIntegration:
                 logger.error("❌ 关键函数不可用")
                 return False
             
-            # 尝试获取或创建事件循环
-            try:
-                self.event_loop = asyncio.get_event_loop()
-                if self.event_loop.is_closed():
-                    self.event_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(self.event_loop)
-            except RuntimeError:
-                self.event_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(self.event_loop)
+            # 启动管道运行时：数据引擎和信号融合运行在同一个事件循环线程
+            self.runtime = get_pipeline_runtime().start()
+            self.event_loop = self.runtime.loop
             
             # 启动实时数据流
             self.data_manager = start_realtime_data(symbols)
@@ -133,6 +131,9 @@ class RealTimeSignalIntegration:
             # 添加信号回调
             self.fusion_system.add_signal_callback(self._on_fused_signal)
             
+            # 行情经合并队列交给融合系统按微批次处理
+            self.runtime.set_handler(self.fusion_system.process_market_data)
+            
             # 启动融合系统
             self.fusion_system.start()
             
@@ -166,22 +167,10 @@ class RealTimeSignalIntegration:
             if stop_realtime_data:
                 stop_realtime_data()
             
-            # 清理事件循环任务
-            if self.event_loop and not self.event_loop.is_closed():
-                try:
-                    # 取消所有待处理的任务
-                    pending_tasks = asyncio.all_tasks(self.event_loop)
-                    for task in pending_tasks:
-                        if not task.done():
-                            task.cancel()
-                    
-                    # 等待任务完成或取消
-                    if pending_tasks:
-                        self.event_loop.run_until_complete(
-                            asyncio.gather(*pending_tasks, return_exceptions=True)
-                        )
-                except Exception as e:
-                    logger.warning(f"清理异步任务时出现问题: {e}")
+            # 数据流停止后再停止管道运行时（取消剩余任务并关闭事件循环）
+            if self.runtime:
+                self.runtime.set_handler(None)
+                self.runtime.stop()
             
             logger.info("✅ 实时信号集成已停止")
             
@@ -196,23 +185,10 @@ class RealTimeSignalIntegration:
         try:
             symbol = market_data.get('symbol')
             if symbol:
-                # 检查事件循环状态并安全地处理市场数据
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running() and not loop.is_closed():
-                        # 异步处理市场数据，生成信号
-                        asyncio.create_task(
-                            self.fusion_system.process_market_data(symbol, market_data)
-                        )
-                    else:
-                        # 同步处理数据作为备用方案
-                        self.fusion_system.process_market_data_sync(symbol, market_data)
-                except RuntimeError:
-                    # 如果没有事件循环，使用同步处理
-                    if hasattr(self.fusion_system, 'process_market_data_sync'):
-                        self.fusion_system.process_market_data_sync(symbol, market_data)
-                    else:
-                        logger.warning(f"无法处理市场数据: 事件循环不可用，symbol: {symbol}")
+                # 数据线程只做入队，信号融合在运行时事件循环中按微批次执行；
+                # 积压时同一股票只保留最新行情
+                if not self.runtime.submit(symbol, market_data):
+                    logger.debug(f"行情队列已满，丢弃 {symbol}")
                 
         except Exception as e:
             logger.error(f"市场数据处理失败: {e}")
@@ -350,6 +326,9 @@ class RealTimeSignalIntegration:
         if self.fusion_system:
             fusion_stats = self.fusion_system.get_performance_stats()
             stats['signal_fusion'] = fusion_stats
+        
+        if self.runtime:
+            stats['pipeline_runtime'] = self.runtime.get_stats()
             
         return stats
     
@@ -8,7 +8,7 @@
 import asyncio
 import logging
 import time
-from typing import Dict, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 from realtime_risk_engine import RealtimeRiskEngine, RiskLimits, RiskAlert
 
 logger = logging.getLogger(__name__)
@@ -77,6 +77,24 @@ class RiskEngineIntegration:
         
         return can_trade, message
     
+    async def pre_trade_check_batch(self, orders: List[Tuple[str, float, float]]) -> List[tuple]:
+        """批量交易前风险检查 - orders 为 [(股票代码, 订单数量, 订单价格)]，按顺序返回每笔结果"""
+        if not self.is_integrated:
+            return [(True, "风险引擎未启动")] * len(orders)
+        
+        if self.trade_blocked:
+            return [(False, "交易被风险控制阻止")] * len(orders)
+        
+        results = await self.risk_engine.check_pre_trade_risk_batch(orders)
+        
+        rejected = [(order, message) for order, (can_trade, message) in zip(orders, results) if not can_trade]
+        if rejected:
+            logger.warning(f"🚫 批量检查阻止 {len(rejected)}/{len(orders)} 笔交易")
+            for (symbol, order_size, order_price), message in rejected:
+                logger.debug(f"🚫 交易被阻止: {symbol} {order_size}@{order_price} - {message}")
+        
+        return results
+    
     # ================================= 数据更新 =================================
     
     async def update_market_data(self, symbol: str, price: float, volume: float = 0.0):
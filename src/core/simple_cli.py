@@ -22,6 +22,7 @@ from datetime import datetime, timedelta
 # 添加路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
+sys.path.append(os.path.dirname(current_dir))  # src，供 analyzers 等包导入
 
 # 颜色输出
 def print_success(msg): print(f"✅ {msg}")
@@ -31,22 +32,29 @@ def print_header():
     print("🚀 SimpleTrader - 量化交易简化命令行")
     print("=" * 50)
 
-# 尝试导入核心模块
+# 尝试导入核心模块（quick_trade 延迟加载 pandas/yfinance 等依赖，这里不会触发重量级导入）
 CLI_AVAILABLE = True
 import_error = None
 
 try:
+    import quick_trade
     from quick_trade import (
-        get_data, get_price, get_info, get_stock_data,
+        get_price, get_info, get_stock_data,
         test_strategy, list_strategies, create_simple_strategy,
         backtest, compare_strategies,
         start_trading, stop_trading, get_trading_status,
         quick_analysis, system_status, demo, tutorial
     )
+    if not quick_trade.CLI_AVAILABLE:
+        CLI_AVAILABLE = False
+        import_error = f"缺少依赖包 {', '.join(quick_trade._missing_dependencies)}"
 except ImportError as e:
     CLI_AVAILABLE = False
     import_error = str(e)
 
+# 只读写本地文件、不需要数据依赖的轻量命令
+LIGHT_COMMANDS = {'watchlist'}
+
 def handle_data_command(args):
     """处理数据相关命令"""
     if not args.symbol:
@@ -554,14 +562,8 @@ def handle_screen_command(args):
             # 简化版股票池选股
             sample_stocks = get_sample_stocks(pool_name)
             
-            results = []
-            for symbol in sample_stocks[:20]:  # 分析前20只
-                try:
-                    score = analyze_technical_score(symbol)
-                    if score >= args.min_score:
-                        results.append((symbol, score))
-                except:
-                    continue
+            scores = analyze_technical_scores(sample_stocks[:20])  # 分析前20只
+            results = [(symbol, score) for symbol, score in scores.items() if score >= args.min_score]
             
             # 排序并显示结果
             results.sort(key=lambda x: x[1], reverse=True)
@@ -595,14 +597,9 @@ def handle_screen_command(args):
             print_success(f"批量分析自选股池 ({len(stocks)} 只股票):")
             print()
             
-            results = []
-            for symbol in stocks:
-                try:
-                    score = analyze_technical_score(symbol)
-                    results.append((symbol, score))
-                    print(f"  ✅ {symbol}: {score:.1f}分")
-                except Exception as e:
-                    print(f"  ❌ {symbol}: 分析失败")
+            results = list(analyze_technical_scores(stocks).items())
+            for symbol, score in results:
+                print(f"  ✅ {symbol}: {score:.1f}分")
             
             # 排序显示
             results.sort(key=lambda x: x[1], reverse=True)
@@ -615,52 +612,39 @@ def handle_screen_command(args):
 
 def analyze_technical_score(symbol):
     """简化版技术分析评分"""
+    return analyze_technical_scores([symbol])[symbol]
+
+def analyze_technical_scores(symbols):
+    """简化版技术分析评分 - 批量版本
+
+    逐只获取数据后对齐为面板，由向量化技术评分引擎一次性计算全部得分；
+    数据获取失败的股票记为50分。
+    """
+    scores = {symbol: 50.0 for symbol in symbols}
     try:
         from quick_trade import get_data
+        from analyzers.technical_screen import TechnicalScreenEngine
         
         # 获取数据
-        data = get_data(symbol, period='6mo')
-        if data is None or data.empty:
-            return 50.0
-        
-        current_price = data['Close'].iloc[-1]
-        
-        # 移动平均线
-        data['MA5'] = data['Close'].rolling(5).mean()
-        data['MA20'] = data['Close'].rolling(20).mean()
-        data['MA50'] = data['Close'].rolling(50).mean()
-        
-        # 趋势得分
-        trend_score = 0
-        if current_price > data['MA5'].iloc[-1]:
-            trend_score += 25
-        if current_price > data['MA20'].iloc[-1]:
-            trend_score += 35
-        if current_price > data['MA50'].iloc[-1]:
-            trend_score += 40
+        data_by_symbol = {}
+        for symbol in symbols:
+            try:
+                data = get_data(symbol, period='6mo')
+                if data is not None and not data.empty:
+                    data_by_symbol[symbol] = data
+            except Exception:
+                continue
         
-        # RSI计算
-        delta = data['Close'].diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
+        if not data_by_symbol:
+            return scores
         
-        # 动量得分
-        if 40 <= current_rsi <= 70:
-            momentum_score = 100
-        elif 30 <= current_rsi <= 80:
-            momentum_score = 80
-        else:
-            momentum_score = 60
-        
-        # 综合得分
-        technical_score = trend_score * 0.6 + momentum_score * 0.4
-        return min(100, max(0, technical_score))
+        engine = TechnicalScreenEngine(min_history=1)
+        table = engine.score_panel(engine.build_panel(data_by_symbol))
+        scores.update(table['simple_score'].astype(float).to_dict())
+        return scores
         
     except Exception as e:
-        return 50.0
+        return scores
 
 def get_sample_stocks(pool_name):
     """获取示例股票池"""
@@ -721,18 +705,24 @@ def create_parser():
     
     return parser
 
-def main():
-    """主函数"""
+def main(argv=None):
+    """主函数
+
+    Args:
+        argv: 命令行参数（默认取 sys.argv[1:]），main.py 以此在进程内分派子命令
+    """
     print_header()
     
-    if not CLI_AVAILABLE:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    
+    if not CLI_AVAILABLE and not (argv and argv[0] in LIGHT_COMMANDS):
         print_error(f"CLI不可用，导入错误: {import_error}")
         print_info("请确保已安装必要依赖: pip install pandas numpy yfinance")
         return 1
     
     parser = create_parser()
     
-    if len(sys.argv) == 1:
+    if not argv:
         parser.print_help()
         print("\n🎯 快速开始:")
         print("  python simple_cli.py strategy list       # 列出所有策略")
@@ -744,7 +734,7 @@ def main():
         print("  python simple_cli.py strategy multi 'RSI,MACD' AAPL  # 多策略分析")
         return 0
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         if args.command == 'data':
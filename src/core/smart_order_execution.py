@@ -16,6 +16,11 @@ from collections import deque
 from enum import Enum
 import numpy as np
 
+try:
+    from latency_tracker import get_latency_tracker, STAGE_ORDER_SUBMIT, STAGE_ORDER_FILL
+except ImportError:
+    from .latency_tracker import get_latency_tracker, STAGE_ORDER_SUBMIT, STAGE_ORDER_FILL
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -157,6 +162,11 @@ class SmartOrderExecutionEngine:
         self.total_slippage = 0.0
         self.total_execution_time = 0.0
         
+        # 分阶段延迟直方图
+        tracker = get_latency_tracker()
+        self._submit_latency = tracker.get_histogram(STAGE_ORDER_SUBMIT)
+        self._fill_latency = tracker.get_histogram(STAGE_ORDER_FILL)
+        
         # 回调函数
         self.execution_callbacks: List[Callable] = []
         self.order_status_callbacks: List[Callable] = []
@@ -198,6 +208,7 @@ class SmartOrderExecutionEngine:
                           **kwargs) -> str:
         """提交订单"""
         start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
         
         try:
             # 生成订单ID
@@ -248,6 +259,8 @@ class SmartOrderExecutionEngine:
         except Exception as e:
             logger.error(f"订单提交失败: {e}")
             return ""
+        finally:
+            self._submit_latency.record(time.perf_counter_ns() - start_ns)
     
     async def _validate_order(self, order: Order) -> Tuple[bool, str]:
         """订单验证"""
@@ -323,6 +336,7 @@ class SmartOrderExecutionEngine:
     async def _execute_order(self, order: Order):
         """执行订单"""
         start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
         
         try:
             logger.info(f"🔄 开始执行订单: {order.order_id}")
@@ -337,6 +351,7 @@ class SmartOrderExecutionEngine:
             success = await execution_func(order)
             
             if success:
+                self._fill_latency.record(time.perf_counter_ns() - start_ns)
                 order.status = OrderStatus.FILLED
                 self.successful_executions += 1
                 logger.info(f"✅ 订单执行成功: {order.order_id}")
@@ -24,6 +24,11 @@ import pandas as pd
 from threading import Lock
 import json
 
+try:
+    from latency_tracker import get_latency_tracker, STAGE_SIGNAL_GENERATION, STAGE_FUSION
+except ImportError:
+    from .latency_tracker import get_latency_tracker, STAGE_SIGNAL_GENERATION, STAGE_FUSION
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -592,6 +597,11 @@ class StrategySignalFusion:
         self.lock = Lock()
         self.is_running = False
         
+        # 分阶段延迟直方图
+        tracker = get_latency_tracker()
+        self._signal_latency = tracker.get_histogram(STAGE_SIGNAL_GENERATION)
+        self._fusion_latency = tracker.get_histogram(STAGE_FUSION)
+        
         # 添加 strategies 属性（兼容性）
         self.strategies = {}
         
@@ -765,6 +775,7 @@ class StrategySignalFusion:
             return
             
         start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             # 并行生成所有策略信号
@@ -777,6 +788,7 @@ class StrategySignalFusion:
             
             # 等待所有信号生成完成
             signals = await asyncio.gather(*tasks, return_exceptions=True)
+            self._signal_latency.record(time.perf_counter_ns() - start_ns)
             
             # 过滤有效信号
             valid_signals = []
@@ -788,7 +800,9 @@ class StrategySignalFusion:
             
             # 融合信号
             if valid_signals:
+                fusion_start_ns = time.perf_counter_ns()
                 fused_signal = await self._fuse_signals(symbol, valid_signals)
+                self._fusion_latency.record(time.perf_counter_ns() - fusion_start_ns)
                 
                 if fused_signal:
                     # 记录性能统计
@@ -8,9 +8,14 @@ for providing market data to trading strategies.
 from .yahoo_feed import YahooDataFeed
 from .csv_feed import CSVDataFeed
 from .live_feed import LiveDataFeed
+from .columnar_store import OHLCVColumnStore, OHLCVSeries
+from .columnar_feed import ColumnarDataFeed
 
 __all__ = [
     'YahooDataFeed',
     'CSVDataFeed', 
-    'LiveDataFeed'
+    'LiveDataFeed',
+    'OHLCVColumnStore',
+    'OHLCVSeries',
+    'ColumnarDataFeed'
 ]
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""
+Columnar OHLCV store.
+
+This module persists OHLCV bars as one ``.npy`` file per column and
+opens them as read-only memory maps, so backtests can load a series
+without parsing CSV or downloading it again, and many ``Cerebro`` runs
+can share the same mapped arrays.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError as e:
+    print(f"警告: 缺少依赖包 {e}, 列式数据存储功能可能受限")
+    pd = None
+
+
+# Columns stored for every series (besides the datetime column)
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'openinterest')
+
+# Backtrader's date2num of 1970-01-01 (proleptic Gregorian ordinal)
+_EPOCH_ORDINAL = 719163.0
+_NS_PER_DAY = 86400 * 10**9
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'columnar')
+
+
+def datetime_index_to_num(index) -> np.ndarray:
+    """
+    Convert a DatetimeIndex to backtrader date numbers in one pass.
+
+    Timezone-aware timestamps are converted to UTC first, matching
+    ``bt.date2num`` on the individual timestamps.
+
+    Args:
+        index: pandas DatetimeIndex
+
+    Returns:
+        float64 array of backtrader date numbers
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    nanoseconds = index.as_unit('ns').asi8
+    return _EPOCH_ORDINAL + nanoseconds / _NS_PER_DAY
+
+
+class OHLCVSeries:
+    """
+    One symbol's bars as aligned column arrays.
+
+    Arrays may be memory maps owned by an ``OHLCVColumnStore``; they are
+    treated as read-only and shared between every feed built from them.
+    """
+
+    def __init__(self, symbol: str, datetime_num: np.ndarray,
+                 columns: Dict[str, np.ndarray], meta: Optional[dict] = None):
+        self.symbol = symbol
+        self.datetime = datetime_num
+        self.columns = columns
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.datetime)
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """Return a column array (``datetime`` included) or None if absent."""
+        if name == 'datetime':
+            return self.datetime
+        return self.columns.get(name)
+
+    @classmethod
+    def from_dataframe(cls, df, symbol: str = '') -> 'OHLCVSeries':
+        """
+        Build an in-memory series from a DataFrame indexed by datetime.
+
+        Column names are matched case-insensitively; rows with missing
+        prices are dropped and the index is sorted.
+
+        Args:
+            df: DataFrame with Open/High/Low/Close[/Volume] columns
+            symbol: Symbol name
+
+        Returns:
+            OHLCVSeries instance
+        """
+        if pd is None:
+            raise ImportError("pandas is required to build a series from a DataFrame")
+
+        frame = df.rename(columns={col: str(col).strip().lower().replace(' ', '') for col in df.columns})
+        missing = [col for col in ('open', 'high', 'low', 'close') if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+
+        frame = frame[~frame.index.isna()].sort_index()
+        frame = frame.dropna(subset=['open', 'high', 'low', 'close'])
+
+        columns = {}
+        for name in OHLCV_COLUMNS:
+            if name in frame.columns:
+                values = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float64)
+                if name in ('volume', 'openinterest'):
+                    values = np.nan_to_num(values, nan=0.0)
+            else:
+                values = np.zeros(len(frame), dtype=np.float64)
+            columns[name] = np.ascontiguousarray(values)
+
+        return cls(symbol, datetime_index_to_num(frame.index), columns)
+
+    def to_frame(self):
+        """Convert back to a DataFrame indexed by (UTC, naive) datetime."""
+        nanoseconds = np.rint((np.asarray(self.datetime) - _EPOCH_ORDINAL) * _NS_PER_DAY).astype('int64')
+        index = pd.DatetimeIndex(nanoseconds.view('datetime64[ns]'), name='datetime')
+        return pd.DataFrame({name: np.asarray(values) for name, values in self.columns.items()}, index=index)
+
+
+class OHLCVColumnStore:
+    """
+    Directory of per-symbol column files opened as memory maps.
+
+    Layout: ``<root>/<SYMBOL>/meta.json`` plus a version directory
+    ``<root>/<SYMBOL>/<version>/{datetime,open,high,low,close,volume,openinterest}.npy``
+    named by ``meta.json``. Every write goes to a fresh version directory
+    and then atomically replaces ``meta.json``, so memory maps held by
+    earlier readers keep pointing at the old, unchanged files. Opened
+    series are kept in a small LRU cache and reloaded automatically when
+    the symbol is rewritten.
+    """
+
+    def __init__(self, root_dir: str = DEFAULT_STORE_DIR, max_cached: int = 64):
+        self.root_dir = root_dir
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # normalized symbol -> (meta mtime, OHLCVSeries)
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        os.makedirs(root_dir, exist_ok=True)
+
+    @staticmethod
+    def _normalize(symbol: str) -> str:
+        """Directory and cache key for a symbol (case-insensitive)."""
+        return re.sub(r'[^A-Za-z0-9._^=-]', '_', symbol.upper())
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root_dir, self._normalize(symbol))
+
+    @staticmethod
+    def _read_meta(symbol_dir: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(symbol_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _data_dir(symbol_dir: str, meta: dict) -> str:
+        """Directory holding the column files (stores written before versioning keep them next to meta.json)."""
+        version = meta.get('version')
+        return os.path.join(symbol_dir, version) if version else symbol_dir
+
+    def has(self, symbol: str) -> bool:
+        """Check whether a symbol has been written to the store."""
+        return os.path.exists(os.path.join(self._symbol_dir(symbol), 'meta.json'))
+
+    def symbols(self) -> List[str]:
+        """List symbols available in the store."""
+        result = []
+        for name in sorted(os.listdir(self.root_dir)):
+            meta = self._read_meta(os.path.join(self.root_dir, name))
+            if meta is not None:
+                result.append(meta.get('symbol', name))
+        return result
+
+    def write(self, symbol: str, data) -> OHLCVSeries:
+        """
+        Write a symbol's bars, replacing any existing data.
+
+        Columns go to a new version directory and ``meta.json`` is swapped
+        in last with ``os.replace``; the previous version is removed
+        afterwards. Existing memory maps stay valid because their files
+        are never truncated or rewritten in place.
+
+        Args:
+            symbol: Symbol name
+            data: DataFrame indexed by datetime, or an OHLCVSeries
+
+        Returns:
+            The series as memory-mapped from the store
+        """
+        series = data if isinstance(data, OHLCVSeries) else OHLCVSeries.from_dataframe(data, symbol)
+        symbol_dir = self._symbol_dir(symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        previous = self._read_meta(symbol_dir)
+
+        version_dir = tempfile.mkdtemp(prefix='v', dir=symbol_dir)
+        try:
+            np.save(os.path.join(version_dir, 'datetime.npy'),
+                    np.ascontiguousarray(series.datetime, dtype=np.float64))
+            for name in OHLCV_COLUMNS:
+                values = series.column(name)
+                if values is None:
+                    values = np.zeros(len(series), dtype=np.float64)
+                np.save(os.path.join(version_dir, f'{name}.npy'), np.ascontiguousarray(values, dtype=np.float64))
+
+            meta = {
+                'symbol': symbol,
+                'rows': len(series),
+                'columns': list(OHLCV_COLUMNS),
+                'version': os.path.basename(version_dir),
+                'written_at': datetime.now().isoformat()
+            }
+            meta_tmp = os.path.join(version_dir, 'meta.json')
+            with open(meta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+            # Readers resolve columns through meta.json, so this single rename publishes the new version
+            os.replace(meta_tmp, os.path.join(symbol_dir, 'meta.json'))
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+        with self._lock:
+            self._cache.pop(self._normalize(symbol), None)
+
+        if previous is not None:
+            self._remove_version(symbol_dir, previous)
+
+        self.logger.info("Wrote %d bars for %s to columnar store", len(series), symbol)
+        return self.read(symbol)
+
+    def _remove_version(self, symbol_dir: str, meta: dict):
+        """Unlink a superseded version; mapped files stay readable until unmapped."""
+        data_dir = self._data_dir(symbol_dir, meta)
+        if data_dir != symbol_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+            return
+        for name in ('datetime',) + OHLCV_COLUMNS:
+            try:
+                os.remove(os.path.join(symbol_dir, f'{name}.npy'))
+            except OSError:
+                pass
+
+    def read(self, symbol: str) -> OHLCVSeries:
+        """
+        Open a symbol's columns as read-only memory maps.
+
+        Repeated reads return the same cached series until the symbol is
+        rewritten, so feeds for many backtests share one set of mappings.
+
+        Raises:
+            FileNotFoundError: If the symbol is not in the store
+        """
+        key = self._normalize(symbol)
+        symbol_dir = self._symbol_dir(symbol)
+        meta_path = os.path.join(symbol_dir, 'meta.json')
+
+        # A concurrent write may remove the version named by the meta.json we just
+        # read; retry once against the new meta.json.
+        for attempt in range(2):
+            try:
+                mtime = os.stat(meta_path).st_mtime_ns
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Symbol not found in columnar store: {symbol}") from None
+
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] == mtime:
+                    self._cache.move_to_end(key)
+                    return cached[1]
+
+            meta = self._read_meta(symbol_dir)
+            if meta is None:
+                raise FileNotFoundError(f"Symbol not found in columnar store: {symbol}")
+            data_dir = self._data_dir(symbol_dir, meta)
+            try:
+                datetime_num = np.load(os.path.join(data_dir, 'datetime.npy'), mmap_mode='r')
+                columns = {
+                    name: np.load(os.path.join(data_dir, f'{name}.npy'), mmap_mode='r')
+                    for name in meta.get('columns', OHLCV_COLUMNS)
+                }
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+        series = OHLCVSeries(symbol, datetime_num, columns, meta)
+
+        with self._lock:
+            self._cache[key] = (mtime, series)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return series
+
+    def delete(self, symbol: str) -> bool:
+        """Remove a symbol from the store."""
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return False
+        with self._lock:
+            self._cache.pop(self._normalize(symbol), None)
+        shutil.rmtree(symbol_dir)
+        return True
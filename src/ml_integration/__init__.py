@@ -142,6 +142,21 @@ class ModelConfig:
             'cross_validation_folds': self.cross_validation_folds,
             'random_state': self.random_state
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ModelConfig':
+        """从字典创建"""
+        return cls(
+            model_type=ModelType(data['model_type']),
+            prediction_type=PredictionType(data['prediction_type']),
+            parameters=data.get('parameters', {}),
+            feature_columns=data.get('feature_columns', []),
+            target_column=data.get('target_column', ''),
+            validation_split=data.get('validation_split', 0.2),
+            test_split=data.get('test_split', 0.1),
+            cross_validation_folds=data.get('cross_validation_folds', 5),
+            random_state=data.get('random_state', 42)
+        )
 
 
 @dataclass
@@ -214,28 +229,44 @@ class MLModel:
         else:
             raise ValueError("Feature importance not available")
     
-    def save_model(self, filepath: str):
-        """保存模型"""
-        import pickle
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'model': self.model,
-                'config': self.config,
-                'metrics': self.metrics,
-                'feature_importance': self.feature_importance,
+    def save_model(self, filepath: str) -> str:
+        """保存模型为制品目录，返回内容哈希"""
+        from .model_store import save_artifact
+        return save_artifact(
+            filepath,
+            {'model': self.model, 'feature_importance': self.feature_importance},
+            metadata={
+                'name': self.name,
+                'model_class': type(self).__name__,
+                'config': self.config.to_dict(),
+                'metrics': self.metrics.to_dict(),
                 'is_trained': self.is_trained
-            }, f)
+            }
+        )
     
-    def load_model(self, filepath: str):
-        """加载模型"""
+    def load_model(self, filepath: str, mmap: bool = True):
+        """加载模型（兼容旧版单文件pickle格式）"""
+        import os
         import pickle
-        with open(filepath, 'rb') as f:
-            data = pickle.load(f)
-            self.model = data['model']
-            self.config = data['config']
-            self.metrics = data['metrics']
-            self.feature_importance = data['feature_importance']
-            self.is_trained = data['is_trained']
+        from .model_store import load_artifact
+        
+        if os.path.isfile(filepath):
+            with open(filepath, 'rb') as f:
+                data = pickle.load(f)
+                self.model = data['model']
+                self.config = data['config']
+                self.metrics = data['metrics']
+                self.feature_importance = data['feature_importance']
+                self.is_trained = data['is_trained']
+            return
+        
+        data, manifest = load_artifact(filepath, mmap=mmap)
+        metadata = manifest.get('metadata', {})
+        self.model = data['model']
+        self.feature_importance = data['feature_importance']
+        self.config = ModelConfig.from_dict(metadata['config'])
+        self.metrics = ModelMetrics(**metadata.get('metrics', {}))
+        self.is_trained = metadata.get('is_trained', True)
 
 
 # 导出
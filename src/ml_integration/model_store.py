@@ -0,0 +1,302 @@
+"""
+模型制品存储
+
+为ML模型提供版本化、可快速加载的制品格式：
+1. 清单(manifest.json)与权重分离，读取元数据无需加载模型
+2. 大数组以pickle协议5带外缓冲区写入单个权重文件，加载时内存映射
+3. 内容哈希：未变化的模型不会重复写入，也不会重复加载
+4. 按需加载 + LRU，限制常驻内存的模型数量
+
+制品目录结构:
+    <path>/manifest.json          清单（格式版本、内容哈希、元数据、缓冲区偏移）
+    <path>/model-<hash>.pkl       模型对象（不含大数组）
+    <path>/weights-<hash>.bin     大数组原始字节，按64字节对齐
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+DEFAULT_MMAP_THRESHOLD = 64 * 1024  # 小于该字节数的数组直接写入pickle
+_ALIGNMENT = 64
+
+
+def _is_artifact(path: str) -> bool:
+    """判断路径是否为制品目录"""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILENAME))
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """读取制品清单"""
+    with open(os.path.join(path, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    version = manifest.get('format_version', 0)
+    if version > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"不支持的制品格式版本: {version}")
+    return manifest
+
+
+def _write_manifest(path: str, manifest: Dict[str, Any]):
+    """先写临时文件再替换，保证读者看到的清单总是完整的"""
+    manifest_path = os.path.join(path, MANIFEST_FILENAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, manifest_path)
+
+
+def save_artifact(path: str, obj: Any, metadata: Optional[Dict[str, Any]] = None,
+                  mmap_threshold: int = DEFAULT_MMAP_THRESHOLD) -> str:
+    """保存对象为制品，返回内容哈希
+
+    内容与现有制品相同时不重写模型和权重文件，元数据有变化时只更新清单。
+    """
+    buffers: List[pickle.PickleBuffer] = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+        # 返回True表示带内序列化，小数组保留在pickle中
+        if buffer.raw().nbytes < mmap_threshold:
+            return True
+        buffers.append(buffer)
+        return False
+
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+
+    hasher = hashlib.sha256(payload)
+    for buffer in buffers:
+        hasher.update(buffer.raw())
+    content_hash = hasher.hexdigest()
+
+    old = None
+    if _is_artifact(path):
+        try:
+            old = read_manifest(path)
+        except (ValueError, OSError, json.JSONDecodeError):
+            pass
+
+    # 按JSON往返规范化，便于与清单中的元数据比较
+    metadata = json.loads(json.dumps(metadata or {}, ensure_ascii=False, default=str))
+
+    if old is not None and old.get('content_hash') == content_hash:
+        if old.get('metadata') == metadata:
+            logger.debug(f"制品未变化，跳过写入: {path}")
+            return content_hash
+
+        # 模型内容未变，只更新清单中的元数据
+        logger.debug(f"制品内容未变化，仅更新元数据: {path}")
+        manifest = dict(old, metadata=metadata, updated_at=datetime.now().isoformat())
+        _write_manifest(path, manifest)
+        return content_hash
+
+    os.makedirs(path, exist_ok=True)
+    tag = content_hash[:16]
+    payload_file = f"model-{tag}.pkl"
+    weights_file = f"weights-{tag}.bin"
+
+    # 写入权重
+    segments = []
+    offset = 0
+    with open(os.path.join(path, weights_file), 'wb') as f:
+        for buffer in buffers:
+            raw = buffer.raw()
+            padding = (-offset) % _ALIGNMENT
+            if padding:
+                f.write(b'\0' * padding)
+                offset += padding
+            f.write(raw)
+            segments.append({'offset': offset, 'nbytes': raw.nbytes})
+            offset += raw.nbytes
+
+    with open(os.path.join(path, payload_file), 'wb') as f:
+        f.write(payload)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'content_hash': content_hash,
+        'created_at': datetime.now().isoformat(),
+        'payload_file': payload_file,
+        'weights_file': weights_file,
+        'weights_bytes': offset,
+        'buffers': segments,
+        'metadata': metadata
+    }
+
+    old_files = set()
+    if old is not None:
+        old_files = {old.get('payload_file'), old.get('weights_file')}
+
+    _write_manifest(path, manifest)
+
+    # 清理旧版本文件（已映射的进程在POSIX下不受影响）
+    for filename in old_files - {payload_file, weights_file, None}:
+        try:
+            os.remove(os.path.join(path, filename))
+        except OSError:
+            pass
+
+    return content_hash
+
+
+def load_artifact(path: str, mmap: bool = True) -> Tuple[Any, Dict[str, Any]]:
+    """加载制品，返回 (对象, 清单)
+
+    mmap=True 时大数组直接映射权重文件（只读），不复制到内存。
+    """
+    manifest = read_manifest(path)
+
+    with open(os.path.join(path, manifest['payload_file']), 'rb') as f:
+        payload = f.read()
+
+    buffers = []
+    segments = manifest.get('buffers', [])
+    if segments:
+        weights_path = os.path.join(path, manifest['weights_file'])
+        if mmap:
+            weights = memoryview(np.memmap(weights_path, dtype=np.uint8, mode='r'))
+        else:
+            with open(weights_path, 'rb') as f:
+                weights = memoryview(f.read())
+        buffers = [weights[seg['offset']:seg['offset'] + seg['nbytes']] for seg in segments]
+
+    return pickle.loads(payload, buffers=buffers), manifest
+
+
+class ModelArtifactStore:
+    """模型制品仓库
+
+    每个模型对应 root_dir 下的一个制品目录。模型在首次使用时加载，
+    常驻数量超过 max_resident 时淘汰最久未使用的模型；
+    清单内容哈希与常驻版本一致时直接返回缓存对象。
+    """
+
+    def __init__(self, root_dir: str = "models", max_resident: int = 16,
+                 mmap: bool = True, mmap_threshold: int = DEFAULT_MMAP_THRESHOLD):
+        self.root_dir = root_dir
+        self.max_resident = max_resident
+        self.mmap = mmap
+        self.mmap_threshold = mmap_threshold
+
+        # name -> (content_hash, obj)
+        self._resident: 'OrderedDict[str, Tuple[str, Any]]' = OrderedDict()
+        # name -> (manifest mtime_ns, manifest)
+        self._manifests: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+
+        self.stats = {
+            'hits': 0,
+            'loads': 0,
+            'evictions': 0,
+            'saves': 0,
+            'unchanged_saves': 0
+        }
+
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _artifact_path(self, name: str) -> str:
+        """模型名对应的制品目录"""
+        if not name or '..' in name or os.path.isabs(name):
+            raise ValueError(f"无效的模型名称: {name}")
+        return os.path.join(self.root_dir, name)
+
+    def has(self, name: str) -> bool:
+        """是否存在已保存的制品"""
+        return _is_artifact(self._artifact_path(name))
+
+    def get_manifest(self, name: str) -> Optional[Dict[str, Any]]:
+        """获取清单（按文件修改时间缓存，不加载权重）"""
+        manifest_path = os.path.join(self._artifact_path(name), MANIFEST_FILENAME)
+        try:
+            mtime_ns = os.stat(manifest_path).st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._manifests.get(name)
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+
+            manifest = read_manifest(self._artifact_path(name))
+            self._manifests[name] = (mtime_ns, manifest)
+            return manifest
+
+    def list_models(self) -> List[str]:
+        """列出所有已保存的模型"""
+        names = []
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            if MANIFEST_FILENAME in filenames:
+                names.append(os.path.relpath(dirpath, self.root_dir).replace(os.sep, '/'))
+        return sorted(names)
+
+    def save(self, name: str, obj: Any, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """保存模型，返回内容哈希"""
+        path = self._artifact_path(name)
+        with self._lock:
+            previous = self.get_manifest(name)
+            content_hash = save_artifact(path, obj, metadata, self.mmap_threshold)
+
+            if previous and previous.get('content_hash') == content_hash:
+                self.stats['unchanged_saves'] += 1
+            else:
+                self.stats['saves'] += 1
+
+            # 刚保存的对象即为最新版本，直接作为常驻对象
+            self._resident[name] = (content_hash, obj)
+            self._resident.move_to_end(name)
+            self._evict_if_needed()
+            return content_hash
+
+    def load(self, name: str) -> Any:
+        """获取模型对象，首次使用时加载"""
+        manifest = self.get_manifest(name)
+        if manifest is None:
+            raise FileNotFoundError(f"模型制品不存在: {name}")
+
+        with self._lock:
+            resident = self._resident.get(name)
+            if resident and resident[0] == manifest['content_hash']:
+                self._resident.move_to_end(name)
+                self.stats['hits'] += 1
+                return resident[1]
+
+            obj, manifest = load_artifact(self._artifact_path(name), mmap=self.mmap)
+            self._resident[name] = (manifest['content_hash'], obj)
+            self._resident.move_to_end(name)
+            self.stats['loads'] += 1
+            self._evict_if_needed()
+
+            logger.debug(f"模型已加载: {name} ({manifest['content_hash'][:12]})")
+            return obj
+
+    def evict(self, name: str):
+        """从内存中移除模型"""
+        with self._lock:
+            self._resident.pop(name, None)
+
+    def _evict_if_needed(self):
+        """淘汰超出容量的最久未使用模型"""
+        while len(self._resident) > self.max_resident:
+            name, _ = self._resident.popitem(last=False)
+            self.stats['evictions'] += 1
+            logger.debug(f"模型已淘汰: {name}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取仓库统计"""
+        with self._lock:
+            return {
+                **self.stats,
+                'resident_models': list(self._resident.keys()),
+                'max_resident': self.max_resident
+            }
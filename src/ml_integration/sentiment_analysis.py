@@ -15,6 +15,8 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass, field
+from collections import OrderedDict
+import hashlib
 import warnings
 import re
 
@@ -123,7 +125,9 @@ class MarketSentiment:
 class TextSentimentAnalyzer:
     """文本情感分析器"""
     
-    def __init__(self):
+    _CLEAN_PATTERN = re.compile(r'[^\w\s.,!?-]')
+    
+    def __init__(self, cache_size: int = 200000):
         # 金融领域特定的词典
         self.positive_words = {
             'bullish', 'buy', 'strong', 'growth', 'profit', 'gain', 'rise', 'surge',
@@ -141,6 +145,15 @@ class TextSentimentAnalyzer:
             'earnings', 'revenue', 'eps', 'guidance', 'forecast', 'outlook',
             'dividend', 'buyback', 'merger', 'acquisition', 'ipo', 'sec'
         }
+        
+        # 批量评分：编译后的词典正则和按内容哈希的结果缓存
+        self.cache_size = cache_size
+        self._score_cache: OrderedDict = OrderedDict()
+        self._lexicon_signature = None
+        self._lexicon_pattern = None
+        self._lexicon_membership: Dict[str, Tuple[bool, bool, bool, bool]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def analyze_text(self, text: str) -> SentimentPoint:
         """分析文本情感"""
@@ -233,6 +246,162 @@ class TextSentimentAnalyzer:
         
         confidence = min(1.0, (financial_density + sentiment_density) * 2)
         return confidence
+    
+    def analyze_batch(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """批量分析文本情感
+        
+        与 analyze_text 评分规则一致，但词典只编译一次，全部文本合并后一次性分词匹配；
+        重复文本按内容哈希缓存。返回按输入顺序排列的数组字典：
+        score, confidence, base_sentiment, financial_sentiment, has_financial_keywords, text_length
+        """
+        n = len(texts)
+        result = {
+            'score': np.zeros(n),
+            'confidence': np.zeros(n),
+            'base_sentiment': np.zeros(n),
+            'financial_sentiment': np.zeros(n),
+            'has_financial_keywords': np.zeros(n, dtype=bool),
+            'text_length': np.array([len(t) if t else 0 for t in texts], dtype=np.int64)
+        }
+        if n == 0:
+            return result
+        
+        self._ensure_lexicon()
+        
+        # 内容哈希去重，只计算未缓存的文本
+        keys = [self._text_key(text) if text else None for text in texts]
+        pending: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key is None or key in pending:
+                continue
+            if key in self._score_cache:
+                self.cache_hits += 1
+            else:
+                pending[key] = text
+        
+        if pending:
+            self.cache_misses += len(pending)
+            self._score_uncached(pending)
+        
+        cache = self._score_cache
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+            cached = cache.get(key)
+            if cached is None:  # 本批次内被淘汰，按单条重新计算
+                self._score_uncached({key: texts[i]})
+                cached = cache[key]
+            score, confidence, base, financial, has_financial = cached
+            result['score'][i] = score
+            result['confidence'][i] = confidence
+            result['base_sentiment'][i] = base
+            result['financial_sentiment'][i] = financial
+            result['has_financial_keywords'][i] = has_financial
+        
+        return result
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取批量评分缓存统计"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'cache_size': len(self._score_cache),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total > 0 else 0.0
+        }
+    
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        """文本内容哈希"""
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    
+    def _ensure_lexicon(self):
+        """将金融词典编译为单个正则（词典变化时重新编译并清空缓存）
+
+        同时出现在多个词表中的词只匹配一次，再按词表归属同时计入各类计数，
+        与 analyze_text 的逐词判断一致。
+        """
+        signature = (frozenset(self.positive_words), frozenset(self.negative_words),
+                     frozenset(self.financial_keywords))
+        if signature == self._lexicon_signature:
+            return
+        
+        positive, negative, financial = signature
+        vocabulary = positive | negative | financial
+        # 长词优先，避免前缀截断
+        alternation = '|'.join(re.escape(w) for w in sorted(vocabulary, key=len, reverse=True)) or '(?!)'
+        
+        # 与 text.split() 的整词匹配等价：前后均为空白或边界
+        self._lexicon_pattern = re.compile(r'(?<!\S)(?:' + alternation + r')(?!\S)')
+        # 词 -> (正面, 负面, 金融关键词, 情感词)
+        self._lexicon_membership = {
+            word: (word in positive, word in negative, word in financial,
+                   word in positive or word in negative)
+            for word in vocabulary
+        }
+        self._lexicon_signature = signature
+        self._score_cache.clear()
+    
+    def _score_uncached(self, pending: Dict[bytes, str]):
+        """批量计算未缓存文本的情感并写入缓存"""
+        keys = list(pending.keys())
+        raw_texts = [pending[key].replace('\n', ' ') for key in keys]
+        
+        # 合并为单个字符串，一次完成小写化、清洗和词典匹配
+        joined = self._CLEAN_PATTERN.sub('', '\n'.join(raw_texts).lower())
+        cleaned = joined.split('\n')
+        
+        line_starts = np.zeros(len(cleaned), dtype=np.int64)
+        if len(cleaned) > 1:
+            line_starts[1:] = np.cumsum([len(line) + 1 for line in cleaned[:-1]])
+        
+        positions = []
+        memberships = []
+        membership = self._lexicon_membership
+        for match in self._lexicon_pattern.finditer(joined):
+            positions.append(match.start())
+            memberships.append(membership[match.group()])
+        
+        counts = np.zeros((len(cleaned), 4))
+        if positions:
+            rows = np.searchsorted(line_starts, np.asarray(positions), side='right') - 1
+            np.add.at(counts, rows, np.asarray(memberships, dtype=float))
+        positive_count, negative_count, financial_count, sentiment_word_count = counts.T
+        total_words = np.array([len(line.split()) for line in cleaned], dtype=float)
+        
+        # TextBlob基础情感（无批量接口，逐条计算）
+        if TEXTBLOB_AVAILABLE:
+            base_sentiment = np.array([TextBlob(' '.join(line.split())).sentiment.polarity
+                                       for line in cleaned])
+        else:
+            base_sentiment = np.zeros(len(cleaned))
+        base_confidence = np.abs(base_sentiment)
+        
+        # 金融词典评分（与 _financial_sentiment_score / _calculate_financial_confidence 一致）
+        polar_words = positive_count + negative_count
+        financial_sentiment = np.divide(positive_count - negative_count, polar_words,
+                                        out=np.zeros_like(polar_words), where=polar_words > 0)
+        financial_confidence = np.minimum(1.0, np.divide(
+            (financial_count + sentiment_word_count) * 2, total_words,
+            out=np.zeros_like(total_words), where=total_words > 0))
+        has_financial = financial_confidence > 0.1
+        
+        combined_sentiment = np.where(has_financial,
+                                      base_sentiment * 0.6 + financial_sentiment * 0.4,
+                                      base_sentiment)
+        combined_confidence = np.where(has_financial,
+                                       np.maximum(base_confidence, financial_confidence),
+                                       base_confidence)
+        combined_sentiment = np.clip(combined_sentiment, -1.0, 1.0)
+        combined_confidence = np.clip(combined_confidence, 0.0, 1.0)
+        
+        cache = self._score_cache
+        for i, key in enumerate(keys):
+            cache[key] = (float(combined_sentiment[i]), float(combined_confidence[i]),
+                          float(base_sentiment[i]), float(financial_sentiment[i]),
+                          bool(has_financial[i]))
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
 
 
 class TechnicalSentimentAnalyzer:
@@ -410,139 +579,150 @@ class TechnicalSentimentAnalyzer:
 
 
 class MarketDataSentimentAnalyzer:
-    """市场数据情感分析器"""
+    """市场数据情感分析器
+    
+    所有成分都在按日期对齐的 (日期 × 股票) 面板上以列向量方式计算，
+    一次计算即可得到逐日的恐慌贪婪指数历史，最新值即为当前指数。
+    """
+    
+    COMPONENT_WEIGHTS = {
+        'momentum': 0.25,    # 价格动量
+        'volatility': 0.25,  # 市场波动率
+        'breadth': 0.25,     # 市场广度
+        'volume': 0.25       # 成交量
+    }
+    
+    def build_market_panel(self, market_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """将各股票数据对齐为 (日期 × 股票) 的收盘价和成交量面板"""
+        closes = {}
+        volumes = {}
+        for symbol, data in market_data.items():
+            if data is None or len(data) == 0:
+                continue
+            close_col = 'close' if 'close' in data.columns else 'Close'
+            if close_col not in data.columns:
+                continue
+            closes[symbol] = data[close_col]
+            volume_col = 'volume' if 'volume' in data.columns else 'Volume'
+            if volume_col in data.columns:
+                volumes[symbol] = data[volume_col]
+        
+        # 由字典直接构造得到单个连续数值块，列运算无需逐列分派
+        close = pd.DataFrame(closes, dtype=float).sort_index() if closes else pd.DataFrame()
+        volume = (pd.DataFrame(volumes, dtype=float).reindex(close.index)
+                  if volumes else pd.DataFrame(index=close.index))
+        return {'close': close, 'volume': volume}
+    
+    def calculate_fear_greed_history(self, market_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """一次性计算逐日恐慌贪婪指数及各成分
+        
+        Returns:
+            以日期为索引的DataFrame，列为 momentum, volatility, breadth, volume, fear_greed_index
+        """
+        panel = self.build_market_panel(market_data)
+        close = panel['close']
+        
+        history = pd.DataFrame({
+            'momentum': self._momentum_component(close),
+            'volatility': self._volatility_component(close),
+            'breadth': self._breadth_component(close),
+            'volume': self._volume_component(close, panel['volume'])
+        }, index=close.index).fillna(0.0)
+        
+        # 加权平均后转换到0-100范围（0=极度恐慌，100=极度贪婪）
+        fear_greed_score = sum(history[name] * weight for name, weight in self.COMPONENT_WEIGHTS.items())
+        history['fear_greed_index'] = ((fear_greed_score + 1) * 50).clip(0, 100)
+        return history
     
     def calculate_fear_greed_index(self, market_data: Dict[str, pd.DataFrame]) -> float:
         """计算恐慌贪婪指数"""
-        components = []
+        history = self.calculate_fear_greed_history(market_data)
+        if history.empty:
+            return 50.0
+        return float(history['fear_greed_index'].iloc[-1])
+    
+    @staticmethod
+    def _observation_count(panel: pd.DataFrame) -> pd.DataFrame:
+        """截至每个日期各股票的有效观测数"""
+        return panel.notna().cumsum()
+    
+    @staticmethod
+    def _latest(component: pd.Series) -> float:
+        """取成分最新值"""
+        if component.empty or pd.isna(component.iloc[-1]):
+            return 0.0
+        return float(component.iloc[-1])
+    
+    def _momentum_component(self, close: pd.DataFrame) -> pd.Series:
+        """动量成分：5日与20日动量均值，跨股票平均"""
+        momentum_5d = close / close.shift(5) - 1
+        momentum_20d = close / close.shift(20) - 1
+        avg_momentum = ((momentum_5d + momentum_20d) / 2).where(self._observation_count(close) >= 20)
+        
+        # 标准化到-1到1范围
+        return (avg_momentum.mean(axis=1) * 5).clip(-1, 1)
+    
+    def _volatility_component(self, close: pd.DataFrame) -> pd.Series:
+        """波动率成分：当前10日波动率相对历史50日波动率均值，高波动率 = 恐慌"""
+        returns = close.pct_change(fill_method=None)
+        current_vol = returns.rolling(10).std()
+        historical_vol = returns.rolling(50).std().expanding().mean()
         
-        # 1. 价格动量（25%权重）
-        momentum_score = self._calculate_momentum_sentiment(market_data)
-        components.append(('momentum', momentum_score, 0.25))
+        vol_ratio = (current_vol / historical_vol).where(historical_vol > 0, 1.0)
+        vol_sentiment = -(vol_ratio - 1)  # 1为中性，>1为负面，<1为正面
+        vol_sentiment = vol_sentiment.where(self._observation_count(close) >= 50)
         
-        # 2. 市场波动率（25%权重）
-        volatility_score = self._calculate_volatility_sentiment(market_data)
-        components.append(('volatility', volatility_score, 0.25))
+        return vol_sentiment.mean(axis=1).clip(-1, 1)
+    
+    def _breadth_component(self, close: pd.DataFrame) -> pd.Series:
+        """市场广度成分：(上涨家数 - 下跌家数) / (上涨 + 下跌)"""
+        if close.shape[1] < 2:
+            return pd.Series(0.0, index=close.index)
         
-        # 3. 市场广度（25%权重）
-        breadth_score = self._calculate_market_breadth(market_data)
-        components.append(('breadth', breadth_score, 0.25))
+        change = close / close.shift(1) - 1
+        advancing = (change > 0).sum(axis=1)
+        declining = (change < 0).sum(axis=1)
+        total = advancing + declining
         
-        # 4. 成交量（25%权重）
-        volume_score = self._calculate_volume_sentiment(market_data)
-        components.append(('volume', volume_score, 0.25))
+        return ((advancing - declining) / total.where(total > 0)).fillna(0.0)
+    
+    def _volume_component(self, close: pd.DataFrame, volume: pd.DataFrame) -> pd.Series:
+        """成交量成分：放量上涨为正面，放量下跌为负面"""
+        if volume.empty or volume.shape[1] == 0:
+            return pd.Series(0.0, index=close.index)
         
-        # 加权平均
-        fear_greed_score = sum(score * weight for _, score, weight in components)
+        close = close.reindex(columns=volume.columns)
+        volume_ma = volume.rolling(20).mean()
+        volume_ratio = (volume / volume_ma).where(volume_ma > 0, 1.0)
+        price_change = close / close.shift(1) - 1
         
-        # 转换到0-100范围（0=极度恐慌，100=极度贪婪）
-        fear_greed_index = (fear_greed_score + 1) * 50
+        # 量价配合分析
+        scores = pd.DataFrame(
+            np.where(volume_ratio > 1.2, np.where(price_change > 0, 0.3, -0.3), 0.0),
+            index=volume.index, columns=volume.columns
+        )
+        # 当日没有行情的股票（数据提前结束或缺失）不参与横截面平均，与逐只计算一致
+        has_bar = volume.notna() & close.notna()
+        scores = scores.where(has_bar & (self._observation_count(close) >= 20))
         
-        return max(0, min(100, fear_greed_index))
+        return scores.mean(axis=1)
     
     def _calculate_momentum_sentiment(self, market_data: Dict[str, pd.DataFrame]) -> float:
         """计算动量情感"""
-        momentum_scores = []
-        
-        for symbol, data in market_data.items():
-            if len(data) >= 20:
-                close = data['close'] if 'close' in data.columns else data['Close']
-                
-                # 短期动量
-                momentum_5d = (close.iloc[-1] - close.iloc[-6]) / close.iloc[-6]
-                momentum_20d = (close.iloc[-1] - close.iloc[-21]) / close.iloc[-21]
-                
-                # 综合动量
-                avg_momentum = (momentum_5d + momentum_20d) / 2
-                momentum_scores.append(avg_momentum)
-        
-        if momentum_scores:
-            overall_momentum = np.mean(momentum_scores)
-            # 标准化到-1到1范围
-            return max(-1, min(1, overall_momentum * 5))
-        else:
-            return 0.0
+        return self._latest(self._momentum_component(self.build_market_panel(market_data)['close']))
     
     def _calculate_volatility_sentiment(self, market_data: Dict[str, pd.DataFrame]) -> float:
         """计算波动率情感"""
-        volatility_scores = []
-        
-        for symbol, data in market_data.items():
-            if len(data) >= 50:
-                close = data['close'] if 'close' in data.columns else data['Close']
-                returns = close.pct_change()
-                
-                # 当前波动率vs历史波动率
-                current_vol = returns.rolling(10).std().iloc[-1]
-                historical_vol = returns.rolling(50).std().mean()
-                
-                vol_ratio = current_vol / historical_vol if historical_vol > 0 else 1.0
-                
-                # 高波动率 = 恐慌
-                vol_sentiment = -(vol_ratio - 1)  # 1为中性，>1为负面，<1为正面
-                volatility_scores.append(vol_sentiment)
-        
-        if volatility_scores:
-            overall_volatility = np.mean(volatility_scores)
-            return max(-1, min(1, overall_volatility))
-        else:
-            return 0.0
+        return self._latest(self._volatility_component(self.build_market_panel(market_data)['close']))
     
     def _calculate_market_breadth(self, market_data: Dict[str, pd.DataFrame]) -> float:
         """计算市场广度"""
-        if len(market_data) < 2:
-            return 0.0
-        
-        advancing_stocks = 0
-        declining_stocks = 0
-        
-        for symbol, data in market_data.items():
-            if len(data) >= 2:
-                close = data['close'] if 'close' in data.columns else data['Close']
-                change = (close.iloc[-1] - close.iloc[-2]) / close.iloc[-2]
-                
-                if change > 0:
-                    advancing_stocks += 1
-                elif change < 0:
-                    declining_stocks += 1
-        
-        total_stocks = advancing_stocks + declining_stocks
-        if total_stocks > 0:
-            advance_decline_ratio = (advancing_stocks - declining_stocks) / total_stocks
-            return advance_decline_ratio
-        else:
-            return 0.0
+        return self._latest(self._breadth_component(self.build_market_panel(market_data)['close']))
     
     def _calculate_volume_sentiment(self, market_data: Dict[str, pd.DataFrame]) -> float:
         """计算成交量情感"""
-        volume_scores = []
-        
-        for symbol, data in market_data.items():
-            volume_col = 'volume' if 'volume' in data.columns else data.get('Volume')
-            if volume_col is not None and len(data) >= 20:
-                volume = data[volume_col]
-                close = data['close'] if 'close' in data.columns else data['Close']
-                
-                # 成交量相对于平均值
-                volume_ma = volume.rolling(20).mean()
-                volume_ratio = volume.iloc[-1] / volume_ma.iloc[-1] if volume_ma.iloc[-1] > 0 else 1.0
-                
-                # 价格变化
-                price_change = (close.iloc[-1] - close.iloc[-2]) / close.iloc[-2]
-                
-                # 量价配合分析
-                if volume_ratio > 1.2:  # 放量
-                    if price_change > 0:
-                        volume_scores.append(0.3)  # 放量上涨，正面
-                    else:
-                        volume_scores.append(-0.3)  # 放量下跌，负面
-                else:
-                    volume_scores.append(0.0)  # 正常量，中性
-        
-        if volume_scores:
-            return np.mean(volume_scores)
-        else:
-            return 0.0
+        panel = self.build_market_panel(market_data)
+        return self._latest(self._volume_component(panel['close'], panel['volume']))
 
 
 class SentimentAnalysisEngine:
@@ -568,14 +748,24 @@ class SentimentAnalysisEngine:
         
         # 新闻情感分析
         if news_texts:
-            news_sentiments = []
-            for text in news_texts:
-                news_sentiment = self.text_analyzer.analyze_text(text)
-                sentiment_points.append(news_sentiment)
-                news_sentiments.append(news_sentiment.score)
+            news_scores = self.text_analyzer.analyze_batch(news_texts)
+            analysis_time = datetime.now()
+            for i, text in enumerate(news_texts):
+                sentiment_points.append(SentimentPoint(
+                    timestamp=analysis_time,
+                    source=SentimentSource.NEWS,
+                    score=float(news_scores['score'][i]),
+                    confidence=float(news_scores['confidence'][i]),
+                    text=text[:200] if text else None,
+                    metadata={
+                        'text_length': int(news_scores['text_length'][i]),
+                        'base_sentiment': float(news_scores['base_sentiment'][i]),
+                        'financial_sentiment': float(news_scores['financial_sentiment'][i]),
+                        'has_financial_keywords': bool(news_scores['has_financial_keywords'][i])
+                    } if text else {}
+                ))
             
-            if news_sentiments:
-                source_scores[SentimentSource.NEWS] = np.mean(news_sentiments)
+            source_scores[SentimentSource.NEWS] = float(np.mean(news_scores['score']))
         
         # 市场数据情感
         if market_data:
@@ -110,6 +110,111 @@ class TrendAnalysis:
         }
 
 
+# ===== 数组版趋势计算 =====
+
+def linear_trend_from_sums(n, sum_y, sum_yy, sum_xy):
+    """由累积和计算线性回归斜率和R²（x 为 0..n-1，支持数组批量计算）
+    
+    Returns:
+        (slope, r_squared)；价格不变时 R² 记为 0
+    """
+    n = np.asarray(n, dtype=float)
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    
+    cov = n * sum_xy - sum_x * sum_y
+    var_x = n * sum_xx - sum_x * sum_x
+    var_y = n * sum_yy - sum_y * sum_y
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(var_x > 0, cov / var_x, 0.0)
+        r_squared = np.where((var_x > 0) & (var_y > 0), cov * cov / (var_x * var_y), 0.0)
+    return slope, np.clip(r_squared, 0.0, 1.0)
+
+
+def linear_trend(values: np.ndarray) -> Tuple[float, float]:
+    """整段序列的线性回归斜率和R²（一次求和，不拟合模型）"""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    # 以首个值为基准减小累积和的数量级，斜率和R²不受平移影响
+    y = values - values[0]
+    x = np.arange(n, dtype=float)
+    slope, r_squared = linear_trend_from_sums(n, y.sum(), np.dot(y, y), np.dot(x, y))
+    return float(slope), float(r_squared)
+
+
+def zigzag_pivots(values: np.ndarray, threshold: float,
+                  initial_chunk: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """计算ZigZag转折点
+    
+    与逐点状态机结果一致：每段趋势内用累积最大/最小值一次找出反转位置，
+    分块扫描（块大小自适应增长），总计算量约为 O(n)。
+    
+    Returns:
+        (转折点位置数组, 转折点价格数组)，最后一个点为当前未确认的极值
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    
+    pivots = []
+    extreme_idx, extreme_value = 0, values[0]
+    
+    # 初始阶段：极值固定为首个点，直到相对变化超过阈值
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (values[1:] - extreme_value) / extreme_value
+    started = np.flatnonzero(np.abs(change) >= threshold)
+    if len(started) == 0:
+        return np.array([0], dtype=np.intp), values[:1].copy()
+    
+    i = int(started[0]) + 1
+    trend = 1 if change[i - 1] > 0 else -1
+    pivots.append(0)
+    extreme_idx, extreme_value = i, values[i]
+    
+    position = i + 1
+    chunk = initial_chunk
+    while position < n:
+        block = values[position:position + chunk]
+        if trend == 1:
+            running = np.fmax.accumulate(np.concatenate(([extreme_value], block)))
+            previous = running[:-1]
+            new_extreme = block > previous
+            with np.errstate(divide='ignore', invalid='ignore'):
+                reversal = ~new_extreme & ((block - previous) / previous <= -threshold)
+        else:
+            running = np.fmin.accumulate(np.concatenate(([extreme_value], block)))
+            previous = running[:-1]
+            new_extreme = block < previous
+            with np.errstate(divide='ignore', invalid='ignore'):
+                reversal = ~new_extreme & ((block - previous) / previous >= threshold)
+        
+        hits = np.flatnonzero(reversal)
+        end = hits[0] if len(hits) else len(block)
+        
+        # 反转前最后一次创出新极值的位置
+        updates = np.flatnonzero(new_extreme[:end])
+        if len(updates):
+            extreme_idx = position + int(updates[-1])
+            extreme_value = block[updates[-1]]
+        
+        if len(hits):
+            pivots.append(extreme_idx)
+            trend = -trend
+            extreme_idx = position + int(end)
+            extreme_value = block[end]
+            position = extreme_idx + 1
+            chunk = initial_chunk
+        else:
+            position += len(block)
+            chunk *= 2
+    
+    pivots.append(extreme_idx)
+    pivots = np.asarray(pivots, dtype=np.intp)
+    return pivots, values[pivots]
+
+
 class TrendDetector:
     """趋势检测器"""
     
@@ -121,23 +226,8 @@ class TrendDetector:
         if len(data) < min_periods:
             return self._create_unknown_trend(data)
         
-        # 准备数据
-        x = np.arange(len(data))
-        y = data.values
-        
-        if SCIPY_SKLEARN_AVAILABLE:
-            # 线性回归
-            model = LinearRegression()
-            model.fit(x.reshape(-1, 1), y)
-            
-            # 计算R²
-            y_pred = model.predict(x.reshape(-1, 1))
-            r_squared = stats.pearsonr(y, y_pred)[0] ** 2
-            slope = model.coef_[0]
-        else:
-            # 简单线性回归
-            slope = np.polyfit(x, y, 1)[0]
-            r_squared = np.corrcoef(x, y)[0, 1] ** 2
+        # 线性回归（由累积和直接求斜率和R²）
+        slope, r_squared = linear_trend(data.to_numpy(dtype=float))
         
         # 判断趋势方向
         direction = self._classify_trend_direction(slope, r_squared)
@@ -285,47 +375,8 @@ class TrendDetector:
     
     def _calculate_zigzag(self, data: pd.Series, threshold: float) -> List[Tuple[int, float]]:
         """计算ZigZag点"""
-        points = []
-        current_trend = None  # 1 for up, -1 for down
-        last_extreme_idx = 0
-        last_extreme_value = data.iloc[0]
-        
-        for i in range(1, len(data)):
-            current_value = data.iloc[i]
-            change = (current_value - last_extreme_value) / last_extreme_value
-            
-            if current_trend is None:
-                if abs(change) >= threshold:
-                    current_trend = 1 if change > 0 else -1
-                    points.append((last_extreme_idx, last_extreme_value))
-                    last_extreme_idx = i
-                    last_extreme_value = current_value
-            elif current_trend == 1:  # 上升趋势
-                if current_value > last_extreme_value:
-                    # 继续上升，更新极值
-                    last_extreme_idx = i
-                    last_extreme_value = current_value
-                elif change <= -threshold:
-                    # 趋势反转
-                    points.append((last_extreme_idx, last_extreme_value))
-                    current_trend = -1
-                    last_extreme_idx = i
-                    last_extreme_value = current_value
-            else:  # 下降趋势
-                if current_value < last_extreme_value:
-                    # 继续下降，更新极值
-                    last_extreme_idx = i
-                    last_extreme_value = current_value
-                elif change >= threshold:
-                    # 趋势反转
-                    points.append((last_extreme_idx, last_extreme_value))
-                    current_trend = 1
-                    last_extreme_idx = i
-                    last_extreme_value = current_value
-        
-        # 添加最后一个点
-        points.append((last_extreme_idx, last_extreme_value))
-        return points
+        indices, prices = zigzag_pivots(data.to_numpy(dtype=float), threshold)
+        return list(zip(indices.tolist(), prices))
     
     def _classify_trend_direction(self, slope: float, r_squared: float) -> TrendDirection:
         """分类趋势方向"""
@@ -446,29 +497,33 @@ class SupportResistanceDetector:
         return support_levels, resistance_levels
     
     def _find_local_extrema(self, data: pd.Series, window: int) -> Tuple[List[float], List[float]]:
-        """寻找局部极值"""
+        """寻找局部极值（滚动最大/最小值，O(n)，与窗口大小无关）"""
+        values = data.to_numpy(dtype=float)
+        
         if SCIPY_SKLEARN_AVAILABLE:
-            # 使用scipy寻找峰值和谷值
-            highs_idx = argrelextrema(data.values, np.greater, order=window)[0]
-            lows_idx = argrelextrema(data.values, np.less, order=window)[0]
-            
-            highs = data.iloc[highs_idx].tolist()
-            lows = data.iloc[lows_idx].tolist()
+            # 严格大于/小于前后 window 个点（边界处窗口截断，首尾点不算极值），
+            # 与 argrelextrema(order=window) 结果一致
+            highs_mask = self._strict_extrema_mask(values, window, np.finfo(float).max, lambda rolling: rolling.max(), np.greater)
+            lows_mask = self._strict_extrema_mask(values, window, -np.finfo(float).max, lambda rolling: rolling.min(), np.less)
         else:
-            # 简单的滑动窗口方法
-            highs = []
-            lows = []
-            
-            for i in range(window, len(data) - window):
-                window_data = data.iloc[i-window:i+window+1]
-                current_price = data.iloc[i]
-                
-                if current_price == window_data.max():
-                    highs.append(current_price)
-                elif current_price == window_data.min():
-                    lows.append(current_price)
-        
-        return highs, lows
+            # 居中滑动窗口的最大/最小值
+            rolling = pd.Series(values).rolling(2 * window + 1, center=True, min_periods=1)
+            inner = np.zeros(len(values), dtype=bool)
+            inner[window:len(values) - window] = True
+            highs_mask = inner & (values == rolling.max().to_numpy())
+            lows_mask = inner & ~highs_mask & (values == rolling.min().to_numpy())
+        
+        return values[highs_mask].tolist(), values[lows_mask].tolist()
+    
+    @staticmethod
+    def _strict_extrema_mask(values: np.ndarray, window: int, nan_fill: float,
+                             reduce, compare) -> np.ndarray:
+        """与前 window 个点和后 window 个点中的极值比较（NaN 邻居视为不可超越）"""
+        filled = np.where(np.isnan(values), nan_fill, values)
+        before = reduce(pd.Series(filled).rolling(window, min_periods=1)).shift(1).to_numpy()
+        after = reduce(pd.Series(filled[::-1]).rolling(window, min_periods=1)).shift(1).to_numpy()[::-1]
+        with np.errstate(invalid='ignore'):
+            return compare(values, before) & compare(values, after)
     
     def _cluster_levels(self, prices: List[float], data: pd.Series,
                        min_touches: int) -> List[float]:
@@ -562,13 +617,23 @@ class TrendAnalysisEngine:
         
         results = {}
         
+        # 所有时间框架共用基础序列的一次累积和，不再逐个复制重采样
+        prices = data[price_column]
+        values = prices.to_numpy(dtype=float)
+        missing = np.isnan(values)
+        base = values[~missing][0] if (~missing).any() else 0.0
+        cumulative = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values - base))))
+        missing_count = np.concatenate(([0], np.cumsum(missing)))
+        
         for tf in timeframes:
             if len(data) >= tf:
-                # 重采样到指定时间框架
-                tf_data = data[price_column].rolling(tf).mean().dropna()
+                # 重采样到指定时间框架（滚动均值，窗口内有缺失值时丢弃）
+                smoothed = (cumulative[tf:] - cumulative[:-tf]) / tf + base
+                valid = missing_count[tf:] == missing_count[:-tf]
+                tf_data = pd.Series(smoothed[valid], index=data.index[tf - 1:][valid], copy=False)
                 
                 if len(tf_data) > 10:  # 确保有足够数据
-                    tf_data.name = f"{getattr(data[price_column], 'name', 'UNKNOWN')}_{tf}D"
+                    tf_data.name = f"{getattr(prices, 'name', 'UNKNOWN')}_{tf}D"
                     results[f'{tf}D'] = self.comprehensive_trend_analysis(tf_data)
         
         return results
@@ -610,9 +675,218 @@ class TrendAnalysisEngine:
         return signals
 
 
+class LiveTrendTracker:
+    """
+    多股票实时趋势跟踪器
+    
+    每只股票一行状态，所有状态按列存放在 numpy 数组中；每根新K线对全部股票做一次
+    O(股票数) 的向量化更新，无需重算历史：
+    - 线性趋势：最近 window 根K线的滚动累积和 (Σy, Σy², Σxy) 直接得出斜率和R²
+    - 均线趋势：短/长周期滚动和
+    - ZigZag：逐K线推进的状态机，保留最近 max_pivots 个转折点
+    
+    累积和每 window 根K线按缓冲区重新求和一次，避免长期运行的浮点误差累积。
+    """
+    
+    def __init__(self, symbols: List[str], window: int = 60, short_window: int = 20,
+                 long_window: int = 50, zigzag_threshold: float = 0.05, max_pivots: int = 16):
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.window = window
+        self.short_window = short_window
+        self.long_window = long_window
+        self.zigzag_threshold = zigzag_threshold
+        self.max_pivots = max_pivots
+        
+        count = len(self.symbols)
+        self.buffer_size = max(window, long_window)
+        self.buffer = np.full((count, self.buffer_size), np.nan)  # 最近价格（环形缓冲区）
+        self.bars = 0  # 已处理K线数
+        self.last_timestamp = None
+        
+        # 线性趋势累积和（价格以各股票首个价格为基准）
+        self.base = np.full(count, np.nan)
+        self.sum_y = np.zeros(count)
+        self.sum_yy = np.zeros(count)
+        self.sum_xy = np.zeros(count)
+        
+        # 均线滚动和
+        self.sum_short = np.zeros(count)
+        self.sum_long = np.zeros(count)
+        
+        # ZigZag 状态：0 未确定, 1 上升, -1 下降
+        self.zigzag_trend = np.zeros(count, dtype=np.int8)
+        self.extreme_value = np.full(count, np.nan)
+        self.extreme_bar = np.zeros(count, dtype=np.int64)
+        self.pivot_bars = np.full((count, max_pivots), -1, dtype=np.int64)
+        self.pivot_prices = np.full((count, max_pivots), np.nan)
+        self.pivot_count = np.zeros(count, dtype=np.int64)
+    
+    # ===== 更新 =====
+    
+    def update(self, prices, timestamp: datetime = None):
+        """推进一根K线
+        
+        Args:
+            prices: 与 symbols 对齐的价格数组，或 {symbol: price}（缺失的股票沿用上一价格）
+            timestamp: K线时间
+        """
+        if isinstance(prices, dict):
+            values = self.latest_prices()
+            for symbol, price in prices.items():
+                i = self.symbol_index.get(symbol)
+                if i is not None:
+                    values[i] = price
+        else:
+            values = np.asarray(prices, dtype=float)
+        
+        first = np.isnan(self.base) & ~np.isnan(values)
+        self.base[first] = values[first]
+        self.extreme_value[first] = values[first]
+        self.extreme_bar[first] = self.bars
+        
+        slot = self.bars % self.buffer_size
+        leaving_window = self.buffer[:, (self.bars - self.window) % self.buffer_size] if self.bars >= self.window else None
+        leaving_short = self.buffer[:, (self.bars - self.short_window) % self.buffer_size] if self.bars >= self.short_window else None
+        leaving_long = self.buffer[:, (self.bars - self.long_window) % self.buffer_size] if self.bars >= self.long_window else None
+        
+        # 均线滚动和
+        self.sum_short += values - (leaving_short if leaving_short is not None else 0.0)
+        self.sum_long += values - (leaving_long if leaving_long is not None else 0.0)
+        
+        # 线性趋势：窗口滑动时所有点的 x 减一
+        y = values - self.base
+        if leaving_window is not None:
+            old_y = leaving_window - self.base
+            self.sum_xy += -(self.sum_y - old_y) + (self.window - 1) * y
+            self.sum_y += y - old_y
+            self.sum_yy += y * y - old_y * old_y
+        else:
+            self.sum_xy += self.bars * y
+            self.sum_y += y
+            self.sum_yy += y * y
+        
+        self.buffer[:, slot] = values
+        self._update_zigzag(values)
+        
+        self.bars += 1
+        self.last_timestamp = timestamp
+        
+        if self.bars % self.window == 0:
+            self._recompute_sums()
+    
+    def _update_zigzag(self, values: np.ndarray):
+        """ZigZag 状态机（全部股票同时推进一步）"""
+        threshold = self.zigzag_threshold
+        trend = self.zigzag_trend
+        extreme = self.extreme_value
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (values - extreme) / extreme
+        
+        start = (trend == 0) & (np.abs(change) >= threshold)
+        up_extend = (trend == 1) & (values > extreme)
+        up_reverse = (trend == 1) & ~up_extend & (change <= -threshold)
+        down_extend = (trend == -1) & (values < extreme)
+        down_reverse = (trend == -1) & ~down_extend & (change >= threshold)
+        
+        confirmed = start | up_reverse | down_reverse
+        if confirmed.any():
+            rows = np.flatnonzero(confirmed)
+            column = self.pivot_count[rows] % self.max_pivots
+            self.pivot_bars[rows, column] = self.extreme_bar[rows]
+            self.pivot_prices[rows, column] = extreme[rows]
+            self.pivot_count[rows] += 1
+        
+        trend[start] = np.where(change[start] > 0, 1, -1)
+        trend[up_reverse] = -1
+        trend[down_reverse] = 1
+        
+        moved = confirmed | up_extend | down_extend
+        extreme[moved] = values[moved]
+        self.extreme_bar[moved] = self.bars
+    
+    def _recompute_sums(self):
+        """按缓冲区重新求和，消除滚动更新的浮点误差"""
+        order = (np.arange(self.bars - self.buffer_size, self.bars)) % self.buffer_size
+        ordered = self.buffer[:, order]
+        
+        recent = ordered[:, -self.window:] - self.base[:, None]
+        x = np.arange(recent.shape[1], dtype=float)
+        self.sum_y = recent.sum(axis=1)
+        self.sum_yy = (recent * recent).sum(axis=1)
+        self.sum_xy = recent @ x
+        
+        # 缓冲区未填满时前部为空位(NaN)，只对已写入的K线求和
+        filled = min(self.bars, self.buffer_size)
+        self.sum_short = ordered[:, -min(self.short_window, filled):].sum(axis=1)
+        self.sum_long = ordered[:, -min(self.long_window, filled):].sum(axis=1)
+    
+    # ===== 查询 =====
+    
+    def latest_prices(self) -> np.ndarray:
+        """各股票最新价格"""
+        if self.bars == 0:
+            return np.full(len(self.symbols), np.nan)
+        return self.buffer[:, (self.bars - 1) % self.buffer_size].copy()
+    
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """全部股票的趋势状态（按列）"""
+        n = min(self.bars, self.window)
+        slope, r_squared = linear_trend_from_sums(n, self.sum_y, self.sum_yy, self.sum_xy)
+        
+        # 线性趋势方向（与 TrendDetector._classify_trend_direction 相同的规则）
+        linear_direction = np.where(
+            r_squared < 0.5, 0, np.where(slope > 0.001, 1, np.where(slope < -0.001, -1, 0)))
+        
+        price = self.latest_prices()
+        short_ma = self.sum_short / self.short_window if self.bars >= self.short_window else np.full(len(price), np.nan)
+        long_ma = self.sum_long / self.long_window if self.bars >= self.long_window else np.full(len(price), np.nan)
+        ma_direction = np.where(
+            (short_ma > long_ma) & (price > short_ma), 1,
+            np.where((short_ma < long_ma) & (price < short_ma), -1, 0))
+        
+        return {
+            'price': price,
+            'slope': slope,
+            'r_squared': r_squared,
+            'linear_direction': linear_direction,
+            'short_ma': short_ma,
+            'long_ma': long_ma,
+            'ma_direction': ma_direction,
+            'zigzag_trend': self.zigzag_trend.copy(),
+            'zigzag_extreme': self.extreme_value.copy()
+        }
+    
+    def get_pivots(self, symbol: str) -> List[Tuple[int, float]]:
+        """股票最近的ZigZag转折点 [(K线序号, 价格)]，按时间排序"""
+        i = self.symbol_index[symbol]
+        count = int(self.pivot_count[i])
+        kept = min(count, self.max_pivots)
+        columns = [(count - kept + k) % self.max_pivots for k in range(kept)]
+        return list(zip(self.pivot_bars[i, columns].tolist(), self.pivot_prices[i, columns].tolist()))
+    
+    def get_trend(self, symbol: str) -> Dict[str, Any]:
+        """单只股票的趋势状态"""
+        i = self.symbol_index[symbol]
+        names = {1: TrendDirection.UPTREND.value, -1: TrendDirection.DOWNTREND.value, 0: TrendDirection.SIDEWAYS.value}
+        state = {key: values[i] for key, values in self.snapshot().items()}
+        return {
+            'symbol': symbol,
+            'timestamp': self.last_timestamp.isoformat() if self.last_timestamp else None,
+            'price': float(state['price']),
+            'slope': float(state['slope']),
+            'r_squared': float(state['r_squared']),
+            'linear_direction': names[int(state['linear_direction'])],
+            'ma_direction': names[int(state['ma_direction'])],
+            'zigzag_direction': names[int(state['zigzag_trend'])],
+            'pivots': self.get_pivots(symbol)
+        }
+
+
 # 导出
 __all__ = [
     'TrendDirection', 'TrendStrength', 'TrendTimeframe',
     'TrendPoint', 'TrendAnalysis', 'TrendDetector',
-    'SupportResistanceDetector', 'TrendAnalysisEngine'
+    'SupportResistanceDetector', 'TrendAnalysisEngine', 'LiveTrendTracker',
+    'linear_trend', 'linear_trend_from_sums', 'zigzag_pivots'
 ]
\ No newline at end of file
@@ -145,6 +145,8 @@ class RiskController:
         self.current_metrics = RiskMetrics()
         self.daily_trades = []
         self.daily_pnl_history = []
+        self.cumulative_pnl = 0        # 累计盈亏（逐笔累加，避免每次重算前缀和）
+        self.peak_cumulative_pnl = None  # 累计盈亏峰值
         self.position_history = []
         
         # 风险监控
@@ -170,7 +172,11 @@ class RiskController:
         Returns:
             (是否通过验证, 原因说明)
         """
-        # 从字典创建TradeRisk对象
+        return self.validate_trade(self._trade_from_dict(trade_dict, account_value), account_value)
+    
+    @staticmethod
+    def _trade_from_dict(trade_dict: Dict, account_value: float) -> TradeRisk:
+        """从交易字典创建TradeRisk对象"""
         trade_risk = TradeRisk(
             symbol=trade_dict.get('symbol', 'UNKNOWN'),
             quantity=trade_dict.get('quantity', 0),
@@ -180,8 +186,7 @@ class RiskController:
         
         # 计算风险指标
         trade_risk.calculate_risk_metrics()
-        
-        return self.validate_trade(trade_risk, account_value)
+        return trade_risk
     
     def validate_trade(self, trade_risk: TradeRisk, account_value: float) -> Tuple[bool, str]:
         """
@@ -229,6 +234,83 @@ class RiskController:
         
         return True, "风险检查通过"
     
+    def validate_trades(self, trades: List[Union[TradeRisk, Dict]],
+                        account_value: float) -> List[Tuple[bool, str]]:
+        """
+        批量验证一组交易请求
+        
+        账户级状态（紧急停止、日亏损、连续亏损、账户最小值）只检查一次，
+        之后按顺序逐笔验证；已通过的交易计入批内敞口，后续交易的单仓位比例
+        按同一标的批内累计价值计算，并检查当前持仓加批内累计是否超过总仓位限制。
+        
+        Args:
+            trades: TradeRisk 或交易字典（格式同 validate_trade_dict）列表
+            account_value: 当前账户价值
+            
+        Returns:
+            与 trades 顺序一致的 [(是否通过验证, 原因说明)]
+        """
+        limits = self.risk_limits
+        
+        # 账户级检查（对整批结果相同）
+        if self.emergency_stop:
+            return [(False, "系统紧急停止状态")] * len(trades)
+        if self.daily_loss_exceeded:
+            return [(False, f"已达到日亏损限制 {limits.max_daily_loss_pct:.1%}")] * len(trades)
+        
+        losses_reason = None
+        if self.current_metrics.consecutive_losses >= limits.max_consecutive_losses:
+            losses_reason = f"连续亏损 {self.current_metrics.consecutive_losses} 次，达到限制"
+        account_reason = None
+        if account_value < limits.min_account_value:
+            account_reason = f"账户价值 ${account_value:,.2f} 低于最小要求 ${limits.min_account_value:,.2f}"
+        
+        # 敞口快照
+        total_exposure = self.current_metrics.position_value
+        max_total_value = account_value * limits.max_total_position_pct
+        pending_by_symbol: Dict[str, float] = {}
+        
+        results = []
+        for trade in trades:
+            trade_risk = self._trade_from_dict(trade, account_value) if isinstance(trade, dict) else trade
+            
+            if trade_risk.estimated_loss > 0:
+                loss_pct = trade_risk.estimated_loss / account_value
+                if loss_pct > limits.max_single_loss_pct:
+                    results.append((False, f"单笔亏损风险 {loss_pct:.2%} 超过限制 {limits.max_single_loss_pct:.2%}"))
+                    continue
+            
+            position_value = trade_risk.quantity * trade_risk.entry_price
+            symbol_value = pending_by_symbol.get(trade_risk.symbol, 0.0) + position_value
+            position_pct = symbol_value / account_value
+            if position_pct > limits.max_position_pct:
+                results.append((False, f"单仓位比例 {position_pct:.1%} 超过限制 {limits.max_position_pct:.1%}"))
+                continue
+            
+            if losses_reason is not None:
+                results.append((False, losses_reason))
+                continue
+            
+            if trade_risk.risk_reward_ratio > 0 and trade_risk.risk_reward_ratio < 1.0:
+                results.append((False, f"风险回报比 {trade_risk.risk_reward_ratio:.2f} 过低"))
+                continue
+            
+            if account_reason is not None:
+                results.append((False, account_reason))
+                continue
+            
+            if total_exposure + position_value > max_total_value:
+                total_pct = (total_exposure + position_value) / account_value
+                results.append((False, f"总仓位比例 {total_pct:.1%} 超过限制 {limits.max_total_position_pct:.1%}"))
+                continue
+            
+            # 通过：计入批内累计敞口
+            total_exposure += position_value
+            pending_by_symbol[trade_risk.symbol] = symbol_value
+            results.append((True, "风险检查通过"))
+        
+        return results
+    
     def calculate_position_size(self, symbol: str, entry_price: float, 
                               stop_loss_price: float, account_value: float,
                               method: PositionSizeMethod = PositionSizeMethod.FIXED_PERCENTAGE) -> int:
@@ -319,12 +401,14 @@ class RiskController:
         if daily_pnl is not None:
             self.current_metrics.daily_pnl = daily_pnl
             self.daily_pnl_history.append(daily_pnl)
+            self.cumulative_pnl += daily_pnl
+            if self.peak_cumulative_pnl is None or self.cumulative_pnl > self.peak_cumulative_pnl:
+                self.peak_cumulative_pnl = self.cumulative_pnl
         
-        # 计算最大回撤
+        # 计算最大回撤（峰值与当前累计盈亏均为增量维护，O(1)）
         if len(self.daily_pnl_history) > 1:
-            cumulative_pnl = [sum(self.daily_pnl_history[:i+1]) for i in range(len(self.daily_pnl_history))]
-            peak = max(cumulative_pnl)
-            current = cumulative_pnl[-1]
+            peak = self.peak_cumulative_pnl
+            current = self.cumulative_pnl
             self.current_metrics.max_drawdown = (peak - current) / account_value if account_value > 0 else 0
         
         # 评估风险等级
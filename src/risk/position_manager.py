@@ -411,6 +411,61 @@ class PositionManager:
         
         return True, "仓位检查通过"
     
+    def check_position_limits_batch(self, orders: List[Tuple[str, int, float]],
+                                    account_value: float) -> List[Tuple[bool, str]]:
+        """
+        批量检查一组拟开仓订单
+        
+        总仓位市值和持仓数量只从当前持仓统计一次，之后按顺序逐笔检查；
+        已通过的订单计入批内累计：同一标的的单仓位比例按批内累计价值计算，
+        总仓位比例和持仓数量包含批内已通过的订单。
+        
+        Args:
+            orders: [(股票代码, 数量, 入场价格)]
+            account_value: 账户价值
+            
+        Returns:
+            与 orders 顺序一致的 [(是否通过检查, 原因说明)]
+        """
+        limits = self.position_limits
+        
+        # 持仓快照
+        total_value = sum(pos.market_value for pos in self.positions.values())
+        positions_count = len(self.positions)
+        pending_by_symbol: Dict[str, float] = {}
+        
+        results = []
+        for symbol, quantity, entry_price in orders:
+            position_value = quantity * entry_price
+            symbol_value = pending_by_symbol.get(symbol, 0.0) + position_value
+            position_pct = symbol_value / account_value
+            
+            if position_pct > limits.max_single_position_pct:
+                results.append((False, f"单仓位比例 {position_pct:.1%} 超过限制 {limits.max_single_position_pct:.1%}"))
+                continue
+            
+            total_pct = (total_value + position_value) / account_value
+            if total_pct > limits.max_total_position_pct:
+                results.append((False, f"总仓位比例 {total_pct:.1%} 超过限制 {limits.max_total_position_pct:.1%}"))
+                continue
+            
+            if positions_count >= limits.max_positions_count:
+                results.append((False, f"持仓数量 {positions_count} 达到限制 {limits.max_positions_count}"))
+                continue
+            
+            if position_value < limits.min_position_value:
+                results.append((False, f"仓位价值 ${position_value:,.2f} 低于最小要求 ${limits.min_position_value:,.2f}"))
+                continue
+            
+            # 通过：计入批内累计
+            total_value += position_value
+            if symbol not in self.positions and symbol not in pending_by_symbol:
+                positions_count += 1
+            pending_by_symbol[symbol] = symbol_value
+            results.append((True, "仓位检查通过"))
+        
+        return results
+    
     def suggest_position_adjustment(self, account_value: float) -> List[Dict]:
         """建议仓位调整"""
         suggestions = []
@@ -20,6 +20,8 @@ import threading
 import time
 import json
 
+import numpy as np
+
 from . import RiskLevel, RiskMetrics, RiskLimits
 
 
@@ -79,6 +81,117 @@ class RiskEvent:
         }
 
 
+class MetricsHistory:
+    """
+    风险指标历史（环形缓冲区，列式存储）
+    
+    每个数值字段一个 numpy 数组，按时间戳顺序写入，写满后覆盖最旧的记录；
+    风险等级存为整数编码。追加记录为 O(1)，同时维护账户价值峰值和回撤的累计值；
+    按时间窗口查询时在两段有序的时间戳上二分查找，O(log n) 定位，统计全部向量化。
+    """
+    
+    FIELDS = ('account_value', 'available_cash', 'position_value', 'unrealized_pnl',
+              'realized_pnl', 'daily_pnl', 'max_drawdown', 'consecutive_losses',
+              'var_95', 'sharpe_ratio')
+    LEVELS = list(RiskLevel)
+    
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity)  # epoch 秒
+        self.columns = {name: np.zeros(capacity) for name in self.FIELDS}
+        self.risk_levels = np.zeros(capacity, dtype=np.int8)
+        self.head = 0   # 下一个写入位置
+        self.count = 0
+        
+        # 累计值（不受环形覆盖影响）
+        self.peak_account_value = 0.0
+        self.current_drawdown = 0.0
+        self.max_drawdown = 0.0
+        self._level_codes = {level: code for code, level in enumerate(self.LEVELS)}
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, timestamp: datetime, metrics: RiskMetrics):
+        """追加一条记录"""
+        i = self.head
+        self.timestamps[i] = timestamp.timestamp()
+        for name, column in self.columns.items():
+            column[i] = getattr(metrics, name)
+        self.risk_levels[i] = self._level_codes[metrics.risk_level]
+        
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        
+        # 峰值和回撤
+        value = metrics.account_value
+        if value > self.peak_account_value:
+            self.peak_account_value = float(value)
+        self.current_drawdown = (self.peak_account_value - value) / self.peak_account_value if self.peak_account_value > 0 else 0.0
+        if self.current_drawdown > self.max_drawdown:
+            self.max_drawdown = self.current_drawdown
+    
+    def _segments(self) -> List[slice]:
+        """按时间顺序排列的存储区间（最多两段）"""
+        if self.count < self.capacity:
+            return [slice(0, self.count)]
+        return [slice(self.head, self.capacity), slice(0, self.head)]
+    
+    def window(self, start: datetime = None, end: datetime = None) -> Dict[str, np.ndarray]:
+        """
+        取时间窗口 [start, end] 内的记录
+        
+        Returns:
+            {'timestamp': ..., 字段名: ..., 'risk_level': 等级编码} 各为按时间排序的数组
+        """
+        start_ts = start.timestamp() if start else -np.inf
+        end_ts = end.timestamp() if end else np.inf
+        
+        ranges = []
+        for segment in self._segments():
+            times = self.timestamps[segment]
+            lo = int(np.searchsorted(times, start_ts, side='left'))
+            hi = int(np.searchsorted(times, end_ts, side='right'))
+            if hi > lo:
+                ranges.append(slice(segment.start + lo, segment.start + hi))
+        
+        def gather(values: np.ndarray) -> np.ndarray:
+            if len(ranges) == 1:
+                return values[ranges[0]]
+            return np.concatenate([values[r] for r in ranges]) if ranges else values[:0]
+        
+        data = {'timestamp': gather(self.timestamps), 'risk_level': gather(self.risk_levels)}
+        for name, column in self.columns.items():
+            data[name] = gather(column)
+        return data
+    
+    def latest(self) -> Optional[Tuple[datetime, RiskMetrics]]:
+        """最近一条记录"""
+        if self.count == 0:
+            return None
+        i = (self.head - 1) % self.capacity
+        return self._record(i)
+    
+    def _record(self, i: int) -> Tuple[datetime, RiskMetrics]:
+        values = {name: float(column[i]) for name, column in self.columns.items()}
+        values['consecutive_losses'] = int(values['consecutive_losses'])
+        return (datetime.fromtimestamp(self.timestamps[i]),
+                RiskMetrics(risk_level=self.LEVELS[self.risk_levels[i]], **values))
+    
+    def records(self) -> List[Tuple[datetime, RiskMetrics]]:
+        """全部记录 [(时间, RiskMetrics)]，按时间排序"""
+        return [self._record(i)
+                for segment in self._segments() for i in range(segment.start, segment.stop)]
+    
+    def level_distribution(self, levels: np.ndarray) -> Dict[str, float]:
+        """风险等级编码数组 -> {等级: 占比}"""
+        if len(levels) == 0:
+            return {}
+        counts = np.bincount(levels, minlength=len(self.LEVELS))
+        return {self.LEVELS[code].value: count / len(levels)
+                for code, count in enumerate(counts.tolist()) if count}
+
+
 class RiskMonitor:
     """
     实时风险监控器
@@ -106,7 +219,7 @@ class RiskMonitor:
         self.emergency_callbacks: List[Callable] = []
         
         # 历史记录
-        self.metrics_history: List[Tuple[datetime, RiskMetrics]] = []
+        self.metrics_history = MetricsHistory(capacity=1000)
         self.daily_start_value = 0.0
         self.session_start_time = datetime.now()
         
@@ -152,12 +265,8 @@ class RiskMonitor:
         """更新风险指标"""
         self.current_metrics = new_metrics
         
-        # 记录历史
-        self.metrics_history.append((datetime.now(), new_metrics))
-        
-        # 限制历史记录长度
-        if len(self.metrics_history) > 1000:
-            self.metrics_history = self.metrics_history[-1000:]
+        # 记录历史（环形缓冲区，超过容量时覆盖最旧记录）
+        self.metrics_history.append(datetime.now(), new_metrics)
         
         # 设置日开始价值
         if self.daily_start_value == 0:
@@ -380,14 +489,14 @@ class RiskMonitor:
         # 筛选时间范围内的数据
         recent_alerts = [alert for alert in self.risk_alerts if alert.timestamp >= cutoff_time]
         recent_events = [event for event in self.risk_events if event.timestamp >= cutoff_time]
-        recent_metrics = [m for t, m in self.metrics_history if t >= cutoff_time]
+        recent_metrics = self.metrics_history.window(start=cutoff_time)
         
         # 计算统计数据
-        if recent_metrics:
-            max_account_value = max(m.account_value for m in recent_metrics)
-            min_account_value = min(m.account_value for m in recent_metrics)
-            max_drawdown = max(m.max_drawdown for m in recent_metrics)
-            avg_daily_pnl = sum(m.daily_pnl for m in recent_metrics) / len(recent_metrics)
+        if len(recent_metrics['timestamp']):
+            max_account_value = float(recent_metrics['account_value'].max())
+            min_account_value = float(recent_metrics['account_value'].min())
+            max_drawdown = float(recent_metrics['max_drawdown'].max())
+            avg_daily_pnl = float(recent_metrics['daily_pnl'].mean())
         else:
             max_account_value = min_account_value = max_drawdown = avg_daily_pnl = 0
         
@@ -401,10 +510,12 @@ class RiskMonitor:
                 'max_account_value': max_account_value,
                 'min_account_value': min_account_value,
                 'max_drawdown': max_drawdown,
-                'avg_daily_pnl': avg_daily_pnl
+                'avg_daily_pnl': avg_daily_pnl,
+                'peak_account_value': self.metrics_history.peak_account_value,
+                'drawdown_from_peak': self.metrics_history.current_drawdown
             },
             'alerts_by_type': self._group_alerts_by_type(recent_alerts),
-            'risk_level_distribution': self._analyze_risk_levels(recent_metrics),
+            'risk_level_distribution': self._analyze_risk_levels(recent_metrics['risk_level']),
             'recommendations': self._generate_recommendations()
         }
     
@@ -417,18 +528,9 @@ class RiskMonitor:
             groups[alert.alert_type].append(alert.to_dict())
         return groups
     
-    def _analyze_risk_levels(self, metrics: List[RiskMetrics]) -> Dict:
-        """分析风险等级分布"""
-        if not metrics:
-            return {}
-        
-        level_counts = {}
-        for metric in metrics:
-            level = metric.risk_level.value
-            level_counts[level] = level_counts.get(level, 0) + 1
-        
-        total = len(metrics)
-        return {level: count/total for level, count in level_counts.items()}
+    def _analyze_risk_levels(self, risk_levels: np.ndarray) -> Dict:
+        """分析风险等级分布（风险等级编码数组）"""
+        return self.metrics_history.level_distribution(risk_levels)
     
     def _generate_recommendations(self) -> List[str]:
         """生成风险建议"""
@@ -14,10 +14,12 @@
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import logging
 import math
 
+import numpy as np
+
 from . import StopLossType, RiskLevel
 
 
@@ -103,17 +105,164 @@ class StopLossOrder:
         return loss_amount / account_value if account_value > 0 else 0.0
 
 
+# 止损类型在止损簿中的编码
+_STOP_TYPE_CODES = {stop_type: code for code, stop_type in enumerate(StopLossType)}
+_TRAILING = _STOP_TYPE_CODES[StopLossType.TRAILING]
+_ATR_BASED = _STOP_TYPE_CODES[StopLossType.ATR_BASED]
+
+
+class StopBook:
+    """
+    止损簿（列式存储）
+    
+    所有活跃止损的参数和状态按列保存在 numpy 数组中（每个止损占一个槽位），
+    一批价格更新只需一次向量化计算即可完成跟踪止损/ATR止损更新和触发判断，
+    不再逐个调用 StopLossOrder 的方法。
+    """
+    
+    def __init__(self, capacity: int = 256):
+        self.capacity = 0
+        self.slots: Dict[str, int] = {}          # symbol -> 槽位
+        self.symbols: List[Optional[str]] = []   # 槽位 -> symbol
+        self._free: List[int] = []
+        self._grow(capacity)
+    
+    def _grow(self, capacity: int):
+        """扩容（保留已有数据）"""
+        def resize(name, dtype, fill):
+            new = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:len(old)] = old
+            setattr(self, name, new)
+        
+        resize('active', bool, False)
+        resize('stop_type', np.int8, -1)
+        resize('stop_price', np.float64, 0.0)
+        resize('current_price', np.float64, 0.0)
+        resize('highest_price', np.float64, 0.0)
+        resize('trailing_percent', np.float64, 0.0)
+        resize('trailing_amount', np.float64, 0.0)
+        resize('atr', np.float64, 0.0)
+        resize('atr_multiplier', np.float64, 0.0)
+        resize('created', np.float64, 0.0)       # 创建时间（时间戳，秒）
+        resize('max_hold', np.float64, np.inf)   # 最大持仓时间（秒），无时间止损时为 inf
+        
+        self.symbols.extend([None] * (capacity - self.capacity))
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+    
+    def __len__(self) -> int:
+        return len(self.slots)
+    
+    def add(self, order: 'StopLossOrder') -> int:
+        """写入止损订单（同一股票已有止损时覆盖），返回槽位"""
+        slot = self.slots.get(order.symbol)
+        if slot is None:
+            if not self._free:
+                self._grow(self.capacity * 2)
+            slot = self._free.pop()
+            self.slots[order.symbol] = slot
+            self.symbols[slot] = order.symbol
+        
+        max_hold = order.max_hold_time.total_seconds() if order.max_hold_time else np.inf
+        
+        self.active[slot] = True
+        self.stop_type[slot] = _STOP_TYPE_CODES[order.stop_type]
+        self.stop_price[slot] = order.stop_price
+        self.current_price[slot] = order.current_price
+        self.highest_price[slot] = order.highest_price
+        self.trailing_percent[slot] = order.trailing_percent
+        self.trailing_amount[slot] = order.trailing_amount
+        self.atr[slot] = order.current_atr
+        self.atr_multiplier[slot] = order.atr_multiplier
+        self.created[slot] = order.created_time.timestamp()
+        self.max_hold[slot] = max_hold if max_hold > 0 else np.inf
+        return slot
+    
+    def remove(self, symbol: str) -> bool:
+        """释放股票的槽位"""
+        slot = self.slots.pop(symbol, None)
+        if slot is None:
+            return False
+        self.active[slot] = False
+        self.symbols[slot] = None
+        self._free.append(slot)
+        return True
+    
+    def evaluate(self, slots: np.ndarray, prices: np.ndarray, now: float) -> np.ndarray:
+        """
+        一次处理一批价格：更新当前价、跟踪止损和ATR止损，判断是否触发
+        
+        Args:
+            slots: 槽位数组（不重复）
+            prices: 对应的新价格
+            now: 当前时间戳（秒）
+            
+        Returns:
+            与 slots 对齐的触发掩码
+        """
+        self.current_price[slots] = prices
+        
+        # 跟踪止损：创新高时上移止损价
+        stop_type = self.stop_type[slots]
+        new_high = (stop_type == _TRAILING) & (prices > self.highest_price[slots])
+        if new_high.any():
+            trail_slots = slots[new_high]
+            highest = prices[new_high]
+            self.highest_price[trail_slots] = highest
+            
+            percent = self.trailing_percent[trail_slots]
+            amount = self.trailing_amount[trail_slots]
+            stops = self.stop_price[trail_slots]
+            stops = np.where(percent > 0, highest * (1 - percent),
+                             np.where(amount > 0, highest - amount, stops))
+            self.stop_price[trail_slots] = stops
+        
+        # ATR止损：随价格移动
+        atr_update = (stop_type == _ATR_BASED) & (self.atr[slots] > 0)
+        if atr_update.any():
+            atr_slots = slots[atr_update]
+            self.stop_price[atr_slots] = (
+                prices[atr_update] - self.atr[atr_slots] * self.atr_multiplier[atr_slots]
+            )
+        
+        # 价格止损 或 时间止损
+        return (
+            (prices <= self.stop_price[slots])
+            | (now - self.created[slots] >= self.max_hold[slots])
+        )
+    
+    def expired(self, max_age_seconds: float, now: float) -> List[str]:
+        """创建时间超过 max_age_seconds 的股票"""
+        mask = self.active & (now - self.created > max_age_seconds)
+        return [self.symbols[slot] for slot in np.flatnonzero(mask)]
+    
+    def sync_order(self, order: 'StopLossOrder'):
+        """把槽位中的动态状态写回订单对象"""
+        slot = self.slots.get(order.symbol)
+        if slot is None:
+            return
+        order.stop_price = float(self.stop_price[slot])
+        order.current_price = float(self.current_price[slot])
+        order.highest_price = float(self.highest_price[slot])
+
+
 class StopLossManager:
     """
     止损管理器
     
     负责管理所有止损订单，监控价格变化，
     自动触发止损条件，执行风险控制。
+    
+    止损状态保存在列式止损簿 (StopBook) 中，价格批量更新时向量化计算；
+    StopLossOrder 对象作为按股票访问的外观，读取时从止损簿同步最新状态。
     """
     
     def __init__(self, max_single_loss_pct: float = 0.005):
         self.max_single_loss_pct = max_single_loss_pct  # 单笔最大亏损比例
-        self.active_stops: Dict[str, StopLossOrder] = {}  # 活跃止损单
+        self.stop_book = StopBook()                       # 活跃止损（列式存储）
+        self._orders: Dict[str, StopLossOrder] = {}       # 活跃止损单对象
         self.triggered_stops: List[StopLossOrder] = []   # 已触发止损单
         self.logger = logging.getLogger(self.__class__.__name__)
         
@@ -124,6 +273,19 @@ class StopLossManager:
         
         self.logger.info("止损管理器初始化完成")
     
+    @property
+    def active_stops(self) -> Dict[str, StopLossOrder]:
+        """活跃止损单（已同步最新止损价和当前价）"""
+        for order in self._orders.values():
+            self.stop_book.sync_order(order)
+        return self._orders
+    
+    def _register(self, stop_order: StopLossOrder):
+        """登记新的止损订单"""
+        self._orders[stop_order.symbol] = stop_order
+        self.stop_book.add(stop_order)
+        self.total_stops_created += 1
+    
     def create_fixed_stop(self, symbol: str, quantity: int, entry_price: float,
                          stop_price: float) -> StopLossOrder:
         """
@@ -148,8 +310,7 @@ class StopLossManager:
             current_price=entry_price
         )
         
-        self.active_stops[symbol] = stop_order
-        self.total_stops_created += 1
+        self._register(stop_order)
         
         self.logger.info("创建固定止损: %s 价格=%.2f", symbol, stop_price)
         return stop_order
@@ -184,8 +345,7 @@ class StopLossManager:
             highest_price=entry_price
         )
         
-        self.active_stops[symbol] = stop_order
-        self.total_stops_created += 1
+        self._register(stop_order)
         
         self.logger.info("创建跟踪止损: %s 跟踪=%.2f%%", symbol, trailing_percent * 100)
         return stop_order
@@ -215,8 +375,7 @@ class StopLossManager:
             max_hold_time=timedelta(minutes=max_hold_minutes)
         )
         
-        self.active_stops[symbol] = stop_order
-        self.total_stops_created += 1
+        self._register(stop_order)
         
         self.logger.info("创建时间止损: %s 时间=%d分钟", symbol, max_hold_minutes)
         return stop_order
@@ -250,8 +409,7 @@ class StopLossManager:
             current_atr=atr_value
         )
         
-        self.active_stops[symbol] = stop_order
-        self.total_stops_created += 1
+        self._register(stop_order)
         
         self.logger.info("创建ATR止损: %s ATR=%.2f 倍数=%.1f", symbol, atr_value, atr_multiplier)
         return stop_order
@@ -310,25 +468,7 @@ class StopLossManager:
         Returns:
             是否触发止损
         """
-        if symbol not in self.active_stops:
-            return False
-        
-        stop_order = self.active_stops[symbol]
-        stop_order.update_price(new_price)
-        
-        if stop_order.is_triggered():
-            # 移动到已触发列表
-            self.triggered_stops.append(stop_order)
-            del self.active_stops[symbol]
-            
-            self.total_stops_triggered += 1
-            self.total_saved_loss += stop_order.get_loss_amount()
-            
-            self.logger.warning("止损触发: %s 价格=%.2f 类型=%s", 
-                              symbol, new_price, stop_order.stop_type.value)
-            return True
-        
-        return False
+        return bool(self.update_all_prices({symbol: new_price}))
     
     def update_all_prices(self, price_updates: Dict[str, float]) -> List[str]:
         """
@@ -340,14 +480,53 @@ class StopLossManager:
         Returns:
             触发止损的股票代码列表
         """
-        triggered_symbols = []
+        slots = self.stop_book.slots
+        symbols = [symbol for symbol in price_updates if symbol in slots]
+        if not symbols:
+            return []
         
-        for symbol, price in price_updates.items():
-            if self.update_price(symbol, price):
-                triggered_symbols.append(symbol)
+        return self.evaluate_batch(symbols, np.fromiter(
+            (price_updates[symbol] for symbol in symbols), dtype=np.float64, count=len(symbols)))
+    
+    def evaluate_batch(self, symbols: Sequence[str], prices: np.ndarray) -> List[str]:
+        """
+        向量化处理一批价格（股票代码不重复且均有活跃止损）
+        
+        Args:
+            symbols: 股票代码序列
+            prices: 对应价格数组
+            
+        Returns:
+            触发止损的股票代码列表（保持输入顺序）
+        """
+        slots = np.fromiter((self.stop_book.slots[symbol] for symbol in symbols),
+                            dtype=np.intp, count=len(symbols))
+        triggered = self.stop_book.evaluate(slots, np.asarray(prices, dtype=np.float64),
+                                            datetime.now().timestamp())
+        
+        triggered_symbols = [symbols[i] for i in np.flatnonzero(triggered)]
+        if triggered_symbols:
+            trigger_time = datetime.now()
+            for symbol in triggered_symbols:
+                self._trigger(symbol, trigger_time)
         
         return triggered_symbols
     
+    def _trigger(self, symbol: str, trigger_time: datetime):
+        """止损触发：同步订单状态并移动到已触发列表"""
+        stop_order = self._orders.pop(symbol)
+        self.stop_book.sync_order(stop_order)
+        self.stop_book.remove(symbol)
+        stop_order.triggered = True
+        stop_order.trigger_time = trigger_time
+        
+        self.triggered_stops.append(stop_order)
+        self.total_stops_triggered += 1
+        self.total_saved_loss += stop_order.get_loss_amount()
+        
+        self.logger.warning("止损触发: %s 价格=%.2f 类型=%s", 
+                          symbol, stop_order.current_price, stop_order.stop_type.value)
+    
     def remove_stop(self, symbol: str) -> bool:
         """
         移除止损订单（例如正常平仓时）
@@ -358,16 +537,18 @@ class StopLossManager:
         Returns:
             是否成功移除
         """
-        if symbol in self.active_stops:
-            del self.active_stops[symbol]
+        if symbol in self._orders:
+            del self._orders[symbol]
+            self.stop_book.remove(symbol)
             self.logger.info("移除止损订单: %s", symbol)
             return True
         return False
     
     def get_stop_info(self, symbol: str) -> Optional[Dict]:
         """获取止损信息"""
-        if symbol in self.active_stops:
-            stop = self.active_stops[symbol]
+        if symbol in self._orders:
+            stop = self._orders[symbol]
+            self.stop_book.sync_order(stop)
             return {
                 'symbol': stop.symbol,
                 'stop_price': stop.stop_price,
@@ -383,7 +564,7 @@ class StopLossManager:
     def get_all_active_stops(self) -> Dict[str, Dict]:
         """获取所有活跃止损信息"""
         return {symbol: self.get_stop_info(symbol) 
-                for symbol in self.active_stops.keys()}
+                for symbol in self._orders.keys()}
     
     def get_statistics(self) -> Dict:
         """获取止损统计信息"""
@@ -392,7 +573,7 @@ class StopLossManager:
         return {
             'total_stops_created': self.total_stops_created,
             'total_stops_triggered': self.total_stops_triggered,
-            'active_stops_count': len(self.active_stops),
+            'active_stops_count': len(self._orders),
             'trigger_rate': trigger_rate,
             'total_saved_loss': self.total_saved_loss,
             'average_saved_per_trigger': (self.total_saved_loss / max(1, self.total_stops_triggered))
@@ -400,15 +581,11 @@ class StopLossManager:
     
     def cleanup_old_stops(self, max_age_hours: int = 24):
         """清理过期的止损订单"""
-        current_time = datetime.now()
-        expired_symbols = []
-        
-        for symbol, stop in self.active_stops.items():
-            if (current_time - stop.created_time).total_seconds() > max_age_hours * 3600:
-                expired_symbols.append(symbol)
+        expired_symbols = self.stop_book.expired(max_age_hours * 3600, datetime.now().timestamp())
         
         for symbol in expired_symbols:
-            del self.active_stops[symbol]
+            del self._orders[symbol]
+            self.stop_book.remove(symbol)
             self.logger.info("清理过期止损订单: %s", symbol)
         
         return len(expired_symbols)
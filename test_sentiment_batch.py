@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+批量文本情感测试
+analyze_batch 与逐条 analyze_text 的结果比对，
+覆盖同时属于多个词表的词、重复文本和空文本
+"""
+
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from ml_integration.sentiment_analysis import TextSentimentAnalyzer
+
+TEXTS = [
+    "Apple beats earnings estimates, shares surge on strong guidance",
+    "Tesla misses delivery forecast; analysts downgrade amid uncertainty",
+    "Volatile session: stock rallies then plunges on merger news",
+    "Dividend raised again. Outlook remains bullish!",
+    "Nothing to see here",
+    "",
+    "Apple beats earnings estimates, shares surge on strong guidance",
+    "volatile volatile earnings risk",
+]
+
+
+def assert_batch_matches_single(analyzer, texts):
+    """逐条与批量结果一致"""
+    batch = analyzer.analyze_batch(texts)
+    for i, text in enumerate(texts):
+        point = analyzer.analyze_text(text)
+        assert np.isclose(batch['score'][i], point.score), (text, batch['score'][i], point.score)
+        assert np.isclose(batch['confidence'][i], point.confidence), (text, batch['confidence'][i], point.confidence)
+        if text:
+            metadata = point.metadata
+            assert np.isclose(batch['financial_sentiment'][i], metadata['financial_sentiment']), text
+            assert bool(batch['has_financial_keywords'][i]) == metadata['has_financial_keywords'], text
+
+
+def test_batch_matches_single_text():
+    assert_batch_matches_single(TextSentimentAnalyzer(), TEXTS)
+
+
+def test_batch_counts_words_in_overlapping_lexicons():
+    """同一个词同时属于正面、负面和金融关键词时，批量路径与逐条路径计数一致"""
+    analyzer = TextSentimentAnalyzer()
+    analyzer.positive_words.add('volatile')
+    analyzer.negative_words.add('volatile')
+    analyzer.financial_keywords.add('volatile')
+    analyzer.positive_words.add('earnings')
+    assert_batch_matches_single(analyzer, TEXTS)
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_text()
+    test_batch_counts_words_in_overlapping_lexicons()
+    print("✅ 批量情感与逐条结果一致")
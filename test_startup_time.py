@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+命令行启动时间测试
+测量轻量命令的启动耗时并检查预算，同时确认入口模块没有提前导入重量级依赖
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 轻量命令的启动预算（秒）
+STARTUP_BUDGETS = [
+    (['main.py', '--help'], 0.3),
+    (['main.py', 'watchlist', 'list'], 0.3),
+    (['src/core/simple_cli.py', 'watchlist', 'list'], 0.3),
+]
+
+# 入口模块加载后不应出现的重量级依赖
+HEAVY_MODULES = [
+    'pandas', 'numpy', 'yfinance', 'backtrader',
+    'sklearn', 'xgboost', 'tensorflow',
+    'matplotlib', 'seaborn', 'plotly', 'asyncio'
+]
+
+RUNS = 5
+
+
+def measure_command(args, runs=RUNS):
+    """多次运行命令，返回耗时中位数（秒）"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def loaded_heavy_modules():
+    """在子进程中导入入口模块，返回被加载的重量级依赖"""
+    code = (
+        "import sys; sys.path.insert(0, 'src/core');"
+        "import main, simple_cli;"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    output = result.stdout.strip().splitlines()
+    return [m for m in (output[-1].split(',') if output else []) if m]
+
+
+def test_light_commands_within_budget():
+    """轻量命令在启动预算内完成"""
+    for args, budget in STARTUP_BUDGETS:
+        elapsed = measure_command(args)
+        assert elapsed < budget, f"{' '.join(args)} 耗时 {elapsed * 1000:.0f}ms，超出预算 {budget * 1000:.0f}ms"
+
+
+def test_entry_points_do_not_import_heavy_dependencies():
+    """入口模块不提前导入重量级依赖"""
+    loaded = loaded_heavy_modules()
+    assert not loaded, f"入口模块提前导入了: {', '.join(loaded)}"
+
+
+if __name__ == "__main__":
+    print("⏱️ 测试命令行启动时间...")
+    print("=" * 50)
+
+    failed = False
+    for args, budget in STARTUP_BUDGETS:
+        elapsed = measure_command(args)
+        ok = elapsed < budget
+        failed |= not ok
+        print(f"   {'✅' if ok else '❌'} {' '.join(args):40s} {elapsed * 1000:6.0f}ms (预算 {budget * 1000:.0f}ms)")
+
+    loaded = loaded_heavy_modules()
+    if loaded:
+        failed = True
+        print(f"   ❌ 入口模块提前导入了: {', '.join(loaded)}")
+    else:
+        print("   ✅ 入口模块未导入重量级依赖")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+实时趋势跟踪器测试
+逐K线推进 LiveTrendTracker，与按完整历史批量计算的结果比对，
+覆盖缓冲区未填满 → 填满的边界以及周期性重新求和的时点
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+from ml_integration.trend_analysis import LiveTrendTracker, linear_trend
+
+# (window, short_window, long_window)：覆盖 window 小于/大于均线周期的组合
+CONFIGS = [(20, 10, 50), (60, 20, 50), (15, 30, 40)]
+
+BARS = 150
+SYMBOLS = ['AAA', 'BBB', 'CCC']
+
+
+def make_prices(bars=BARS, symbols=len(SYMBOLS), seed=7):
+    """随机游走价格（列为股票）"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.02, size=(bars, symbols))
+    return 100 * np.exp(np.cumsum(returns, axis=0))
+
+
+def batch_expectations(prices, bar, window, short_window, long_window):
+    """截至第 bar 根K线（含）按完整历史计算的期望值"""
+    history = prices[:bar + 1]
+    frame = pd.DataFrame(history)
+    short_ma = frame.rolling(short_window).mean().iloc[-1].to_numpy()
+    long_ma = frame.rolling(long_window).mean().iloc[-1].to_numpy()
+    recent = history[-window:]
+    trends = [linear_trend(recent[:, j]) for j in range(recent.shape[1])]
+    slope = np.array([t[0] for t in trends])
+    r_squared = np.array([t[1] for t in trends])
+    return short_ma, long_ma, slope, r_squared
+
+
+def check_config(window, short_window, long_window):
+    """逐K线比对一组参数，返回首个不一致的描述（一致时返回 None）"""
+    prices = make_prices()
+    tracker = LiveTrendTracker(SYMBOLS, window=window, short_window=short_window,
+                               long_window=long_window)
+    for bar in range(BARS):
+        tracker.update(prices[bar])
+        state = tracker.snapshot()
+        short_ma, long_ma, slope, r_squared = batch_expectations(
+            prices, bar, window, short_window, long_window)
+
+        checks = [('short_ma', state['short_ma'], short_ma),
+                  ('long_ma', state['long_ma'], long_ma)]
+        if bar >= 2:
+            checks += [('slope', state['slope'], slope),
+                       ('r_squared', state['r_squared'], r_squared)]
+        for name, actual, expected in checks:
+            if not np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True):
+                return f"window={window} bar={bar} {name}: {actual} != {expected}"
+    return None
+
+
+def test_tracker_matches_batch_across_fill_boundary():
+    """流式结果与批量计算一致（包括缓冲区填满前的周期性重新求和）"""
+    for config in CONFIGS:
+        mismatch = check_config(*config)
+        assert mismatch is None, mismatch
+
+
+if __name__ == "__main__":
+    print("📈 测试实时趋势跟踪器...")
+    print("=" * 50)
+
+    failed = False
+    for config in CONFIGS:
+        mismatch = check_config(*config)
+        failed |= mismatch is not None
+        label = "window={} short={} long={}".format(*config)
+        print(f"   {'✅' if mismatch is None else '❌'} {label}" + (f"  {mismatch}" if mismatch else ""))
+
+    sys.exit(1 if failed else 0)
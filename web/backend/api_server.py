@@ -7,19 +7,56 @@
 import os
 import sys
 import json
+import errno
 import threading
 import webbrowser
 import argparse
+import asyncio
 from datetime import datetime
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from http_runtime import PooledHTTPServer, ResponseCache, StaticFileCache, JobManager
+from event_stream import get_event_broadcaster
+
+PROJECT_ROOT = os.path.realpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+WEB_DIR = os.path.realpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+STATIC_DIR = os.path.join(WEB_DIR, 'static')
+TEMPLATE_DIR = os.path.join(WEB_DIR, 'templates')
+
+# 接口缓存有效期（秒）
+STATUS_CACHE_TTL = 10.0
+STOCKS_CACHE_TTL = 30.0
+WATCHLIST_CACHE_TTL = 60.0
+
+# 自选股文件的读-改-写由线程池中的多个请求并发执行，需要串行化
+WATCHLIST_LOCK = threading.Lock()
+
+
+def write_json_atomic(path: str, data):
+    """先写同目录临时文件再替换，读者不会看到写了一半的文件"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 class APIHandler(BaseHTTPRequestHandler):
     """API处理器 - 专注于后端逻辑"""
     
+    # 类级共享：所有工作线程共用同一份缓存、后台任务池和事件推送
+    response_cache = ResponseCache()
+    static_cache = StaticFileCache()
+    event_broadcaster = get_event_broadcaster()
+    job_manager = JobManager(on_finish=lambda job: get_event_broadcaster().publish('job', job))
+    
     def log_message(self, format, *args):
         """自定义日志"""
         print(f"[{datetime.now().strftime('%H:%M:%S')}] {format % args}")
@@ -47,12 +84,20 @@ class APIHandler(BaseHTTPRequestHandler):
             elif path == '/reports':
                 self.serve_template('reports.html')
             # API路由
+            elif path == '/api/stream':
+                self.api_event_stream()
+            elif path == '/api/stream/stats':
+                self.send_json_response({"success": True, "data": self.event_broadcaster.get_stats()})
             elif path == '/api/status':
                 self.api_system_status()
             elif path == '/api/stocks':
                 self.api_stocks_data()
             elif path == '/api/backtest':
                 self.api_run_backtest(parse_qs(parsed_url.query))
+            elif path == '/api/backtest/jobs':
+                self.api_list_backtest_jobs()
+            elif path.startswith('/api/backtest/jobs/'):
+                self.api_get_backtest_job(path.split('/')[-1])
             elif path == '/api/auto_trade/start':
                 self.api_start_auto_trade()
             elif path == '/api/auto_trade/stop':
@@ -105,60 +150,79 @@ class APIHandler(BaseHTTPRequestHandler):
     
     def serve_static_file(self, path):
         """提供静态文件服务"""
-        file_path = os.path.join(os.path.dirname(__file__), '..', path[1:])  # 移除开头的 /
+        file_path = os.path.realpath(os.path.join(WEB_DIR, path[1:]))  # 移除开头的 /
         
-        if not os.path.exists(file_path):
+        # 只允许访问 static 目录内的文件
+        if not file_path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(file_path):
             self.send_error(404)
             return
         
-        # 根据文件扩展名设置Content-Type
-        if path.endswith('.css'):
-            content_type = 'text/css'
-        elif path.endswith('.js'):
-            content_type = 'application/javascript'
-        elif path.endswith('.html'):
-            content_type = 'text/html'
-        else:
-            content_type = 'application/octet-stream'
-        
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            
-            self.send_response(200)
-            self.send_header('Content-type', content_type + '; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(content)
+            self.send_cached_file(file_path)
         except Exception as e:
             print(f"❌ 静态文件错误: {e}")
             self.send_error(500)
     
     def serve_template(self, template_name):
         """提供HTML模板服务"""
-        template_path = os.path.join(os.path.dirname(__file__), '..', 'templates', template_name)
+        template_path = os.path.join(TEMPLATE_DIR, template_name)
         
         if not os.path.exists(template_path):
             self.send_error(404, f"模板文件不存在: {template_name}")
             return
         
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(content.encode('utf-8'))
+            self.send_cached_file(template_path, 'text/html')
         except Exception as e:
             print(f"❌ 模板错误: {e}")
             self.send_error(500)
     
+    def send_cached_file(self, file_path, content_type=None):
+        """发送文件：支持 ETag 协商缓存和 gzip 压缩"""
+        static_file = self.static_cache.get(file_path, content_type)
+        if static_file is None:
+            self.send_error(404)
+            return
+        
+        # 浏览器缓存仍有效时只返回 304
+        if static_file.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', static_file.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        
+        body = static_file.body
+        use_gzip = static_file.gzip_body is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = static_file.gzip_body
+        
+        content_type = static_file.content_type
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', static_file.etag)
+        self.send_header('Last-Modified', self.date_time_string(static_file.last_modified))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+    
     # ===================
     # API接口实现
     # ===================
     
     def api_system_status(self):
-        """系统状态API - 返回真实系统状态"""
+        """系统状态API - 返回真实系统状态（缓存 STATUS_CACHE_TTL 秒）"""
+        self.send_cached_json('status', self._build_system_status, STATUS_CACHE_TTL)
+    
+    def _build_system_status(self):
+        """采集系统状态（CPU采样、网络探测较慢，由缓存限制调用频率）"""
         try:
             # 尝试获取真实系统信息
             memory_info = self._get_memory_info()
@@ -186,9 +250,11 @@ class APIHandler(BaseHTTPRequestHandler):
                 "data_files": data_files_status,
                 "api_server": {
                     "status": "running",
-                    "host": "localhost",
-                    "port": 8000,
-                    "requests_handled": getattr(self, '_request_count', 0)
+                    "host": self.server.server_address[0],
+                    "port": self.server.server_address[1],
+                    "workers": getattr(self.server, 'max_workers', 1),
+                    "requests_handled": getattr(self, '_request_count', 0),
+                    "cache": self.response_cache.get_stats()
                 }
             }
         except Exception as e:
@@ -207,7 +273,7 @@ class APIHandler(BaseHTTPRequestHandler):
                 "error": f"系统状态检查失败: {str(e)}"
             }
         
-        self.send_json_response(status)
+        return status
     
     def _get_memory_info(self):
         """获取内存信息"""
@@ -370,8 +436,32 @@ class APIHandler(BaseHTTPRequestHandler):
         except Exception:
             return "unknown"
     
+    def api_event_stream(self):
+        """实时事件推送API (SSE)：行情增量、融合信号、风险警报、任务完成通知"""
+        if not hasattr(self.server, 'detach_request'):
+            self.send_json_response({"success": False, "error": "事件推送需要线程池模式 (--workers > 1)"}, status=503)
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.flush()
+        
+        # 连接交给推送线程，工作线程立即释放
+        self.close_connection = True
+        if self.event_broadcaster.add_client(self.request, self.client_address):
+            self.server.detach_request(self.request)
+    
     def api_stocks_data(self):
         """股票数据API"""
+        self.send_cached_json('stocks', self._build_stocks_data, STOCKS_CACHE_TTL)
+    
+    def _build_stocks_data(self):
+        """股票列表数据"""
         stocks_data = {
             "stocks": [
                 {
@@ -438,20 +528,44 @@ class APIHandler(BaseHTTPRequestHandler):
             "total": 5,
             "lastUpdate": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
-        self.send_json_response(stocks_data)
+        return stocks_data
     
     def api_run_backtest(self, params):
-        """回测API - GET方式"""
-        # 这里可以调用实际的回测引擎
+        """回测API - GET方式：提交后台回测任务，客户端轮询 /api/backtest/jobs/<taskId>"""
+        data = {key: values[0] for key, values in params.items()}
+        task_id = self.job_manager.submit('backtest', self._run_backtest, data)
         result = {
             "status": "success",
             "message": "回测任务已启动",
-            "taskId": f"backtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            "taskId": task_id,
+            "pollUrl": f"/api/backtest/jobs/{task_id}"
         }
-        self.send_json_response(result)
+        self.send_json_response(result, status=202)
     
     def api_run_backtest_post(self, data):
-        """回测API - POST方式"""
+        """回测API - POST方式（参数 background=true 时作为后台任务执行）"""
+        if data.get("background"):
+            self.api_run_backtest({key: [value] for key, value in data.items()})
+            return
+        
+        self.send_json_response(self._run_backtest(data))
+    
+    def api_list_backtest_jobs(self):
+        """回测任务列表API"""
+        jobs = self.job_manager.list_jobs('backtest')
+        self.send_json_response({"success": True, "data": jobs, "total": len(jobs)})
+    
+    def api_get_backtest_job(self, task_id):
+        """回测任务状态API"""
+        job = self.job_manager.get(task_id)
+        if job is None:
+            self.send_json_response({"success": False, "error": f"任务不存在: {task_id}"}, status=404)
+            return
+        self.send_json_response({"success": True, "data": job})
+    
+    @staticmethod
+    def _run_backtest(data):
+        """执行回测（在请求线程或后台任务线程中运行）"""
         # 这里可以接收完整的回测参数并调用回测引擎
         result = {
             "status": "success",
@@ -465,7 +579,7 @@ class APIHandler(BaseHTTPRequestHandler):
                 "sharpeRatio": 1.25
             }
         }
-        self.send_json_response(result)
+        return result
     
     def api_start_auto_trade(self):
         """启动自动交易API"""
@@ -496,7 +610,12 @@ class APIHandler(BaseHTTPRequestHandler):
         self.send_json_response(result)
     
     def api_get_watchlist(self):
-        """获取自选股列表API"""
+        """获取自选股列表API（修改自选股时缓存失效）"""
+        self.send_cached_json('watchlist', self._build_watchlist, WATCHLIST_CACHE_TTL)
+    
+    @staticmethod
+    def _build_watchlist():
+        """读取自选股列表"""
         try:
             # 尝试从数据文件读取
             watchlist_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'watchlist.json')
@@ -538,7 +657,7 @@ class APIHandler(BaseHTTPRequestHandler):
                 "data": ['AAPL', 'TSLA', 'NVDA', 'MSFT', 'GOOGL']  # 备用数据
             }
         
-        self.send_json_response(result)
+        return result
     
     def api_add_to_watchlist(self, data):
         """添加股票到自选股API"""
@@ -552,91 +671,93 @@ class APIHandler(BaseHTTPRequestHandler):
             self.send_json_response(result)
             return
         
-        try:
-            # 读取现有自选股列表
-            watchlist_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'watchlist.json')
-            
-            if os.path.exists(watchlist_file):
-                with open(watchlist_file, 'r', encoding='utf-8') as f:
-                    file_data = json.load(f)
-                    
-                    # 兼容不同格式
-                    if isinstance(file_data, dict):
-                        if 'stocks' in file_data:
-                            if isinstance(file_data['stocks'], list):
-                                # 新简单格式
-                                watchlist = file_data['stocks']
-                                use_simple_format = True
+        with WATCHLIST_LOCK:
+            try:
+                # 读取现有自选股列表
+                watchlist_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'watchlist.json')
+                
+                if os.path.exists(watchlist_file):
+                    with open(watchlist_file, 'r', encoding='utf-8') as f:
+                        file_data = json.load(f)
+                        
+                        # 兼容不同格式
+                        if isinstance(file_data, dict):
+                            if 'stocks' in file_data:
+                                if isinstance(file_data['stocks'], list):
+                                    # 新简单格式
+                                    watchlist = file_data['stocks']
+                                    use_simple_format = True
+                                else:
+                                    # 旧复杂格式
+                                    watchlist = list(file_data['stocks'].keys())
+                                    use_simple_format = False
+                                    original_stocks_data = file_data['stocks']
                             else:
-                                # 旧复杂格式
-                                watchlist = list(file_data['stocks'].keys())
+                                # 直接是股票字典
+                                watchlist = list(file_data.keys())
                                 use_simple_format = False
-                                original_stocks_data = file_data['stocks']
+                                original_stocks_data = file_data
                         else:
-                            # 直接是股票字典
-                            watchlist = list(file_data.keys())
-                            use_simple_format = False
-                            original_stocks_data = file_data
-                    else:
-                        # 简单数组
-                        watchlist = file_data
-                        use_simple_format = True
-            else:
-                watchlist = []
-                use_simple_format = True
-                file_data = {}
-            
-            # 检查是否已存在
-            if symbol in watchlist:
-                result = {
-                    "success": False,
-                    "error": f"股票 {symbol} 已在自选股列表中"
-                }
-            else:
-                # 添加到列表
-                watchlist.append(symbol)
+                            # 简单数组
+                            watchlist = file_data
+                            use_simple_format = True
+                else:
+                    watchlist = []
+                    use_simple_format = True
+                    file_data = {}
                 
-                # 根据格式保存
-                if use_simple_format:
-                    save_data = {
-                        "stocks": watchlist,
-                        "lastUpdate": datetime.now().isoformat()
+                # 检查是否已存在
+                if symbol in watchlist:
+                    result = {
+                        "success": False,
+                        "error": f"股票 {symbol} 已在自选股列表中"
                     }
                 else:
-                    # 保持原有复杂格式，只添加新股票
-                    if 'stocks' in file_data:
-                        file_data['stocks'][symbol] = {
-                            "last_score": 0,
-                            "price": 0,
-                            "added_at": datetime.now().isoformat()
+                    # 添加到列表
+                    watchlist.append(symbol)
+                    
+                    # 根据格式保存
+                    if use_simple_format:
+                        save_data = {
+                            "stocks": watchlist,
+                            "lastUpdate": datetime.now().isoformat()
                         }
                     else:
-                        file_data[symbol] = {
-                            "last_score": 0,
-                            "price": 0,
-                            "added_at": datetime.now().isoformat()
-                        }
-                    save_data = file_data
-                
-                # 确保目录存在
-                os.makedirs(os.path.dirname(watchlist_file), exist_ok=True)
-                
-                # 保存到文件
-                with open(watchlist_file, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=2)
-                
+                        # 保持原有复杂格式，只添加新股票
+                        if 'stocks' in file_data:
+                            file_data['stocks'][symbol] = {
+                                "last_score": 0,
+                                "price": 0,
+                                "added_at": datetime.now().isoformat()
+                            }
+                        else:
+                            file_data[symbol] = {
+                                "last_score": 0,
+                                "price": 0,
+                                "added_at": datetime.now().isoformat()
+                            }
+                        save_data = file_data
+                    
+                    # 确保目录存在
+                    os.makedirs(os.path.dirname(watchlist_file), exist_ok=True)
+                    
+                    # 原子写入：先写临时文件再替换
+                    write_json_atomic(watchlist_file, save_data)
+                    self.response_cache.invalidate('watchlist')
+                    self.event_broadcaster.publish('watchlist', {"data": watchlist})
+                    
+                    result = {
+                        "success": True,
+                        "message": f"成功添加 {symbol} 到自选股",
+                        "data": watchlist
+                    }
+            
+            except Exception as e:
                 result = {
-                    "success": True,
-                    "message": f"成功添加 {symbol} 到自选股",
-                    "data": watchlist
+                    "success": False,
+                    "error": f"添加失败: {str(e)}"
                 }
-        
-        except Exception as e:
-            result = {
-                "success": False,
-                "error": f"添加失败: {str(e)}"
-            }
-        
+            
         self.send_json_response(result)
     
     def api_remove_from_watchlist(self, data):
@@ -651,80 +772,82 @@ class APIHandler(BaseHTTPRequestHandler):
             self.send_json_response(result)
             return
         
-        try:
-            # 读取现有自选股列表
-            watchlist_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'watchlist.json')
-            
-            if os.path.exists(watchlist_file):
-                with open(watchlist_file, 'r', encoding='utf-8') as f:
-                    file_data = json.load(f)
-                    
-                    # 兼容不同格式
-                    if isinstance(file_data, dict):
-                        if 'stocks' in file_data:
-                            if isinstance(file_data['stocks'], list):
-                                # 新简单格式
-                                watchlist = file_data['stocks']
-                                use_simple_format = True
+        with WATCHLIST_LOCK:
+            try:
+                # 读取现有自选股列表
+                watchlist_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'watchlist.json')
+                
+                if os.path.exists(watchlist_file):
+                    with open(watchlist_file, 'r', encoding='utf-8') as f:
+                        file_data = json.load(f)
+                        
+                        # 兼容不同格式
+                        if isinstance(file_data, dict):
+                            if 'stocks' in file_data:
+                                if isinstance(file_data['stocks'], list):
+                                    # 新简单格式
+                                    watchlist = file_data['stocks']
+                                    use_simple_format = True
+                                else:
+                                    # 旧复杂格式
+                                    watchlist = list(file_data['stocks'].keys())
+                                    use_simple_format = False
                             else:
-                                # 旧复杂格式
-                                watchlist = list(file_data['stocks'].keys())
+                                # 直接是股票字典
+                                watchlist = list(file_data.keys())
                                 use_simple_format = False
                         else:
-                            # 直接是股票字典
-                            watchlist = list(file_data.keys())
-                            use_simple_format = False
-                    else:
-                        # 简单数组
-                        watchlist = file_data
-                        use_simple_format = True
-            else:
-                watchlist = []
-                use_simple_format = True
-                file_data = {}
-            
-            # 检查是否存在
-            if symbol not in watchlist:
-                result = {
-                    "success": False,
-                    "error": f"股票 {symbol} 不在自选股列表中"
-                }
-            else:
-                # 从列表移除
-                watchlist.remove(symbol)
+                            # 简单数组
+                            watchlist = file_data
+                            use_simple_format = True
+                else:
+                    watchlist = []
+                    use_simple_format = True
+                    file_data = {}
                 
-                # 根据格式保存
-                if use_simple_format:
-                    save_data = {
-                        "stocks": watchlist,
-                        "lastUpdate": datetime.now().isoformat()
+                # 检查是否存在
+                if symbol not in watchlist:
+                    result = {
+                        "success": False,
+                        "error": f"股票 {symbol} 不在自选股列表中"
                     }
                 else:
-                    # 保持原有复杂格式，删除对应股票
-                    if 'stocks' in file_data:
-                        if symbol in file_data['stocks']:
-                            del file_data['stocks'][symbol]
+                    # 从列表移除
+                    watchlist.remove(symbol)
+                    
+                    # 根据格式保存
+                    if use_simple_format:
+                        save_data = {
+                            "stocks": watchlist,
+                            "lastUpdate": datetime.now().isoformat()
+                        }
                     else:
-                        if symbol in file_data:
-                            del file_data[symbol]
-                    save_data = file_data
-                
-                # 保存到文件
-                with open(watchlist_file, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=2)
-                
+                        # 保持原有复杂格式，删除对应股票
+                        if 'stocks' in file_data:
+                            if symbol in file_data['stocks']:
+                                del file_data['stocks'][symbol]
+                        else:
+                            if symbol in file_data:
+                                del file_data[symbol]
+                        save_data = file_data
+                    
+                    # 原子写入：先写临时文件再替换
+                    write_json_atomic(watchlist_file, save_data)
+                    self.response_cache.invalidate('watchlist')
+                    self.event_broadcaster.publish('watchlist', {"data": watchlist})
+                    
+                    result = {
+                        "success": True,
+                        "message": f"成功从自选股移除 {symbol}",
+                        "data": watchlist
+                    }
+            
+            except Exception as e:
                 result = {
-                    "success": True,
-                    "message": f"成功从自选股移除 {symbol}",
-                    "data": watchlist
+                    "success": False,
+                    "error": f"移除失败: {str(e)}"
                 }
-        
-        except Exception as e:
-            result = {
-                "success": False,
-                "error": f"移除失败: {str(e)}"
-            }
-        
+            
         self.send_json_response(result)
     
     def api_get_stock_info(self, symbol):
@@ -756,25 +879,98 @@ class APIHandler(BaseHTTPRequestHandler):
         
         self.send_json_response(result)
     
-    def send_json_response(self, data):
+    def send_json_response(self, data, status=200):
         """发送JSON响应"""
-        self.send_response(200)
+        self.send_json_bytes(json.dumps(data, ensure_ascii=False).encode('utf-8'), status)
+    
+    def send_cached_json(self, key, builder, ttl):
+        """发送缓存的预序列化JSON，过期时调用 builder() 重新生成"""
+        self.send_json_bytes(self.response_cache.get_or_build(key, builder, ttl))
+    
+    def send_json_bytes(self, body, status=200):
+        """发送已序列化的JSON字节"""
+        self.send_response(status)
         self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')  # 允许跨域
         self.end_headers()
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        self.wfile.write(body)
+
+def connect_realtime_sources(symbols=None) -> bool:
+    """启动实时管道，并把行情、融合信号和风险警报接入 /api/stream 推送
+
+    数据流、信号融合和风险引擎都运行在管道运行时的事件循环中；
+    行情同时喂给风险引擎，由它产生风险警报。
+    """
+    core_dir = os.path.join(PROJECT_ROOT, 'src', 'core')
+    if core_dir not in sys.path:
+        sys.path.append(core_dir)
+    try:
+        from realtime_signal_integration import get_integration_system, start_realtime_trading
+        from risk_engine_integration import get_risk_integration
+    except ImportError as e:
+        print(f"⚠️ 实时管道不可用，事件推送仅包含自选股和任务通知: {e}")
+        return False
+
+    symbols = symbols or APIHandler._build_watchlist()['data']
+    integration = get_integration_system()
+    if not integration.is_running and not start_realtime_trading(symbols):
+        print("⚠️ 实时管道启动失败，事件推送仅包含自选股和任务通知")
+        return False
+
+    # 风险引擎与信号融合共用管道运行时的事件循环
+    loop = integration.event_loop
+    risk_integration = get_risk_integration()
+    if not risk_integration.is_integrated:
+        asyncio.run_coroutine_threadsafe(risk_integration.start_integration(), loop).result(timeout=5)
+
+    def feed_risk_engine(data):
+        asyncio.run_coroutine_threadsafe(
+            risk_integration.update_market_data(data['symbol'], data['price'], data.get('volume') or 0.0), loop)
 
-def start_api_server(host='localhost', port=8090, open_browser=True):
-    """启动API服务器"""
+    for symbol in symbols:
+        integration.data_manager.subscribe(symbol, feed_risk_engine)
+
+    APIHandler.event_broadcaster.attach_realtime_sources(
+        data_stream=integration.data_manager,
+        symbols=symbols,
+        fusion_system=integration.fusion_system,
+        risk_engine=risk_integration.risk_engine
+    )
+    print(f"📡 实时事件推送已接入: 行情、融合信号、风险警报 ({', '.join(symbols)})")
+    return True
+
+
+def stop_realtime_sources():
+    """停止实时管道（未启动时不做任何事）"""
+    module = sys.modules.get('realtime_signal_integration')
+    if module is not None and module.get_integration_system().is_running:
+        module.stop_realtime_trading()
+
+
+def start_api_server(host='localhost', port=8090, open_browser=True, workers=16, realtime=True):
+    """启动API服务器
+
+    workers > 1 时使用线程池并发处理请求；workers <= 1 时退回单线程 HTTPServer。
+    realtime 为 True 时在后台启动实时管道并接入事件推送（需要线程池模式）。
+    """
     for try_port in range(port, port + 10):
         try:
-            server = HTTPServer((host, try_port), APIHandler)
+            if workers > 1:
+                server = PooledHTTPServer((host, try_port), APIHandler, max_workers=workers)
+            else:
+                server = HTTPServer((host, try_port), APIHandler)
             print(f"🔧 后端API服务器已启动: http://{host}:{try_port}")
+            print(f"🧵 并发模式: {'线程池 ' + str(workers) + ' 个工作线程' if workers > 1 else '单线程'}")
             print(f"🌐 前端页面: http://{host}:{try_port}/")
             print(f"📡 API端点: http://{host}:{try_port}/api/")
             print("🛑 按 Ctrl+C 停止服务器")
             print("✨ 特点: 前后端分离、RESTful API、模块化架构")
             
+            # 实时管道启动较慢（连接数据源），放在后台线程，不阻塞服务
+            if realtime and workers > 1:
+                threading.Thread(target=connect_realtime_sources, name='realtime-connect', daemon=True).start()
+            
             # 自动打开浏览器
             if open_browser:
                 threading.Timer(1.0, lambda: webbrowser.open(f'http://{host}:{try_port}')).start()
@@ -782,14 +978,16 @@ def start_api_server(host='localhost', port=8090, open_browser=True):
             server.serve_forever()
             break
         except OSError as e:
-            if e.errno == 48:  # Address already in use
+            if e.errno in (48, errno.EADDRINUSE):  # Address already in use
                 print(f"端口 {try_port} 被占用，尝试端口 {try_port + 1}")
                 continue
             else:
                 raise
         except KeyboardInterrupt:
             print("\n🛑 API服务器已停止")
-            server.shutdown()
+            server.server_close()
+            APIHandler.job_manager.shutdown()
+            stop_realtime_sources()
             break
 
 if __name__ == "__main__":
@@ -797,10 +995,13 @@ if __name__ == "__main__":
     parser.add_argument('--host', default='localhost', help='服务器地址 (默认: localhost)')
     parser.add_argument('--port', type=int, default=8000, help='服务器端口 (默认: 8000)')
     parser.add_argument('--no-browser', action='store_true', help='不自动打开浏览器')
+    parser.add_argument('--workers', type=int, default=16, help='工作线程数，1 为单线程模式 (默认: 16)')
+    parser.add_argument('--no-realtime', action='store_true', help='不启动实时管道（事件推送只包含自选股和任务通知）')
     
     args = parser.parse_args()
     
     print("🚀 启动量化交易系统后端API服务器...")
     print(f"📡 服务器地址: http://{args.host}:{args.port}")
     
-    start_api_server(host=args.host, port=args.port, open_browser=not args.no_browser)
\ No newline at end of file
+    start_api_server(host=args.host, port=args.port, open_browser=not args.no_browser, workers=args.workers,
+                     realtime=not args.no_realtime)
\ No newline at end of file
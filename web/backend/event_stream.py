@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+📡 实时事件推送 (Server-Sent Events) - 量化交易系统
+把实时行情、融合信号和风险警报推送给浏览器，替代各页面的定时轮询：
+- 每个事件只序列化一次，所有客户端共享同一份字节
+- 每个客户端有界缓冲区，慢客户端积压时丢弃最旧的消息，不拖慢其他客户端
+- 单个推送线程以非阻塞方式写出所有连接，不占用 HTTP 工作线程
+- 行情只推送价格变化（增量），新客户端连接时先收到最新价格快照
+"""
+
+import json
+import logging
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 心跳作为普通事件发送，页面可据此刷新运行时间等本地状态，无需定时轮询
+HEARTBEAT = b'event: heartbeat\ndata: {}\n\n'
+
+
+def _json_default(obj):
+    """序列化枚举、时间等非JSON类型"""
+    if hasattr(obj, 'value'):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def format_event(event: str, data: Any, event_id: int = None) -> bytes:
+    """编码为一条 SSE 消息"""
+    payload = json.dumps(data, ensure_ascii=False, default=_json_default)
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {payload}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def _to_dict(obj) -> dict:
+    """把引擎回调对象转换为字典"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if is_dataclass(obj):
+        return asdict(obj)
+    return dict(obj)
+
+# ================================= 客户端连接 =================================
+
+class StreamClient:
+    """单个 SSE 连接及其有界发送缓冲区"""
+
+    __slots__ = ('sock', 'address', 'pending', 'current', 'max_buffer',
+                 'dropped', 'sent', 'connected_at')
+
+    def __init__(self, sock: socket.socket, address, max_buffer: int):
+        self.sock = sock
+        self.address = address
+        self.pending = deque()
+        self.current = b''  # 正在发送中的消息剩余部分
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.sent = 0
+        self.connected_at = time.time()
+
+    def enqueue(self, message: bytes):
+        """加入发送缓冲区，满时丢弃最旧的消息"""
+        if len(self.pending) >= self.max_buffer:
+            self.pending.popleft()
+            self.dropped += 1
+        self.pending.append(message)
+
+    def has_pending(self) -> bool:
+        return bool(self.current or self.pending)
+
+    def flush(self) -> bool:
+        """尽可能写出缓冲区，返回连接是否仍然可用"""
+        while True:
+            if not self.current:
+                if not self.pending:
+                    return True
+                self.current = self.pending.popleft()
+            try:
+                sent = self.sock.send(self.current)
+            except (BlockingIOError, InterruptedError):
+                return True
+            except OSError:
+                return False
+            self.current = self.current[sent:]
+            if not self.current:
+                self.sent += 1
+
+# ================================= 事件广播 =================================
+
+class EventBroadcaster:
+    """SSE 事件广播器"""
+
+    def __init__(self, max_buffer: int = 256, heartbeat_interval: float = 15.0,
+                 max_clients: int = 256, flush_interval: float = 0.05):
+        self.max_buffer = max_buffer
+        self.heartbeat_interval = heartbeat_interval
+        self.max_clients = max_clients
+        self.flush_interval = flush_interval
+
+        self._clients: Dict[socket.socket, StreamClient] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._event_id = 0
+
+        self.latest_prices: Dict[str, dict] = {}  # 新客户端的初始快照
+        self.stats = {
+            'published': 0,
+            'skipped_unchanged': 0,
+            'dropped_messages': 0,
+            'disconnected': 0
+        }
+
+    # ================================= 连接管理 =================================
+
+    def add_client(self, sock: socket.socket, address=None) -> bool:
+        """接管已发送响应头的连接，超过连接上限时返回False"""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return False
+            sock.setblocking(False)
+            client = StreamClient(sock, address, self.max_buffer)
+            client.enqueue(b'retry: 3000\n\n')
+            client.enqueue(format_event('snapshot', {'prices': self.latest_prices}))
+            self._clients[sock] = client
+            self._ensure_thread()
+
+        self._wakeup.set()
+        logger.info(f"SSE客户端已连接: {address}")
+        return True
+
+    def _remove_client(self, client: StreamClient):
+        with self._lock:
+            self._clients.pop(client.sock, None)
+            self.stats['dropped_messages'] += client.dropped
+            self.stats['disconnected'] += 1
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+        logger.info(f"SSE客户端已断开: {client.address}")
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._writer_loop, name='sse-writer', daemon=True)
+            self._thread.start()
+
+    # ================================= 发布 =================================
+
+    def publish(self, event: str, data: Any):
+        """发布事件：序列化一次，分发到所有客户端缓冲区"""
+        with self._lock:
+            self._event_id += 1
+            self.stats['published'] += 1
+            if not self._clients:
+                return
+            message = format_event(event, data, self._event_id)
+            for client in self._clients.values():
+                client.enqueue(message)
+        self._wakeup.set()
+
+    def publish_price(self, data: dict):
+        """发布行情增量：价格未变化的行情不推送"""
+        symbol = data.get('symbol')
+        with self._lock:
+            last = self.latest_prices.get(symbol)
+            if last is not None and last.get('price') == data.get('price'):
+                self.stats['skipped_unchanged'] += 1
+                return
+            self.latest_prices[symbol] = data
+        self.publish('price', data)
+
+    # ================================= 推送线程 =================================
+
+    def _writer_loop(self):
+        """非阻塞写出所有连接；有积压时按 flush_interval 重试，空闲时只发心跳"""
+        last_heartbeat = time.time()
+        while True:
+            with self._lock:
+                clients = list(self._clients.values())
+                backlog = any(client.has_pending() for client in clients)
+            if not clients:
+                # 没有连接时退出，下次有连接时重新启动
+                with self._lock:
+                    if not self._clients:
+                        self._thread = None
+                        return
+                continue
+
+            self._wakeup.wait(self.flush_interval if backlog else self.heartbeat_interval)
+            self._wakeup.clear()
+
+            if time.time() - last_heartbeat >= self.heartbeat_interval:
+                last_heartbeat = time.time()
+                with self._lock:
+                    for client in self._clients.values():
+                        client.enqueue(HEARTBEAT)
+
+            for client in clients:
+                with self._lock:
+                    alive = client.flush()
+                if not alive:
+                    self._remove_client(client)
+
+    # ================================= 数据源接入 =================================
+
+    def attach_data_engine(self, engine):
+        """接入 RealtimeDataEngine 行情"""
+        engine.subscribe_to_data(lambda data: self.publish_price(_to_dict(data)))
+
+    def attach_data_stream(self, data_stream, symbols):
+        """接入 DataStreamManager 行情（按股票订阅，回调参数为字典）"""
+        for symbol in symbols:
+            data_stream.subscribe(symbol, self.publish_price)
+
+    def attach_signal_fusion(self, fusion_system):
+        """接入 StrategySignalFusion 融合信号"""
+        fusion_system.add_signal_callback(lambda signal: self.publish('signal', _to_dict(signal)))
+
+    def attach_risk_engine(self, risk_engine):
+        """接入 RealtimeRiskEngine 风险警报和紧急事件"""
+        risk_engine.add_alert_callback(lambda alert: self.publish('risk_alert', _to_dict(alert)))
+        risk_engine.add_emergency_callback(lambda alert: self.publish('risk_emergency', _to_dict(alert)))
+
+    def attach_realtime_sources(self, data_engine=None, fusion_system=None, risk_engine=None,
+                                data_stream=None, symbols=()):
+        """一次接入多个实时数据源"""
+        if data_engine is not None:
+            self.attach_data_engine(data_engine)
+        if data_stream is not None:
+            self.attach_data_stream(data_stream, symbols)
+        if fusion_system is not None:
+            self.attach_signal_fusion(fusion_system)
+        if risk_engine is not None:
+            self.attach_risk_engine(risk_engine)
+
+    # ================================= 统计 =================================
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            clients = [
+                {
+                    'address': f"{client.address[0]}:{client.address[1]}" if client.address else None,
+                    'buffered': len(client.pending),
+                    'sent': client.sent,
+                    'dropped': client.dropped,
+                    'connected_seconds': round(time.time() - client.connected_at, 1)
+                }
+                for client in self._clients.values()
+            ]
+            stats = dict(self.stats)
+        stats['clients'] = clients
+        stats['client_count'] = len(clients)
+        return stats
+
+# ================================= 全局实例 =================================
+
+_global_broadcaster: Optional[EventBroadcaster] = None
+
+def get_event_broadcaster() -> EventBroadcaster:
+    """获取全局事件广播器"""
+    global _global_broadcaster
+    if _global_broadcaster is None:
+        _global_broadcaster = EventBroadcaster()
+    return _global_broadcaster
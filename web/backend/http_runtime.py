@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+🔧 Web服务运行时组件 - 量化交易系统
+为 API 服务器和简单 Web 界面提供并发与缓存支持：
+- PooledHTTPServer: 固定大小线程池处理请求，慢请求不再阻塞其他客户端
+- ResponseCache: 预序列化 JSON 字节的 TTL 缓存，同一键并发请求只计算一次
+- StaticFileCache: 静态文件内容、ETag 与 gzip 压缩结果缓存（按修改时间自动失效）
+- JobManager: 后台任务（长回测），客户端按任务ID轮询结果
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import HTTPServer
+
+# 值得压缩的内容类型
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# 小于该字节数的文件不压缩
+GZIP_MIN_SIZE = 1024
+
+# ================================= 线程池服务器 =================================
+
+class PooledHTTPServer(HTTPServer):
+    """线程池 HTTP 服务器
+
+    与 ThreadingHTTPServer 每个请求新建线程不同，这里复用固定数量的工作线程，
+    并发上限可控；单个慢请求（系统状态、回测）只占用一个工作线程。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, RequestHandlerClass, max_workers: int = 16,
+                 bind_and_activate: bool = True):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http-worker')
+        self._detached = set()
+        self._detached_lock = threading.Lock()
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+    def process_request(self, request, client_address):
+        """把请求交给工作线程处理"""
+        self._executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        """工作线程入口"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def detach_request(self, request):
+        """请求结束后不关闭该连接（由长连接推送等组件接管）"""
+        with self._detached_lock:
+            self._detached.add(request)
+
+    def shutdown_request(self, request):
+        with self._detached_lock:
+            if request in self._detached:
+                self._detached.discard(request)
+                return
+        super().shutdown_request(request)
+
+    def server_close(self):
+        """关闭监听并释放线程池"""
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+# ================================= 响应缓存 =================================
+
+class ResponseCache:
+    """预序列化响应的 TTL 缓存
+
+    缓存的是已编码的 JSON 字节，命中时直接写出，不再重复计算和序列化。
+    同一键同时只有一个线程执行构建函数，其他请求等待并共享结果。
+    """
+
+    def __init__(self, default_ttl: float = 5.0):
+        self.default_ttl = default_ttl
+        self._entries = {}  # key -> (expires_at, body)
+        self._key_locks = {}
+        # 失效代数：构建期间发生 invalidate() 时丢弃构建结果，避免缓存写入前的旧数据
+        self._generation = 0
+        self._key_generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _current_generation(self, key):
+        with self._lock:
+            return self._generation, self._key_generations.get(key, 0)
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    def get_or_build(self, key, builder, ttl: float = None) -> bytes:
+        """返回缓存的 JSON 字节，过期时调用 builder() 重新生成"""
+        body = self._lookup(key)
+        if body is not None:
+            self.hits += 1
+            return body
+
+        with self._key_lock(key):
+            # 等锁期间其他线程可能已完成构建
+            body = self._lookup(key)
+            if body is not None:
+                self.hits += 1
+                return body
+
+            self.misses += 1
+            generation = self._current_generation(key)
+            body = json.dumps(builder(), ensure_ascii=False).encode('utf-8')
+            ttl = self.default_ttl if ttl is None else ttl
+            with self._lock:
+                if generation == (self._generation, self._key_generations.get(key, 0)):
+                    self._entries[key] = (time.time() + ttl, body)
+            return body
+
+    def invalidate(self, key=None):
+        """使指定键（默认全部）失效，正在进行的构建结果不会写入缓存"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._generation += 1
+            else:
+                self._entries.pop(key, None)
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0
+        }
+
+# ================================= 静态文件缓存 =================================
+
+class StaticFile:
+    """缓存的静态文件"""
+
+    __slots__ = ('body', 'gzip_body', 'etag', 'content_type', 'last_modified', 'signature')
+
+    def __init__(self, body: bytes, content_type: str, signature: tuple, last_modified: float):
+        self.body = body
+        self.content_type = content_type
+        self.signature = signature
+        self.last_modified = last_modified
+        self.etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        self.gzip_body = None
+        if len(body) >= GZIP_MIN_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+
+
+class StaticFileCache:
+    """静态文件内容缓存，文件修改时间或大小变化时自动重新加载"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._files = OrderedDict()  # path -> StaticFile
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def guess_type(file_path: str) -> str:
+        """根据扩展名推断 Content-Type"""
+        if file_path.endswith('.js'):
+            return 'application/javascript'
+        content_type, _ = mimetypes.guess_type(file_path)
+        return content_type or 'application/octet-stream'
+
+    def get(self, file_path: str, content_type: str = None):
+        """读取文件（不存在时返回None）"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._files.get(file_path)
+            if cached is not None and cached.signature == signature:
+                self._files.move_to_end(file_path)
+                return cached
+
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        static_file = StaticFile(body, content_type or self.guess_type(file_path),
+                                 signature, stat.st_mtime)
+
+        with self._lock:
+            self._files[file_path] = static_file
+            self._files.move_to_end(file_path)
+            while len(self._files) > self.max_entries:
+                self._files.popitem(last=False)
+        return static_file
+
+# ================================= 后台任务 =================================
+
+class JobManager:
+    """后台任务管理器
+
+    submit() 立即返回任务ID，任务在独立线程池中执行；客户端通过 get() 轮询
+    pending/running/completed/failed 状态和结果，或通过 on_finish 回调得到结束通知。
+    只保留最近 max_jobs 个任务。
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 200, on_finish=None):
+        self.max_jobs = max_jobs
+        self.on_finish = on_finish  # 任务结束回调 on_finish(job)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-worker')
+        self._jobs = OrderedDict()  # job_id -> dict
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func, params: dict = None) -> str:
+        """提交任务，返回任务ID"""
+        job_id = f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'status': 'pending',
+            'params': params or {},
+            'result': None,
+            'error': None,
+            'submitted_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, func)
+        return job_id
+
+    def _run(self, job: dict, func):
+        job['status'] = 'running'
+        job['started_at'] = datetime.now().isoformat()
+        try:
+            job['result'] = func(job['params'])
+            job['status'] = 'completed'
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = datetime.now().isoformat()
+            if self.on_finish:
+                try:
+                    self.on_finish({key: value for key, value in job.items() if key != 'result'})
+                except Exception:
+                    pass
+
+    def _prune(self):
+        """超出上限时丢弃最早的已结束任务"""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job['status'] in ('completed', 'failed')]:
+            del self._jobs[job_id]
+            if len(self._jobs) <= self.max_jobs:
+                break
+
+    def get(self, job_id: str):
+        """任务状态快照（不存在时返回None）"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self, kind: str = None) -> list:
+        """任务列表（不含结果），最新的在前"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if kind is None or job['kind'] == kind]
+        return [
+            {key: value for key, value in job.items() if key != 'result'}
+            for job in reversed(jobs)
+        ]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -7,19 +7,41 @@ class AutoTradeManager {
     constructor() {
         this.api = new TradingAPI();
         this.isRunning = false;
-        this.intervalId = null;
-        this.tradeCount = 0;
+        this.signalCount = 0;
         this.startTime = null;
-        this.totalProfit = 0;
         
         this.init();
     }
     
     init() {
         this.bindEvents();
+        this.connectEventStream();
         this.updateUI();
     }
     
+    /**
+     * 订阅服务端推送：运行期间记录融合信号和风险警报，心跳时刷新运行时间
+     */
+    connectEventStream() {
+        eventStream
+            .on('signal', (signal) => this.onSignal(signal))
+            .on('risk_alert', (alert) => {
+                if (this.isRunning) {
+                    this.logTrade(`⚠️ 风险警报 ${alert.symbol}`, alert.message);
+                }
+            })
+            .on('risk_emergency', (alert) => {
+                if (this.isRunning) {
+                    this.logTrade(`🆘 紧急风险 ${alert.symbol}`, alert.message);
+                }
+            })
+            .on('heartbeat', () => {
+                if (this.isRunning) {
+                    this.updateStatusDisplay();
+                }
+            });
+    }
+    
     bindEvents() {
         document.getElementById('start-btn').addEventListener('click', () => this.startTrading());
         document.getElementById('stop-btn').addEventListener('click', () => this.stopTrading());
@@ -43,12 +65,10 @@ class AutoTradeManager {
             if (response.success) {
                 this.isRunning = true;
                 this.startTime = new Date();
-                this.tradeCount = 0;
-                this.totalProfit = 0;
+                this.signalCount = 0;
                 
-                // 更新UI状态
+                // 更新UI状态（之后由推送事件驱动）
                 this.updateUI();
-                this.startStatusUpdates();
                 
                 UIUtils.showAlert('✅ 自动交易已启动！', 'success');
                 this.logTrade('🚀 自动交易系统启动', '开始监控市场并执行交易策略...');
@@ -67,7 +87,6 @@ class AutoTradeManager {
             
             if (response.success) {
                 this.isRunning = false;
-                this.stopStatusUpdates();
                 this.updateUI();
                 
                 UIUtils.showAlert('🛑 自动交易已停止', 'info');
@@ -139,13 +158,11 @@ class AutoTradeManager {
         
         if (this.isRunning) {
             const runtime = this.getRuntime();
-            const profitStr = this.totalProfit >= 0 ? `+$${this.totalProfit.toFixed(2)}` : `-$${Math.abs(this.totalProfit).toFixed(2)}`;
             
             statusDiv.innerHTML = `
 🟢 自动交易运行中...
 ⏱️ 运行时间: ${runtime}
-💼 交易次数: ${this.tradeCount}
-💰 当前盈亏: ${profitStr}
+📶 交易信号: ${this.signalCount}次
 📊 策略: ${this.getStrategyName(config.strategy)}
 🎯 股票池: ${this.getStockPoolName(config.stocks)}
 🛡️ 风险控制: 止损${config.stopLoss}%, 止盈${config.takeProfit}%`;
@@ -159,42 +176,27 @@ class AutoTradeManager {
         }
     }
     
-    startStatusUpdates() {
-        // 每5秒更新一次状态
-        this.intervalId = setInterval(() => {
-            this.updateStatusDisplay();
-            this.simulateTrading();
-        }, 5000);
-    }
-    
-    stopStatusUpdates() {
-        if (this.intervalId) {
-            clearInterval(this.intervalId);
-            this.intervalId = null;
+    /**
+     * 处理融合信号（买入/卖出信号计入信号次数；推送流不含成交，不统计交易次数和盈亏）
+     */
+    onSignal(signal) {
+        if (!this.isRunning) {
+            return;
         }
-    }
-    
-    // 模拟交易活动
-    simulateTrading() {
-        // 模拟随机交易
-        if (Math.random() < 0.3) { // 30%概率产生交易
-            const actions = ['买入', '卖出'];
-            const stocks = ['AAPL', 'TSLA', 'NVDA', 'MSFT', 'GOOGL'];
-            const action = actions[Math.floor(Math.random() * actions.length)];
-            const stock = stocks[Math.floor(Math.random() * stocks.length)];
-            const price = (Math.random() * 200 + 50).toFixed(2);
-            const shares = Math.floor(Math.random() * 100 + 10);
-            const profit = (Math.random() - 0.5) * 1000;
-            
-            this.tradeCount++;
-            this.totalProfit += profit;
-            
-            const profitStr = profit >= 0 ? `+$${profit.toFixed(2)}` : `-$${Math.abs(profit).toFixed(2)}`;
-            this.logTrade(
-                `📈 ${action} ${stock}`,
-                `价格: $${price}, 数量: ${shares}股, 盈亏: ${profitStr}`
-            );
+        
+        const action = String(signal.final_signal || '').toLowerCase();
+        const label = action.includes('buy') ? '买入' : action.includes('sell') ? '卖出' : null;
+        if (!label) {
+            return;
         }
+        
+        this.signalCount++;
+        const strategies = (signal.contributing_strategies || []).join(', ');
+        this.logTrade(
+            `📈 ${label}信号 ${signal.symbol}`,
+            `强度: ${Number(signal.aggregated_strength).toFixed(2)}, 置信度: ${Number(signal.confidence_score).toFixed(2)}, 策略: ${strategies}`
+        );
+        this.updateStatusDisplay();
     }
     
     logTrade(title, details) {
@@ -236,9 +238,8 @@ ${details}
     
     generateSummary() {
         const runtime = this.getRuntime();
-        const profitStr = this.totalProfit >= 0 ? `盈利$${this.totalProfit.toFixed(2)}` : `亏损$${Math.abs(this.totalProfit).toFixed(2)}`;
         
-        return `运行时间: ${runtime}, 总交易: ${this.tradeCount}次, 总${profitStr}`;
+        return `运行时间: ${runtime}, 交易信号: ${this.signalCount}次`;
     }
     
     getModeLabel(mode) {
@@ -257,6 +257,66 @@ class UIUtils {
     }
 }
 
+/**
+ * 服务端事件推送 (/api/stream)
+ * 每个页面共用一个 EventSource 连接，各模块按事件类型注册处理函数，替代定时轮询。
+ * 事件类型: snapshot, price, signal, risk_alert, risk_emergency, job, watchlist, heartbeat
+ */
+class EventStream {
+    constructor(url = '/api/stream') {
+        this.url = url;
+        this.source = null;
+        this.handlers = {};
+    }
+
+    /**
+     * 注册事件处理函数（收到的数据已解析为对象）
+     */
+    on(type, handler) {
+        if (!this.handlers[type]) {
+            this.handlers[type] = [];
+            if (this.source) {
+                this.bind(type);
+            }
+        }
+        this.handlers[type].push(handler);
+        this.connect();
+        return this;
+    }
+
+    connect() {
+        if (this.source || !window.EventSource) {
+            return;
+        }
+        // 断线后浏览器按服务端的 retry 间隔自动重连
+        this.source = new EventSource(this.url);
+        Object.keys(this.handlers).forEach(type => this.bind(type));
+    }
+
+    bind(type) {
+        this.source.addEventListener(type, (e) => {
+            let data;
+            try {
+                data = JSON.parse(e.data);
+            } catch (error) {
+                console.error(`事件解析失败 (${type}):`, error);
+                return;
+            }
+            this.handlers[type].forEach(handler => handler(data));
+        });
+    }
+
+    close() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+}
+
+// 全局事件推送实例
+const eventStream = new EventStream();
+
 /**
  * 数据工具类
  */
@@ -387,4 +447,6 @@ window.TradingAPI = TradingAPI;
 window.UIUtils = UIUtils;
 window.DataUtils = DataUtils;
 window.ChartUtils = ChartUtils;
-window.api = api;
\ No newline at end of file
+window.api = api;
+window.EventStream = EventStream;
+window.eventStream = eventStream;
\ No newline at end of file
@@ -7,16 +7,80 @@ class MonitoringManager {
     constructor() {
         this.api = new TradingAPI();
         this.startTime = new Date();
-        this.autoUpdate = true;
-        this.updateInterval = null;
+        this.prices = {};               // 推送的最新行情 {symbol: price事件}
+        this.strategies = new Set();    // 融合信号中出现过的策略
+        this.priceAlertPercent = 5;     // 涨跌幅超过该值时记录日志
         
         this.init();
     }
     
     init() {
         this.bindEvents();
-        this.startAutoUpdate();
+        this.updateSystemStatus();
+        this.updateUptime();
         this.loadSystemData();
+        this.connectEventStream();
+    }
+    
+    /**
+     * 订阅服务端推送 (/api/stream)：行情、融合信号、风险警报、任务完成、自选股变化
+     * 页面状态全部由推送事件驱动，不再定时轮询
+     */
+    connectEventStream() {
+        eventStream
+            .on('snapshot', (snapshot) => {
+                Object.assign(this.prices, snapshot.prices || {});
+                this.updateMonitoredStocks();
+            })
+            .on('price', (tick) => this.onPrice(tick))
+            .on('signal', (signal) => {
+                (signal.contributing_strategies || []).forEach(name => this.strategies.add(name));
+                document.getElementById('active-strategies').textContent = `${this.strategies.size}个`;
+                this.appendLog('INFO', `策略信号: ${signal.symbol} ${signal.final_signal} (强度 ${Number(signal.aggregated_strength).toFixed(2)})`);
+            })
+            .on('risk_alert', (alert) => {
+                this.appendLog(alert.alert_type === 'CRITICAL' ? 'ERROR' : 'WARNING', `风险警报: ${alert.symbol} ${alert.message}`);
+            })
+            .on('risk_emergency', (alert) => {
+                this.appendLog('ERROR', `紧急风险: ${alert.symbol} ${alert.message}`);
+            })
+            .on('job', (job) => {
+                const level = job.status === 'completed' ? 'SUCCESS' : 'ERROR';
+                this.appendLog(level, `后台任务 ${job.id}: ${job.status}`);
+            })
+            .on('watchlist', (update) => {
+                this.appendLog('INFO', `自选股已更新: ${(update.data || []).join(', ')}`);
+            })
+            .on('heartbeat', () => this.updateUptime());
+    }
+    
+    onPrice(tick) {
+        const isNew = !(tick.symbol in this.prices);
+        this.prices[tick.symbol] = tick;
+        if (isNew) {
+            this.updateMonitoredStocks();
+        }
+        
+        const changePercent = Number(tick.change_percent || 0);
+        if (Math.abs(changePercent) >= this.priceAlertPercent) {
+            this.appendLog('WARNING', `${tick.symbol} 股价波动异常: $${Number(tick.price).toFixed(2)} (${changePercent >= 0 ? '+' : ''}${changePercent.toFixed(2)}%)`);
+        }
+    }
+    
+    updateMonitoredStocks() {
+        document.getElementById('monitored-stocks').textContent = `${Object.keys(this.prices).length}只`;
+    }
+    
+    appendLog(level, message) {
+        const logContainer = document.getElementById('system-log');
+        const time = new Date().toTimeString().slice(0, 8);
+        logContainer.insertBefore(this.createLogElement({ time, level, message }), logContainer.firstChild);
+        
+        // 限制日志数量
+        const logs = logContainer.children;
+        if (logs.length > 20) {
+            logContainer.removeChild(logs[logs.length - 1]);
+        }
     }
     
     bindEvents() {
@@ -34,29 +98,10 @@ class MonitoringManager {
         });
     }
     
-    startAutoUpdate() {
-        this.updateInterval = setInterval(() => {
-            this.updateSystemStatus();
-            this.updateUptime();
-        }, 60000); // 每分钟更新
-        
-        // 立即更新一次
-        this.updateSystemStatus();
-        this.updateUptime();
-    }
-    
-    stopAutoUpdate() {
-        if (this.updateInterval) {
-            clearInterval(this.updateInterval);
-            this.updateInterval = null;
-        }
-    }
-    
     async loadSystemData() {
         try {
             await Promise.all([
                 this.loadTradingData(),
-                this.loadLogData(),
                 this.updateRiskMetrics()
             ]);
         } catch (error) {
@@ -75,15 +120,6 @@ class MonitoringManager {
         }
     }
     
-    async loadLogData() {
-        try {
-            // 模拟系统日志
-            this.simulateSystemLogs();
-        } catch (error) {
-            console.error('加载日志数据失败:', error);
-        }
-    }
-    
     updateSystemStatus() {
         // 更新系统状态
         const metrics = this.calculateSystemMetrics();
@@ -171,43 +207,6 @@ class MonitoringManager {
         }).join('');
     }
     
-    simulateSystemLogs() {
-        const logContainer = document.getElementById('system-log');
-        
-        // 定期添加新日志
-        setInterval(() => {
-            const newLog = this.generateRandomLog();
-            const logElement = this.createLogElement(newLog);
-            logContainer.insertBefore(logElement, logContainer.firstChild);
-            
-            // 限制日志数量
-            const logs = logContainer.children;
-            if (logs.length > 20) {
-                logContainer.removeChild(logs[logs.length - 1]);
-            }
-        }, 30000); // 每30秒添加一条日志
-    }
-    
-    generateRandomLog() {
-        const levels = ['INFO', 'SUCCESS', 'WARNING', 'ERROR'];
-        const messages = [
-            '数据更新完成，获取到最新股价信息',
-            '策略信号生成：MA交叉买入信号',
-            '风险检查通过，执行交易操作',
-            '连接数据源成功',
-            '股价异常波动检测',
-            '止损订单执行完成',
-            '系统内存使用率正常',
-            '网络延迟检测: 45ms'
-        ];
-        
-        const level = levels[Math.floor(Math.random() * levels.length)];
-        const message = messages[Math.floor(Math.random() * messages.length)];
-        const time = new Date().toTimeString().slice(0, 8);
-        
-        return { time, level, message };
-    }
-    
     createLogElement(log) {
         const div = document.createElement('div');
         div.className = `log-entry ${log.level.toLowerCase()}`;
@@ -6,11 +6,19 @@
 import os
 import sys
 import json
+import errno
 import threading
 import webbrowser
 from datetime import datetime
 from http.server import HTTPServer, BaseHTTPRequestHandler
 
+# 线程池服务器与 API 服务器共用
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web', 'backend'))
+try:
+    from http_runtime import PooledHTTPServer
+except ImportError:
+    from http.server import ThreadingHTTPServer as PooledHTTPServer
+
 class SimpleWebHandler(BaseHTTPRequestHandler):
     """简单Web处理器"""
     
@@ -951,12 +959,13 @@ ${finalReturn > 0.4 ? '🏆 组合表现优秀，风险分散良好' : finalRetu
         self.end_headers()
         self.wfile.write(json.dumps(stocks_data, ensure_ascii=False).encode('utf-8'))
 
-def start_simple_web(port=8090):
-    """启动简单Web服务器"""
+def start_simple_web(port=8090, threaded=True):
+    """启动简单Web服务器（默认并发处理请求，threaded=False 时为单线程）"""
     # 尝试多个端口
     for try_port in range(port, port + 10):
         try:
-            server = HTTPServer(('localhost', try_port), SimpleWebHandler)
+            server_class = PooledHTTPServer if threaded else HTTPServer
+            server = server_class(('localhost', try_port), SimpleWebHandler)
             print(f"🌐 简单Web界面已启动: http://localhost:{try_port}")
             print("💡 使用浏览器访问上述地址")
             print("🛑 按 Ctrl+C 停止服务器")
@@ -968,7 +977,7 @@ def start_simple_web(port=8090):
             server.serve_forever()
             break
         except OSError as e:
-            if e.errno == 48:  # Address already in use
+            if e.errno in (48, errno.EADDRINUSE):  # Address already in use
                 print(f"端口 {try_port} 被占用，尝试端口 {try_port + 1}")
                 continue
             else: